@@ -10,11 +10,13 @@ from .models import (
     UserActivityLog,
     UserFavorite,
     UserNotification,
+    BroadcastJob,
     RewardAccount,
     RewardTransaction,
     UserSession,
     OTPCode,
 )
+from .notifications import invalidate_unread
 
 
 # ─── PROFIL UTILISATEUR ───────────────────────────────────────────────────────
@@ -97,8 +99,8 @@ class UserFavoriteAdmin(admin.ModelAdmin):
 
 @admin.register(UserNotification)
 class UserNotificationAdmin(admin.ModelAdmin):
-    list_display  = ('user', 'title', 'notification_type', 'is_read', 'created_at')
-    list_filter   = ('notification_type', 'is_read')
+    list_display  = ('user', 'title', 'notification_type', 'audience', 'is_read', 'created_at')
+    list_filter   = ('notification_type', 'audience', 'is_read')
     search_fields = ('user__username', 'title', 'message')
     readonly_fields = ('created_at', 'updated_at')
     ordering      = ('-created_at',)
@@ -106,16 +108,29 @@ class UserNotificationAdmin(admin.ModelAdmin):
     actions = ['mark_as_read', 'mark_as_unread']
 
     def mark_as_read(self, request, queryset):
+        user_ids = list(queryset.values_list('user_id', flat=True).distinct())
         count = queryset.update(is_read=True)
+        invalidate_unread(user_ids)
         self.message_user(request, f"{count} notification(s) marquée(s) comme lue(s).")
     mark_as_read.short_description = "Marquer comme lue"
 
     def mark_as_unread(self, request, queryset):
+        user_ids = list(queryset.values_list('user_id', flat=True).distinct())
         count = queryset.update(is_read=False)
+        invalidate_unread(user_ids)
         self.message_user(request, f"{count} notification(s) marquée(s) comme non lue(s).")
     mark_as_unread.short_description = "Marquer comme non lue"
 
 
+@admin.register(BroadcastJob)
+class BroadcastJobAdmin(admin.ModelAdmin):
+    list_display  = ('id', 'title', 'scope', 'status', 'sent', 'total', 'created_by', 'created_at', 'finished_at')
+    list_filter   = ('status', 'scope')
+    search_fields = ('title', 'message')
+    readonly_fields = ('total', 'sent', 'last_user_id', 'error', 'created_by', 'created_at', 'started_at', 'finished_at')
+    ordering      = ('-created_at',)
+
+
 class RewardTransactionInline(admin.TabularInline):
     model = RewardTransaction
     extra = 0
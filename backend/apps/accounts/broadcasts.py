@@ -0,0 +1,241 @@
+# backend/apps/accounts/broadcasts.py
+# Moteur de diffusion des notifications admin (BroadcastJob).
+#   - ciblage   : customer_targets() / actor_targets() → queryset d'utilisateurs
+#   - exécution : run_job() insère par lots de CHUNK_SIZE avec un INSERT … SELECT
+#                 (aucune instance User/UserNotification chargée en Python),
+#                 curseur last_user_id → reprise possible après interruption
+#   - worker    : `python manage.py run_broadcasts --loop`
+# Les petites diffusions (≤ INLINE_MAX destinataires) partent dans la requête.
+
+import logging
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import BroadcastJob, CourierProfile, UserNotification
+from .notifications import audience_for_url, invalidate_unread
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 2000
+INLINE_MAX = 500
+STALE_AFTER = timedelta(minutes=5)
+
+
+# ─── Ciblage ──────────────────────────────────────────────────────────────────
+
+def customer_targets(filters):
+    """
+    Retourne un queryset d'utilisateurs selon les filtres :
+      - audience : 'all' | 'city' | 'tier' | 'user'
+      - city     : str (si audience == 'city')
+      - tier     : str BRONZE|SILVER|GOLD|DIAMOND (si audience == 'tier')
+      - user_id  : int (si audience == 'user')
+    N'inclut que les acheteurs actifs non bannis.
+    """
+    audience = filters.get('audience', 'all')
+    qs = User.objects.filter(is_active=True, is_staff=False)
+
+    if audience == 'city':
+        city = filters.get('city', '')
+        if city:
+            # Cherche dans le profil vendeur ou le profil utilisateur
+            qs = qs.filter(
+                Q(vendor_profile__city__iexact=city) |
+                Q(profile__city__iexact=city)
+            ).distinct()
+
+    elif audience == 'tier':
+        tier = filters.get('tier') or 'BRONZE'
+        # Le tier est dans VendorProfile pour les vendeurs, dans UserProfile pour les acheteurs
+        qs = qs.filter(
+            Q(vendor_profile__certification_tier=tier) |
+            Q(profile__loyalty_tier=tier)
+        ).distinct()
+
+    elif audience == 'user':
+        user_id = filters.get('user_id')
+        qs = qs.filter(id=user_id) if user_id else qs.none()
+
+    # Exclure les utilisateurs bannis
+    return qs.exclude(profile__is_banned=True)
+
+
+def actor_targets(filters):
+    """
+    Ciblage étendu (clients, vendeurs, livreurs, individuel).
+    Lève ValueError avec un message utilisateur si le ciblage est invalide.
+    """
+    audience = filters.get('audience', 'all')
+    active = User.objects.filter(is_active=True)
+
+    if audience in ('all_actors', 'all'):
+        return active.filter(is_staff=False)
+    if audience == 'couriers':
+        return active.filter(
+            id__in=CourierProfile.objects.filter(user__is_active=True).values('user_id')
+        )
+    if audience == 'specific_courier':
+        if not filters.get('courier_user_id'):
+            raise ValueError('courier_user_id requis pour ce ciblage.')
+        return active.filter(id=filters['courier_user_id'])
+    if audience == 'specific_vendor':
+        if not filters.get('vendor_user_id'):
+            raise ValueError('vendor_user_id requis pour ce ciblage.')
+        return active.filter(id=filters['vendor_user_id'])
+    if audience == 'customers':
+        return active.filter(
+            is_staff=False,
+            vendor_profile__isnull=True,
+            courier_profile__isnull=True,
+        )
+    if audience == 'vendors':
+        return active.filter(vendor_profile__isnull=False)
+    if audience == 'active_vendors':
+        return active.filter(vendor_profile__status='APPROVED')
+    raise ValueError(f'Audience inconnue : {audience}')
+
+
+def target_queryset(job):
+    if job.scope == BroadcastJob.Scope.ACTORS:
+        return actor_targets(job.filters)
+    return customer_targets(job.filters)
+
+
+# ─── Création / exécution ─────────────────────────────────────────────────────
+
+def create_job(*, title, message, notification_type, action_url, scope, filters, created_by, run_inline=True):
+    """
+    Enregistre la diffusion et la lance tout de suite si elle est petite.
+    Lève ValueError si le ciblage est invalide ou vide.
+    """
+    job = BroadcastJob(
+        title=title[:160],
+        message=message,
+        notification_type=notification_type,
+        action_url=action_url or "",
+        scope=scope,
+        filters=filters,
+        created_by=created_by,
+    )
+    job.total = target_queryset(job).count()
+    if job.total == 0:
+        raise ValueError('Aucun utilisateur ciblé avec ces filtres.')
+    inline = run_inline and job.total <= INLINE_MAX
+    if inline:
+        # Créé RUNNING : claim_next_job() du worker ne le prend pas en parallèle
+        job.status = BroadcastJob.Status.RUNNING
+        job.started_at = timezone.now()
+    job.save()
+    if inline:
+        run_job(job)
+    return job
+
+
+def _insert_chunk(job, chunk_qs, audience, now):
+    """
+    Insère les notifications d'un lot (chunk_qs : queryset .values('id') tranché).
+    Retourne les ids des destinataires.
+    """
+    if connection.vendor != 'postgresql':
+        user_ids = [row['id'] for row in chunk_qs]
+        UserNotification.objects.bulk_create([
+            UserNotification(
+                user_id=user_id, title=job.title, message=job.message,
+                notification_type=job.notification_type, action_url=job.action_url,
+                audience=audience,
+            )
+            for user_id in user_ids
+        ])
+        return user_ids
+
+    select_sql, params = chunk_qs.query.sql_with_params()
+    table = connection.ops.quote_name(UserNotification._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH batch AS ({select_sql}), inserted AS ("
+            f" INSERT INTO {table}"
+            f" (user_id, title, message, notification_type, action_url, audience, is_read, created_at, updated_at)"
+            f" SELECT batch.id, %s, %s, %s, %s, %s, false, %s, %s FROM batch"
+            f") SELECT id FROM batch",
+            [*params, job.title, job.message, job.notification_type, job.action_url, audience, now, now],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def run_job(job, chunk_size=CHUNK_SIZE):
+    """Exécute (ou reprend) une diffusion, lot par lot."""
+    audience = audience_for_url(job.action_url)
+    base = target_queryset(job).order_by('id').values('id')
+
+    job.status = BroadcastJob.Status.RUNNING
+    job.started_at = job.started_at or timezone.now()
+    job.save(update_fields=['status', 'started_at', 'updated_at'])
+
+    try:
+        while True:
+            now = timezone.now()
+            with transaction.atomic():
+                user_ids = _insert_chunk(job, base.filter(id__gt=job.last_user_id)[:chunk_size], audience, now)
+                if not user_ids:
+                    break
+                job.sent += len(user_ids)
+                job.last_user_id = max(user_ids)
+                job.save(update_fields=['sent', 'last_user_id', 'updated_at'])
+            invalidate_unread(user_ids, audiences=[audience])
+    except Exception as exc:
+        logger.exception("Diffusion #%s interrompue", job.pk)
+        job.status = BroadcastJob.Status.FAILED
+        job.error = str(exc)[:2000]
+        job.save(update_fields=['status', 'error', 'updated_at'])
+        return job
+
+    job.status = BroadcastJob.Status.DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'finished_at', 'updated_at'])
+    return job
+
+
+def claim_next_job():
+    """
+    Réserve le prochain job à exécuter : PENDING, ou RUNNING abandonné
+    (worker mort, pas de progrès depuis STALE_AFTER).
+    """
+    stale = timezone.now() - STALE_AFTER
+    with transaction.atomic():
+        job = (
+            BroadcastJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=BroadcastJob.Status.PENDING)
+                | Q(status=BroadcastJob.Status.RUNNING, updated_at__lt=stale)
+            )
+            .order_by('created_at')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = BroadcastJob.Status.RUNNING
+        job.save(update_fields=['status', 'updated_at'])
+    return job
+
+
+def history_entry(job):
+    """Format historique attendu par l'écran admin (ancienne liste en cache)."""
+    return {
+        'id':        job.id,
+        'title':     job.title,
+        'message':   job.message[:120] + ('…' if len(job.message) > 120 else ''),
+        'audience':  job.filters.get('audience', ''),
+        'city':      job.filters.get('city', ''),
+        'tier':      job.filters.get('tier', ''),
+        'type':      job.notification_type,
+        'sent_to':   job.total,
+        'delivered': job.sent,
+        'status':    job.status,
+        'progress':  job.progress,
+        'sent_by':   job.created_by.username if job.created_by_id else '',
+        'sent_at':   job.created_at.isoformat(),
+    }
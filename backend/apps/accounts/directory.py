@@ -0,0 +1,106 @@
+# backend/apps/accounts/directory.py
+# Annuaire admin des utilisateurs (GET /api/vendors/admin/users/).
+#   - directory_queryset() : filtres, recherche et tri en SQL ; commandes et
+#                            dépenses lues dans CustomerStats (LEFT JOIN),
+#                            plus de COUNT / SUM par ligne
+#   - directory_totals()   : compteurs globaux de la page (une requête)
+#   - UserProfile          : créé au post_save de User (cf. profiles.py), le
+#                            filtre is_banned n'a plus à créer les manquants
+
+from django.contrib.auth.models import User
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+# Clés de tri acceptées (?ordering=-total_spent) → expression SQL
+ORDERING_FIELDS = {
+    "username": "username",
+    "date_joined": "date_joined",
+    "last_login": "last_login",
+    "orders_count": "orders_count",
+    "total_orders": "orders_count",
+    "loyalty_points": "orders_count",
+    "total_spent": "total_spent",
+}
+DEFAULT_ORDERING = "-date_joined"
+
+
+def _flag(value):
+    return str(value).lower() in ("1", "true", "yes")
+
+
+def _plan_filter(plan):
+    """Plan actif du vendeur : FREE = sans plan ou plan expiré."""
+    valid = Q(vendor_profile__current_plan__isnull=False) & (
+        Q(vendor_profile__plan_expires_at__isnull=True) | Q(vendor_profile__plan_expires_at__gt=timezone.now())
+    )
+    if plan.upper() == "FREE":
+        return Q(vendor_profile__isnull=False) & ~valid
+    return valid & Q(vendor_profile__current_plan__code=plan.upper())
+
+
+def directory_queryset(params):
+    users = User.objects.select_related(
+        "vendor_profile", "vendor_profile__current_plan", "courier_profile", "profile", "order_stats",
+    ).annotate(
+        orders_count=Coalesce(F("order_stats__orders_count"), Value(0)),
+        total_spent=Coalesce(F("order_stats__total_spent_xaf"), Value(0)),
+    )
+
+    role = params.get("role")
+    if role == "vendor":
+        users = users.filter(vendor_profile__isnull=False)
+    elif role == "courier":
+        users = users.filter(courier_profile__isnull=False)
+    elif role == "customer":
+        users = users.filter(is_staff=False, is_superuser=False)
+    elif role in {"staff", "admin"}:
+        users = users.filter(Q(is_staff=True) | Q(is_superuser=True))
+
+    if params.get("is_active") is not None:
+        users = users.filter(is_active=_flag(params["is_active"]))
+    if params.get("is_banned") is not None:
+        banned = Q(profile__is_banned=True)
+        users = users.filter(banned if _flag(params["is_banned"]) else ~banned)
+
+    status = params.get("status")
+    if status == "active":
+        users = users.filter(is_active=True).exclude(profile__is_banned=True)
+    elif status == "inactive":
+        users = users.filter(is_active=False).exclude(profile__is_banned=True)
+    elif status == "banned":
+        users = users.filter(profile__is_banned=True)
+
+    if params.get("plan"):
+        users = users.filter(_plan_filter(params["plan"]))
+    if params.get("date_from"):
+        users = users.filter(date_joined__date__gte=params["date_from"])
+    if params.get("date_to"):
+        users = users.filter(date_joined__date__lte=params["date_to"])
+
+    search = (params.get("search") or "").strip()
+    if search:
+        users = users.filter(
+            Q(username__icontains=search)
+            | Q(email__icontains=search)
+            | Q(first_name__icontains=search)
+            | Q(last_name__icontains=search)
+            | Q(vendor_profile__business_name__icontains=search)
+        )
+
+    ordering = params.get("ordering") or DEFAULT_ORDERING
+    descending = ordering.startswith("-")
+    field = ORDERING_FIELDS.get(ordering.lstrip("-"))
+    if field is None:
+        descending, field = True, "date_joined"
+    expression = F(field).desc(nulls_last=True) if descending else F(field).asc(nulls_first=True)
+    return users.order_by(expression, "-id" if descending else "id")
+
+
+def directory_totals():
+    return User.objects.aggregate(
+        total=Count("id"),
+        vendors=Count("id", filter=Q(vendor_profile__isnull=False)),
+        couriers=Count("id", filter=Q(courier_profile__is_active=True)),
+        banned=Count("id", filter=Q(profile__is_banned=True)),
+    )
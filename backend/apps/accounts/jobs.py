@@ -0,0 +1,30 @@
+# backend/apps/accounts/jobs.py
+# Tâches planifiées comptes (exécutées par run_scheduler).
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.common.scheduler import periodic_job
+from .models import OTPCode, UserSession
+
+# Les OTP expirés restent un jour (traçabilité support)
+OTP_RETENTION = timedelta(days=1)
+
+
+@periodic_job("expire_auth_records", every=900)
+def expire_auth_records():
+    """
+    Purge les OTP expirés depuis plus d'OTP_RETENTION, et désactive
+    les sessions sans activité depuis la durée de vie du refresh token.
+    """
+    now = timezone.now()
+    otp_deleted, _ = OTPCode.objects.filter(expires_at__lt=now - OTP_RETENTION).delete()
+
+    refresh_lifetime = settings.SIMPLE_JWT.get("REFRESH_TOKEN_LIFETIME", timedelta(days=7))
+    sessions_expired = UserSession.objects.filter(
+        is_active=True,
+        last_activity__lt=now - refresh_lifetime,
+    ).update(is_active=False)
+    return {"otp_deleted": otp_deleted, "sessions_expired": sessions_expired}
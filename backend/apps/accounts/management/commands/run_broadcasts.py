@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.accounts.broadcasts import claim_next_job, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Exécute les diffusions de notifications en attente (BroadcastJob), "
+        "par lots. Reprend aussi les jobs interrompus. --loop pour tourner en worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Tourne en continu (worker) au lieu de vider la file une fois.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Pause (secondes) quand aucun job n'attend, en mode --loop.",
+        )
+
+    def handle(self, *args, **opts):
+        while True:
+            job = claim_next_job()
+            if job is None:
+                if not opts["loop"]:
+                    return
+                time.sleep(opts["interval"])
+                continue
+
+            run_job(job)
+            style = self.style.SUCCESS if job.status == job.Status.DONE else self.style.ERROR
+            self.stdout.write(style(
+                f"Diffusion #{job.id} « {job.title} » : {job.sent}/{job.total} "
+                f"({job.get_status_display()})"
+            ))
@@ -7,6 +7,8 @@
 import logging
 import re
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
 logger = logging.getLogger(__name__)
 
 
@@ -77,12 +79,30 @@ class SessionTrackingMiddleware:
     - On ne crée JAMAIS deux entrées pour le même appareil réel.
     """
 
+    sync_capable  = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
         response = self.get_response(request)
+        self._track(request)
+        return response
 
+    async def __acall__(self, request):
+        # Sous ASGI : la vue (éventuellement async) ne tient aucun thread,
+        # seul le suivi de session (ORM) passe par sync_to_async
+        response = await self.get_response(request)
+        await sync_to_async(self._track)(request)
+        return response
+
+    def _track(self, request):
         # Seulement pour les requêtes avec un JWT valide
         if (
             hasattr(request, 'user')
@@ -94,7 +114,7 @@ class SessionTrackingMiddleware:
             try:
                 jti = str(request.auth.payload.get('jti', ''))
                 if not jti:
-                    return response
+                    return
 
                 from apps.accounts.models import UserSession
                 ua_string   = request.META.get('HTTP_USER_AGENT', '')
@@ -131,5 +151,3 @@ class SessionTrackingMiddleware:
 
             except Exception as exc:
                 logger.debug('SessionTracking skipped: %s', exc)
-
-        return response
\ No newline at end of file
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.15 on 2026-10-19 14:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_audience(apps, schema_editor):
+    # Ancienne convention : l'audience était déduite du préfixe d'action_url
+    UserNotification = apps.get_model("accounts", "UserNotification")
+    for prefix, audience in (("/courier", "COURIER"), ("/seller", "VENDOR"), ("/admin", "ADMIN")):
+        UserNotification.objects.filter(action_url__startswith=prefix).update(audience=audience)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_delivery_capacity_vehicle'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usernotification',
+            name='audience',
+            field=models.CharField(choices=[('CUSTOMER', 'Client'), ('VENDOR', 'Vendeur'), ('COURIER', 'Livreur'), ('ADMIN', 'Admin')], default='CUSTOMER', max_length=10),
+        ),
+        migrations.RunPython(backfill_audience, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='usernotification',
+            index=models.Index(fields=['user', 'audience', '-created_at'], name='notif_user_audience_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usernotification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['user', 'audience'], name='notif_unread_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.15 on 2026-10-19 14:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_usernotification_audience'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BroadcastJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=160)),
+                ('message', models.TextField()),
+                ('notification_type', models.CharField(choices=[('ORDER', 'Commande'), ('PROMOTION', 'Promotion'), ('PAYMENT', 'Paiement'), ('SUPPORT', 'Support'), ('SYSTEM', 'Système')], default='SYSTEM', max_length=20)),
+                ('action_url', models.CharField(blank=True, default='', max_length=255)),
+                ('scope', models.CharField(choices=[('CUSTOMERS', 'Clients (filtres ville / palier)'), ('ACTORS', 'Acteurs (clients, vendeurs, livreurs)')], default='CUSTOMERS', max_length=10)),
+                ('filters', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('PENDING', 'En attente'), ('RUNNING', 'En cours'), ('DONE', 'Terminé'), ('FAILED', 'Échec')], db_index=True, default='PENDING', max_length=10)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('sent', models.PositiveIntegerField(default=0)),
+                ('last_user_id', models.BigIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='broadcast_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Diffusion de notification',
+                'verbose_name_plural': 'Diffusions de notifications',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.15 on 2026-10-19 14:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_broadcastjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='courierprofile',
+            name='active_shipments_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='deliveryorganizationprofile',
+            name='active_shipments_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='courierprofile',
+            index=models.Index(fields=['active_shipments_count', 'updated_at'], name='courier_load_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.15 on 2026-10-19 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_active_shipments_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='courierprofile',
+            name='last_latitude',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True),
+        ),
+        migrations.AddField(
+            model_name='courierprofile',
+            name='last_longitude',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True),
+        ),
+        migrations.AddField(
+            model_name='courierprofile',
+            name='last_position_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
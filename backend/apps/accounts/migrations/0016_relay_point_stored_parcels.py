@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-19 15:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0015_courier_last_position'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='relaypointprofile',
+            name='stored_parcels_count',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.15 on 2026-10-19 15:28
+
+from django.conf import settings
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def create_missing_profiles(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    UserProfile = apps.get_model("accounts", "UserProfile")
+
+    missing = User.objects.filter(profile__isnull=True).order_by("pk").values_list("pk", flat=True)
+    user_ids = list(missing)
+    for start in range(0, len(user_ids), BATCH_SIZE):
+        UserProfile.objects.bulk_create(
+            [UserProfile(user_id=user_id) for user_id in user_ids[start:start + BATCH_SIZE]],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0016_relay_point_stored_parcels'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_profiles, migrations.RunPython.noop),
+    ]
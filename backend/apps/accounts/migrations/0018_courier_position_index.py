@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0017_create_missing_profiles'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='courierprofile',
+            index=models.Index(condition=models.Q(('is_online', True)), fields=['last_latitude', 'last_longitude'], name='courier_position_idx'),
+        ),
+    ]
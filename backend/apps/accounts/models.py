@@ -6,7 +6,26 @@ from django.contrib.auth.models import User
 from apps.catalog.models import Product
 
 
-class CourierProfile(models.Model):
+class MaintainedCountersMixin:
+    """
+    Champs compteurs mis à jour uniquement par F() (cf. apps.shipping.capacity
+    et apps.shipping.relay) : un save() complet d'une instance chargée plus tôt
+    ne doit pas les écraser.
+    """
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class CourierProfile(MaintainedCountersMixin, models.Model):
     class VehicleType(models.TextChoices):
         MOTORBIKE = "MOTORBIKE", "Moto"
         CAR       = "CAR", "Voiture"
@@ -35,9 +54,16 @@ class CourierProfile(models.Model):
     gps_permission_granted = models.BooleanField(default=False)
     camera_permission_granted = models.BooleanField(default=False)
     max_active_shipments = models.PositiveIntegerField(default=5)
+    # Shipments actifs, maintenu par apps.shipping.capacity (F() à chaque transition)
+    active_shipments_count = models.IntegerField(default=0)
+    counter_fields = ("active_shipments_count",)
     is_active = models.BooleanField(default=True)
     is_approved = models.BooleanField(default=False)
     is_online = models.BooleanField(default=False)
+    # Dernière position GPS connue (cf. apps.shipping.geo)
+    last_latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    last_longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    last_position_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -45,12 +71,21 @@ class CourierProfile(models.Model):
         ordering = ["-created_at"]
         verbose_name = "Profil livreur"
         verbose_name_plural = "Profils livreurs"
+        indexes = [
+            models.Index(fields=["active_shipments_count", "updated_at"], name="courier_load_idx"),
+            # Voisinage des livreurs en ligne (apps.shipping.geo.nearest_couriers)
+            models.Index(
+                fields=["last_latitude", "last_longitude"],
+                name="courier_position_idx",
+                condition=models.Q(is_online=True),
+            ),
+        ]
 
     def __str__(self):
         return f"Livreur {self.user.username} ({self.city})"
 
 
-class DeliveryOrganizationProfile(models.Model):
+class DeliveryOrganizationProfile(MaintainedCountersMixin, models.Model):
     """
     Entreprise partenaire de livraison.
 
@@ -73,6 +108,8 @@ class DeliveryOrganizationProfile(models.Model):
     contract_reference = models.CharField(max_length=120, blank=True, default="")
     allowed_vehicle_types = models.JSONField(default=list, blank=True)
     max_active_shipments = models.PositiveIntegerField(default=50)
+    active_shipments_count = models.IntegerField(default=0)
+    counter_fields = ("active_shipments_count",)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -87,7 +124,7 @@ class DeliveryOrganizationProfile(models.Model):
         return self.company_name
 
 
-class RelayPointProfile(models.Model):
+class RelayPointProfile(MaintainedCountersMixin, models.Model):
     """
     Point relais BelivaY.
 
@@ -110,6 +147,9 @@ class RelayPointProfile(models.Model):
     relay_code = models.CharField(max_length=80, blank=True, default="")
     opening_hours = models.CharField(max_length=160, blank=True, default="")
     storage_capacity = models.PositiveIntegerField(default=0)
+    # Colis RECEIVED / STORED présents (cf. apps.shipping.relay)
+    stored_parcels_count = models.IntegerField(default=0)
+    counter_fields = ("stored_parcels_count",)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -249,6 +289,12 @@ class UserNotification(models.Model):
         SUPPORT = "SUPPORT", "Support"
         SYSTEM = "SYSTEM", "Système"
 
+    class Audience(models.TextChoices):
+        CUSTOMER = "CUSTOMER", "Client"
+        VENDOR = "VENDOR", "Vendeur"
+        COURIER = "COURIER", "Livreur"
+        ADMIN = "ADMIN", "Admin"
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
     title = models.CharField(max_length=160)
     message = models.TextField()
@@ -258,6 +304,14 @@ class UserNotification(models.Model):
         default=NotificationType.SYSTEM,
     )
     action_url = models.CharField(max_length=255, blank=True, default="")
+    # Espace (client / vendeur / livreur / admin) où la notification s'affiche.
+    # Renseigné par apps.accounts.notifications.notify() — remplace le filtrage
+    # par préfixe d'action_url.
+    audience = models.CharField(
+        max_length=10,
+        choices=Audience.choices,
+        default=Audience.CUSTOMER,
+    )
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -266,11 +320,72 @@ class UserNotification(models.Model):
         ordering = ['-created_at']
         verbose_name = "Notification utilisateur"
         verbose_name_plural = "Notifications utilisateurs"
+        indexes = [
+            models.Index(fields=['user', 'audience', '-created_at'], name='notif_user_audience_idx'),
+            models.Index(
+                fields=['user', 'audience'],
+                condition=models.Q(is_read=False),
+                name='notif_unread_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.title}"
 
 
+class BroadcastJob(models.Model):
+    """
+    Diffusion d'une notification à une audience (admin).
+    Exécutée par lots par apps.accounts.broadcasts.run_job ; `last_user_id`
+    sert de curseur pour reprendre un job interrompu. Sert aussi d'historique.
+    """
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "En attente"
+        RUNNING = "RUNNING", "En cours"
+        DONE = "DONE", "Terminé"
+        FAILED = "FAILED", "Échec"
+
+    class Scope(models.TextChoices):
+        CUSTOMERS = "CUSTOMERS", "Clients (filtres ville / palier)"
+        ACTORS = "ACTORS", "Acteurs (clients, vendeurs, livreurs)"
+
+    title = models.CharField(max_length=160)
+    message = models.TextField()
+    notification_type = models.CharField(
+        max_length=20,
+        choices=UserNotification.NotificationType.choices,
+        default=UserNotification.NotificationType.SYSTEM,
+    )
+    action_url = models.CharField(max_length=255, blank=True, default="")
+    scope = models.CharField(max_length=10, choices=Scope.choices, default=Scope.CUSTOMERS)
+    # Ciblage : {"audience": ..., "city": ..., "tier": ..., "user_id": ...}
+    filters = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING, db_index=True)
+    total = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    last_user_id = models.BigIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    created_by = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL, related_name="broadcast_jobs",
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)  # sert de heartbeat au worker
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Diffusion de notification"
+        verbose_name_plural = "Diffusions de notifications"
+
+    def __str__(self):
+        return f"{self.title} ({self.sent}/{self.total})"
+
+    @property
+    def progress(self):
+        return 100 if not self.total else min(100, round(self.sent * 100 / self.total))
+
+
 class RewardAccount(models.Model):
     """
     Compte points/tokens par rôle.
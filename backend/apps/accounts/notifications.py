@@ -0,0 +1,152 @@
+# backend/apps/accounts/notifications.py
+# Service de notifications in-app.
+#   - notify()           : point d'entrée unique (remplace UserNotification.objects.create)
+#   - écriture groupée   : dans une transaction, les notifications sont collectées
+#                          puis insérées en un bulk_create au commit
+#                          (apps.common.on_commit) ; un savepoint annulé emporte
+#                          ses lignes
+#   - compteur non-lus   : dans le cache partagé (CACHES, Redis en prod) par
+#                          (utilisateur, audience), mis à jour par incrément dans
+#                          tous les processus ; le polling du frontend ne fait
+#                          pas de COUNT
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from apps.common.on_commit import on_commit_batch
+from .models import UserNotification
+
+Audience = UserNotification.Audience
+
+UNREAD_CACHE_TTL = 600
+
+_AUDIENCE_PREFIXES = (
+    ("/courier", Audience.COURIER),
+    ("/seller", Audience.VENDOR),
+    ("/admin", Audience.ADMIN),
+)
+
+# Alias acceptés en query-param (?audience=livreur, ?audience=seller…)
+AUDIENCE_ALIASES = {
+    "customer": Audience.CUSTOMER, "client": Audience.CUSTOMER,
+    "courier": Audience.COURIER, "driver": Audience.COURIER, "livreur": Audience.COURIER,
+    "vendor": Audience.VENDOR, "seller": Audience.VENDOR, "vendeur": Audience.VENDOR,
+    "admin": Audience.ADMIN,
+}
+
+def audience_for_url(action_url):
+    """Audience déduite de l'URL d'action (convention historique des préfixes)."""
+    for prefix, audience in _AUDIENCE_PREFIXES:
+        if (action_url or "").startswith(prefix):
+            return audience
+    return Audience.CUSTOMER
+
+
+def parse_audience(value):
+    return AUDIENCE_ALIASES.get((value or "customer").strip().lower(), Audience.CUSTOMER)
+
+
+# ─── Compteur non-lus ──────────────────────────────────────────────────────────
+
+def _unread_key(user_id, audience):
+    return f"notif_unread:{user_id}:{audience}"
+
+
+def unread_count(user, audience):
+    """Nombre de non-lus, servi depuis le cache ; COUNT indexé seulement au premier appel."""
+    key = _unread_key(user.pk, audience)
+    value = cache.get(key)
+    if value is None:
+        value = UserNotification.objects.filter(user=user, audience=audience, is_read=False).count()
+        cache.set(key, value, UNREAD_CACHE_TTL)
+    return value
+
+
+def _bump_unread(counts):
+    """counts : {(user_id, audience): delta}. Les clés absentes seront recalculées."""
+    for (user_id, audience), delta in counts.items():
+        key = _unread_key(user_id, audience)
+        try:
+            if delta >= 0:
+                cache.incr(key, delta)
+            elif cache.decr(key, -delta) < 0:
+                cache.delete(key)
+        except ValueError:
+            pass  # pas encore en cache
+
+
+def mark_read(notification):
+    if notification.is_read:
+        return
+    notification.is_read = True
+    notification.save(update_fields=['is_read', 'updated_at'])
+    _bump_unread({(notification.user_id, notification.audience): -1})
+
+
+def delete_notification(notification):
+    was_unread = not notification.is_read
+    key = (notification.user_id, notification.audience)
+    notification.delete()
+    if was_unread:
+        _bump_unread({key: -1})
+
+
+def mark_all_read(user, audience=None):
+    qs = UserNotification.objects.filter(user=user, is_read=False)
+    if audience:
+        qs = qs.filter(audience=audience)
+    qs.update(is_read=True)
+    audiences = [audience] if audience else Audience.values
+    cache.set_many({_unread_key(user.pk, a): 0 for a in audiences}, UNREAD_CACHE_TTL)
+
+
+def invalidate_unread(user_ids, audiences=None):
+    """À appeler après une mise à jour en masse hors service (admin, diffusions)."""
+    audiences = audiences or Audience.values
+    cache.delete_many([_unread_key(uid, a) for uid in set(user_ids) for a in audiences])
+
+
+# ─── Écriture ──────────────────────────────────────────────────────────────────
+
+def _write(rows):
+    if not rows:
+        return
+    UserNotification.objects.bulk_create(rows, batch_size=500)
+    counts = {}
+    for row in rows:
+        key = (row.user_id, row.audience)
+        counts[key] = counts.get(key, 0) + 1
+    _bump_unread(counts)
+
+
+def _user_ids(users):
+    if users is None:
+        return []
+    if hasattr(users, "pk") or isinstance(users, int):
+        users = [users]
+    return [getattr(u, "pk", u) for u in users if u is not None]
+
+
+def notify(users, title, message, *, notification_type=UserNotification.NotificationType.SYSTEM,
+           action_url="", audience=None, using=DEFAULT_DB_ALIAS):
+    """
+    Notifie un ou plusieurs utilisateurs (instances ou ids).
+    Dans une transaction : insertion groupée au commit (rien en cas de rollback).
+    Hors transaction : un seul bulk_create immédiat.
+    """
+    audience = audience or audience_for_url(action_url)
+    rows = [
+        UserNotification(
+            user_id=user_id,
+            title=title[:160],
+            message=message,
+            notification_type=notification_type,
+            action_url=action_url,
+            audience=audience,
+        )
+        for user_id in dict.fromkeys(_user_ids(users))
+    ]
+    if not rows:
+        return 0
+    on_commit_batch(_write, rows, using=using)
+    return len(rows)
@@ -0,0 +1,15 @@
+# backend/apps/accounts/profiles.py
+# Chaque User a son UserProfile, créé à l'inscription (les comptes antérieurs
+# sont complétés par la migration 0017_create_missing_profiles).
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import UserProfile
+
+
+@receiver(post_save, sender=User, dispatch_uid="accounts_create_user_profile")
+def _create_profile(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserProfile.objects.get_or_create(user=instance)
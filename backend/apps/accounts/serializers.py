@@ -465,6 +465,7 @@ class NotificationSerializer(serializers.ModelSerializer):
             'message',
             'notification_type',
             'action_url',
+            'audience',
             'is_read',
             'created_at',
             'updated_at',
@@ -30,6 +30,7 @@ from .views import (
     FavoritesListCreateView,
     FavoriteDestroyView,
     NotificationsListView,
+    NotificationUnreadCountView,
     NotificationMarkReadView,
     NotificationDeleteView,
     NotificationMarkAllReadView,
@@ -96,6 +97,7 @@ urlpatterns = [
     path("favorites/",                FavoritesListCreateView.as_view(), name="client-favorites"),
     path("favorites/<int:pk>/",       FavoriteDestroyView.as_view(),     name="client-favorite-delete"),
     path("notifications/",            NotificationsListView.as_view(),   name="client-notifications"),
+    path("notifications/unread-count/",    NotificationUnreadCountView.as_view(), name="client-notifications-unread-count"),
     path("notifications/<int:id>/read/",   NotificationMarkReadView.as_view(),    name="client-notification-read"),
     path("notifications/<int:id>/",        NotificationDeleteView.as_view(),      name="client-notification-delete"),
     path("notifications/read-all/",        NotificationMarkAllReadView.as_view(), name="client-notifications-read-all"),
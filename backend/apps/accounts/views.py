@@ -15,7 +15,7 @@ import random
 import string
 from datetime import timedelta
 from django.utils import timezone
-from django.core.mail import send_mail
+from django.db import transaction
 from django.conf import settings as django_settings
 from rest_framework_simplejwt.views import TokenObtainPairView as _BaseLoginView
 from .serializers import (
@@ -37,6 +37,7 @@ from django.db.models import Q
 
 from .serializers import UserSerializer, RegisterSerializer
 from .models import CourierProfile, DeliveryOrganizationProfile, RewardAccount, UserCart, UserProfile, UserFavorite, UserNotification
+from .notifications import delete_notification, mark_all_read, mark_read, parse_audience, unread_count
 from apps.orders.models import Dispute
 from apps.shipping.models import Shipment
 
@@ -1094,21 +1095,17 @@ class NotificationsListView(generics.ListAPIView):
     serializer_class = NotificationSerializer
 
     def get_queryset(self):
-        qs = UserNotification.objects.filter(user=self.request.user)
-        audience = (self.request.query_params.get("audience") or "customer").strip().lower()
-
-        if audience in {"courier", "driver", "livreur"}:
-            return qs.filter(action_url__startswith="/courier")
-        if audience in {"vendor", "seller", "vendeur"}:
-            return qs.filter(action_url__startswith="/seller")
-        if audience == "admin":
-            return qs.filter(action_url__startswith="/admin")
-
-        return qs.exclude(
-            Q(action_url__startswith="/courier")
-            | Q(action_url__startswith="/seller")
-            | Q(action_url__startswith="/admin")
-        )
+        audience = parse_audience(self.request.query_params.get("audience"))
+        return UserNotification.objects.filter(user=self.request.user, audience=audience)
+
+
+@extend_schema(tags=["Client"], summary="Unread notifications count (cached)")
+class NotificationUnreadCountView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        audience = parse_audience(request.query_params.get("audience"))
+        return Response({"audience": audience, "unread": unread_count(request.user, audience)})
 
 
 @extend_schema(tags=["Client"], summary="Mark one notification as read")
@@ -1121,8 +1118,7 @@ class NotificationMarkReadView(APIView):
             id=id,
             user=request.user,
         )
-        notification.is_read = True
-        notification.save(update_fields=['is_read', 'updated_at'])
+        mark_read(notification)
         return Response(NotificationSerializer(notification).data)
 
 
@@ -1136,7 +1132,7 @@ class NotificationDeleteView(APIView):
             id=id,
             user=request.user,
         )
-        notification.delete()
+        delete_notification(notification)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -1145,7 +1141,7 @@ class NotificationMarkAllReadView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        UserNotification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+        mark_all_read(request.user)
         return Response({"detail": "Notifications marked as read"})
 
 
@@ -1187,15 +1183,11 @@ def _generate_otp() -> str:
  
  
 def _create_and_send_otp(user, purpose: str) -> None:
-    """Invalide les anciens codes, génère un nouveau et envoie l'email."""
+    """Invalide les anciens codes, génère un nouveau et met l'email en file (outbox)."""
     from .models import OTPCode
+    from apps.common.mail import queue_email
  
-    OTPCode.objects.filter(user=user, purpose=purpose, is_used=False).update(is_used=True)
     code = _generate_otp()
-    OTPCode.objects.create(
-        user=user, code=code, purpose=purpose,
-        expires_at=timezone.now() + timedelta(minutes=10),
-    )
  
     labels = {
         '2FA_LOGIN':   'Connexion sécurisée',
@@ -1205,22 +1197,28 @@ def _create_and_send_otp(user, purpose: str) -> None:
     label = labels.get(purpose, 'Vérification')
     from_email = getattr(django_settings, 'DEFAULT_FROM_EMAIL', 'BelivaY <noreply@belivay.com>')
  
-    send_mail(
-        subject=f'[BelivaY] Code de vérification — {label}',
-        message=(
-            f'Bonjour {user.first_name or user.username},\n\n'
-            f'Votre code de vérification BelivaY :\n\n'
-            f'        {code}\n\n'
-            f'Ce code est valable 10 minutes.\n'
-            f'Ne le partagez jamais avec personne.\n\n'
-            f"Si vous n'êtes pas à l'origine de cette demande, "
-            f'changez votre mot de passe immédiatement.\n\n'
-            f'— L\'équipe BelivaY'
-        ),
-        from_email=from_email,
-        recipient_list=[user.email],
-        fail_silently=False,
-    )
+    # Code + e-mail dans la même transaction : le worker n'envoie que des codes valides
+    with transaction.atomic():
+        OTPCode.objects.filter(user=user, purpose=purpose, is_used=False).update(is_used=True)
+        OTPCode.objects.create(
+            user=user, code=code, purpose=purpose,
+            expires_at=timezone.now() + timedelta(minutes=10),
+        )
+        queue_email(
+            subject=f'[BelivaY] Code de vérification — {label}',
+            message=(
+                f'Bonjour {user.first_name or user.username},\n\n'
+                f'Votre code de vérification BelivaY :\n\n'
+                f'        {code}\n\n'
+                f'Ce code est valable 10 minutes.\n'
+                f'Ne le partagez jamais avec personne.\n\n'
+                f"Si vous n'êtes pas à l'origine de cette demande, "
+                f'changez votre mot de passe immédiatement.\n\n'
+                f'— L\'équipe BelivaY'
+            ),
+            from_email=from_email,
+            recipient_list=[user.email],
+        )
  
  
 # ── Login enrichi (2FA) ───────────────────────────────────────────────────────
@@ -9,4 +9,8 @@ class CatalogConfig(AppConfig):
         # Active l'audit OHADA sur les modèles du catalogue
         from apps.common.audit import register_audit
         from .models import Category, Product, MasterProduct
-        register_audit(Category, Product, MasterProduct)
\ No newline at end of file
+        register_audit(Category, Product, MasterProduct)
+        # Invalidation de l'index catalogue de l'assistant IA
+        from . import assistant_index  # noqa: F401
+        # Dérivés WebP des images produit / fiche
+        from . import images  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,305 @@
+# backend/apps/catalog/assistant_index.py
+# Index catalogue de l'assistant IA : recherche côté serveur sur tout le
+# catalogue approuvé (et plus seulement les produits chargés par le client).
+#   - jetons   : titre, descriptions et catégorie normalisés (minuscules, sans
+#                accents ni ponctuation, pluriel en -s/-x replié) ; mis en cache
+#                par produit selon updated_at → une reconstruction ne
+#                re-tokenise que les produits modifiés
+#   - index    : jeton → positions (liste inversée) ; colonnes array() pour
+#                prix final, note, avis, stock, promo
+#   - scores   : score de base par intention (pas cher / premium / promo)
+#                calculé en une passe sur les colonnes, avec l'ordre trié
+#                associé, mis en mémoire à la première demande
+#   - requête  : base + 4 par jeton trouvé (listes inversées), filtres, top-k
+#                par heapq ; O(produits touchés + k)
+#   - fraîcheur : version en cache renouvelée au post_save / post_delete de
+#                Product, Inventory, ProductReview et PromotionCampaign ;
+#                reconstruction au plus une fois par REBUILD_MIN_SECONDS et au
+#                plus tard après INDEX_TTL
+
+import heapq
+import re
+import time
+import unicodedata
+import uuid
+from array import array
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, Min, Q
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .models import Inventory, ModerationStatus, Product, ProductReview, PromotionCampaign
+
+VERSION_KEY = "assistant_index:version"
+INDEX_TTL = 600
+REBUILD_MIN_SECONDS = 60
+KEYWORD_WEIGHT = 4.0
+ALL_CATEGORIES = "toutes les categories"
+
+STOPWORDS = {
+    "a", "au", "aux", "avec", "ce", "de", "des", "du", "en", "et", "je", "la", "le", "les", "ma", "me", "mes",
+    "moi", "mon", "ou", "pour", "que", "qui", "sur", "ta", "te", "tu", "un", "une", "veux", "cherche", "montre",
+    "voudrais", "produit", "produits", "plus", "tres", "pas", "cher", "chere",
+}
+INTENTS = {
+    "cheap": ("pas cher", "abordable", "budget", "moins cher"),
+    "premium": ("premium", "qualite", "solide", "durable"),
+    "promo": ("promo", "promotion", "reduction"),
+}
+
+# Index du processus et jetons par produit (id → (updated_at, jetons))
+_local = {"version": None, "index": None, "built": 0.0}
+_tokens = {}
+
+
+# ─── Texte ───────────────────────────────────────────────────────────────────
+
+def fold(text):
+    """Minuscules, sans accents ni ponctuation, espaces réduits."""
+    text = unicodedata.normalize("NFKD", str(text or "")).encode("ascii", "ignore").decode()
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def _stem(word):
+    return word[:-1] if len(word) > 3 and word[-1] in "sx" else word
+
+
+def tokenize(text):
+    return {_stem(word) for word in fold(text).split() if len(word) > 1 and word not in STOPWORDS}
+
+
+def query_intents(folded):
+    return tuple(sorted(name for name, keywords in INTENTS.items() if any(k in folded for k in keywords)))
+
+
+# ─── Construction ────────────────────────────────────────────────────────────
+
+class CatalogIndex:
+    """Colonnes du catalogue approuvé ; position i = i-ème produit de `rows`."""
+
+    def __init__(self, rows, tokens_by_id):
+        self.rows = rows
+        self.ids = array("q", (row["id"] for row in rows))
+        self.price = array("d", (row["price_final"] for row in rows))
+        self.rating = array("d", (row["rating_average"] or 0 for row in rows))
+        self.reviews = array("d", (row["reviews_count"] for row in rows))
+        self.stock = array("d", (row["stock_quantity"] for row in rows))
+        self.promo = array("b", (row["on_promotion"] for row in rows))
+        self.category = [fold(row["category_name"]) for row in rows]
+        postings = {}
+        for position, row in enumerate(rows):
+            for token in tokens_by_id[row["id"]]:
+                postings.setdefault(token, array("I")).append(position)
+        self.postings = postings
+        self._rankings = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def ranking(self, intents):
+        """(scores de base, positions triées par score décroissant) pour ces intentions."""
+        if intents not in self._rankings:
+            # Même barème que score_product (apps.common.views), colonne par colonne
+            scores = [(2.0 if stock > 0 else 0.0) + reviews / 10 for reviews, stock in zip(self.reviews, self.stock)]
+            if "cheap" in intents:
+                scores = [score + max(0.0, 100000 - price) / 10000 for score, price in zip(scores, self.price)]
+            if "premium" in intents:
+                scores = [score + rating * 2 for score, rating in zip(scores, self.rating)]
+            if "promo" in intents:
+                scores = [score + (6.0 if promo else 0.0) for score, promo in zip(scores, self.promo)]
+            base = array("d", scores)
+            order = array("I", sorted(range(len(base)), key=base.__getitem__, reverse=True))
+            self._rankings[intents] = (base, order)
+        return self._rankings[intents]
+
+
+def _product_rows():
+    now = timezone.now()
+    today = now.date()
+    products = list(
+        Product.objects.filter(is_active=True, moderation_status=ModerationStatus.APPROVED)
+        .values(
+            "id", "title", "description", "short_description", "updated_at", "price_xaf", "compare_at_price",
+            "discount", "promo_end_date", "category__name", "inventory__quantity",
+        )
+        .order_by("id")
+    )
+    listed = Q(product__is_active=True, product__moderation_status=ModerationStatus.APPROVED,
+               product__deleted_at__isnull=True)
+    reviews = {
+        row["product_id"]: row
+        for row in ProductReview.objects.filter(listed, is_approved=True)
+        .order_by()
+        .values("product_id")
+        .annotate(avg=Avg("rating"), total=Count("id"))
+    }
+    campaigns = dict(
+        PromotionCampaign.objects.filter(
+            listed, status=PromotionCampaign.Status.APPROVED, starts_at__lte=now, ends_at__gte=now,
+        )
+        .order_by()
+        .values("product_id")
+        .annotate(price=Min("promo_price_xaf"))
+        .values_list("product_id", "price")
+    )
+
+    rows = []
+    for product in products:
+        review = reviews.get(product["id"], {})
+        compare = product["compare_at_price"]
+        striked = bool(compare and compare > product["price_xaf"]) and (
+            product["promo_end_date"] is None or product["promo_end_date"] >= today
+        )
+        campaign_price = campaigns.get(product["id"])
+        rows.append({
+            "id": product["id"],
+            "title": product["title"],
+            "short_description": product["short_description"] or "",
+            "description": product["description"] or "",
+            "category_name": product["category__name"] or "",
+            "price_xaf": product["price_xaf"],
+            "price_final": campaign_price if campaign_price is not None else product["price_xaf"],
+            "discount": product["discount"] or 0,
+            "stock_quantity": product["inventory__quantity"] or 0,
+            "rating_average": round(review["avg"], 1) if review.get("avg") is not None else None,
+            "reviews_count": review.get("total", 0),
+            "on_promotion": campaign_price is not None or striked or (product["discount"] or 0) > 0,
+            "updated_at": product["updated_at"],
+        })
+    return rows
+
+
+def build_index():
+    """Index complet (trois requêtes) ; ne re-tokenise que les produits modifiés."""
+    rows = _product_rows()
+    tokens_by_id = {}
+    for row in rows:
+        cached = _tokens.get(row["id"])
+        if cached is None or cached[0] != (row["updated_at"], row["category_name"]):
+            text = " ".join((row["title"], row["short_description"], row["description"], row["category_name"]))
+            cached = _tokens[row["id"]] = ((row["updated_at"], row["category_name"]), frozenset(tokenize(text)))
+        tokens_by_id[row["id"]] = cached[1]
+    for product_id in set(_tokens) - set(tokens_by_id):
+        del _tokens[product_id]
+    return CatalogIndex(rows, tokens_by_id)
+
+
+def index_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_index_version():
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def current_index():
+    """Index du processus — reconstruit si la version a changé (au plus une fois par minute) ou a expiré."""
+    version = index_version()
+    age = time.monotonic() - _local["built"]
+    index = _local["index"]
+    if index is not None and age < INDEX_TTL and (_local["version"] == version or age < REBUILD_MIN_SECONDS):
+        return index
+    index = build_index()
+    _local.update(version=version, index=index, built=time.monotonic())
+    return index
+
+
+def reset_index():
+    _local.update(version=None, index=None, built=0.0)
+    _tokens.clear()
+
+
+# ─── Recherche ───────────────────────────────────────────────────────────────
+
+def _allowed(index, filters, category):
+    filters = filters or {}
+    promo_only = bool(filters.get("promoOnly"))
+    in_stock_only = bool(filters.get("inStockOnly"))
+    try:
+        min_rating = float(filters.get("minRating") or 0)
+    except (TypeError, ValueError):
+        min_rating = 0
+    category = fold(category)
+    if category == ALL_CATEGORIES:
+        category = ""
+    if not (promo_only or in_stock_only or min_rating or category):
+        return None
+
+    def allowed(position):
+        return (
+            (not promo_only or index.promo[position])
+            and (not in_stock_only or index.stock[position] > 0)
+            and index.rating[position] >= min_rating
+            and (not category or index.category[position] == category)
+        )
+    return allowed
+
+
+def search_catalog(message, filters=None, category=None, limit=8):
+    """
+    Les `limit` meilleurs produits du catalogue approuvé pour `message`.
+    Si un mot de la demande correspond à des produits (après filtres), seuls
+    ceux-là sont retenus ; sinon, classement sur le prix, la note, le stock
+    et la promo.
+    """
+    index = current_index()
+    if not len(index):
+        return []
+    folded = fold(message)
+    base, order = index.ranking(query_intents(folded))
+    allowed = _allowed(index, filters, category)
+
+    boosts = {}
+    for token in tokenize(folded):
+        for position in index.postings.get(token, ()):
+            boosts[position] = boosts.get(position, 0.0) + KEYWORD_WEIGHT
+
+    if boosts:
+        candidates = (
+            (base[position] + boost, position)
+            for position, boost in boosts.items()
+            if allowed is None or allowed(position)
+        )
+        top = [position for _, position in heapq.nlargest(limit, candidates)]
+    else:
+        top = []
+    if not top:
+        for position in order:
+            if allowed is None or allowed(position):
+                top.append(position)
+                if len(top) == limit:
+                    break
+
+    return [_public(index.rows[position]) for position in top]
+
+
+def _public(row):
+    return {
+        "id": row["id"],
+        "title": row["title"],
+        "short_description": row["short_description"],
+        "description": row["description"][:280],
+        "category_name": row["category_name"],
+        "price_xaf": row["price_xaf"],
+        "price_final": row["price_final"],
+        "discount": row["discount"],
+        "stock_quantity": row["stock_quantity"],
+        "rating_average": row["rating_average"],
+        "reviews_count": row["reviews_count"],
+    }
+
+
+# ─── Invalidation ────────────────────────────────────────────────────────────
+
+def _catalog_changed(sender, **kwargs):
+    bump_index_version()
+
+
+for _model in (Product, Inventory, ProductReview, PromotionCampaign):
+    post_save.connect(_catalog_changed, sender=_model, dispatch_uid=f"assistant_index_save_{_model.__name__}")
+    post_delete.connect(_catalog_changed, sender=_model, dispatch_uid=f"assistant_index_delete_{_model.__name__}")
@@ -0,0 +1,221 @@
+# backend/apps/catalog/images.py
+# Dérivés des images produit et fiche (ProductImage, MasterProductImage).
+#   - tailles   : thumb (carré 200 px recadré, cartes), medium (600 px) et
+#                 large (1200 px) sur le plus grand côté ; jamais d'agrandissement
+#   - format    : WebP, orientation EXIF appliquée puis métadonnées retirées
+#                 (EXIF, GPS, XMP) ; seul le profil ICC est conservé
+#   - chemins   : déterministes, dérivés du nom de l'original →
+#                 derivatives/<chemin de l'original sans extension>/<taille>.webp ;
+#                 l'original étant adressé par contenu (apps.common.media), les
+#                 lignes qui partagent un fichier partagent ses dérivés
+#   - suivi     : width / height de l'original et `derivatives`
+#                 ({"source", "sizes": {taille: {name, width, height}}}) sur la
+#                 ligne ; None = à générer (nouvel upload ou fichier remplacé)
+#   - quand     : au commit de l'upload (IMAGE_DERIVATIVES_ON_UPLOAD), sinon / en
+#                 rattrapage par le job generate_image_derivatives
+#   - ménage    : dérivés plus référencés par aucune ligne → commande media_gc
+#   - URLs      : derivative_url() et srcset() pour les serializers ; l'original
+#                 sert tant que les dérivés n'existent pas
+
+import io
+import logging
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import MasterProductImage, ProductImage
+
+logger = logging.getLogger(__name__)
+
+IMAGE_MODELS = (ProductImage, MasterProductImage)
+ROOT = "derivatives"
+# (nom, côté max en px, recadrage carré)
+SIZES = (
+    ("thumb", 200, True),
+    ("medium", 600, False),
+    ("large", 1200, False),
+)
+SRCSET_SIZES = ("medium", "large")
+LARGEST = SIZES[-1][1]
+WEBP_QUALITY = 80
+EXIF_ORIENTATION = 0x0112
+DECODE_ERRORS = (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError)
+
+
+# ─── Rendu ───────────────────────────────────────────────────────────────────
+
+def derivative_name(source_name, size):
+    return posixpath.join(ROOT, posixpath.splitext(source_name)[0], f"{size}.webp")
+
+
+def _decode(source):
+    """(image orientée en RGB / RGBA, largeur, hauteur de l'original orienté, profil ICC)."""
+    with Image.open(source) as original:
+        width, height = original.size
+        if original.getexif().get(EXIF_ORIENTATION, 1) in (5, 6, 7, 8):
+            width, height = height, width
+        icc_profile = original.info.get("icc_profile")
+        original.draft("RGB", (LARGEST, LARGEST))  # JPEG : décodage directement réduit
+        image = ImageOps.exif_transpose(original)
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    return image.convert("RGBA" if has_alpha else "RGB"), width, height, icc_profile
+
+
+def render(source):
+    """
+    (largeur, hauteur, {taille: (octets WebP, largeur, hauteur)}) pour un
+    fichier image ouvert. Une taille qui donnerait les mêmes dimensions que la
+    précédente (original plus petit que la borne) n'est pas produite.
+    """
+    image, width, height, icc_profile = _decode(source)
+    options = {"quality": WEBP_QUALITY, "method": 4}
+    if icc_profile:
+        options["icc_profile"] = icc_profile
+    rendered = {}
+    previous = None
+    for size, bound, square in SIZES:
+        if square:
+            side = min(bound, *image.size)
+            variant = ImageOps.fit(image, (side, side), Image.LANCZOS)
+        else:
+            variant = image.copy()
+            variant.thumbnail((bound, bound), Image.LANCZOS)
+            if variant.size == previous:
+                continue
+            previous = variant.size
+        buffer = io.BytesIO()
+        variant.save(buffer, "WEBP", **options)  # ni exif ni xmp passés : métadonnées retirées
+        rendered[size] = (buffer.getvalue(), *variant.size)
+    return width, height, rendered
+
+
+# ─── Génération ──────────────────────────────────────────────────────────────
+
+def generate_derivatives(image_obj):
+    """
+    Écrit les dérivés de `image_obj` et les enregistre sur la ligne (UPDATE,
+    sans save() ni signaux). Si une autre image partage déjà l'original, ses
+    dérivés sont repris tels quels. En cas d'original illisible, `sizes`
+    reste vide : l'original est servi et le job ne repasse pas dessus. Un
+    original introuvable (volume média absent, fichier pas encore copié) n'est
+    pas définitif : `derivatives` reste NULL et le job réessaiera.
+    """
+    source_name = image_obj.image.name
+    shared = _shared_record(source_name)
+    if shared is not None:
+        width, height, record = shared
+    else:
+        try:
+            width, height, record = _generate(image_obj.image.storage, source_name)
+        except FileNotFoundError:
+            logger.warning("Original introuvable pour %s : dérivés laissés à générer", source_name)
+            return False
+
+    updated = type(image_obj).objects.filter(pk=image_obj.pk, image=source_name).update(
+        width=width, height=height, derivatives=record,
+    )
+    if updated:
+        image_obj.width, image_obj.height, image_obj.derivatives = width, height, record
+    return bool(updated)
+
+
+def _generate(source_storage, source_name):
+    record = {"source": source_name, "sizes": {}}
+    try:
+        with source_storage.open(source_name, "rb") as source:
+            width, height, rendered = render(source)
+    except FileNotFoundError:
+        raise  # sous-classe d'OSError, mais pas une erreur de décodage
+    except DECODE_ERRORS as exc:
+        logger.warning("Dérivés impossibles pour %s : %s", source_name, exc)
+        record["error"] = exc.__class__.__name__
+        return None, None, record
+    for size, (content, size_width, size_height) in rendered.items():
+        name = derivative_name(source_name, size)
+        if default_storage.exists(name):
+            default_storage.delete(name)  # chemin déterministe : on remplace
+        name = default_storage.save(name, ContentFile(content))
+        record["sizes"][size] = {"name": name, "width": size_width, "height": size_height}
+    return width, height, record
+
+
+def _shared_record(source_name):
+    """(largeur, hauteur, dérivés) d'une image au même original, si ses fichiers existent encore."""
+    for model in IMAGE_MODELS:
+        row = (
+            model.objects.filter(image=source_name, derivatives__source=source_name)
+            .exclude(derivatives__sizes={})
+            .values_list("width", "height", "derivatives")
+            .first()
+        )
+        if row and all(default_storage.exists(entry["name"]) for entry in row[2]["sizes"].values()):
+            return row
+    return None
+
+
+def _generate_pending(model, pk):
+    image_obj = model.objects.filter(pk=pk, derivatives__isnull=True).first()
+    if image_obj is not None:
+        generate_derivatives(image_obj)
+
+
+def pending_images(model):
+    return model.objects.filter(derivatives__isnull=True).exclude(image="")
+
+
+# ─── URLs ────────────────────────────────────────────────────────────────────
+
+def _absolute(request, url):
+    return request.build_absolute_uri(url) if request else url
+
+
+def derivative_url(image_obj, size, request=None):
+    """URL du dérivé `size` (ou du plus proche plus grand), sinon de l'original."""
+    if not image_obj or not image_obj.image:
+        return None
+    sizes = (image_obj.derivatives or {}).get("sizes") or {}
+    names = [name for name, _, _ in SIZES]
+    for candidate in names[names.index(size):]:
+        if candidate in sizes:
+            return _absolute(request, default_storage.url(sizes[candidate]["name"]))
+    # Taille absente car égale à la précédente (petit original) : medium ou plus petit
+    for candidate in reversed(names[:names.index(size)]):
+        if candidate in sizes and candidate != "thumb":
+            return _absolute(request, default_storage.url(sizes[candidate]["name"]))
+    return _absolute(request, image_obj.image.url)
+
+
+def srcset(image_obj, request=None):
+    """Attribut srcset (« url 600w, url 1200w ») ; None tant que les dérivés manquent."""
+    if not image_obj or not image_obj.image:
+        return None
+    sizes = (image_obj.derivatives or {}).get("sizes") or {}
+    entries = [
+        f"{_absolute(request, default_storage.url(sizes[size]['name']))} {sizes[size]['width']}w"
+        for size in SRCSET_SIZES if size in sizes
+    ]
+    return ", ".join(entries) or None
+
+
+# ─── Signaux ─────────────────────────────────────────────────────────────────
+
+def _reset_on_new_file(sender, instance, **kwargs):
+    """Fichier nouvellement uploadé ou remplacé : dérivés à régénérer."""
+    record = instance.derivatives
+    if not instance.image._committed or (record and record.get("source") != instance.image.name):
+        instance.width = instance.height = instance.derivatives = None
+
+
+def _generate_on_upload(sender, instance, **kwargs):
+    if instance.derivatives is None and instance.image and settings.IMAGE_DERIVATIVES_ON_UPLOAD:
+        transaction.on_commit(lambda: _generate_pending(sender, instance.pk))
+
+
+for _model in IMAGE_MODELS:
+    pre_save.connect(_reset_on_new_file, sender=_model, dispatch_uid=f"image_derivatives_reset_{_model.__name__}")
+    post_save.connect(_generate_on_upload, sender=_model, dispatch_uid=f"image_derivatives_{_model.__name__}")
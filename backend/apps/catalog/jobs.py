@@ -0,0 +1,72 @@
+# backend/apps/catalog/jobs.py
+# Tâches planifiées catalogue (exécutées par run_scheduler).
+
+from django.utils import timezone
+
+from apps.accounts.models import UserNotification
+from apps.accounts.notifications import notify
+from apps.common.scheduler import periodic_job
+from .images import IMAGE_MODELS, generate_derivatives, pending_images
+from .models import PromotionCampaign
+
+DERIVATIVES_BATCH = 100
+# Modèle → dernier pk examiné : les originaux introuvables, laissés à générer,
+# ne bloquent pas la tête de file ; on repart du début une fois la table parcourue
+_derivatives_cursor = {}
+
+EXPIRABLE_STATUSES = [
+    PromotionCampaign.Status.DRAFT,
+    PromotionCampaign.Status.PENDING,
+    PromotionCampaign.Status.APPROVED,
+    PromotionCampaign.Status.SUSPENDED,
+]
+
+
+@periodic_job("expire_promotion_campaigns", every=300)
+def expire_promotion_campaigns():
+    """Campagnes dont ends_at est passé → EXPIRED ; le vendeur des campagnes actives est prévenu."""
+    now = timezone.now()
+    rows = list(
+        PromotionCampaign.objects.filter(status__in=EXPIRABLE_STATUSES, ends_at__lt=now)
+        .select_for_update(skip_locked=True, of=("self",))
+        .values_list("id", "status", "title", "product__vendor_id")
+    )
+    if not rows:
+        return 0
+
+    PromotionCampaign.objects.filter(pk__in=[row[0] for row in rows]).update(
+        status=PromotionCampaign.Status.EXPIRED,
+        updated_at=now,
+    )
+    for _, previous_status, title, vendor_id in rows:
+        if previous_status != PromotionCampaign.Status.APPROVED:
+            continue
+        notify(
+            vendor_id,
+            title="Promotion terminee",
+            message=f"La campagne « {title} » est arrivee a echeance.",
+            notification_type=UserNotification.NotificationType.PROMOTION,
+            action_url="/seller/products",
+        )
+    return len(rows)
+
+
+@periodic_job("generate_image_derivatives", every=60)
+def generate_image_derivatives():
+    """Rattrapage des dérivés manquants (images antérieures, échec au commit, génération à l'upload désactivée)."""
+    done = examined = 0
+    for model in IMAGE_MODELS:
+        wanted = DERIVATIVES_BATCH - examined
+        batch = list(
+            pending_images(model).filter(pk__gt=_derivatives_cursor.get(model, 0))
+            .order_by("pk").select_for_update(skip_locked=True)[:wanted]
+        )
+        for image_obj in batch:
+            done += generate_derivatives(image_obj)
+            _derivatives_cursor[model] = image_obj.pk
+        if len(batch) < wanted:
+            _derivatives_cursor.pop(model, None)
+        examined += len(batch)
+        if examined >= DERIVATIVES_BATCH:
+            break
+    return done
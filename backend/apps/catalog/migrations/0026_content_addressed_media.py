@@ -0,0 +1,24 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:10
+
+import apps.common.media
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0025_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='masterproductimage',
+            name='image',
+            field=models.ImageField(storage=apps.common.media.ContentAddressedStorage(), upload_to='masters/%Y/%m/'),
+        ),
+        migrations.AlterField(
+            model_name='productimage',
+            name='image',
+            field=models.ImageField(storage=apps.common.media.ContentAddressedStorage(), upload_to='products/%Y/%m/', verbose_name='Image'),
+        ),
+    ]
@@ -6,6 +6,8 @@ from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.text import slugify
 from django.db import transaction
+from apps.common.media import content_storage
+from apps.catalog.slugs import reserve_ids, save_with_slug, slug_base
 from apps.common.models import SoftDeleteModel
 
 
@@ -669,22 +671,25 @@ class MasterProduct(SoftDeleteModel):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            base = slugify(self.title) or "fiche"
-            self.slug = base
-            counter = 1
-            while MasterProduct.all_objects.filter(slug=self.slug).exclude(pk=self.pk).exists():
-                self.slug = f"{base}-{counter}"
-                counter += 1
-        super().save(*args, **kwargs)
+            save_with_slug(
+                self, lambda: super(MasterProduct, self).save(*args, **kwargs),
+                MasterProduct.all_objects, slug_base(self.title, self._meta.get_field("slug").max_length, "fiche"),
+            )
+        else:
+            super().save(*args, **kwargs)
 
 
 class MasterProductImage(models.Model):
     """Image PRO d'une fiche produit (mise en avant, vue acheteur)."""
     master     = models.ForeignKey(MasterProduct, on_delete=models.CASCADE, related_name='images')
-    image      = models.ImageField(upload_to='masters/%Y/%m/')
+    image      = models.ImageField(upload_to='masters/%Y/%m/', storage=content_storage)
     is_primary = models.BooleanField(default=False)
     order      = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Renseignés par apps.catalog.images (None = dérivés pas encore générés)
+    width       = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height      = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    derivatives = models.JSONField(null=True, blank=True, editable=False)
 
     class Meta:
         ordering            = ['order', '-is_primary', '-created_at']
@@ -904,13 +909,16 @@ class ProductVariant(SoftDeleteModel):
         # 2. Validation métier
         self.full_clean(exclude=["sku", "axis_key"])
  
-        # 3. Save initial (pour obtenir l'ID si création)
-        super().save(*args, **kwargs)
- 
-        # 4. SKU auto après première sauvegarde (nécessite l'ID)
+        # 3. SKU auto : id réservé sur la séquence avant l'INSERT (pas d'UPDATE après)
         if not self.sku:
+            if self.pk is None:
+                self.pk = reserve_ids(ProductVariant)[0]
+                kwargs["force_insert"] = True
             self.sku = f"BLV-V-{self.master_id:06d}-{self.pk:04d}"
-            ProductVariant.all_objects.filter(pk=self.pk).update(sku=self.sku)
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "sku"}
+ 
+        super().save(*args, **kwargs)
  
     # ─── Propriétés Buy Box ────────────────────────────────────────────
  
@@ -1284,24 +1292,40 @@ class Product(SoftDeleteModel):
         cat_code = (self.category.name[:3].upper() if self.category else 'GEN')
         return f"BLV-{cat_code}-{self.pk:05d}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Valeurs chargées, pour ne toucher VendorStatsSnapshot qu'en cas de changement
+        instance._loaded_listing = instance.listing_key()
+        return instance
+
+    def listing_key(self):
+        """(vendeur, actif, vivant) repris dans VendorStatsSnapshot (None si non chargé)."""
+        loaded = self.__dict__
+        if not all(name in loaded for name in ("vendor_id", "is_active", "deleted_at")):
+            return None
+        return self.vendor_id, self.is_active, self.deleted_at is None
+
     def save(self, *args, **kwargs):
+        # SKU auto : id réservé sur la séquence avant l'INSERT (pas d'UPDATE après)
+        if not self.sku:
+            if self.pk is None:
+                self.pk = reserve_ids(Product)[0]
+                kwargs["force_insert"] = True
+            self.sku = self.generate_sku()
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "sku"}
+
         # Slug auto depuis le titre
         if not self.slug:
-            self.slug = slugify(self.title)
-            original = self.slug
-            counter  = 1
             # all_objects : on tient compte AUSSI des produits soft-deleted
             # pour ne jamais réutiliser un slug encore présent en base (unique).
-            while Product.all_objects.filter(slug=self.slug).exclude(pk=self.pk).exists():
-                self.slug = f"{original}-{counter}"
-                counter += 1
-
-        super().save(*args, **kwargs)
-
-        # SKU auto après première sauvegarde (pour avoir le pk)
-        if not self.sku:
-            self.sku = self.generate_sku()
-            Product.all_objects.filter(pk=self.pk).update(sku=self.sku)
+            save_with_slug(
+                self, lambda: super(Product, self).save(*args, **kwargs),
+                Product.all_objects, slug_base(self.title, self._meta.get_field("slug").max_length, "produit"),
+            )
+        else:
+            super().save(*args, **kwargs)
 
 
 class PromotionCampaign(TimeStampedModel):
@@ -1433,10 +1457,14 @@ class ProductImage(models.Model):
     product    = models.ForeignKey(
         Product, on_delete=models.CASCADE, related_name='images', verbose_name="Produit",
     )
-    image      = models.ImageField(upload_to='products/%Y/%m/', verbose_name="Image")
+    image      = models.ImageField(upload_to='products/%Y/%m/', storage=content_storage, verbose_name="Image")
     is_primary = models.BooleanField(default=False, verbose_name="Image principale")
     order      = models.PositiveIntegerField(default=0, verbose_name="Ordre d'affichage")
     created_at = models.DateTimeField(auto_now_add=True)
+    # Renseignés par apps.catalog.images (None = dérivés pas encore générés)
+    width       = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Largeur")
+    height      = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Hauteur")
+    derivatives = models.JSONField(null=True, blank=True, editable=False, verbose_name="Dérivés")
 
     class Meta:
         verbose_name        = "Image Produit"
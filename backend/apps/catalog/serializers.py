@@ -4,6 +4,7 @@
 from rest_framework import serializers
 from django.db.models import Avg
 import re
+from .images import derivative_url, srcset
 from .models import Product, Category, ProductMedia, ProductImage, ProductReview, MasterProduct, ProductCondition, PromotionCampaign, Brand, ColorDictionary, ProductAttribute, MasterProduct, AttributeRole, ProductVariant, ColorFamily
 
 
@@ -113,11 +114,16 @@ class ProductMediaSerializer(serializers.ModelSerializer):
 
 class ProductImageSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = ProductImage
-        fields = ['id', 'image', 'image_url', 'is_primary', 'order', 'created_at']
-        read_only_fields = ['id', 'created_at']
+        fields = [
+            'id', 'image', 'image_url', 'thumbnail_url', 'srcset',
+            'width', 'height', 'is_primary', 'order', 'created_at',
+        ]
+        read_only_fields = ['id', 'width', 'height', 'created_at']
     
     def get_image_url(self, obj):
         if obj.image:
@@ -127,6 +133,13 @@ class ProductImageSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
 
+    def get_thumbnail_url(self, obj):
+        # Carré 200 px WebP (cartes) ; l'original tant que les dérivés manquent
+        return derivative_url(obj, 'thumb', self.context.get('request'))
+
+    def get_srcset(self, obj):
+        return srcset(obj, self.context.get('request'))
+
 
 class ProductReviewSerializer(serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.username', read_only=True)
@@ -514,20 +527,28 @@ class OfferSerializer(serializers.ModelSerializer):
 class MasterProductListSerializer(serializers.ModelSerializer):
     category      = CategorySerializer(read_only=True)
     primary_image = serializers.SerializerMethodField()
+    primary_image_srcset = serializers.SerializerMethodField()
     offers_count  = serializers.SerializerMethodField()
     buy_box       = serializers.SerializerMethodField()
 
     class Meta:
         model = MasterProduct
         fields = ['id', 'title', 'slug', 'brand', 'category',
-                  'primary_image', 'offers_count', 'buy_box', 'created_at']
+                  'primary_image', 'primary_image_srcset', 'offers_count', 'buy_box', 'created_at']
+
+    def _primary(self, obj):
+        # Choisie une fois par fiche parmi les images préchargées (prefetch 'images')
+        if not hasattr(obj, '_primary_image'):
+            images = list(obj.images.all())  # ordre du modèle, comme images.first()
+            obj._primary_image = next((im for im in images if im.is_primary), images[0] if images else None)
+        return obj._primary_image
 
     def get_primary_image(self, obj):
-        img = obj.images.filter(is_primary=True).first() or obj.images.first()
-        if img and img.image:
-            request = self.context.get('request')
-            return request.build_absolute_uri(img.image.url) if request else img.image.url
-        return None
+        # Carte : dérivé medium (600 px WebP), l'original tant qu'il manque
+        return derivative_url(self._primary(obj), 'medium', self.context.get('request'))
+
+    def get_primary_image_srcset(self, obj):
+        return srcset(self._primary(obj), self.context.get('request'))
 
     def get_offers_count(self, obj):
         return obj.offers.filter(is_active=True, moderation_status='APPROVED').count()
@@ -549,7 +570,11 @@ class MasterProductDetailSerializer(MasterProductListSerializer):
         out = []
         for im in obj.images.all():
             url = request.build_absolute_uri(im.image.url) if request else im.image.url
-            out.append({'id': im.id, 'image': url, 'is_primary': im.is_primary})
+            out.append({
+                'id': im.id, 'image': url, 'is_primary': im.is_primary,
+                'thumbnail': derivative_url(im, 'thumb', request), 'srcset': srcset(im, request),
+                'width': im.width, 'height': im.height,
+            })
         return out
 
     def get_offers(self, obj):
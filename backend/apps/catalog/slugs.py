@@ -0,0 +1,111 @@
+# backend/apps/catalog/slugs.py
+# Attribution des slugs et des SKU, sans boucle de requêtes à l'enregistrement.
+#   - slugs  : une requête par tranche de SLUG_CHUNK bases → suffixes numériques
+#              déjà pris (slug = base OU slug LIKE 'base-%', index LIKE du champ
+#              unique) ; base libre → base, sinon le plus petit suffixe libre ≥ 1
+#              (« iphone » ne devient pas « iphone-16 » parce qu'« iphone-15 »
+#              existe déjà)
+#   - course : deux enregistrements simultanés peuvent recevoir le même slug ;
+#              la contrainte unique tranche et save_with_slug() réattribue
+#   - SKU    : l'id est réservé sur la séquence de la table (nextval) avant
+#              l'INSERT ; le SKU qui en dépend part dans l'INSERT lui-même,
+#              sans UPDATE de rattrapage
+#   - lots   : allocate_slugs(queryset, bases) et reserve_ids(model, n) servent
+#              autant de lignes que demandé (import CSV) ; pas d'agrégat par base
+#              dans la liste SELECT, bornée à 1664 colonnes par PostgreSQL
+# Le module ne dépend d'aucun modèle : apps.catalog.models l'importe.
+
+import re
+
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+SUFFIX_DIGITS = 9
+SLUG_RETRIES = 5
+SLUG_CHUNK = 200
+
+
+# ─── Slugs ───────────────────────────────────────────────────────────────────
+
+def slug_base(text, max_length, fallback):
+    """Base de slug pour `text`, tronquée pour laisser la place à « -<suffixe> »."""
+    return slugify(text)[:max_length - SUFFIX_DIGITS - 1].strip("-") or fallback
+
+
+def _taken_suffixes(queryset, bases, field):
+    """{base: suffixes déjà pris} (0 = la base elle-même), une requête par tranche de bases."""
+    taken = {base: set() for base in bases}
+    for start in range(0, len(bases), SLUG_CHUNK):
+        chunk = bases[start:start + SLUG_CHUNK]
+        lookup = Q(**{f"{field}__in": chunk})
+        for base in chunk:
+            lookup |= Q(**{f"{field}__startswith": f"{base}-"})  # index LIKE du champ unique
+        pattern = rf"^(?:{'|'.join(re.escape(base) for base in chunk)})(?:-[0-9]{{1,{SUFFIX_DIGITS}}})?$"
+        for slug in queryset.filter(lookup, **{f"{field}__regex": pattern}).order_by().values_list(field, flat=True):
+            if slug in taken:
+                taken[slug].add(0)
+            head, _, tail = slug.rpartition("-")
+            if head in taken and tail.isdigit():
+                taken[head].add(int(tail))
+    return taken
+
+
+def allocate_slugs(queryset, bases, field="slug"):
+    """
+    Un slug libre par élément de `bases` (doublons compris, dans l'ordre), en
+    une requête par tranche de SLUG_CHUNK bases sur `queryset` (all_objects
+    pour compter les lignes supprimées en douceur, le slug restant pris en base).
+    """
+    distinct = list(dict.fromkeys(bases))
+    if not distinct:
+        return []
+    taken = _taken_suffixes(queryset, distinct, field)
+
+    following = dict.fromkeys(distinct, 1)
+    used = set()
+    slugs = []
+    for base in bases:
+        if 0 not in taken[base] and base not in used:
+            slug = base
+        else:
+            # Plus petit suffixe libre : « sac-2 » saisi dans le même lot que trois « sac »
+            suffix = following[base]
+            while suffix in taken[base] or f"{base}-{suffix}" in used:
+                suffix += 1
+            following[base] = suffix + 1
+            slug = f"{base}-{suffix}"
+        used.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def save_with_slug(instance, save, queryset, base, field="slug"):
+    """
+    Attribue à `instance` un slug libre dérivé de `base`, puis appelle `save()`.
+    Si une écriture concurrente a pris le même slug entre-temps, l'INSERT
+    échoue sur la contrainte unique (dans un savepoint) : on réattribue.
+    """
+    using = router.db_for_write(type(instance))
+    for attempt in range(SLUG_RETRIES):
+        setattr(instance, field, allocate_slugs(queryset, [base], field)[0])
+        try:
+            with transaction.atomic(using=using):
+                return save()
+        except IntegrityError:
+            if attempt + 1 == SLUG_RETRIES or not queryset.filter(**{field: getattr(instance, field)}).exists():
+                raise  # autre contrainte, ou slug toujours disputé
+
+
+# ─── Identifiants / SKU ──────────────────────────────────────────────────────
+
+def reserve_ids(model, count=1):
+    """`count` ids tirés de la séquence de la clé primaire de `model`, en une requête."""
+    if count < 1:
+        return []
+    with connections[router.db_for_write(model)].cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)",
+            [model._meta.db_table, model._meta.pk.column, count],
+        )
+        return [row[0] for row in cursor.fetchall()]
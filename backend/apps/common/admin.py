@@ -1,3 +1,61 @@
+# backend/apps/common/admin.py
+# Admin du socle partagé : suivi de l'outbox e-mail.
+
 from django.contrib import admin
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.html import format_html
+
+from .models import OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ["id", "subject", "recipients", "status_badge", "attempts", "next_attempt_at", "sent_at", "created_at"]
+    list_filter = ["status", "created_at"]
+    search_fields = ["subject", "to"]
+    readonly_fields = [
+        "subject", "body", "html_body", "from_email", "to", "reply_to",
+        "attempts", "last_error", "sent_at", "created_at",
+    ]
+    actions = ["requeue"]
+
+    def recipients(self, obj):
+        return ", ".join(obj.to)
+    recipients.short_description = "Destinataires"
+
+    def status_badge(self, obj):
+        colors = {
+            OutboundEmail.Status.PENDING: "#F59E0B",
+            OutboundEmail.Status.SENT:    "#10B981",
+            OutboundEmail.Status.FAILED:  "#EF4444",
+        }
+        return format_html(
+            '<span style="background-color: {}; color: white; padding: 4px 12px; border-radius: 12px; font-size: 11px; font-weight: 600;">{}</span>',
+            colors.get(obj.status, "#6B7280"),
+            obj.get_status_display(),
+        )
+    status_badge.short_description = "Statut"
+
+    def requeue(self, request, queryset):
+        """Remet en file les e-mails en échec (nouveau cycle de tentatives)."""
+        count = queryset.exclude(status=OutboundEmail.Status.SENT).update(
+            status=OutboundEmail.Status.PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+        )
+        self.message_user(request, f"{count} e-mail(s) remis en file.")
+    requeue.short_description = "Remettre en file d'envoi"
 
-# Register your models here.
+    def changelist_view(self, request, extra_context=None):
+        # Compteurs par statut affichés en tête de liste
+        counts = {
+            row["status"]: row["n"]
+            for row in OutboundEmail.objects.values("status").annotate(n=Count("id"))
+        }
+        extra_context = extra_context or {}
+        extra_context["title"] = (
+            f"E-mails sortants — en attente : {counts.get('PENDING', 0)} · "
+            f"envoyés : {counts.get('SENT', 0)} · échecs : {counts.get('FAILED', 0)}"
+        )
+        return super().changelist_view(request, extra_context=extra_context)
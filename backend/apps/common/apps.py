@@ -8,4 +8,7 @@ class CommonConfig(AppConfig):
 
     def ready(self):
         # Connecte les signals d'audit (inactifs tant qu'aucun modèle n'est enregistré)
-        from . import audit  # noqa: F401
\ No newline at end of file
+        from . import audit  # noqa: F401
+        # Comptage des références du stockage média adressé par contenu
+        from .media import connect_reference_tracking
+        connect_reference_tracking()
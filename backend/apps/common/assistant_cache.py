@@ -0,0 +1,227 @@
+# backend/apps/common/assistant_cache.py
+# Cache des réponses de l'assistant catalogue.
+#   - clé        : message normalisé (casse, accents, ponctuation, espaces),
+#                  ensemble des ids produits envoyés au modèle, filtres,
+#                  catégorie et modèle → assistant:answer:<sha256>
+#   - TTL        : ASSISTANT_CACHE_TTL ; seules les réponses du fournisseur
+#                  sont mises en cache (jamais le fallback mock ni les erreurs)
+#   - cache      : CACHES partagé (Redis dès que REDIS_URL est défini, voir
+#                  settings) — réponses, verrous et compteurs valent pour tous
+#                  les workers ; en LocMem (dev) ils restent par processus
+#   - single-flight : dans un worker, les demandes identiques en vol attendent
+#                  la même tâche ; entre workers, un verrou cache.add (jeton
+#                  propre à l'appel) fait attendre les autres sur le résultat
+#                  en cache. Seul le détenteur du jeton efface le verrou
+#   - fournisseur lent : au-delà d'ASSISTANT_SOFT_TIMEOUT, réponse mock
+#                  immédiate ; sous ASGI l'appel continue et remplit le cache
+#                  pour les demandes suivantes. Sous WSGI la boucle
+#                  d'async_to_sync meurt avec la requête : l'appel est annulé
+#                  (background=False), verrou libéré
+#   - compteurs  : hits, misses, coalesced, fallbacks, erreurs, appels et
+#                  latence du fournisseur (histogramme) → assistant_stats()
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+import unicodedata
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+KEY_PREFIX = "assistant:answer:"
+LOCK_PREFIX = "assistant:lock:"
+STATS_PREFIX = "assistant:stats:"
+POLL_SECONDS = 0.25
+MAX_PRODUCTS = 8  # produits transmis au modèle (voir build_openrouter_request)
+LATENCY_BUCKETS_MS = (500, 1000, 2000, 5000, 10000, 20000)
+COUNTERS = ("hits", "misses", "coalesced", "slow_fallbacks", "errors", "provider_calls", "provider_ms_total")
+
+# Appels en vol du processus : clé → tâche asyncio
+_inflight = {}
+
+
+# ─── Clé ─────────────────────────────────────────────────────────────────────
+
+def normalize_message(message: str) -> str:
+    text = unicodedata.normalize("NFKD", str(message or "")).encode("ascii", "ignore").decode()
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def cache_key(payload: dict) -> str:
+    products = payload.get("products") or []
+    ids = sorted({str(product.get("id")) for product in products[:MAX_PRODUCTS] if isinstance(product, dict)})
+    material = json.dumps(
+        {
+            "message": normalize_message(payload.get("message", "")),
+            "products": ids,
+            "filters": payload.get("filters") or {},
+            "category": payload.get("selectedCategoryName") or "",
+            "model": settings.OPENROUTER_MODEL,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return KEY_PREFIX + hashlib.sha256(material.encode()).hexdigest()
+
+
+# ─── Compteurs ───────────────────────────────────────────────────────────────
+
+def _bucket(ms):
+    for bound in LATENCY_BUCKETS_MS:
+        if ms <= bound:
+            return f"provider_le_{bound}ms"
+    return "provider_gt_max"
+
+
+def _bucket_names():
+    return [f"provider_le_{bound}ms" for bound in LATENCY_BUCKETS_MS] + ["provider_gt_max"]
+
+
+def record(**deltas):
+    """Incrémente les compteurs (partagés entre workers si le cache l'est)."""
+    for name, delta in deltas.items():
+        if not delta:
+            continue
+        key = STATS_PREFIX + name
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            cache.add(key, 0, None)
+            cache.incr(key, delta)
+
+
+def record_latency(ms):
+    record(provider_calls=1, provider_ms_total=int(ms), **{_bucket(ms): 1})
+
+
+def assistant_stats() -> dict:
+    names = list(COUNTERS) + _bucket_names()
+    values = cache.get_many([STATS_PREFIX + name for name in names])
+    stats = {name: values.get(STATS_PREFIX + name, 0) for name in names}
+    lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+    calls = stats["provider_calls"]
+    return {
+        "hits": stats["hits"],
+        "misses": stats["misses"],
+        "coalesced": stats["coalesced"],
+        "slow_fallbacks": stats["slow_fallbacks"],
+        "errors": stats["errors"],
+        "hit_ratio": round((stats["hits"] + stats["coalesced"]) / lookups, 4) if lookups else None,
+        "provider": {
+            "calls": calls,
+            "avg_ms": round(stats["provider_ms_total"] / calls) if calls else None,
+            "p50_ms": _percentile(stats, calls, 0.50),
+            "p95_ms": _percentile(stats, calls, 0.95),
+            "histogram": {name.removeprefix("provider_"): stats[name] for name in _bucket_names()},
+        },
+        "ttl_seconds": settings.ASSISTANT_CACHE_TTL,
+        "soft_timeout_seconds": settings.ASSISTANT_SOFT_TIMEOUT,
+    }
+
+
+def _percentile(stats, calls, rank):
+    """Borne haute du seau qui contient le rang demandé (None au-delà du dernier)."""
+    if not calls:
+        return None
+    seen = 0
+    for bound in LATENCY_BUCKETS_MS:
+        seen += stats[f"provider_le_{bound}ms"]
+        if seen >= calls * rank:
+            return bound
+    return None
+
+
+def reset_stats():
+    cache.delete_many([STATS_PREFIX + name for name in list(COUNTERS) + _bucket_names()])
+
+
+# ─── Réponse ─────────────────────────────────────────────────────────────────
+
+async def _wait_other_worker(key, deadline):
+    loop = asyncio.get_running_loop()
+    while loop.time() < deadline:
+        await asyncio.sleep(POLL_SECONDS)
+        cached = await cache.aget(key)
+        if cached is not None:
+            return cached
+        if not await cache.ahas_key(LOCK_PREFIX + key):
+            return None  # l'autre worker a échoué : on appelle nous-mêmes
+    return None
+
+
+async def _fetch_and_store(key, payload, fetch):
+    loop = asyncio.get_running_loop()
+    lock_key, token = LOCK_PREFIX + key, uuid.uuid4().hex
+    lock_ttl = int(settings.OPENROUTER_TIMEOUT) + 5
+    owned = await cache.aadd(lock_key, token, lock_ttl)
+    if not owned:
+        cached = await _wait_other_worker(key, loop.time() + settings.OPENROUTER_TIMEOUT)
+        if cached is not None:
+            return cached
+        # Autre worker trop lent ou tombé : on appelle, en reprenant le verrou s'il est libre
+        owned = await cache.aadd(lock_key, token, lock_ttl)
+    started = time.perf_counter()
+    try:
+        result = await fetch(payload)
+    except Exception:
+        await sync_to_async(record)(errors=1)
+        raise
+    finally:
+        if owned and await cache.aget(lock_key) == token:
+            await cache.adelete(lock_key)
+    await sync_to_async(record_latency)((time.perf_counter() - started) * 1000)
+    await cache.aset(key, result, settings.ASSISTANT_CACHE_TTL)
+    return result
+
+
+def _forget(key, task):
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        task.exception()  # récupérée ici : pas d'avertissement si plus personne n'attend
+
+
+async def cached_answer(payload: dict, fetch, fallback, errors, background=True) -> dict:
+    """
+    Réponse de l'assistant pour `payload` : cache, sinon `fetch(payload)`
+    (coroutine du fournisseur) partagée entre demandes identiques.
+    `fallback(payload)` sert si le fournisseur dépasse le délai souple ou
+    lève une des exceptions `errors`. La réponse porte `cache` :
+    hit | miss | coalesced | fallback.
+    `background` : la boucle survit à la requête (ASGI) et l'appel lent peut
+    finir en arrière-plan ; sinon (WSGI) il est annulé au délai souple.
+    """
+    key = cache_key(payload)
+    cached = await cache.aget(key)
+    if cached is not None:
+        await sync_to_async(record)(hits=1)
+        return {**cached, "cache": "hit"}
+
+    loop = asyncio.get_running_loop()
+    task = _inflight.get(key)
+    if task is not None and not task.done() and task.get_loop() is loop:
+        status = "coalesced"
+    else:
+        status = "miss"
+        task = loop.create_task(_fetch_and_store(key, payload, fetch))
+        _inflight[key] = task
+        task.add_done_callback(lambda done, key=key: _forget(key, done))
+    await sync_to_async(record)(**{"misses" if status == "miss" else "coalesced": 1})
+
+    try:
+        result = await asyncio.wait_for(asyncio.shield(task), settings.ASSISTANT_SOFT_TIMEOUT)
+    except asyncio.TimeoutError:
+        if not background:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await sync_to_async(record)(slow_fallbacks=1)
+        return {**fallback(payload), "cache": "fallback", "error": "provider timeout"}
+    except errors as exc:
+        return {**fallback(payload), "cache": "fallback", "error": str(exc) or exc.__class__.__name__}
+    return {**result, "cache": status}
@@ -0,0 +1,36 @@
+# backend/apps/common/http.py
+# Client HTTP asynchrone partagé pour les appels sortants des vues async
+# (OpenRouter, ip-api.com).
+#   - async_client() : un httpx.AsyncClient par (thread, boucle d'événements).
+#     Sous uvicorn, un worker = une boucle : le pool keep-alive est réutilisé
+#     d'une requête à l'autre. Sous WSGI (async_to_sync), chaque appel a sa
+#     boucle jetable : le client précédent est abandonné avec elle.
+#   - délais bornés par défaut ; chaque appel peut fixer le sien (timeout=...)
+#   - pool plafonné : un fournisseur lent ne peut pas ouvrir des centaines de
+#     connexions, les appels en trop attendent (POOL_TIMEOUT) puis échouent
+
+import asyncio
+import threading
+
+import httpx
+
+USER_AGENT = "BelivaY/1.0"
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE = 20
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=3.0, pool=5.0)
+
+_local = threading.local()
+
+
+def async_client() -> httpx.AsyncClient:
+    """Client partagé de la boucle courante (à appeler depuis une coroutine)."""
+    loop = asyncio.get_running_loop()
+    client = getattr(_local, "client", None)
+    if client is None or client.is_closed or getattr(_local, "loop", None) is not loop:
+        client = httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE),
+            headers={"User-Agent": USER_AGENT},
+        )
+        _local.client, _local.loop = client, loop
+    return client
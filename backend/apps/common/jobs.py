@@ -0,0 +1,12 @@
+# backend/apps/common/jobs.py
+# Tâches planifiées du socle (exécutées par run_scheduler).
+
+from apps.common.scheduler import periodic_job
+from . import media
+
+
+@periodic_job("collect_media_garbage", every=24 * 3600)
+def collect_media_garbage():
+    """Recompte les références média et supprime les fichiers orphelins (voir media_gc)."""
+    stats = media.collect_garbage()
+    return stats["blobs"] + stats["orphans"] + stats["legacy"] + stats["derivatives"]
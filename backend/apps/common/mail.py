@@ -0,0 +1,135 @@
+# backend/apps/common/mail.py
+# Outbox e-mail : les vues n'attendent plus le SMTP.
+#   - queue_email()      : écrit un OutboundEmail dans la transaction courante
+#   - render_email()     : rendu texte + HTML avec templates compilés en cache
+#   - deliver_pending()  : envoi par lots sur une connexion SMTP unique,
+#                          avec nouvelle tentative et backoff exponentiel
+# Le worker est la commande `python manage.py send_queued_emails --loop`.
+
+import logging
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 60
+BACKOFF_MAX_SECONDS = 3600
+
+
+@lru_cache(maxsize=64)
+def _compiled_template(name):
+    """Template compilé une seule fois par processus (le loader ne re-parse pas)."""
+    return get_template(name)
+
+
+def render_email(template_base, context):
+    """
+    Rend `<template_base>.txt` et `<template_base>.html`.
+    Retourne (texte, html).
+    """
+    text = _compiled_template(f"{template_base}.txt").render(context)
+    html = _compiled_template(f"{template_base}.html").render(context)
+    return text, html
+
+
+def queue_email(subject, message, recipient_list, from_email=None,
+                html_message="", reply_to=None):
+    """
+    Même signature que django.core.mail.send_mail, sans bloquer sur le SMTP.
+    La ligne suit la transaction de l'appelant : rollback ⇒ aucun e-mail.
+    """
+    return OutboundEmail.objects.create(
+        subject=subject[:255],
+        body=message,
+        html_body=html_message or "",
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=[addr for addr in recipient_list if addr],
+        reply_to=list(reply_to or []),
+    )
+
+
+def _backoff(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+def _build_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.to,
+        reply_to=email.reply_to or None,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, "text/html")
+    return message
+
+
+def deliver_pending(batch_size=50):
+    """
+    Envoie un lot d'e-mails échus. Les lignes sont verrouillées avec
+    SKIP LOCKED : plusieurs workers peuvent tourner sans double envoi.
+    Retourne {"sent": n, "retried": n, "failed": n}.
+    """
+    stats = {"sent": 0, "retried": 0, "failed": 0}
+    now = timezone.now()
+
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.Status.PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        if not batch:
+            return stats
+
+        connection = get_connection(fail_silently=False)
+        open_error = ""
+        try:
+            connection.open()
+        except Exception as exc:
+            logger.warning("Connexion SMTP impossible : %s", exc)
+            connection = None
+            open_error = str(exc)
+
+        for email in batch:
+            email.attempts += 1
+            try:
+                if connection is None:
+                    raise ConnectionError(open_error)
+                if not email.to:
+                    raise ValueError("Aucun destinataire.")
+                _build_message(email, connection).send()
+            except Exception as exc:
+                email.last_error = str(exc)[:2000]
+                if email.attempts >= MAX_ATTEMPTS:
+                    email.status = OutboundEmail.Status.FAILED
+                    stats["failed"] += 1
+                else:
+                    email.next_attempt_at = now + _backoff(email.attempts)
+                    stats["retried"] += 1
+            else:
+                email.status = OutboundEmail.Status.SENT
+                email.sent_at = timezone.now()
+                email.last_error = ""
+                stats["sent"] += 1
+
+        if connection is not None:
+            connection.close()
+
+        OutboundEmail.objects.bulk_update(
+            batch, ["status", "attempts", "next_attempt_at", "last_error", "sent_at"],
+        )
+
+    return stats
@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.common.media import collect_garbage
+
+
+class Command(BaseCommand):
+    help = (
+        "Ramasse-miettes des médias : recompte les références du stockage "
+        "adressé par contenu puis supprime les fichiers plus référencés depuis "
+        "le délai de grâce (blobs, orphelins cas/, anciens chemins, dérivés "
+        "d'images). À planifier chaque nuit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Âge minimum (heures) d'un fichier non référencé avant suppression.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Affiche ce qui serait supprimé sans rien toucher.",
+        )
+
+    def handle(self, *args, **opts):
+        stats = collect_garbage(grace=timedelta(hours=opts["grace_hours"]), dry_run=opts["dry_run"])
+        prefix = "[simulation] " if opts["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Blobs : {stats['blobs']} · orphelins : {stats['orphans']} · anciens fichiers : "
+            f"{stats['legacy']} · dérivés : {stats['derivatives']} · {stats['bytes'] / 1_048_576:.1f} Mo libérés "
+            f"· compteurs recalés : {stats['reconciled']}"
+        ))
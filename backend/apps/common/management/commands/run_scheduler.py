@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.common.scheduler import Scheduler, discover_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Exécute les tâches périodiques enregistrées (apps/<app>/jobs.py). Une seule "
+        "instance est active à la fois (verrou consultatif PostgreSQL). "
+        "--loop pour tourner en worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Tourne en continu au lieu d'exécuter chaque job une fois.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Pause (secondes) entre deux vérifications des échéances, en mode --loop.",
+        )
+        parser.add_argument(
+            "--job",
+            action="append",
+            dest="jobs",
+            help="Limite l'exécution à ce job (répétable).",
+        )
+
+    def handle(self, *args, **opts):
+        jobs = discover_jobs()
+        if opts["jobs"]:
+            unknown = set(opts["jobs"]) - set(jobs)
+            if unknown:
+                raise CommandError(f"Job(s) inconnu(s) : {', '.join(sorted(unknown))}")
+            jobs = {name: jobs[name] for name in opts["jobs"]}
+
+        scheduler = Scheduler(jobs)
+        try:
+            if not opts["loop"]:
+                ran = scheduler.tick(force=True)
+                if not scheduler.is_leader:
+                    self.stdout.write(self.style.WARNING("Une autre instance du planificateur est active."))
+                self._log(ran)
+                return
+
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"── Planificateur démarré ({len(jobs)} jobs) ──"
+            ))
+            was_leader = False
+            while True:
+                ran = scheduler.tick()
+                if scheduler.is_leader != was_leader:
+                    was_leader = scheduler.is_leader
+                    self.stdout.write("Leader." if was_leader else "En attente du verrou…")
+                self._log(ran)
+                time.sleep(opts["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Planificateur arrêté.")
+        finally:
+            scheduler.stop()
+
+    def _log(self, ran):
+        for job, result, error in ran:
+            if error is not None:
+                self.stdout.write(self.style.ERROR(f"{job.name} : échec ({error})"))
+            elif result:
+                self.stdout.write(self.style.SUCCESS(f"{job.name} : {result}"))
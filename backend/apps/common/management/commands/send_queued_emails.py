@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.common.mail import deliver_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Expédie les e-mails de l'outbox (OutboundEmail) par lots, sur une "
+        "connexion SMTP unique. --loop pour tourner en worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="Nombre d'e-mails envoyés par connexion SMTP.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Tourne en continu (worker) au lieu d'un passage unique.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Pause (secondes) quand l'outbox est vide, en mode --loop.",
+        )
+
+    def handle(self, *args, **opts):
+        batch_size = opts["batch_size"]
+
+        if not opts["loop"]:
+            total = {"sent": 0, "retried": 0, "failed": 0}
+            while True:
+                stats = deliver_pending(batch_size=batch_size)
+                for key, value in stats.items():
+                    total[key] += value
+                if sum(stats.values()) < batch_size:
+                    break
+            self._log(total)
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING("── Worker e-mail démarré ──"))
+        try:
+            while True:
+                stats = deliver_pending(batch_size=batch_size)
+                if any(stats.values()):
+                    self._log(stats)
+                if sum(stats.values()) < batch_size:
+                    time.sleep(opts["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Worker e-mail arrêté.")
+
+    def _log(self, stats):
+        self.stdout.write(self.style.SUCCESS(
+            f"Envoyés : {stats['sent']} · à réessayer : {stats['retried']} "
+            f"· échecs définitifs : {stats['failed']}"
+        ))
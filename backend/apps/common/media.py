@@ -0,0 +1,300 @@
+# backend/apps/common/media.py
+# Stockage média adressé par contenu, avec déduplication.
+#   - stockage : ContentAddressedStorage range chaque fichier sous
+#                cas/<aa>/<bb>/<sha256><ext> ; un contenu déjà connu n'est pas
+#                réécrit, on renvoie le nom existant (MediaBlob)
+#   - champs   : ProductImage / MasterProductImage.image, photos boutique
+#                (VendorProfile.banner_image / profile_photo) et preuves de
+#                litige (DisputeEvidence.file) utilisent `content_storage` ;
+#                dupliquer une ligne = copier le nom, sans copie de fichier
+#   - refcount : post_save / post_delete des modèles concernés (champs
+#                découverts au démarrage) ; les écritures de masse (update,
+#                bulk_create) passent à côté → recomptés par media_gc
+#   - suppression : storage.delete() ne touche jamais un fichier partagé ;
+#                seul collect_garbage() efface, après recomptage et délai de grâce
+#   - GC       : blobs sans référence, fichiers cas/ sans blob, fichiers des
+#                anciens chemins (upload_to) plus référencés, dérivés d'images
+#                (derivatives/) plus référencés ; les fichiers ne sont effacés
+#                qu'au commit (job planifié : rollback → rien d'effacé), et
+#                jamais si le dossier cas/ manque alors que des blobs existent
+#                (volume média non monté)
+
+import hashlib
+import os
+import tempfile
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.apps import apps
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+PREFIX = "cas/"
+DERIVATIVES_PREFIX = "derivatives/"
+GC_GRACE = timedelta(hours=24)  # uploads en cours : blob écrit, ligne pas encore enregistrée
+
+
+# ─── Stockage ────────────────────────────────────────────────────────────────
+
+def content_name(digest, ext):
+    return f"{PREFIX}{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+
+@deconstructible(path="apps.common.media.ContentAddressedStorage")
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage (MEDIA_ROOT) dont les noms sont le SHA-256 du contenu."""
+
+    def save(self, name, content, max_length=None):
+        from .models import MediaBlob
+
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        digest, size = _digest(content)
+
+        blob = MediaBlob.objects.filter(sha256=digest).first()
+        if blob is None:
+            ext = os.path.splitext(name)[1].lower()[:10]
+            blob_name = content_name(digest, ext)
+            self._write(blob_name, content)
+            try:
+                with transaction.atomic():
+                    blob = MediaBlob.objects.create(sha256=digest, name=blob_name, size=size)
+            except IntegrityError:  # même contenu enregistré en parallèle
+                blob = MediaBlob.objects.get(sha256=digest)
+        else:
+            if not self.exists(blob.name):  # fichier purgé entre-temps : on le réécrit
+                self._write(blob.name, content)
+            MediaBlob.objects.filter(pk=digest).update(last_used_at=timezone.now())
+        return blob.name
+
+    def _write(self, name, content):
+        """Écriture atomique (fichier temporaire + rename) : deux écritures du même contenu sont sans danger."""
+        path = self.path(name)
+        if os.path.exists(path):
+            return
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        handle, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        try:
+            with os.fdopen(handle, "wb") as tmp:
+                content.seek(0)
+                for chunk in content.chunks():
+                    tmp.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(tmp_path, self.file_permissions_mode)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete(self, name):
+        # Un fichier adressé par contenu peut être partagé : seul le GC l'efface
+        if name and not name.startswith(PREFIX):
+            super().delete(name)
+
+    def purge(self, name):
+        super().delete(name)
+
+
+def _digest(content):
+    sha = hashlib.sha256()
+    size = 0
+    content.seek(0)
+    for chunk in content.chunks():
+        sha.update(chunk)
+        size += len(chunk)
+    content.seek(0)
+    return sha.hexdigest(), size
+
+
+content_storage = ContentAddressedStorage()
+
+
+# ─── Références ──────────────────────────────────────────────────────────────
+
+def referencing_fields():
+    """[(modèle, [noms de champs])] des FileField sur le stockage adressé par contenu."""
+    found = []
+    for model in apps.get_models():
+        names = [
+            field.name for field in model._meta.concrete_fields
+            if isinstance(field, models.FileField) and isinstance(field.storage, ContentAddressedStorage)
+        ]
+        if names:
+            found.append((model, names))
+    return found
+
+
+def _name(value):
+    return getattr(value, "name", value) or None
+
+
+def _adjust(name, delta):
+    from .models import MediaBlob
+
+    if name and name.startswith(PREFIX):
+        MediaBlob.objects.filter(name=name).update(ref_count=F("ref_count") + delta)
+
+
+def retain(names):
+    """Références créées hors signaux (bulk_create) : +1 par occurrence."""
+    for name, total in Counter(names).items():
+        _adjust(name, total)
+
+
+def _tracker(field_names):
+    def remember(sender, instance, **kwargs):
+        deferred = instance.get_deferred_fields()
+        instance._media_names = {
+            name: _name(instance.__dict__.get(name)) for name in field_names if name not in deferred
+        }
+
+    def saved(sender, instance, created=False, update_fields=None, **kwargs):
+        known = getattr(instance, "_media_names", {})
+        for name in field_names:
+            if name not in known or (update_fields is not None and name not in update_fields):
+                continue
+            old, new = None if created else known[name], _name(instance.__dict__.get(name))
+            if old != new:
+                _adjust(new, +1)
+                _adjust(old, -1)
+                known[name] = new
+
+    def deleted(sender, instance, **kwargs):
+        known = getattr(instance, "_media_names", {})
+        for name in field_names:
+            # Nom d'origine : la vue a pu vider le champ (field.delete(save=False)) avant delete()
+            _adjust(known.get(name) or _name(instance.__dict__.get(name)), -1)
+
+    return remember, saved, deleted
+
+
+def connect_reference_tracking():
+    """Appelé par CommonConfig.ready, une fois tous les modèles chargés."""
+    for model, field_names in referencing_fields():
+        remember, saved, deleted = _tracker(field_names)
+        uid = f"media_refs_{model._meta.label_lower}"
+        post_init.connect(remember, sender=model, weak=False, dispatch_uid=f"{uid}_init")
+        post_save.connect(saved, sender=model, weak=False, dispatch_uid=f"{uid}_save")
+        post_delete.connect(deleted, sender=model, weak=False, dispatch_uid=f"{uid}_delete")
+
+
+# ─── Ramasse-miettes ─────────────────────────────────────────────────────────
+
+def reference_counts():
+    """Nom → nombre de lignes qui le référencent (tous modèles, y compris supprimés en douceur)."""
+    counts = Counter()
+    for model, field_names in referencing_fields():
+        for name in field_names:
+            rows = (
+                model._base_manager.exclude(**{name: ""}).exclude(**{f"{name}__isnull": True})
+                .values_list(name).annotate(total=models.Count("pk")).order_by()
+            )
+            counts.update(dict(rows))
+    return counts
+
+
+def reconcile_ref_counts(counts):
+    """Recale MediaBlob.ref_count sur les références réelles ; renvoie le nombre de blobs corrigés."""
+    from .models import MediaBlob
+
+    stale = []
+    for blob in MediaBlob.objects.only("sha256", "name", "ref_count").iterator():
+        actual = counts.get(blob.name, 0)
+        if blob.ref_count != actual:
+            blob.ref_count = actual
+            stale.append(blob)
+    MediaBlob.objects.bulk_update(stale, ["ref_count"], batch_size=500)
+    return len(stale)
+
+
+def _legacy_prefixes():
+    """Préfixes fixes des upload_to des champs suivis (ex. 'products/')."""
+    prefixes = set()
+    for model, field_names in referencing_fields():
+        for name in field_names:
+            upload_to = model._meta.get_field(name).upload_to
+            if isinstance(upload_to, str) and upload_to:
+                prefixes.add(upload_to.split("%", 1)[0])
+    return sorted(prefixes)
+
+
+def _derivative_names():
+    """Noms des dérivés encore référencés par une image (apps.catalog.images)."""
+    from apps.catalog.images import IMAGE_MODELS
+
+    names = set()
+    for model in IMAGE_MODELS:
+        for record in model._base_manager.exclude(derivatives__isnull=True).values_list("derivatives", flat=True):
+            names.update(entry["name"] for entry in (record.get("sizes") or {}).values())
+    return names
+
+
+def _walk(storage, prefix):
+    """(nom, date de modification) des fichiers sous `prefix`."""
+    root = storage.path(prefix.rstrip("/"))
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, storage.location).replace(os.sep, "/")
+            yield name, datetime.fromtimestamp(os.path.getmtime(path), tz=dt_timezone.utc)
+
+
+def _prune_dirs(storage, prefix):
+    root = storage.path(prefix.rstrip("/"))
+    for directory, _, _ in sorted(os.walk(root), key=lambda entry: len(entry[0]), reverse=True):
+        if directory != root and not os.listdir(directory):
+            os.rmdir(directory)
+
+
+def collect_garbage(grace=GC_GRACE, dry_run=False):
+    """
+    Recompte les références, puis supprime ce qui n'est plus référencé depuis
+    au moins `grace` : blobs, fichiers cas/ orphelins, anciens fichiers
+    (chemins upload_to) et dérivés d'images. Renvoie les compteurs.
+    """
+    from .models import MediaBlob
+
+    if MediaBlob.objects.exists() and not content_storage.exists(PREFIX.rstrip("/")):
+        raise RuntimeError(f"Dossier {content_storage.path(PREFIX)} introuvable : volume média non monté ?")
+
+    cutoff = timezone.now() - grace
+    counts = reference_counts()
+    stats = {"reconciled": 0, "blobs": 0, "orphans": 0, "legacy": 0, "derivatives": 0, "bytes": 0}
+    if not dry_run:
+        stats["reconciled"] = reconcile_ref_counts(counts)
+
+    # 1. Blobs sans référence
+    blobs = MediaBlob.objects.filter(ref_count__lte=0, last_used_at__lt=cutoff)
+    known = set(MediaBlob.objects.values_list("name", flat=True))
+    for blob in blobs.iterator():
+        if counts.get(blob.name):
+            continue
+        stats["blobs"] += 1
+        stats["bytes"] += blob.size
+        if not dry_run and MediaBlob.objects.filter(pk=blob.pk, ref_count__lte=0, last_used_at__lt=cutoff).delete()[0]:
+            transaction.on_commit(lambda name=blob.name: content_storage.purge(name))
+
+    # 2. Fichiers cas/ sans blob (transaction d'upload annulée), anciens fichiers plus référencés
+    sweeps = [(PREFIX, "orphans", known.__contains__)]
+    sweeps += [(prefix, "legacy", counts.__contains__) for prefix in _legacy_prefixes()]
+    sweeps.append((DERIVATIVES_PREFIX, "derivatives", _derivative_names().__contains__))
+    for prefix, counter, referenced in sweeps:
+        for name, modified in _walk(default_storage, prefix):
+            if modified >= cutoff or referenced(name):
+                continue
+            stats[counter] += 1
+            stats["bytes"] += default_storage.size(name)
+            if not dry_run:
+                transaction.on_commit(lambda name=name: default_storage.delete(name))
+        if not dry_run:
+            transaction.on_commit(lambda prefix=prefix: _prune_dirs(default_storage, prefix))
+    return stats
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0002_outbound_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField()),
+                ('ref_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Fichier média',
+                'verbose_name_plural': 'Fichiers médias',
+                'indexes': [models.Index(condition=models.Q(('ref_count__lte', 0)), fields=['last_used_at'], name='media_blob_unreferenced_idx')],
+            },
+        ),
+    ]
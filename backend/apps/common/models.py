@@ -3,6 +3,8 @@
 #   - TimeStampedModel : horodatage création/màj (base des futurs modèles)
 #   - SoftDeleteModel  : suppression douce (deleted_at) + managers
 #   - AuditLog         : journal d'audit immuable (OHADA)
+#   - OutboundEmail    : outbox e-mail (envoi différé)
+#   - MediaBlob        : fichier média adressé par contenu (SHA-256, refcount)
 
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
@@ -142,4 +144,80 @@ class AuditLog(models.Model):
         super().save(*args, **kwargs)
 
     def delete(self, *args, **kwargs):
-        raise AuditLogImmutableError("Une entrée d'audit ne peut pas être supprimée.")
\ No newline at end of file
+        raise AuditLogImmutableError("Une entrée d'audit ne peut pas être supprimée.")
+
+# ─── Outbox e-mail (envoi différé) ──────────────────────────────────────────────
+
+class OutboundEmail(models.Model):
+    """
+    E-mail en attente d'envoi. La ligne est écrite dans la transaction de la
+    requête (apps.common.mail.queue_email) ; le worker `send_queued_emails`
+    l'expédie ensuite par lots sur une seule connexion SMTP.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "En attente"
+        SENT    = "SENT",    "Envoyé"
+        FAILED  = "FAILED",  "Échec définitif"
+
+    subject         = models.CharField(max_length=255)
+    body            = models.TextField()
+    html_body       = models.TextField(blank=True, default="")
+    from_email      = models.CharField(max_length=255)
+    to              = models.JSONField(default=list)
+    reply_to        = models.JSONField(default=list, blank=True)
+    status          = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING, db_index=True,
+    )
+    attempts        = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error      = models.TextField(blank=True, default="")
+    sent_at         = models.DateTimeField(null=True, blank=True)
+    created_at      = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "E-mail sortant"
+        verbose_name_plural = "E-mails sortants"
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(status="PENDING"),
+                name="outbound_email_due_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.to)}"
+
+
+# ─── Médias adressés par contenu ────────────────────────────────────────────────
+
+class MediaBlob(models.Model):
+    """
+    Fichier physique unique du stockage adressé par contenu
+    (apps.common.media.ContentAddressedStorage). Plusieurs lignes métier
+    (images produit / fiche, photos boutique, preuves de litige) peuvent
+    référencer le même nom ; ref_count suit ces références et la commande
+    `media_gc` supprime les blobs qui n'en ont plus.
+    """
+    sha256       = models.CharField(max_length=64, primary_key=True)
+    name         = models.CharField(max_length=255, unique=True)
+    size         = models.PositiveBigIntegerField()
+    ref_count    = models.IntegerField(default=0)
+    created_at   = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Fichier média"
+        verbose_name_plural = "Fichiers médias"
+        indexes = [
+            models.Index(
+                fields=["last_used_at"],
+                condition=models.Q(ref_count__lte=0),
+                name="media_blob_unreferenced_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} réf.)"
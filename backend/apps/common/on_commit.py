@@ -0,0 +1,63 @@
+# backend/apps/common/on_commit.py
+# Travail regroupé au commit, par transaction (API publique transaction.on_commit).
+#   - on_commit_batch(flush, items) : ajoute `items` au lot de `flush` pour la
+#     transaction courante ; flush(items) est appelé une seule fois au commit,
+#     avec les éléments de tous les appels. Hors transaction, Django exécute
+#     on_commit aussitôt : flush immédiat.
+#   - chaque appel enregistre sa part avec on_commit : Django abandonne celles
+#     d'un savepoint ou d'une transaction annulés ; le lot, qui suit ses parts
+#     par références faibles, ne garde que les survivantes
+#   - lots rangés par connexion (une connexion par thread et par alias)
+
+import weakref
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+_batches = weakref.WeakKeyDictionary()  # connexion → {flush: _Batch}
+
+
+class _Part:
+    def __init__(self, batch, items):
+        self.batch = batch
+        self.items = list(items)
+
+    def run(self):
+        # La première part exécutée au commit vide tout le lot
+        self.batch.run()
+
+
+class _Batch:
+    def __init__(self, flush, batches):
+        self.flush = flush
+        self.batches = batches
+        self.parts = []
+
+    def add(self, items):
+        part = _Part(self, items)
+        # Les parts abandonnées par Django (rollback) ne sont plus référencées
+        self.parts = [ref for ref in self.parts if ref() is not None]
+        self.parts.append(weakref.ref(part))
+        return part
+
+    def run(self):
+        if self.batches.get(self.flush) is self:
+            del self.batches[self.flush]
+        items = []
+        for ref in self.parts:
+            part = ref()
+            if part is not None:
+                items.extend(part.items)
+                part.items = []
+        self.parts = []
+        if items:
+            self.flush(items)
+
+
+def on_commit_batch(flush, items, using=DEFAULT_DB_ALIAS):
+    """Appelle flush(items de toute la transaction) une fois, au commit."""
+    connection = transaction.get_connection(using)
+    batches = _batches.setdefault(connection, {})
+    batch = batches.get(flush)
+    if batch is None:
+        batch = batches[flush] = _Batch(flush, batches)
+    transaction.on_commit(batch.add(items).run, using=using)
@@ -0,0 +1,140 @@
+# backend/apps/common/scheduler.py
+# Planificateur des tâches périodiques (`python manage.py run_scheduler`).
+#   - registre : @periodic_job("nom", every=secondes) dans apps/<app>/jobs.py,
+#                modules découverts par autodiscover_modules("jobs")
+#   - leader   : une seule instance exécute les jobs, celle qui tient le verrou
+#                consultatif PostgreSQL (pg_try_advisory_lock, niveau session) ;
+#                les autres restent en attente et reprennent si la connexion
+#                du leader tombe
+#   - jobs     : chacun dans sa propre transaction ; une erreur est journalisée
+#                sans arrêter les autres
+# Les jobs sont ensemblistes (UPDATE / bulk_create) : aucune requête HTTP ne
+# porte plus la maintenance de toute la plateforme.
+
+import logging
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Callable
+
+from django.db import connection, transaction
+from django.utils.module_loading import autodiscover_modules
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = zlib.crc32(b"belivay.run_scheduler")
+
+
+@dataclass
+class PeriodicJob:
+    name: str
+    func: Callable
+    every: float
+
+
+JOBS: dict = {}
+
+
+def periodic_job(name, every):
+    """Enregistre `func` pour être exécutée toutes les `every` secondes."""
+    def decorator(func):
+        JOBS[name] = PeriodicJob(name=name, func=func, every=every)
+        return func
+    return decorator
+
+
+def discover_jobs():
+    autodiscover_modules("jobs")
+    return JOBS
+
+
+# ─── Verrou de leader ────────────────────────────────────────────────────────
+
+def _is_postgres():
+    return connection.vendor == "postgresql"
+
+
+def try_acquire_leadership():
+    if not _is_postgres():
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [LOCK_KEY])
+        return cursor.fetchone()[0]
+
+
+def holds_leadership():
+    """Vrai si la session courante détient toujours le verrou."""
+    if not _is_postgres():
+        return True
+    if connection.connection is None:
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_locks WHERE locktype = 'advisory' AND granted "
+            "AND pid = pg_backend_pid() AND objsubid = 1 "
+            "AND ((classid::bigint << 32) | objid::bigint) = %s)",
+            [LOCK_KEY],
+        )
+        return cursor.fetchone()[0]
+
+
+def release_leadership():
+    if not _is_postgres() or connection.connection is None:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_unlock(%s)", [LOCK_KEY])
+
+
+# ─── Exécution ───────────────────────────────────────────────────────────────
+
+def run_job(job):
+    """Exécute un job dans sa transaction. Retourne (résultat, erreur)."""
+    try:
+        with transaction.atomic():
+            return job.func(), None
+    except Exception as exc:  # noqa: BLE001 — un job en échec n'arrête pas la boucle
+        logger.exception("Job planifié %s en échec", job.name)
+        return None, exc
+
+
+class Scheduler:
+    """Boucle du planificateur ; `tick()` exécute les jobs arrivés à échéance."""
+
+    def __init__(self, jobs=None, clock=time.monotonic):
+        self.jobs = list((jobs if jobs is not None else discover_jobs()).values())
+        self.clock = clock
+        self.last_runs = {}
+        self.is_leader = False
+
+    def ensure_leadership(self):
+        if self.is_leader and not holds_leadership():
+            logger.warning("Verrou du planificateur perdu, passage en attente")
+            self.is_leader = False
+        if not self.is_leader:
+            self.is_leader = try_acquire_leadership()
+            if self.is_leader:
+                self.last_runs.clear()
+        return self.is_leader
+
+    def due(self, now):
+        return [
+            job for job in self.jobs
+            if job.name not in self.last_runs or now - self.last_runs[job.name] >= job.every
+        ]
+
+    def tick(self, force=False):
+        """[(job, résultat, erreur)] des jobs exécutés ; rien si pas leader."""
+        if not self.ensure_leadership():
+            return []
+        now = self.clock()
+        ran = []
+        for job in (self.jobs if force else self.due(now)):
+            result, error = run_job(job)
+            self.last_runs[job.name] = now
+            ran.append((job, result, error))
+        return ran
+
+    def stop(self):
+        if self.is_leader:
+            release_leadership()
+            self.is_leader = False
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import CatalogAssistantView
+from .views import CatalogAssistantView, catalog_assistant_stats
 
 urlpatterns = [
     path("catalog-assistant/", CatalogAssistantView.as_view(), name="ai-catalog-assistant"),
+    path("catalog-assistant/stats/", catalog_assistant_stats, name="ai-catalog-assistant-stats"),
 ]
@@ -1,12 +1,24 @@
 import json
-from urllib import error, request
+from urllib import request
 
+import httpx
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from rest_framework import status
-from rest_framework.permissions import AllowAny
-from rest_framework.response import Response
-from rest_framework.views import APIView
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from drf_spectacular.utils import extend_schema
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import Throttled
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from apps.catalog.assistant_index import fold, query_intents, search_catalog
+from .assistant_cache import assistant_stats, cached_answer
+from .http import async_client
 
 
 def normalize_text(value: str) -> str:
@@ -29,7 +41,8 @@ def build_suggestions_sentence(suggestions: list[dict]) -> str:
 
 
 def score_product(product: dict, query: str) -> float:
-    haystack = normalize_text(
+    """Score d'un produit fourni par le client (même barème que apps.catalog.assistant_index)."""
+    haystack = fold(
         " ".join(
             [
                 product.get("title", ""),
@@ -39,19 +52,21 @@ def score_product(product: dict, query: str) -> float:
             ]
         )
     )
+    query = fold(query)
+    intents = query_intents(query)
     score = 0.0
 
-    for word in normalize_text(query).split():
+    for word in query.split():
         if word in haystack:
             score += 4
 
-    if any(keyword in normalize_text(query) for keyword in ["pas cher", "abordable", "budget", "moins cher"]):
+    if "cheap" in intents:
         score += max(0, 100000 - int(product.get("price_final", 0))) / 10000
 
-    if any(keyword in normalize_text(query) for keyword in ["premium", "qualite", "solide", "durable"]):
+    if "premium" in intents:
         score += float(product.get("rating_average") or 0) * 2
 
-    if any(keyword in normalize_text(query) for keyword in ["promo", "promotion", "reduction"]) and int(product.get("discount") or 0) > 0:
+    if "promo" in intents and int(product.get("discount") or 0) > 0:
         score += 6
 
     if int(product.get("stock_quantity") or 0) > 0:
@@ -77,11 +92,14 @@ def build_mock_response(payload: dict) -> dict:
         }
 
     products = payload.get("products", [])
-    ranked_products = sorted(
-        products,
-        key=lambda product: score_product(product, payload.get("message", "")),
-        reverse=True,
-    )[:3]
+    if payload.get("retrieval") == "catalog":
+        ranked_products = products[:3]  # déjà classés par l'index catalogue
+    else:
+        ranked_products = sorted(
+            products,
+            key=lambda product: score_product(product, payload.get("message", "")),
+            reverse=True,
+        )[:3]
 
     suggestions = []
     for index, product in enumerate(ranked_products):
@@ -119,7 +137,8 @@ def build_mock_response(payload: dict) -> dict:
     }
 
 
-def call_openrouter(payload: dict) -> dict:
+def build_openrouter_request(payload: dict) -> tuple[str, dict, bytes]:
+    """(modèle, en-têtes, corps) de l'appel OpenRouter — partagé par les variantes sync et async."""
     if not settings.OPENROUTER_API_KEY:
         raise ValueError("OPENROUTER_API_KEY is not configured")
 
@@ -158,21 +177,16 @@ def call_openrouter(payload: dict) -> dict:
         }
     ).encode("utf-8")
 
-    req = request.Request(
-        "https://openrouter.ai/api/v1/chat/completions",
-        data=body,
-        headers={
-            "Authorization": f"Bearer {settings.OPENROUTER_API_KEY}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": settings.OPENROUTER_SITE_URL,
-            "X-Title": settings.OPENROUTER_APP_NAME,
-        },
-        method="POST",
-    )
+    headers = {
+        "Authorization": f"Bearer {settings.OPENROUTER_API_KEY}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": settings.OPENROUTER_SITE_URL,
+        "X-Title": settings.OPENROUTER_APP_NAME,
+    }
+    return model, headers, body
 
-    with request.urlopen(req, timeout=45) as response:
-        response_data = json.loads(response.read().decode("utf-8"))
 
+def parse_openrouter_response(response_data: dict, model: str) -> dict:
     content = response_data["choices"][0]["message"]["content"]
     parsed = json.loads(content)
     parsed["source"] = "openrouter"
@@ -181,27 +195,111 @@ def call_openrouter(payload: dict) -> dict:
     return parsed
 
 
-@extend_schema(
-    tags=["AI"],
-    summary="Assistant catalogue IA",
-    description="Retourne des recommandations catalogue. Utilise OpenRouter si disponible, sinon fallback mock.",
-)
-class CatalogAssistantView(APIView):
-    permission_classes = [AllowAny]
+def call_openrouter(payload: dict) -> dict:
+    model, headers, body = build_openrouter_request(payload)
+    req = request.Request(settings.OPENROUTER_API_URL, data=body, headers=headers, method="POST")
+    with request.urlopen(req, timeout=settings.OPENROUTER_TIMEOUT) as response:
+        response_data = json.loads(response.read().decode("utf-8"))
+    return parse_openrouter_response(response_data, model)
 
-    def post(self, request):
-        payload = request.data
 
-        if not payload.get("message"):
-            return Response({"detail": "message is required"}, status=status.HTTP_400_BAD_REQUEST)
+async def acall_openrouter(payload: dict) -> dict:
+    """Variante async : le worker reste libre pendant l'attente du modèle (pool httpx partagé)."""
+    model, headers, body = build_openrouter_request(payload)
+    response = await async_client().post(
+        settings.OPENROUTER_API_URL, content=body, headers=headers, timeout=settings.OPENROUTER_TIMEOUT,
+    )
+    response.raise_for_status()
+    return parse_openrouter_response(response.json(), model)
 
-        if not isinstance(payload.get("products"), list):
-            return Response({"detail": "products must be an array"}, status=status.HTTP_400_BAD_REQUEST)
+
+CATALOG_PRODUCTS = 8  # produits transmis au modèle
+PROVIDER_ERRORS = (ValueError, httpx.HTTPError, json.JSONDecodeError, KeyError, IndexError, TypeError)
+
+
+def _assistant_error(payload) -> str | None:
+    if not isinstance(payload, dict) or not payload.get("message"):
+        return "message is required"
+    if not isinstance(payload.get("products", []), list):
+        return "products must be an array"
+    return None
+
+
+def with_catalog_products(payload: dict) -> dict:
+    """
+    Remplace les produits envoyés par le client par les meilleurs résultats
+    du catalogue approuvé (apps.catalog.assistant_index). Les produits du
+    client ne servent plus que si le catalogue ne renvoie rien.
+    """
+    if is_greeting(payload.get("message", "")):
+        return payload
+    products = search_catalog(
+        payload.get("message", ""),
+        filters=payload.get("filters") if isinstance(payload.get("filters"), dict) else None,
+        category=payload.get("selectedCategoryName"),
+        limit=CATALOG_PRODUCTS,
+    )
+    if not products:
+        return payload
+    return {**payload, "products": products, "retrieval": "catalog"}
+
+
+def _throttle_wait(request, view):
+    """Mêmes throttles DRF que les APIView (anon / user) ; délai d'attente ou None."""
+    waits = [
+        throttle.wait() or 0
+        for throttle in (throttle_class() for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES)
+        if not throttle.allow_request(request, view)
+    ]
+    return max(waits) if waits else None
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class CatalogAssistantView(View):
+    """
+    Assistant catalogue IA. Vue Django async (DRF 3.14 n'a pas d'APIView
+    async) : sous ASGI, l'appel OpenRouter attend dans la boucle d'événements
+    sans occuper de thread ; sous WSGI, Django l'exécute via async_to_sync.
+    Seuls les throttles DRF (session, cache) et la recherche catalogue passent
+    par sync_to_async ; sans authentification JWT ici, la limite appliquée est
+    celle par IP (anon).
+    Recommande parmi les meilleurs produits du catalogue approuvé ; OpenRouter
+    si disponible (réponses en cache, voir assistant_cache), sinon fallback mock.
+    """
+
+    async def post(self, request):
+        wait = await sync_to_async(_throttle_wait)(request, self)
+        if wait is not None:
+            throttled = Throttled(wait)
+            response = JsonResponse({"detail": str(throttled.detail)}, status=throttled.status_code)
+            response["Retry-After"] = str(int(wait) + 1)
+            return response
 
         try:
-            result = call_openrouter(payload)
-            return Response(result, status=status.HTTP_200_OK)
-        except (ValueError, error.URLError, error.HTTPError, json.JSONDecodeError, KeyError) as exc:
-            fallback = build_mock_response(payload)
-            fallback["error"] = str(exc)
-            return Response(fallback, status=status.HTTP_200_OK)
+            payload = json.loads(request.body or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return JsonResponse({"detail": "JSON invalide"}, status=400)
+
+        detail = _assistant_error(payload)
+        if detail:
+            return JsonResponse({"detail": detail}, status=400)
+        payload = await sync_to_async(with_catalog_products)(payload)
+
+        if not settings.OPENROUTER_API_KEY:
+            result = build_mock_response(payload)
+            result["error"] = "OPENROUTER_API_KEY is not configured"
+            return JsonResponse(result, json_dumps_params={"ensure_ascii": False})
+
+        result = await cached_answer(
+            payload, acall_openrouter, build_mock_response, PROVIDER_ERRORS,
+            background=isinstance(request, ASGIRequest),
+        )
+        return JsonResponse(result, json_dumps_params={"ensure_ascii": False})
+
+
+@extend_schema(tags=["AI"], summary="Compteurs du cache de l'assistant catalogue")
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def catalog_assistant_stats(request):
+    """Hits / misses / coalescés / fallbacks et latence du fournisseur (histogramme)."""
+    return Response(assistant_stats())
@@ -1,17 +1,17 @@
 # backend/apps/contact/utils.py
 # Utilitaires pour l'envoi d'emails de contact
 
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
 from django.conf import settings
+from apps.common.mail import queue_email, render_email
 from apps.orders.models import PlatformSettings
 
 
 def send_contact_emails(contact_message):
     """
-    Envoyer les emails de contact :
+    Mettre en file (outbox) les emails de contact :
     1. Email au support
     2. Email de confirmation au client
+    L'envoi SMTP est assuré par le worker `send_queued_emails`.
     """
     
     # Récupérer l'email du support depuis les settings de la plateforme
@@ -32,18 +32,16 @@ def send_contact_emails(contact_message):
         'support_email': support_email,
     }
     
-    support_html = render_to_string('contact/email_to_support.html', support_context)
-    support_text = render_to_string('contact/email_to_support.txt', support_context)
+    support_text, support_html = render_email('contact/email_to_support', support_context)
     
-    support_mail = EmailMultiAlternatives(
+    queue_email(
         subject=support_subject,
-        body=support_text,
+        message=support_text,
+        html_message=support_html,
         from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[support_email],
+        recipient_list=[support_email],
         reply_to=[contact_message.email]
     )
-    support_mail.attach_alternative(support_html, "text/html")
-    support_mail.send()
     
     
     #  EMAIL DE CONFIRMATION AU CLIENT
@@ -57,14 +55,12 @@ def send_contact_emails(contact_message):
         'support_email': support_email,
     }
     
-    confirmation_html = render_to_string('contact/email_confirmation.html', confirmation_context)
-    confirmation_text = render_to_string('contact/email_confirmation.txt', confirmation_context)
+    confirmation_text, confirmation_html = render_email('contact/email_confirmation', confirmation_context)
     
-    confirmation_mail = EmailMultiAlternatives(
+    queue_email(
         subject=confirmation_subject,
-        body=confirmation_text,
+        message=confirmation_text,
+        html_message=confirmation_html,
         from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[contact_message.email]
-    )
-    confirmation_mail.attach_alternative(confirmation_html, "text/html")
-    confirmation_mail.send()
\ No newline at end of file
+        recipient_list=[contact_message.email]
+    )
\ No newline at end of file
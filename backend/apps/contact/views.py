@@ -1,6 +1,7 @@
 # backend/apps/contact/views.py
 # Vues API pour le système de contact
 
+from django.db import transaction
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
@@ -67,9 +68,10 @@ def contact_message_create(request):
         user_agent=request.META.get('HTTP_USER_AGENT', '')[:500]
     )
     
-    # Envoyer les emails (support + confirmation)
+    # Mettre en file les emails (support + confirmation), tout ou rien
     try:
-        send_contact_emails(contact_message)
+        with transaction.atomic():
+            send_contact_emails(contact_message)
         email_sent = True
     except Exception as e:
         print(f"Erreur envoi email: {e}")
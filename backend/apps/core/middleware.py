@@ -6,16 +6,25 @@
 # Géolocalisation par IP — aucune permission utilisateur requise.
 # Utilise ip-api.com (gratuit, sans clé API, max 45 req/min).
 # En production : mettre en cache les résultats IP pour éviter les limites.
+#
+# Compatible sync et async : sous ASGI (uvicorn), la chaîne de middlewares
+# reste async jusqu'aux vues async (assistant IA, SSE) ; la géolocalisation
+# passe par le client httpx partagé, le cache et l'ORM par sync_to_async.
 
 import json
 import urllib.request
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.core.cache import cache
 from django.utils import timezone
 
+from apps.common.http import async_client
+
 ACTIVE_USERS_KEY = 'belivay_active_users'
 USER_KEY_PREFIX  = 'belivay_user_'
 GEO_IP_PREFIX    = 'belivay_geoip_'   # Cache résultats IP (TTL 24h)
 TTL              = 300                 # 5 min — durée de session active
+GEO_TIMEOUT      = 2
 
 PAGE_MAP = [
     ('/api/vendors/admin/dashboard',  'Admin · Dashboard'),
@@ -64,6 +73,29 @@ def get_client_ip(request) -> str:
     return request.META.get('REMOTE_ADDR', '')
 
 
+def _is_local_ip(ip: str) -> bool:
+    return not ip or ip in ('127.0.0.1', '::1') or ip.startswith('192.168.') or ip.startswith('10.')
+
+
+def _geo_cache_key(ip: str) -> str:
+    return f'{GEO_IP_PREFIX}{ip.replace(".", "_")}'
+
+
+def _geo_url(ip: str) -> str:
+    return f'http://ip-api.com/json/{ip}?fields=status,lat,lon,city,regionName,country,query'
+
+
+def _geo_result(data: dict) -> dict:
+    if data.get('status') != 'success':
+        return {}
+    return {
+        'lat':    data.get('lat'),
+        'lng':    data.get('lon'),
+        'city':   data.get('city'),
+        'region': data.get('regionName'),
+    }
+
+
 def geolocate_ip(ip: str) -> dict:
     """
     Géolocalise une IP via ip-api.com.
@@ -71,29 +103,18 @@ def geolocate_ip(ip: str) -> dict:
     Retourne {} si l'IP est privée/locale ou si le service est indisponible.
     """
     # IPs locales/privées → pas de géolocalisation
-    if not ip or ip in ('127.0.0.1', '::1') or ip.startswith('192.168.') or ip.startswith('10.'):
+    if _is_local_ip(ip):
         return {}
 
-    cache_key = f'{GEO_IP_PREFIX}{ip.replace(".", "_")}'
+    cache_key = _geo_cache_key(ip)
     cached    = cache.get(cache_key)
     if cached is not None:
         return cached
 
     try:
-        url = f'http://ip-api.com/json/{ip}?fields=status,lat,lon,city,regionName,country,query'
-        req = urllib.request.Request(url, headers={'User-Agent': 'BelivaY/1.0'})
-        with urllib.request.urlopen(req, timeout=2) as resp:
-            data = json.loads(resp.read().decode())
-
-        if data.get('status') == 'success':
-            result = {
-                'lat':    data.get('lat'),
-                'lng':    data.get('lon'),
-                'city':   data.get('city'),
-                'region': data.get('regionName'),
-            }
-        else:
-            result = {}
+        req = urllib.request.Request(_geo_url(ip), headers={'User-Agent': 'BelivaY/1.0'})
+        with urllib.request.urlopen(req, timeout=GEO_TIMEOUT) as resp:
+            result = _geo_result(json.loads(resp.read().decode()))
 
         # Mettre en cache 24h
         cache.set(cache_key, result, 86400)
@@ -105,28 +126,76 @@ def geolocate_ip(ip: str) -> dict:
         return {}
 
 
+async def ageolocate_ip(ip: str) -> dict:
+    """Variante async de geolocate_ip (client httpx partagé, même cache)."""
+    if _is_local_ip(ip):
+        return {}
+
+    cache_key = _geo_cache_key(ip)
+    cached    = await cache.aget(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        resp = await async_client().get(_geo_url(ip), timeout=GEO_TIMEOUT)
+        result = _geo_result(resp.json())
+        await cache.aset(cache_key, result, 86400)
+        return result
+    except Exception:
+        await cache.aset(cache_key, {}, 300)
+        return {}
+
+
+def _skipped(path: str) -> bool:
+    return path.startswith('/static/') or path.startswith('/media/') or path.startswith('/django-admin/')
+
+
 class UserActivityMiddleware:
+    sync_capable  = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
         response = self.get_response(request)
-        path = request.path
-        if (path.startswith('/static/')
-                or path.startswith('/media/')
-                or path.startswith('/django-admin/')):
+        if not _skipped(request.path):
+            self._after(request, response)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if _skipped(request.path):
             return response
-        if request.user.is_authenticated:
+        geo = None
+        if await sync_to_async(self._is_authenticated)(request):
+            geo = await ageolocate_ip(get_client_ip(request))
+        await sync_to_async(self._after)(request, response, geo)
+        return response
+
+    @staticmethod
+    def _is_authenticated(request):
+        try:
+            return request.user.is_authenticated
+        except Exception:
+            return False
+
+    def _after(self, request, response, geo=None):
+        if self._is_authenticated(request):
             try:
-                self._record(request)
+                self._record(request, geo)
             except Exception:
                 pass
-        if path.startswith('/api/') and response.status_code >= 400:
+        if request.path.startswith('/api/') and response.status_code >= 400:
             try:
                 self._record_api_error(request, response)
             except Exception:
                 pass
-        return response
 
     def _record_api_error(self, request, response):
         from apps.vendors.models import SystemLog
@@ -150,7 +219,7 @@ class UserActivityMiddleware:
             },
         )
 
-    def _record(self, request):
+    def _record(self, request, geo=None):
         user = request.user
         path = request.path
 
@@ -160,7 +229,7 @@ class UserActivityMiddleware:
 
         # ── Géolocalisation par IP (sans permission) ──────────────────────────
         ip     = get_client_ip(request)
-        geo    = geolocate_ip(ip)
+        geo    = geolocate_ip(ip) if geo is None else geo
         lat    = geo.get('lat')
         lng    = geo.get('lng')
         ip_city= geo.get('city')
@@ -4,6 +4,7 @@
 # Note : Shipment/ShipmentEvent sont dans l'app shipping — voir shipping/admin.py
 
 from django.contrib import admin
+from django.db import transaction
 from django.utils.html import format_html
 from django.utils import timezone
 from .models import (
@@ -126,7 +127,13 @@ class OrderAdmin(admin.ModelAdmin):
     actions = ['mark_paid', 'mark_cancelled']
 
     def mark_paid(self, request, queryset):
-        count = queryset.filter(payment_status='PENDING').update(payment_status='PAID')
+        # save() et non UPDATE en masse : CustomerStats et stats vendeur suivent payment_status
+        count = 0
+        with transaction.atomic():
+            for order in queryset.filter(payment_status='PENDING').select_for_update():
+                order.payment_status = 'PAID'
+                order.save(update_fields=['payment_status', 'updated_at'])
+                count += 1
         self.message_user(request, f"{count} commande(s) marquée(s) comme payée(s).")
     mark_paid.short_description = "Marquer comme payée (PAID)"
 
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class OrdersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.orders"
+
+    def ready(self):
+        # Statistiques clients (annuaire admin) tenues par signals
+        from . import customer_stats  # noqa: F401
+        # Modèle de lecture des commandes (articles, vendeurs, sous-totaux)
+        from . import read_model  # noqa: F401
@@ -0,0 +1,94 @@
+# backend/apps/orders/customer_stats.py
+# Agrégats commandes par client (CustomerStats), lus par l'annuaire admin.
+#   - refresh_customer_stats(user_ids) : recalcul ensembliste (un GROUP BY +
+#     un upsert) des clients donnés
+#   - tenue à jour : post_save d'Order quand client, statut de paiement ou
+#     total changent, et post_delete → recalcul au commit, un seul pour toute
+#     la transaction (apps.common.on_commit)
+#   - reconcile_customer_stats() : recalcul complet par lots, job nocturne
+#     (les UPDATE en masse sur Order ne passent pas par les signals)
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.common.on_commit import on_commit_batch
+from .models import CustomerStats, Order
+
+RECONCILE_BATCH = 1000
+_STAT_FIELDS = ["orders_count", "paid_orders_count", "total_spent_xaf", "last_order_at", "updated_at"]
+
+
+def refresh_customer_stats(user_ids):
+    """Recalcule la ligne CustomerStats de chaque utilisateur de `user_ids`."""
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if not user_ids:
+        return 0
+    paid = Q(payment_status=Order.PaymentStatus.PAID)
+    aggregates = {
+        row["user_id"]: row
+        for row in Order.objects.filter(user_id__in=user_ids)
+        .order_by()
+        .values("user_id")
+        .annotate(
+            orders_count=Count("id"),
+            paid_orders_count=Count("id", filter=paid),
+            total_spent_xaf=Sum("total_xaf", filter=paid),
+            last_order_at=Max("created_at"),
+        )
+    }
+    existing = User.objects.filter(pk__in=user_ids).values_list("pk", flat=True)
+    rows = []
+    for user_id in existing:
+        row = aggregates.get(user_id, {})
+        rows.append(CustomerStats(
+            user_id=user_id,
+            orders_count=row.get("orders_count", 0),
+            paid_orders_count=row.get("paid_orders_count", 0),
+            total_spent_xaf=row.get("total_spent_xaf") or 0,
+            last_order_at=row.get("last_order_at"),
+        ))
+    CustomerStats.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=["user"], update_fields=_STAT_FIELDS,
+    )
+    return len(rows)
+
+
+def reconcile_customer_stats():
+    """Recalcule les statistiques de tous les utilisateurs, par lots de RECONCILE_BATCH."""
+    refreshed, last_id = 0, 0
+    while True:
+        user_ids = list(
+            User.objects.filter(pk__gt=last_id).order_by("pk").values_list("pk", flat=True)[:RECONCILE_BATCH]
+        )
+        if not user_ids:
+            return refreshed
+        with transaction.atomic():
+            refreshed += refresh_customer_stats(user_ids)
+        last_id = user_ids[-1]
+
+
+# ─── Tenue à jour ────────────────────────────────────────────────────────────
+
+def _schedule_refresh(user_id):
+    # Un seul recalcul par transaction, tous clients confondus (checkout multi-commandes)
+    if user_id:
+        on_commit_batch(refresh_customer_stats, [user_id])
+
+
+@receiver(post_save, sender=Order, dispatch_uid="orders_customer_stats_saved")
+def _order_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_loaded_stats_key", None)
+    current = instance.stats_key()
+    if created or previous is None or previous != current:
+        _schedule_refresh(instance.user_id)
+        if previous and previous[0] != instance.user_id:
+            _schedule_refresh(previous[0])
+    instance._loaded_stats_key = current
+
+
+@receiver(post_delete, sender=Order, dispatch_uid="orders_customer_stats_deleted")
+def _order_deleted(sender, instance, **kwargs):
+    _schedule_refresh(instance.user_id)
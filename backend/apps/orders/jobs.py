@@ -0,0 +1,73 @@
+# backend/apps/orders/jobs.py
+# Tâches planifiées commandes (exécutées par run_scheduler).
+
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.accounts.models import UserNotification
+from apps.accounts.notifications import notify
+from apps.common.scheduler import periodic_job
+from . import customer_stats
+from .models import Order, OrderHistory, PlatformSettings
+
+
+@periodic_job("auto_confirm_delivered_orders", every=300)
+def auto_confirm_delivered_orders():
+    """
+    Commandes livrées sans confirmation ni litige depuis escrow_auto_confirm_h
+    (48h par défaut) → AUTO_CONFIRMED, escrow en libération. La date de
+    livraison est celle du shipment, sinon la dernière mise à jour de la commande.
+    """
+    now = timezone.now()
+    deadline = now - timedelta(hours=PlatformSettings.get_settings().escrow_auto_confirm_h)
+    rows = list(
+        Order.objects.filter(fulfillment_status=Order.FulfillmentStatus.DELIVERED)
+        .filter(
+            Q(shipment__delivered_at__lte=deadline)
+            | Q(shipment__delivered_at__isnull=True, updated_at__lte=deadline)
+        )
+        .select_for_update(skip_locked=True, of=("self",))
+        .values_list("id", "user_id")
+    )
+    if not rows:
+        return 0
+
+    order_ids = [order_id for order_id, _ in rows]
+    Order.objects.filter(pk__in=order_ids).update(
+        fulfillment_status=Order.FulfillmentStatus.AUTO_CONFIRMED,
+        escrow_status=Order.EscrowStatus.RELEASE_PENDING,
+        updated_at=now,
+    )
+    OrderHistory.objects.bulk_create(
+        [
+            OrderHistory(
+                order_id=order_id,
+                action="Réception confirmée automatiquement (48h)",
+                field_name="fulfillment_status",
+                old_value=Order.FulfillmentStatus.DELIVERED,
+                new_value=Order.FulfillmentStatus.AUTO_CONFIRMED,
+            )
+            for order_id in order_ids
+        ],
+        batch_size=500,
+    )
+    for order_id, user_id in rows:
+        notify(
+            user_id,
+            title=f"Commande #{order_id} confirmee",
+            message="Sans retour de votre part, la reception de votre commande a ete confirmee automatiquement.",
+            notification_type=UserNotification.NotificationType.ORDER,
+            action_url=f"/orders/{order_id}",
+        )
+    return len(rows)
+
+
+@periodic_job("reconcile_customer_stats", every=24 * 3600)
+def reconcile_customer_stats():
+    """
+    Recalcule CustomerStats pour tous les clients : rattrape les UPDATE en
+    masse sur Order qui ne passent pas par les signals de customer_stats.
+    """
+    return customer_stats.reconcile_customer_stats()
@@ -0,0 +1,68 @@
+# Generated by Django 5.1.15 on 2026-10-19 15:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+
+def backfill_customer_stats(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    CustomerStats = apps.get_model("orders", "CustomerStats")
+
+    paid = Q(payment_status="PAID")
+    rows = (
+        Order.objects.filter(user__isnull=False)
+        .order_by()
+        .values("user_id")
+        .annotate(
+            orders_count=Count("id"),
+            paid_orders_count=Count("id", filter=paid),
+            total_spent_xaf=Sum("total_xaf", filter=paid),
+            last_order_at=Max("created_at"),
+        )
+    )
+    now = timezone.now()
+    CustomerStats.objects.bulk_create(
+        [
+            CustomerStats(
+                user_id=row["user_id"],
+                orders_count=row["orders_count"],
+                paid_orders_count=row["paid_orders_count"],
+                total_spent_xaf=row["total_spent_xaf"] or 0,
+                last_order_at=row["last_order_at"],
+                updated_at=now,
+            )
+            for row in rows.iterator(chunk_size=2000)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('orders', '0020_order_delivery_coordinates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='order_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('orders_count', models.PositiveIntegerField(default=0)),
+                ('paid_orders_count', models.PositiveIntegerField(default=0)),
+                ('total_spent_xaf', models.PositiveBigIntegerField(default=0)),
+                ('last_order_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Statistiques client',
+                'verbose_name_plural': 'Statistiques clients',
+                'indexes': [models.Index(fields=['orders_count'], name='customer_stats_orders_idx'), models.Index(fields=['total_spent_xaf'], name='customer_stats_spent_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_customer_stats, migrations.RunPython.noop),
+    ]
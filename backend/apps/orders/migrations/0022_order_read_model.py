@@ -0,0 +1,77 @@
+# Generated by Django 5.1.15 on 2026-10-19 15:37
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+BATCH = 1000
+
+
+def backfill_order_read_model(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    OrderItem = apps.get_model("orders", "OrderItem")
+
+    last_id = 0
+    while True:
+        order_ids = list(Order.objects.filter(pk__gt=last_id).order_by("pk").values_list("pk", flat=True)[:BATCH])
+        if not order_ids:
+            return
+        summaries = {order_id: {"items_count": 0, "vendor_subtotals": {}} for order_id in order_ids}
+        rows = (
+            OrderItem.objects.filter(order_id__in=order_ids)
+            .order_by()
+            .values("order_id", "product__vendor_id")
+            .annotate(lines=Count("id"), total=Sum("line_total_xaf"))
+        )
+        for row in rows:
+            summary = summaries[row["order_id"]]
+            summary["items_count"] += row["lines"]
+            if row["product__vendor_id"]:
+                summary["vendor_subtotals"][str(row["product__vendor_id"])] = row["total"] or 0
+        Order.objects.bulk_update(
+            [
+                Order(
+                    pk=order_id,
+                    items_count=summary["items_count"],
+                    vendor_ids=sorted(int(vendor_id) for vendor_id in summary["vendor_subtotals"]),
+                    vendor_subtotals=summary["vendor_subtotals"],
+                )
+                for order_id, summary in summaries.items()
+            ],
+            ["items_count", "vendor_ids", "vendor_subtotals"],
+            batch_size=500,
+        )
+        last_id = order_ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0021_customer_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='items_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='vendor_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, default=list, size=None),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='vendor_subtotals',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['vendor_ids'], name='order_vendor_ids_gin'),
+        ),
+        migrations.RunPython(backfill_order_read_model, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:10
+
+import apps.common.media
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0022_order_read_model'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='disputeevidence',
+            name='file',
+            field=models.FileField(storage=apps.common.media.ContentAddressedStorage(), upload_to='disputes/%Y/%m/'),
+        ),
+    ]
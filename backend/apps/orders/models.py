@@ -9,11 +9,14 @@
 #   commission_rate_snapshot est copié depuis PlatformSettings à la création.
 #   Les modifications ultérieures du taux n'affectent JAMAIS les commandes passées.
 
-from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models
 from django.utils import timezone
 from datetime import timedelta
 from apps.catalog.models import Product
+from apps.common.media import content_storage
 
 
 class TimeStampedModel(models.Model):
@@ -102,6 +105,9 @@ class Order(TimeStampedModel):
     city    = models.CharField(max_length=50)
     address = models.CharField(max_length=255)
     note    = models.TextField(blank=True, null=True)
+    # Point de livraison GPS (optionnel, fourni par le client au checkout)
+    delivery_latitude  = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    delivery_longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
 
     # Statuts
     payment_status = models.CharField(
@@ -144,14 +150,46 @@ class Order(TimeStampedModel):
         verbose_name="Délai de réponse vendeur",
     )
 
+    # Lecture des listes admin / vendeur sans relire les articles (cf. read_model.py) :
+    # figés au checkout, recalculés si un article est ajouté ou supprimé ensuite.
+    items_count      = models.PositiveIntegerField(default=0)
+    vendor_ids       = ArrayField(models.IntegerField(), default=list, blank=True)
+    # {"<id utilisateur vendeur>": sous-total de ses articles en FCFA}
+    vendor_subtotals = models.JSONField(default=dict, blank=True)
+
     class Meta:
         ordering = ["-created_at"]
         verbose_name = "Commande"
         verbose_name_plural = "Commandes"
+        indexes = [
+            GinIndex(fields=["vendor_ids"], name="order_vendor_ids_gin"),
+            # Liste admin paginée, la plus récente d'abord
+            models.Index(fields=["created_at", "id"], name="order_created_idx"),
+        ]
 
     def __str__(self):
         return f"Commande #{self.id} — {self.payment_status} / {self.fulfillment_status}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Valeurs chargées, pour ne recalculer CustomerStats qu'en cas de changement
+        instance._loaded_stats_key = instance.stats_key()
+        # Statut de paiement chargé : transitions PAID ↔ autre (VendorStatsSnapshot)
+        instance._loaded_payment_status = instance.__dict__.get("payment_status")
+        return instance
+
+    def stats_key(self):
+        """Champs repris dans CustomerStats (None si l'un n'est pas chargé)."""
+        loaded = self.__dict__
+        if not all(name in loaded for name in ("user_id", "payment_status", "total_xaf")):
+            return None
+        return self.user_id, self.payment_status, self.total_xaf
+
+    def vendor_subtotal(self, vendor_id) -> int:
+        """Sous-total des articles du vendeur `vendor_id` (utilisateur)."""
+        return self.vendor_subtotals.get(str(vendor_id), 0)
+
     # ── Propriétés calculées ──────────────────────────────────────────────────
 
     @property
@@ -289,6 +327,30 @@ class OrderHistory(models.Model):
         return f"Order #{self.order.id} — {self.action} — {self.timestamp}"
 
 
+class CustomerStats(models.Model):
+    """
+    Agrégats commandes d'un client (annuaire admin), tenus par
+    apps.orders.customer_stats au fil des commandes.
+    """
+    user              = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="order_stats")
+    orders_count      = models.PositiveIntegerField(default=0)
+    paid_orders_count = models.PositiveIntegerField(default=0)
+    total_spent_xaf   = models.PositiveBigIntegerField(default=0)
+    last_order_at     = models.DateTimeField(null=True, blank=True)
+    updated_at        = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Statistiques client"
+        verbose_name_plural = "Statistiques clients"
+        indexes = [
+            models.Index(fields=["orders_count"], name="customer_stats_orders_idx"),
+            models.Index(fields=["total_spent_xaf"], name="customer_stats_spent_idx"),
+        ]
+
+    def __str__(self):
+        return f"Stats client #{self.user_id} — {self.orders_count} commandes"
+
+
 class Dispute(models.Model):
     """Litige sur une commande."""
 
@@ -430,7 +492,7 @@ class DisputeEvidence(models.Model):
     """Pièce justificative jointe à un litige."""
     dispute     = models.ForeignKey(Dispute, on_delete=models.CASCADE, related_name="evidences")
     uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE)
-    file        = models.FileField(upload_to="disputes/%Y/%m/")
+    file        = models.FileField(upload_to="disputes/%Y/%m/", storage=content_storage)
     description = models.CharField(max_length=255, blank=True)
     created_at  = models.DateTimeField(auto_now_add=True)
 
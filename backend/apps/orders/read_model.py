@@ -0,0 +1,69 @@
+# backend/apps/orders/read_model.py
+# Modèle de lecture des commandes : items_count, vendor_ids, vendor_subtotals.
+#   - line_summary(lines)          : calcul depuis des articles en mémoire
+#                                    (checkout, aucune requête)
+#   - refresh_order_lines(ids)     : recalcul ensembliste depuis OrderItem
+#                                    (un GROUP BY + un bulk_update)
+#   - post_save / post_delete d'OrderItem → recalcul de la commande ; le
+#     checkout crée ses articles par bulk_create et remplit lui-même les champs
+
+from django.db.models import Count, Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Order, OrderItem
+
+READ_MODEL_FIELDS = ["items_count", "vendor_ids", "vendor_subtotals"]
+
+
+def line_summary(lines):
+    """lines : [(vendor_id, line_total_xaf)] → champs du modèle de lecture."""
+    subtotals = {}
+    count = 0
+    for vendor_id, line_total in lines:
+        count += 1
+        if vendor_id:
+            subtotals[str(vendor_id)] = subtotals.get(str(vendor_id), 0) + (line_total or 0)
+    return {
+        "items_count": count,
+        "vendor_ids": sorted(int(vendor_id) for vendor_id in subtotals),
+        "vendor_subtotals": subtotals,
+    }
+
+
+def refresh_order_lines(order_ids):
+    """Recalcule le modèle de lecture des commandes `order_ids`."""
+    order_ids = set(order_ids)
+    if not order_ids:
+        return 0
+    rows = (
+        OrderItem.objects.filter(order_id__in=order_ids)
+        .order_by()
+        .values("order_id", "product__vendor_id")
+        .annotate(lines=Count("id"), total=Sum("line_total_xaf"))
+    )
+    summaries = {order_id: {"items_count": 0, "vendor_subtotals": {}} for order_id in order_ids}
+    for row in rows:
+        summary = summaries[row["order_id"]]
+        summary["items_count"] += row["lines"]
+        if row["product__vendor_id"]:
+            summary["vendor_subtotals"][str(row["product__vendor_id"])] = row["total"] or 0
+
+    orders = []
+    for order_id, summary in summaries.items():
+        subtotals = summary["vendor_subtotals"]
+        orders.append(Order(
+            pk=order_id,
+            items_count=summary["items_count"],
+            vendor_ids=sorted(int(vendor_id) for vendor_id in subtotals),
+            vendor_subtotals=subtotals,
+        ))
+    Order.objects.bulk_update(orders, READ_MODEL_FIELDS, batch_size=500)
+    return len(orders)
+
+
+@receiver(post_save, sender=OrderItem, dispatch_uid="orders_read_model_item_saved")
+@receiver(post_delete, sender=OrderItem, dispatch_uid="orders_read_model_item_deleted")
+def _item_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_order_lines([instance.order_id])
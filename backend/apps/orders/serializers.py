@@ -4,12 +4,12 @@
 from rest_framework import serializers
 from django.conf import settings as django_settings
 from django.db.models import Count, Q
-from django.utils.text import slugify
 from django.utils import timezone
 import unicodedata
 from decimal import Decimal, ROUND_HALF_UP
 from .models import Order, OrderItem, Dispute, DisputeMessage
 from apps.catalog.models import Category, Product, ProductMedia
+from apps.catalog.slugs import save_with_slug, slug_base
 
 
 def _city_variants(value):
@@ -160,6 +160,16 @@ class OrderCreateSerializer(serializers.Serializer):
         allow_blank=True,
         help_text="Note pour la livraison (optionnel)"
     )
+    delivery_latitude = serializers.DecimalField(
+        max_digits=9, decimal_places=6, required=False, allow_null=True,
+        min_value=-90, max_value=90,
+        help_text="Latitude du point de livraison (optionnel)"
+    )
+    delivery_longitude = serializers.DecimalField(
+        max_digits=9, decimal_places=6, required=False, allow_null=True,
+        min_value=-180, max_value=180,
+        help_text="Longitude du point de livraison (optionnel)"
+    )
 
     def validate_cart_items(self, value):
         """Valider les articles du panier"""
@@ -198,17 +208,9 @@ class OrderCreateSerializer(serializers.Serializer):
             defaults={"name": "Produits demo", "is_active": True},
         )
 
-        base_slug = slugify(f"demo-{item['product_id']}-{title}") or f"demo-{item['product_id']}"
-        slug = base_slug
-        suffix = 1
-        while Product.objects.filter(slug=slug).exists():
-            slug = f"{base_slug}-{suffix}"
-            suffix += 1
-
-        product = Product.objects.create(
+        product = Product(
             id=item['product_id'],
             title=title,
-            slug=slug,
             description=(
                 "Produit de demonstration cree automatiquement pour tester "
                 "le workflow commande/livraison."
@@ -219,6 +221,11 @@ class OrderCreateSerializer(serializers.Serializer):
             is_active=True,
             category=category,
         )
+        base_slug = slug_base(
+            f"demo-{item['product_id']}-{title}", Product._meta.get_field("slug").max_length,
+            f"demo-{item['product_id']}",
+        )
+        save_with_slug(product, product.save, Product.all_objects, base_slug)
 
         image_url = str(item.get('image_url') or "").strip()
         if image_url:
@@ -234,9 +241,12 @@ class OrderCreateSerializer(serializers.Serializer):
     def create(self, validated_data):
         """Créer une nouvelle commande"""
         from .models import PlatformSettings
+        from apps.shipping.geo import locate_shipment
         from apps.shipping.models import Shipment, ShipmentEvent
         from apps.orders.models import OrderHistory
         from apps.accounts.models import UserNotification
+        from apps.accounts.notifications import notify
+        from .read_model import line_summary
 
         cart_items = validated_data.pop('cart_items')
         user = self.context['request'].user if self.context['request'].user.is_authenticated else None
@@ -293,17 +303,25 @@ class OrderCreateSerializer(serializers.Serializer):
             city=validated_data['city'],
             address=address,
             note=note,
+            delivery_latitude=validated_data.get('delivery_latitude'),
+            delivery_longitude=validated_data.get('delivery_longitude'),
             subtotal_xaf=subtotal,
             delivery_fee_xaf=delivery_fee,
             total_xaf=subtotal + delivery_fee,
             commission_rate_snapshot=commission_rate_snapshot,
             payment_status=Order.PaymentStatus.PENDING,
             fulfillment_status=Order.FulfillmentStatus.CREATED,
+            # Modèle de lecture figé ici : les listes ne relisent pas les articles
+            **line_summary(
+                (item_data['product'].vendor_id, item_data['line_total_xaf'])
+                for item_data in order_items_data
+            ),
         )
         
-        # Créer les articles de la commande
-        for item_data in order_items_data:
-            OrderItem.objects.create(order=order, **item_data)
+        # Créer les articles de la commande (bulk_create : le modèle de lecture est déjà rempli)
+        OrderItem.objects.bulk_create(
+            [OrderItem(order=order, **item_data) for item_data in order_items_data]
+        )
 
         vendor_users = {
             item_data['product'].vendor
@@ -330,19 +348,19 @@ class OrderCreateSerializer(serializers.Serializer):
             if fallback_vendor:
                 vendor_users.add(fallback_vendor.user)
 
-        for vendor_user in vendor_users:
-            UserNotification.objects.create(
-                user=vendor_user,
-                title=f"Commande initiée à {order.city}",
-                message=(
-                    f"Une commande a été initiée à {order.city}. "
-                    f"Total estimé: {order.total_xaf} FCFA. Consulte ton espace vendeur pour la préparer."
-                ),
-                notification_type=UserNotification.NotificationType.ORDER,
-                action_url="/seller/orders",
-            )
+        notify(
+            vendor_users,
+            title=f"Commande initiée à {order.city}",
+            message=(
+                f"Une commande a été initiée à {order.city}. "
+                f"Total estimé: {order.total_xaf} FCFA. Consulte ton espace vendeur pour la préparer."
+            ),
+            notification_type=UserNotification.NotificationType.ORDER,
+            action_url="/seller/orders",
+        )
 
         shipment = Shipment.objects.create(order=order, status=Shipment.Status.CREATED)
+        locate_shipment(shipment)
         ShipmentEvent.objects.create(
             shipment=shipment,
             status=Shipment.Status.CREATED,
@@ -378,8 +396,8 @@ class OrderCreateSerializer(serializers.Serializer):
             before_courier_id = shipment.courier_id
             assign_shipment_or_mark_blocked(shipment)
             if shipment.courier_id and shipment.courier_id != before_courier_id:
-                UserNotification.objects.create(
-                    user=shipment.courier.user,
+                notify(
+                    shipment.courier.user_id,
                     title=f"Nouvelle livraison #{order.id}",
                     message=f"Une commande est disponible dans ta tournee: {order.city} - {order.address}.",
                     notification_type=UserNotification.NotificationType.ORDER,
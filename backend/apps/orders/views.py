@@ -7,6 +7,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 from django.utils import timezone
 from django.db.models import Q
 
@@ -22,6 +23,7 @@ from .serializers import (
 from apps.shipping.models import Shipment, ShipmentEvent
 from apps.shipping.serializers import ShipmentSerializer
 from apps.accounts.models import UserNotification
+from apps.accounts.notifications import notify
 
 
 def _phone_variants(phone):
@@ -84,16 +86,19 @@ class OrderCreateView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
 
-        order = serializer.save()
+        # Checkout atomique : les notifications (vendeurs, livreur, client)
+        # sont insérées en un seul lot au commit.
+        with transaction.atomic():
+            order = serializer.save()
 
-        if request.user.is_authenticated:
-            UserNotification.objects.create(
-                user=request.user,
-                title=f"Commande #{order.id} creee",
-                message="Votre commande a bien ete enregistree et attend le paiement.",
-                notification_type=UserNotification.NotificationType.ORDER,
-                action_url=f"/orders/{order.id}",
-            )
+            if request.user.is_authenticated:
+                notify(
+                    request.user,
+                    title=f"Commande #{order.id} creee",
+                    message="Votre commande a bien ete enregistree et attend le paiement.",
+                    notification_type=UserNotification.NotificationType.ORDER,
+                    action_url=f"/orders/{order.id}",
+                )
 
         out = OrderDetailSerializer(order)
         return Response(out.data, status=status.HTTP_201_CREATED)
@@ -184,8 +189,8 @@ class CancelOrderView(APIView):
             new_value=Order.FulfillmentStatus.CANCELLED,
         )
 
-        UserNotification.objects.create(
-            user=request.user,
+        notify(
+            request.user,
             title=f"Commande #{order.id} annulee",
             message="Votre commande a bien ete annulee et retiree de vos commandes en cours.",
             notification_type=UserNotification.NotificationType.ORDER,
@@ -235,8 +240,8 @@ class ConfirmReceiptView(APIView):
             new_value=Order.FulfillmentStatus.BUYER_CONFIRMED,
         )
 
-        UserNotification.objects.create(
-            user=request.user,
+        notify(
+            request.user,
             title=f"Commande #{order.id} livree",
             message="Merci d'avoir confirme la reception de votre commande.",
             notification_type=UserNotification.NotificationType.ORDER,
@@ -313,8 +318,8 @@ class OrderDisputeListCreateView(generics.ListCreateAPIView):
             old_value=old_status,
             new_value=Order.FulfillmentStatus.DISPUTED,
         )
-        UserNotification.objects.create(
-            user=request.user,
+        notify(
+            request.user,
             title=f"Litige ouvert sur la commande #{order.id}",
             message="Votre demande a ete transmise au support Belivay.",
             notification_type=UserNotification.NotificationType.SUPPORT,
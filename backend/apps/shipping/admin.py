@@ -2,8 +2,12 @@
 # Enregistrement des modèles shipping dans Django Admin.
 
 from django.contrib import admin
+from django.db.models import Count
+from django.db.models.functions import Coalesce, Now
 from django.utils.html import format_html
-from .models import RelayParcel, Shipment, ShipmentEvent, ShipmentMessage
+from .capacity import reconcile_active_counts
+from .dispatch import dispatch_pending
+from .models import CoverageZone, RelayParcel, Shipment, ShipmentEvent, ShipmentMessage
 
 
 # ─── INLINE : Événements d'une livraison ─────────────────────────────────────
@@ -72,18 +76,33 @@ class ShipmentAdmin(admin.ModelAdmin):
         )
     status_badge.short_description = 'Statut'
 
-    actions = ['mark_delivered', 'mark_failed']
+    actions = ['mark_delivered', 'mark_failed', 'dispatch_selected']
 
     def mark_delivered(self, request, queryset):
-        count = queryset.exclude(status='DELIVERED').update(status='DELIVERED')
+        courier_ids = list(queryset.exclude(courier=None).values_list('courier_id', flat=True).distinct())
+        count = queryset.exclude(status='DELIVERED').update(
+            status='DELIVERED', delivered_at=Coalesce('delivered_at', Now()),
+        )
+        reconcile_active_counts(courier_ids)
         self.message_user(request, f"{count} livraison(s) marquée(s) comme livrée(s).")
     mark_delivered.short_description = "Marquer comme livré"
 
     def mark_failed(self, request, queryset):
+        courier_ids = list(queryset.exclude(courier=None).values_list('courier_id', flat=True).distinct())
         count = queryset.exclude(status__in=['DELIVERED', 'CANCELLED']).update(status='FAILED')
+        reconcile_active_counts(courier_ids)
         self.message_user(request, f"{count} livraison(s) marquée(s) comme échouée(s).")
     mark_failed.short_description = "Marquer comme échoué"
 
+    def dispatch_selected(self, request, queryset):
+        stats = dispatch_pending(shipment_ids=list(queryset.values_list('pk', flat=True)), limit=None)
+        self.message_user(
+            request,
+            f"{stats['assigned']}/{stats['examined']} livraison(s) bloquée(s) réaffectée(s), "
+            f"{stats['remaining']} toujours sans livreur.",
+        )
+    dispatch_selected.short_description = "Relancer l'affectation des livraisons bloquées"
+
 
 # ─── ÉVÉNEMENTS DE LIVRAISON ──────────────────────────────────────────────────
 
@@ -112,3 +131,29 @@ class RelayParcelAdmin(admin.ModelAdmin):
     search_fields = ("shipment__order__id", "relay_point__name", "slot_code", "pickup_code")
     readonly_fields = ("created_at", "updated_at", "received_at", "picked_up_at", "returned_at")
     ordering = ("-updated_at",)
+
+
+@admin.register(CoverageZone)
+class CoverageZoneAdmin(admin.ModelAdmin):
+    # Index maintenu automatiquement depuis city/zones des profils : lecture seule
+    list_display = ("key", "label", "organizations_count", "couriers_count", "created_at")
+    search_fields = ("key", "label")
+    readonly_fields = ("key", "label", "created_at")
+    ordering = ("key",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            organizations_count=Count("organization_links", distinct=True),
+            couriers_count=Count("courier_links", distinct=True),
+        )
+
+    def organizations_count(self, obj):
+        return obj.organizations_count
+    organizations_count.short_description = "Organisations"
+
+    def couriers_count(self, obj):
+        return obj.couriers_count
+    couriers_count.short_description = "Livreurs"
+
+    def has_add_permission(self, request):
+        return False
@@ -5,3 +5,9 @@ class ShippingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.shipping"
     verbose_name = "Shipping"
+
+    def ready(self):
+        # Index de couverture (CoverageZone), compteurs de charge, occupation
+        # des points relais, diffusion temps réel et version du réseau livreur
+        # maintenus par signals
+        from . import capacity, coverage, network, realtime, relay  # noqa: F401
@@ -1,54 +1,30 @@
-import unicodedata
-
-from django.db.models import Count, Q
+from django.db import transaction
 
 from apps.accounts.models import CourierProfile, DeliveryOrganizationProfile
 from apps.orders.models import Order
+from .capacity import has_capacity_q, pick_least_loaded
+from .coverage import zone_id_for
+from .geo import locate_shipment, nearest_couriers
 from .models import Shipment, ShipmentEvent
 
 
-ACTIVE_STATUSES = [
-    Shipment.Status.ASSIGNED,
-    Shipment.Status.PICKED_UP,
-    Shipment.Status.IN_TRANSIT,
-    Shipment.Status.OUT_FOR_DELIVERY,
-]
-
-
-def city_variants(value):
-    raw = (value or "").strip()
-    if not raw:
-        return []
-    normalized = unicodedata.normalize("NFKD", raw)
-    ascii_city = "".join(ch for ch in normalized if not unicodedata.combining(ch))
-    compact = ascii_city.replace(" ", "").replace("-", "").replace("_", "").upper()
-    variants = {raw, ascii_city, raw.upper(), ascii_city.upper(), compact}
-    aliases = {
-        "YAOUNDE": {"YAOUNDE", "Yaounde", "Yaoundé", "yaounde", "yaoundé"},
-        "DOUALA": {"DOUALA", "Douala", "douala"},
-    }
-    variants.update(aliases.get(compact, set()))
-    return [variant for variant in variants if variant]
-
-
-def coverage_q(city):
-    query = Q()
-    for variant in city_variants(city):
-        query |= Q(city__iexact=variant) | Q(zones__icontains=variant)
-    return query
-
-
 def organization_covers(city):
-    query = coverage_q(city)
-    if not query:
+    zone_id = zone_id_for(city)
+    if zone_id is None:
         return DeliveryOrganizationProfile.objects.none()
     return DeliveryOrganizationProfile.objects.filter(
         is_active=True,
         status=DeliveryOrganizationProfile.Status.APPROVED,
-    ).filter(query)
+        coverage_links__zone_id=zone_id,
+    )
 
 
-def choose_courier_for_order(order: Order, required_vehicle_type=""):
+def choose_courier_for_order(order: Order, required_vehicle_type="", pickup=None):
+    """
+    Livreur le moins chargé couvrant la ville de la commande, le plus proche de
+    `pickup` (lat, lon) à charge égale. La ligne choisie reste verrouillée
+    jusqu'à la fin de la transaction appelante.
+    """
     city = (order.city or "").strip()
     covered_orgs = organization_covers(city)
     if not covered_orgs.exists():
@@ -56,55 +32,53 @@ def choose_courier_for_order(order: Order, required_vehicle_type=""):
 
     required_vehicle = (required_vehicle_type or "").strip().upper()
     org_ids = []
-    for org in covered_orgs.annotate(
-        active_shipments_count=Count(
-            "couriers__shipments",
-            filter=Q(couriers__shipments__status__in=ACTIVE_STATUSES),
-        )
-    ):
+    for org in covered_orgs.filter(has_capacity_q()).only("id", "allowed_vehicle_types"):
         allowed = [str(item).upper() for item in (org.allowed_vehicle_types or []) if item]
         if required_vehicle and allowed and required_vehicle not in allowed:
             continue
-        if org.max_active_shipments and org.active_shipments_count >= org.max_active_shipments:
-            continue
         org_ids.append(org.id)
 
     if not org_ids:
         return None, "CAPACITY_BLOCKED", "Les organisations couvrant cette zone sont indisponibles, pleines ou incompatibles."
 
-    courier_q = coverage_q(city)
     couriers = (
         CourierProfile.objects.filter(
             is_active=True,
             is_approved=True,
             is_online=True,
             delivery_organization_id__in=org_ids,
+            coverage_links__zone_id=zone_id_for(city),
         )
-        .filter(courier_q)
         .exclude(user=order.user)
-        .annotate(active_shipments_count=Count("shipments", filter=Q(shipments__status__in=ACTIVE_STATUSES)))
-        .select_related("user", "delivery_organization")
+        .select_related("user")
     )
     if required_vehicle:
         couriers = couriers.filter(vehicle_type=required_vehicle)
-    if not couriers.exists() and required_vehicle:
-        return None, "VEHICLE_INCOMPATIBLE", "Aucun livreur disponible avec le moyen de transport requis."
-
-    available = [
-        courier
-        for courier in couriers
-        if not courier.max_active_shipments or courier.active_shipments_count < courier.max_active_shipments
-    ]
-    if not available:
+        if not couriers.exists():
+            return None, "VEHICLE_INCOMPATIBLE", "Aucun livreur disponible avec le moyen de transport requis."
+
+    nearest = None
+    if pickup:
+        # Classement restreint aux éligibles : le top k global peut n'en contenir aucun
+        eligible_ids = set(couriers.filter(has_capacity_q()).values_list("id", flat=True))
+        nearest = [courier_id for courier_id, _ in nearest_couriers(*pickup, candidate_ids=eligible_ids)]
+    courier = pick_least_loaded(couriers, nearest=nearest)
+    if courier is None:
         return None, "CAPACITY_BLOCKED", "Tous les livreurs couvrant cette zone ont atteint leur capacite active."
-
-    available.sort(key=lambda item: (item.active_shipments_count, item.updated_at))
-    return available[0], "", ""
+    return courier, "", ""
 
 
+@transaction.atomic
 def assign_shipment_or_mark_blocked(shipment: Shipment, required_vehicle_type=""):
     order = shipment.order
-    courier, issue_code, issue_message = choose_courier_for_order(order, required_vehicle_type=required_vehicle_type)
+    if shipment.pickup_latitude is None:
+        locate_shipment(shipment)
+    pickup = None
+    if shipment.pickup_latitude is not None:
+        pickup = (shipment.pickup_latitude, shipment.pickup_longitude)
+    courier, issue_code, issue_message = choose_courier_for_order(
+        order, required_vehicle_type=required_vehicle_type, pickup=pickup,
+    )
     if courier:
         shipment.courier = courier
         shipment.courier_name = courier.user.get_full_name().strip() or courier.user.username
@@ -0,0 +1,148 @@
+# backend/apps/shipping/capacity.py
+# Compteurs de charge des livreurs et organisations de livraison.
+#   - active_shipments_count (CourierProfile / DeliveryOrganizationProfile) :
+#     nombre de shipments actifs, mis à jour par F() à chaque transition
+#     (Shipment.save) — plus de COUNT à chaque assignation
+#   - reconcile_active_counts() : recalcul complet, appelé par la commande
+#     `python manage.py reconcile_courier_capacity` (cron) et après les mises à
+#     jour en masse de l'admin
+#   - pick_least_loaded() : livreur le moins chargé, verrouillé (SKIP LOCKED)
+#     pour que deux checkouts simultanés ne le surchargent pas
+
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from apps.accounts.models import CourierProfile, DeliveryOrganizationProfile
+from .models import Shipment
+
+ACTIVE_STATUSES = [
+    Shipment.Status.ASSIGNED,
+    Shipment.Status.PICKED_UP,
+    Shipment.Status.IN_TRANSIT,
+    Shipment.Status.OUT_FOR_DELIVERY,
+]
+
+
+def is_active(status):
+    return status in ACTIVE_STATUSES
+
+
+def has_capacity_q():
+    """max_active_shipments = 0 : pas de plafond."""
+    return Q(max_active_shipments=0) | Q(active_shipments_count__lt=F("max_active_shipments"))
+
+
+def adjust_active_counts(courier_id, delta):
+    """Ajoute `delta` au compteur du livreur et de son organisation."""
+    if not courier_id or not delta:
+        return
+    CourierProfile.objects.filter(pk=courier_id).update(
+        active_shipments_count=F("active_shipments_count") + delta,
+    )
+    DeliveryOrganizationProfile.objects.filter(couriers__pk=courier_id).update(
+        active_shipments_count=F("active_shipments_count") + delta,
+    )
+
+
+def bulk_adjust_active_counts(deltas):
+    """deltas : {courier_id: delta}. Deux UPDATE quel que soit le nombre de livreurs."""
+    deltas = {courier_id: delta for courier_id, delta in deltas.items() if courier_id and delta}
+    if not deltas:
+        return
+    CourierProfile.objects.filter(pk__in=list(deltas)).update(
+        active_shipments_count=F("active_shipments_count") + Case(
+            *[When(pk=courier_id, then=Value(delta)) for courier_id, delta in deltas.items()],
+            default=Value(0),
+        ),
+    )
+    org_deltas = {}
+    for courier_id, organization_id in CourierProfile.objects.filter(
+        pk__in=list(deltas), delivery_organization__isnull=False,
+    ).values_list("pk", "delivery_organization_id"):
+        org_deltas[organization_id] = org_deltas.get(organization_id, 0) + deltas[courier_id]
+    if org_deltas:
+        DeliveryOrganizationProfile.objects.filter(pk__in=list(org_deltas)).update(
+            active_shipments_count=F("active_shipments_count") + Case(
+                *[When(pk=org_id, then=Value(delta)) for org_id, delta in org_deltas.items()],
+                default=Value(0),
+            ),
+        )
+
+
+def apply_transition(old_courier_id, old_status, new_courier_id, new_status):
+    """Répercute un changement (livreur, statut) d'un shipment sur les compteurs."""
+    was_active = bool(old_courier_id) and is_active(old_status)
+    now_active = bool(new_courier_id) and is_active(new_status)
+    if was_active and now_active and old_courier_id == new_courier_id:
+        return
+    if was_active:
+        adjust_active_counts(old_courier_id, -1)
+    if now_active:
+        adjust_active_counts(new_courier_id, 1)
+
+
+def _active_count(outer_filter):
+    counts = (
+        Shipment.objects.filter(status__in=ACTIVE_STATUSES, **{outer_filter: OuterRef("pk")})
+        .order_by()
+        .values(outer_filter)
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def reconcile_active_counts(courier_ids=None):
+    """
+    Recalcule les compteurs depuis les shipments (tous, ou ceux des livreurs
+    donnés et de leurs organisations). Retourne le nombre de profils corrigés.
+    """
+    couriers = CourierProfile.objects.all()
+    organizations = DeliveryOrganizationProfile.objects.all()
+    if courier_ids is not None:
+        couriers = couriers.filter(pk__in=courier_ids)
+        organizations = organizations.filter(couriers__pk__in=courier_ids).distinct()
+
+    expected = _active_count("courier")
+    fixed = couriers.annotate(expected=expected).exclude(
+        active_shipments_count=F("expected")
+    ).values_list("pk", flat=True)
+    fixed_couriers = CourierProfile.objects.filter(pk__in=list(fixed)).update(active_shipments_count=expected)
+
+    expected = _active_count("courier__delivery_organization")
+    fixed = organizations.annotate(expected=expected).exclude(
+        active_shipments_count=F("expected")
+    ).values_list("pk", flat=True)
+    fixed_organizations = DeliveryOrganizationProfile.objects.filter(pk__in=list(fixed)).update(
+        active_shipments_count=expected,
+    )
+    return fixed_couriers + fixed_organizations
+
+
+def pick_least_loaded(couriers, nearest=None):
+    """
+    Livreur éligible le moins chargé, puis le plus proche (`nearest` : ids triés
+    par distance), puis le moins récemment servi ; verrouillé jusqu'à la fin de
+    la transaction. Les lignes déjà verrouillées par un autre checkout sont
+    sautées. À appeler dans transaction.atomic().
+    """
+    ordering = ["active_shipments_count"]
+    if nearest:
+        ordering.append(Case(
+            *[When(pk=courier_id, then=Value(rank)) for rank, courier_id in enumerate(nearest)],
+            default=Value(len(nearest)),
+        ))
+    return (
+        couriers.filter(has_capacity_q())
+        .select_for_update(skip_locked=True, of=("self",))
+        .order_by(*ordering, "updated_at")
+        .first()
+    )
+
+
+@receiver(post_delete, sender=Shipment, dispatch_uid="shipping_capacity_shipment_deleted")
+def _shipment_deleted(sender, instance, **kwargs):
+    if instance.courier_id and is_active(instance.status):
+        adjust_active_counts(instance.courier_id, -1)
@@ -0,0 +1,119 @@
+# backend/apps/shipping/coverage.py
+# Index de couverture des zones de livraison.
+#   - zone_key()   : clé canonique (sans accents, sans espaces/tirets, majuscules),
+#                    même normalisation que l'ancien city_variants
+#   - CoverageZone : une ligne par clé ; CourierCoverage / OrganizationCoverage
+#                    relient profils et zones, maintenus au post_save des profils
+#   - zone_id_for(): carte en mémoire clé → id, l'assignation devient une jointure
+#                    indexée au lieu de N `zones__icontains` sur un JSONField
+
+import re
+import unicodedata
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.accounts.models import CourierProfile, DeliveryOrganizationProfile
+from .models import CourierCoverage, CoverageZone, OrganizationCoverage
+
+_TOKEN_SEPARATORS = re.compile(r"[\s,;/()\-_]+")
+
+# Carte clé canonique → id de CoverageZone (par processus, complétée à la demande)
+_zone_ids = {}
+
+
+def zone_key(value):
+    normalized = unicodedata.normalize("NFKD", str(value or "").strip())
+    ascii_value = "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return ascii_value.replace(" ", "").replace("-", "").replace("_", "").upper()
+
+
+def coverage_keys(city, zones):
+    """
+    Clés couvertes par un profil : {clé: libellé}.
+    Une zone composée (« Douala - Akwa ») couvre aussi chacun de ses mots,
+    comme le faisait la recherche par sous-chaîne.
+    """
+    keys = {}
+    for value in [city, *(zones or [])]:
+        label = str(value or "").strip()
+        if not label:
+            continue
+        for key in [zone_key(label), *(zone_key(token) for token in _TOKEN_SEPARATORS.split(label))]:
+            if key:
+                keys.setdefault(key, label)
+    return keys
+
+
+def zone_id_for(value):
+    """Id de la zone couvrant `value` ; None si aucun profil ne la couvre."""
+    key = zone_key(value)
+    if not key:
+        return None
+    zone_id = _zone_ids.get(key)
+    if zone_id is None:
+        zone_id = CoverageZone.objects.filter(key=key).values_list("id", flat=True).first()
+        if zone_id is not None:
+            _zone_ids[key] = zone_id
+    return zone_id
+
+
+def _ensure_zones(keys):
+    """{clé: libellé} → {clé: id}, en créant les zones manquantes."""
+    CoverageZone.objects.bulk_create(
+        [CoverageZone(key=key, label=label[:120]) for key, label in keys.items()],
+        ignore_conflicts=True,
+    )
+    ids = dict(CoverageZone.objects.filter(key__in=keys).values_list("key", "id"))
+    _zone_ids.update(ids)
+    return ids
+
+
+def _sync_links(link_model, owner_field, owner, keys):
+    wanted = set(_ensure_zones(keys).values())
+    links = link_model.objects.filter(**{owner_field: owner})
+    current = set(links.values_list("zone_id", flat=True))
+    if current - wanted:
+        links.filter(zone_id__in=current - wanted).delete()
+    if wanted - current:
+        link_model.objects.bulk_create(
+            [link_model(zone_id=zone_id, **{owner_field: owner}) for zone_id in wanted - current],
+            ignore_conflicts=True,
+        )
+
+
+def sync_courier_coverage(courier):
+    _sync_links(CourierCoverage, "courier", courier, coverage_keys(courier.city, courier.zones))
+
+
+def sync_organization_coverage(organization):
+    _sync_links(
+        OrganizationCoverage, "organization", organization,
+        coverage_keys(organization.city, organization.zones),
+    )
+
+
+# ─── Signals ──────────────────────────────────────────────────────────────────
+
+_COVERAGE_FIELDS = {"city", "zones"}
+
+
+def _coverage_changed(update_fields):
+    return update_fields is None or bool(_COVERAGE_FIELDS & set(update_fields))
+
+
+@receiver(post_save, sender=CourierProfile, dispatch_uid="shipping_courier_coverage")
+def _courier_saved(sender, instance, update_fields=None, **kwargs):
+    if _coverage_changed(update_fields):
+        sync_courier_coverage(instance)
+
+
+@receiver(post_save, sender=DeliveryOrganizationProfile, dispatch_uid="shipping_organization_coverage")
+def _organization_saved(sender, instance, update_fields=None, **kwargs):
+    if _coverage_changed(update_fields):
+        sync_organization_coverage(instance)
+
+
+@receiver(post_delete, sender=CoverageZone, dispatch_uid="shipping_coverage_zone_deleted")
+def _zone_deleted(sender, instance, **kwargs):
+    _zone_ids.pop(instance.key, None)
@@ -0,0 +1,204 @@
+# backend/apps/shipping/dashboard.py
+# Agrégats du dashboard livreur.
+#   - totaux     : compteurs, gains et durée moyenne en une requête d'agrégat,
+#                  sur les STATS_WINDOW_DAYS derniers jours (plus les courses en
+#                  cours) ; durée = delivered_at - picked_up_at, posés sur le Shipment
+#   - fenêtres   : aujourd'hui / mois (groupé par semaine) / 30 jours (zones) ;
+#                  seules les courses de la fenêtre sont lues
+#   - distance   : trajets réels (route_km, apps.shipping.geo)
+#   - classement : une seule requête groupée (COUNT FILTER par livreur, tri et
+#                  LIMIT en SQL), top-N partagé par tous les livreurs via le cache
+# Le coût ne dépend plus de l'historique du livreur.
+
+from datetime import timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db.models import Avg, Case, Count, F, FloatField, Min, Q, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, ExtractDay, NullIf, Round
+
+from apps.accounts.models import CourierProfile
+from .geo import DEFAULT_TRIP_KM, courier_position, distances_from
+from .models import Shipment
+
+STATS_WINDOW_DAYS = 30
+
+LEADERBOARD_SIZE = 3
+LEADERBOARD_CACHE_TTL = 60
+
+PAYOUT_RATE = 0.08
+
+DASHBOARD_ACTIVE_STATUSES = [
+    Shipment.Status.ASSIGNED,
+    Shipment.Status.PICKED_UP,
+    Shipment.Status.OUT_FOR_DELIVERY,
+]
+
+_DELIVERED = Q(status=Shipment.Status.DELIVERED)
+_ACTIVE = Q(status__in=DASHBOARD_ACTIVE_STATUSES)
+
+
+def leaderboard_tone(score: int) -> str:
+    if score >= 97:
+        return "text-emerald-300"
+    if score >= 92:
+        return "text-orange-300"
+    return "text-sky-300"
+
+
+def leaderboard_badge(score: int) -> str:
+    if score >= 97:
+        return "Elite"
+    if score >= 92:
+        return "Top"
+    return "Stable"
+
+
+def _payout():
+    # Même arrondi que la commission par course (round Python, pair le plus proche)
+    return Round(Cast(F("order__total_xaf"), FloatField()) * Value(PAYOUT_RATE))
+
+
+# ─── Totaux du livreur ────────────────────────────────────────────────────────
+
+def courier_totals(courier, since):
+    """
+    Compteurs et moyennes du livreur depuis `since`, en une requête : courses
+    en cours, livrées (delivered_at) et échouées (updated_at) dans la fenêtre.
+    """
+    delivered = Q(_DELIVERED, delivered_at__gte=since)
+    failed = Q(status=Shipment.Status.FAILED, updated_at__gte=since)
+    totals = Shipment.objects.filter(_ACTIVE | delivered | failed, courier=courier).aggregate(
+        active=Count("id", filter=_ACTIVE),
+        delivered=Count("id", filter=delivered),
+        failed=Count("id", filter=failed),
+        payout_total=Coalesce(Sum(_payout(), filter=delivered), Value(0.0)),
+        active_since=Min("updated_at", filter=_ACTIVE),
+        delivery_duration=Avg(
+            F("delivered_at") - Coalesce("picked_up_at", "created_at"),
+            filter=delivered,
+        ),
+    )
+    totals["payout_total"] = int(totals["payout_total"])
+    return totals
+
+
+def month_earnings(courier, today_start, month_start):
+    """
+    Gains du mois : (aujourd'hui, mois, {S1..S4: (gains, livraisons)}).
+    Groupé par semaine du mois en SQL, bornée par delivered_at >= month_start.
+    """
+    day = ExtractDay("delivered_at", tzinfo=dt_timezone.utc)
+    week = Case(
+        When(Q(day__lte=7), then=Value("S1")),
+        When(Q(day__lte=14), then=Value("S2")),
+        When(Q(day__lte=21), then=Value("S3")),
+        default=Value("S4"),
+    )
+    rows = (
+        Shipment.objects.filter(_DELIVERED, courier=courier, delivered_at__gte=month_start)
+        .annotate(day=day)
+        .annotate(week=week)
+        .values("week")
+        .annotate(
+            deliveries=Count("id"),
+            earnings=Sum(_payout()),
+            today=Coalesce(Sum(_payout(), filter=Q(delivered_at__gte=today_start)), Value(0.0)),
+        )
+    )
+    weeks = {}
+    today = month = 0
+    for row in rows:
+        weeks[row["week"]] = (int(row["earnings"] or 0), row["deliveries"])
+        month += int(row["earnings"] or 0)
+        today += int(row["today"])
+    return today, month, weeks
+
+
+def courier_distance_km(courier, today_start):
+    """
+    Kilomètres du jour : trajets (route_km) des courses en cours et livrées
+    aujourd'hui, plus l'approche position → enlèvement des courses pas encore
+    récupérées.
+    """
+    rows = list(
+        Shipment.objects.filter(courier=courier)
+        .filter(_ACTIVE | Q(_DELIVERED, delivered_at__gte=today_start))
+        .values_list("status", "route_km", "pickup_latitude", "pickup_longitude")
+    )
+    total = sum(DEFAULT_TRIP_KM if route_km is None else route_km for _, route_km, _, _ in rows)
+    position = courier_position(courier)
+    pickups = [
+        (lat, lon)
+        for status, _, lat, lon in rows
+        if status == Shipment.Status.ASSIGNED and lat is not None and lon is not None
+    ]
+    if position and pickups:
+        total += sum(distances_from(position, pickups))
+    return round(total, 1)
+
+
+def zone_demand(courier, zones, since):
+    """Nombre de courses des 30 derniers jours par zone, une requête (COUNT par zone)."""
+    if not zones:
+        return []
+    counts = Shipment.objects.filter(courier=courier, created_at__gte=since).aggregate(**{
+        f"zone_{index}": Count(
+            "id",
+            filter=Q(order__address__icontains=zone) | Q(order__city__icontains=zone),
+        )
+        for index, zone in enumerate(zones)
+    })
+    return [(zone, counts[f"zone_{index}"]) for index, zone in enumerate(zones)]
+
+
+# ─── Classement ───────────────────────────────────────────────────────────────
+
+def _leaderboard_key(limit):
+    return f"courier_leaderboard:top{limit}"
+
+
+def _leaderboard_rows(limit):
+    """
+    Score = livrées / (livrées + échouées) × 100, 0 sans course terminée.
+    Départage par volume livré puis ancienneté du profil.
+    """
+    delivered = Count("shipments", filter=Q(shipments__status=Shipment.Status.DELIVERED))
+    failed = Count("shipments", filter=Q(shipments__status=Shipment.Status.FAILED))
+    return (
+        CourierProfile.objects.filter(is_approved=True, is_active=True)
+        .annotate(delivered=delivered, failed=failed)
+        .annotate(
+            score=Coalesce(
+                Round(
+                    Cast("delivered", FloatField()) * Value(100.0)
+                    / NullIf(Cast("delivered", FloatField()) + Cast("failed", FloatField()), Value(0.0))
+                ),
+                Value(0.0),
+            )
+        )
+        .order_by("-score", "-delivered", "id")
+        .values("user__first_name", "user__last_name", "user__username", "score")[:limit]
+    )
+
+
+def courier_leaderboard(limit=LEADERBOARD_SIZE):
+    """Top-N des livreurs, recalculé au plus une fois par LEADERBOARD_CACHE_TTL."""
+    key = _leaderboard_key(limit)
+    entries = cache.get(key)
+    if entries is not None:
+        return entries
+
+    entries = []
+    for row in _leaderboard_rows(limit):
+        score = int(row["score"])
+        full_name = f"{row['user__first_name']} {row['user__last_name']}".strip()
+        entries.append(
+            {
+                "name": full_name or row["user__username"],
+                "score": f"{score}%",
+                "badge": leaderboard_badge(score),
+                "tone": leaderboard_tone(score),
+            }
+        )
+    cache.set(key, entries, LEADERBOARD_CACHE_TTL)
+    return entries
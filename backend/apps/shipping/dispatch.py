@@ -0,0 +1,249 @@
+# backend/apps/shipping/dispatch.py
+# Ré-affectation groupée des shipments bloqués (dispatch_pending).
+#   - chargement : shipments bloqués, livreurs en ligne avec de la capacité,
+#                  zones couvertes (livreurs + organisations) — 5 requêtes
+#   - résolution : glouton en mémoire, FIFO sur les shipments ; pour chacun le
+#                  livreur compatible (zone, véhicule, capacité livreur et
+#                  organisation) le moins chargé puis le moins récemment servi
+#   - verrous    : livreurs lus sans verrou (un checkout concurrent, en SKIP
+#                  LOCKED, ne doit pas les voir tous pris) ; seuls les livreurs
+#                  retenus et leurs organisations sont verrouillés ensuite, et
+#                  leur capacité relue
+#   - écriture   : bulk_update des shipments, UPDATE des commandes, compteurs
+#                  de charge et événements en bulk, notifications groupées
+# Lancement : `python manage.py dispatch_pending` (cron) ou depuis l'admin.
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.accounts.models import CourierProfile, DeliveryOrganizationProfile, UserNotification
+from apps.accounts.notifications import notify
+from apps.orders.models import Order
+from .capacity import bulk_adjust_active_counts, has_capacity_q
+from .coverage import zone_key
+from .models import CourierCoverage, CoverageZone, OrganizationCoverage, Shipment, ShipmentEvent
+from .realtime import publish_events
+
+BLOCKED_STATUSES = [
+    Shipment.Status.WAITING_MANUAL_ASSIGNMENT,
+    Shipment.Status.CAPACITY_BLOCKED,
+    Shipment.Status.ZONE_UNCOVERED,
+    Shipment.Status.VEHICLE_INCOMPATIBLE,
+]
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _load_shipments(shipment_ids, limit):
+    qs = Shipment.objects.filter(status__in=BLOCKED_STATUSES)
+    if shipment_ids is not None:
+        qs = qs.filter(pk__in=shipment_ids)
+    return list(
+        qs.select_for_update(skip_locked=True, of=("self",))
+        .order_by("created_at", "id")
+        .values("id", "order_id", "order__city", "order__user_id", "required_vehicle_type")[:limit]
+    )
+
+
+def _load_couriers():
+    """Livreurs en ligne avec capacité restante, organisation approuvée non pleine."""
+    organizations = {
+        row["id"]: {
+            "remaining": (row["max_active_shipments"] - row["active_shipments_count"]) if row["max_active_shipments"] else None,
+            "vehicles": {str(item).upper() for item in (row["allowed_vehicle_types"] or []) if item},
+        }
+        for row in DeliveryOrganizationProfile.objects.filter(
+            has_capacity_q(),
+            is_active=True,
+            status=DeliveryOrganizationProfile.Status.APPROVED,
+        ).values("id", "max_active_shipments", "active_shipments_count", "allowed_vehicle_types")
+    }
+    rows = (
+        CourierProfile.objects.filter(
+            has_capacity_q(),
+            is_active=True,
+            is_approved=True,
+            is_online=True,
+            delivery_organization_id__in=list(organizations),
+        )
+        .values(
+            "id", "user_id", "user__first_name", "user__last_name", "user__username", "phone",
+            "vehicle_type", "active_shipments_count", "max_active_shipments",
+            "delivery_organization_id", "updated_at",
+        )
+    )
+    couriers = {}
+    for row in rows:
+        name = f"{row['user__first_name']} {row['user__last_name']}".strip() or row["user__username"]
+        couriers[row["id"]] = {
+            "id": row["id"],
+            "user_id": row["user_id"],
+            "name": name,
+            "phone": row["phone"],
+            "vehicle": (row["vehicle_type"] or "").upper(),
+            "load": row["active_shipments_count"],
+            "remaining": (row["max_active_shipments"] - row["active_shipments_count"]) if row["max_active_shipments"] else None,
+            "organization_id": row["delivery_organization_id"],
+            "updated_at": row["updated_at"],
+        }
+    return couriers, organizations
+
+
+def _candidates_by_zone(zone_ids, couriers, organizations):
+    """{zone_id: [courier_id…]} : livreur et organisation couvrent tous deux la zone."""
+    org_zones = set(
+        OrganizationCoverage.objects.filter(zone_id__in=zone_ids, organization_id__in=list(organizations))
+        .values_list("organization_id", "zone_id")
+    )
+    by_zone = {}
+    for courier_id, zone_id in CourierCoverage.objects.filter(
+        zone_id__in=zone_ids, courier_id__in=list(couriers),
+    ).values_list("courier_id", "zone_id"):
+        if (couriers[courier_id]["organization_id"], zone_id) in org_zones:
+            by_zone.setdefault(zone_id, []).append(courier_id)
+    return by_zone
+
+
+def _has_room(remaining):
+    return remaining is None or remaining > 0
+
+
+def solve(shipments, couriers, organizations, candidates_by_zone, zone_for_city):
+    """Affectation gloutonne en mémoire → [(shipment, courier)]."""
+    matches = []
+    for shipment in shipments:
+        zone_id = zone_for_city.get(zone_key(shipment["order__city"]))
+        vehicle = (shipment["required_vehicle_type"] or "").strip().upper()
+        best = None
+        for courier_id in candidates_by_zone.get(zone_id, ()):
+            courier = couriers[courier_id]
+            organization = organizations[courier["organization_id"]]
+            if courier["user_id"] == shipment["order__user_id"]:
+                continue
+            if not (_has_room(courier["remaining"]) and _has_room(organization["remaining"])):
+                continue
+            if vehicle and (courier["vehicle"] != vehicle or (organization["vehicles"] and vehicle not in organization["vehicles"])):
+                continue
+            if best is None or (courier["load"], courier["updated_at"]) < (best["load"], best["updated_at"]):
+                best = courier
+        if best is None:
+            continue
+        best["load"] += 1
+        if best["remaining"] is not None:
+            best["remaining"] -= 1
+        organization = organizations[best["organization_id"]]
+        if organization["remaining"] is not None:
+            organization["remaining"] -= 1
+        matches.append((shipment, best))
+    return matches
+
+
+def _room(model, ids):
+    """{id: place restante} des lignes verrouillées (ordre d'id), None sans plafond."""
+    rows = (
+        model.objects.filter(pk__in=ids)
+        .select_for_update(of=("self",))
+        .order_by("id")
+        .values_list("id", "active_shipments_count", "max_active_shipments")
+    )
+    return {pk: (limit - load) if limit else None for pk, load, limit in rows}
+
+
+def _lock_matched(matches):
+    """
+    Verrouille les seuls livreurs retenus puis leurs organisations (ordre d'id,
+    comme les compteurs : pas d'interblocage entre dispatchs) et écarte les
+    affectations qui ne tiennent plus : un checkout a pu prendre de la capacité
+    livreur ou organisation depuis la lecture sans verrou.
+    """
+    courier_room = _room(CourierProfile, {courier["id"] for _, courier in matches})
+    organization_room = _room(
+        DeliveryOrganizationProfile, {courier["organization_id"] for _, courier in matches},
+    )
+    kept = []
+    for shipment, courier in matches:
+        remaining = courier_room.get(courier["id"], 0)
+        org_remaining = organization_room.get(courier["organization_id"], 0)
+        if not (_has_room(remaining) and _has_room(org_remaining)):
+            continue
+        if remaining is not None:
+            courier_room[courier["id"]] = remaining - 1
+        if org_remaining is not None:
+            organization_room[courier["organization_id"]] = org_remaining - 1
+        kept.append((shipment, courier))
+    return kept
+
+
+def _write(matches):
+    now = timezone.now()
+    Shipment.objects.bulk_update(
+        [
+            Shipment(
+                id=shipment["id"],
+                courier_id=courier["id"],
+                courier_name=courier["name"],
+                courier_phone=courier["phone"],
+                status=Shipment.Status.ASSIGNED,
+                assignment_issue_code="",
+                assignment_issue_message="",
+                updated_at=now,
+            )
+            for shipment, courier in matches
+        ],
+        ["courier", "courier_name", "courier_phone", "status", "assignment_issue_code",
+         "assignment_issue_message", "updated_at"],
+        batch_size=500,
+    )
+    Order.objects.filter(pk__in=[shipment["order_id"] for shipment, _ in matches]).update(
+        fulfillment_status=Order.FulfillmentStatus.DRIVER_ASSIGNED,
+        updated_at=now,
+    )
+    deltas = {}
+    for _, courier in matches:
+        deltas[courier["id"]] = deltas.get(courier["id"], 0) + 1
+    bulk_adjust_active_counts(deltas)
+    events = ShipmentEvent.objects.bulk_create(
+        [
+            ShipmentEvent(
+                shipment_id=shipment["id"],
+                status=Shipment.Status.ASSIGNED,
+                message="Livraison reaffectee automatiquement (dispatch groupe)",
+                location=shipment["order__city"] or "",
+            )
+            for shipment, _ in matches
+        ],
+        batch_size=500,
+    )
+    publish_events(events)
+    for shipment, courier in matches:
+        notify(
+            courier["user_id"],
+            title=f"Nouvelle livraison #{shipment['order_id']}",
+            message=f"Une livraison vers {shipment['order__city']} vous a ete affectee.",
+            notification_type=UserNotification.NotificationType.ORDER,
+            action_url="/courier",
+        )
+
+
+def dispatch_pending(*, shipment_ids=None, limit=DEFAULT_BATCH_SIZE, dry_run=False):
+    """
+    Ré-affecte en une passe les shipments bloqués (tous, ou `shipment_ids`).
+    Retourne {"examined", "assigned", "remaining"}.
+    """
+    with transaction.atomic():
+        shipments = _load_shipments(shipment_ids, limit)
+        if not shipments:
+            return {"examined": 0, "assigned": 0, "remaining": 0}
+
+        keys = {zone_key(row["order__city"]) for row in shipments} - {""}
+        zone_for_city = dict(CoverageZone.objects.filter(key__in=keys).values_list("key", "id"))
+        couriers, organizations = _load_couriers()
+        candidates = _candidates_by_zone(list(zone_for_city.values()), couriers, organizations)
+
+        matches = solve(shipments, couriers, organizations, candidates, zone_for_city)
+        if matches and not dry_run:
+            matches = _lock_matched(matches)
+            if matches:
+                _write(matches)
+
+    return {"examined": len(shipments), "assigned": len(matches), "remaining": len(shipments) - len(matches)}
@@ -0,0 +1,180 @@
+# backend/apps/shipping/geo.py
+# Géolocalisation livraison.
+#   - positions    : dernière position GPS du livreur (CourierProfile.last_*)
+#   - voisinage    : boîte englobante sur CourierProfile.last_* (index partiel
+#                    courier_position_idx, livreurs en ligne) ; une position
+#                    reçue n'est écrite qu'une fois, sur sa propre ligne — pas
+#                    d'index partagé à réécrire ni de mise à jour perdue
+#   - distances    : haversine calculée par lots (distances_from) sur les seuls
+#                    livreurs de la boîte
+#   - shipments    : points d'enlèvement (VendorLocation) et de livraison
+#                    (coordonnées client, sinon centre-ville) + route_km, posés
+#                    à la création ; utilisés par l'assignation et le dashboard
+
+from datetime import timedelta
+from decimal import Decimal
+from math import asin, cos, radians, sin, sqrt
+
+from django.utils import timezone
+
+from apps.accounts.models import CourierProfile
+from .coverage import zone_key
+from .realtime import publish_position
+
+EARTH_RADIUS_KM = 6371.0088
+
+KM_PER_DEG = 111.0
+POSITION_MAX_AGE = timedelta(minutes=30)
+
+NEAREST_K = 10
+NEAREST_MAX_KM = 15.0
+
+# Trajet urbain moyen quand l'enlèvement ou la livraison n'est pas localisé
+DEFAULT_TRIP_KM = 5.0
+
+# Centres-villes (clé canonique zone_key → lat, lon)
+CITY_CENTROIDS = {
+    "DOUALA": (4.0511, 9.7679),
+    "YAOUNDE": (3.8480, 11.5021),
+    "BAFOUSSAM": (5.4781, 10.4176),
+    "BAMENDA": (5.9631, 10.1591),
+    "GAROUA": (9.3017, 13.3921),
+    "MAROUA": (10.5910, 14.3159),
+    "NGAOUNDERE": (7.3277, 13.5847),
+    "BERTOUA": (4.5774, 13.6846),
+    "EBOLOWA": (2.9156, 11.1543),
+    "KRIBI": (2.9373, 9.9077),
+    "LIMBE": (4.0186, 9.2043),
+    "BUEA": (4.1527, 9.2410),
+    "EDEA": (3.8000, 10.1333),
+    "NKONGSAMBA": (4.9547, 9.9404),
+}
+
+
+# ─── Distances ────────────────────────────────────────────────────────────────
+
+def haversine_km(a, b):
+    return distances_from(a, [b])[0]
+
+
+def distances_from(origin, points):
+    """
+    Distances (km) d'un point d'origine vers une liste de points (lat, lon),
+    en un passage : les termes de l'origine sont calculés une seule fois.
+    """
+    phi1 = radians(float(origin[0]))
+    lam1 = radians(float(origin[1]))
+    cos_phi1 = cos(phi1)
+    distances = []
+    for lat, lon in points:
+        phi2 = radians(float(lat))
+        h = sin((phi2 - phi1) / 2) ** 2 + cos_phi1 * cos(phi2) * sin((radians(float(lon)) - lam1) / 2) ** 2
+        distances.append(2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(h))))
+    return distances
+
+
+def city_centroid(city):
+    return CITY_CENTROIDS.get(zone_key(city))
+
+
+# ─── Positions des livreurs ──────────────────────────────────────────────────
+
+def update_courier_position(courier, latitude, longitude):
+    """Enregistre la position du livreur (une ligne, un UPDATE) et la diffuse."""
+    now = timezone.now()
+    latitude, longitude = Decimal(str(latitude)), Decimal(str(longitude))
+    CourierProfile.objects.filter(pk=courier.pk).update(
+        last_latitude=latitude, last_longitude=longitude, last_position_at=now,
+    )
+    courier.last_latitude, courier.last_longitude, courier.last_position_at = latitude, longitude, now
+    publish_position(courier)
+
+
+def _couriers_around(latitude, longitude, max_km):
+    """[(courier_id, lat, lon)] des livreurs en ligne dans la boîte de ±max_km."""
+    d_lat = max_km / KM_PER_DEG
+    d_lon = max_km / (KM_PER_DEG * max(cos(radians(float(latitude))), 0.01))
+    latitude, longitude = float(latitude), float(longitude)
+    rows = CourierProfile.objects.filter(
+        is_online=True,
+        is_active=True,
+        is_approved=True,
+        last_latitude__range=(latitude - d_lat, latitude + d_lat),
+        last_longitude__range=(longitude - d_lon, longitude + d_lon),
+        last_position_at__gte=timezone.now() - POSITION_MAX_AGE,
+    ).values_list("id", "last_latitude", "last_longitude")
+    return [(courier_id, float(lat), float(lon)) for courier_id, lat, lon in rows]
+
+
+def nearest_couriers(latitude, longitude, k=NEAREST_K, max_km=NEAREST_MAX_KM, candidate_ids=None):
+    """[(courier_id, km)] des k livreurs en ligne les plus proches, à moins de max_km."""
+    entries = [
+        entry for entry in _couriers_around(latitude, longitude, max_km)
+        if candidate_ids is None or entry[0] in candidate_ids
+    ]
+    if not entries:
+        return []
+    distances = distances_from((latitude, longitude), [(lat, lon) for _, lat, lon in entries])
+    ranked = sorted(
+        ((entry[0], km) for entry, km in zip(entries, distances) if km <= max_km),
+        key=lambda item: item[1],
+    )
+    return ranked[:k]
+
+
+# ─── Shipments ────────────────────────────────────────────────────────────────
+
+def _point(lat, lon):
+    if lat is None or lon is None:
+        return None
+    return float(lat), float(lon)
+
+
+def pickup_point(order):
+    """Premier emplacement boutique géolocalisé d'un vendeur de la commande."""
+    from apps.orders.models import OrderItem
+    from apps.vendors.models import VendorLocation
+
+    row = (
+        VendorLocation.objects.filter(
+            is_active=True,
+            latitude__isnull=False,
+            longitude__isnull=False,
+            vendor__user_id__in=OrderItem.objects.filter(order=order).values("product__vendor_id"),
+        )
+        .order_by("id")
+        .values_list("latitude", "longitude")
+        .first()
+    )
+    return _point(*row) if row else None
+
+
+def drop_point(order):
+    return _point(order.delivery_latitude, order.delivery_longitude) or city_centroid(order.city)
+
+
+def locate_shipment(shipment):
+    """Pose les points d'enlèvement / livraison et la distance du trajet."""
+    order = shipment.order
+    pickup, drop = pickup_point(order), drop_point(order)
+    shipment.pickup_latitude, shipment.pickup_longitude = pickup or (None, None)
+    shipment.drop_latitude, shipment.drop_longitude = drop or (None, None)
+    shipment.route_km = round(haversine_km(pickup, drop), 2) if pickup and drop else None
+    shipment.save(update_fields=[
+        "pickup_latitude", "pickup_longitude", "drop_latitude", "drop_longitude", "route_km", "updated_at",
+    ])
+    return shipment
+
+
+def courier_position(courier):
+    return _point(courier.last_latitude, courier.last_longitude)
+
+
+def pickup_distance_km(shipment, courier=None):
+    """Distance livreur → enlèvement (None si l'un des deux n'est pas localisé)."""
+    courier = courier or shipment.courier
+    position = courier_position(courier) if courier else None
+    pickup = _point(shipment.pickup_latitude, shipment.pickup_longitude)
+    if not (position and pickup):
+        return None
+    return round(haversine_km(position, pickup), 2)
@@ -0,0 +1,86 @@
+# backend/apps/shipping/jobs.py
+# Tâches planifiées livraison (exécutées par run_scheduler).
+
+from datetime import timedelta
+
+from django.utils import timezone
+
+from apps.accounts.models import UserNotification
+from apps.accounts.notifications import notify
+from apps.common.scheduler import periodic_job
+from apps.orders.models import Order
+from .capacity import bulk_adjust_active_counts
+from .models import Shipment, ShipmentEvent
+from .queue import invalidate_available_counts
+from .realtime import publish_events
+
+ACCEPTED_PICKUP_DELAY = timedelta(hours=1)
+
+
+@periodic_job("release_overdue_accepted_shipments", every=60)
+def release_overdue_accepted_shipments():
+    """
+    Libère les missions acceptées non prises en charge dans l'heure : le
+    shipment revient dans la file (CREATED), la commande repasse prête pour
+    enlèvement, le livreur est pénalisé. Retourne le nombre de missions libérées.
+    """
+    now = timezone.now()
+    rows = list(
+        Shipment.objects.filter(
+            status=Shipment.Status.ASSIGNED,
+            courier__isnull=False,
+            accepted_at__isnull=False,
+            accepted_at__lte=now - ACCEPTED_PICKUP_DELAY,
+            penalty_notified_at__isnull=True,
+        )
+        .select_for_update(skip_locked=True, of=("self",))
+        .values("id", "order_id", "order__city", "city_key", "courier_id", "courier__user_id")
+    )
+    if not rows:
+        return 0
+
+    Shipment.objects.filter(pk__in=[row["id"] for row in rows]).update(
+        status=Shipment.Status.CREATED,
+        courier=None,
+        courier_name="",
+        courier_phone="",
+        accepted_at=None,
+        claim_key="",
+        penalty_notified_at=now,
+        updated_at=now,
+    )
+    Order.objects.filter(pk__in=[row["order_id"] for row in rows]).update(
+        fulfillment_status=Order.FulfillmentStatus.READY_FOR_PICKUP,
+        updated_at=now,
+    )
+    deltas = {}
+    for row in rows:
+        deltas[row["courier_id"]] = deltas.get(row["courier_id"], 0) - 1
+    bulk_adjust_active_counts(deltas)
+    invalidate_available_counts({row["city_key"] for row in rows})
+
+    events = ShipmentEvent.objects.bulk_create(
+        [
+            ShipmentEvent(
+                shipment_id=row["id"],
+                status=Shipment.Status.CREATED,
+                message="Mission liberee automatiquement apres depassement du delai de prise en charge.",
+                location=row["order__city"] or "",
+            )
+            for row in rows
+        ],
+        batch_size=500,
+    )
+    publish_events(events)
+    for row in rows:
+        notify(
+            row["courier__user_id"],
+            title=f"Penalite mission #{row['order_id']}",
+            message=(
+                "Vous avez accepte cette mission mais le colis n'a pas ete marque pris en charge "
+                "dans le delai d'une heure. Vos points ont ete reduits et la mission a ete liberee."
+            ),
+            notification_type=UserNotification.NotificationType.SYSTEM,
+            action_url="/courier",
+        )
+    return len(rows)
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.shipping.dispatch import DEFAULT_BATCH_SIZE, dispatch_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Ré-affecte en une passe les livraisons bloquées (attente manuelle, capacité, "
+        "zone non couverte, véhicule incompatible) aux livreurs disponibles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Nombre maximum de livraisons examinées par passe.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Calcule l'affectation sans rien écrire.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Relance une passe toutes les --interval secondes.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60.0,
+            help="Pause (secondes) entre deux passes, en mode --loop.",
+        )
+
+    def handle(self, *args, **opts):
+        while True:
+            stats = dispatch_pending(limit=opts["limit"], dry_run=opts["dry_run"])
+            prefix = "[dry-run] " if opts["dry_run"] else ""
+            self.stdout.write(self.style.SUCCESS(
+                f"{prefix}{stats['assigned']}/{stats['examined']} livraison(s) affectée(s), "
+                f"{stats['remaining']} toujours bloquée(s)."
+            ))
+            if not opts["loop"]:
+                return
+            time.sleep(opts["interval"])
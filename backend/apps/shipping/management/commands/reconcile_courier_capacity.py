@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.shipping.capacity import reconcile_active_counts
+from apps.shipping.relay import reconcile_relay_occupancy
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule active_shipments_count des livreurs et organisations de livraison "
+        "depuis les shipments actifs, et stored_parcels_count des points relais "
+        "depuis leurs colis (à planifier, ex. toutes les heures)."
+    )
+
+    def handle(self, *args, **opts):
+        fixed = reconcile_active_counts() + reconcile_relay_occupancy()
+        style = self.style.WARNING if fixed else self.style.SUCCESS
+        self.stdout.write(style(f"{fixed} compteur(s) corrigé(s)."))
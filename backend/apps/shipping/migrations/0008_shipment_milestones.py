@@ -0,0 +1,54 @@
+# Generated by Django 5.1.15 on 2026-10-19 14:53
+
+from django.db import migrations, models
+from django.db.models import Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_milestones(apps, schema_editor):
+    # Jalons repris du premier événement correspondant de la timeline
+    Shipment = apps.get_model("shipping", "Shipment")
+    ShipmentEvent = apps.get_model("shipping", "ShipmentEvent")
+
+    def first_event(status):
+        return Subquery(
+            ShipmentEvent.objects.filter(shipment=OuterRef("pk"), status=status)
+            .values("shipment")
+            .annotate(first=Min("created_at"))
+            .values("first")[:1]
+        )
+
+    picked_up = ShipmentEvent.objects.filter(status="PICKED_UP").values("shipment")
+    Shipment.objects.filter(pk__in=picked_up).update(
+        picked_up_at=first_event("PICKED_UP"),
+    )
+    Shipment.objects.filter(status="DELIVERED").update(
+        delivered_at=Coalesce(first_event("DELIVERED"), "updated_at"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_broadcastjob'),
+        ('orders', '0019_merge_20260707_2030'),
+        ('shipping', '0007_assignment_and_relayparcel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shipment',
+            name='delivered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='shipment',
+            name='picked_up_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_milestones, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='shipment',
+            index=models.Index(fields=['courier', 'status', 'delivered_at'], name='shipment_courier_status_idx'),
+        ),
+    ]
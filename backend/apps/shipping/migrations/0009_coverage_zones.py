@@ -0,0 +1,108 @@
+# Generated by Django 5.1.15 on 2026-10-19 14:56
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Copie figée de apps.shipping.coverage (zone_key / coverage_keys) au moment
+# de la migration : une évolution de la normalisation ne doit pas la réécrire.
+_TOKEN_SEPARATORS = re.compile(r"[\s,;/()\-_]+")
+
+
+def zone_key(value):
+    normalized = unicodedata.normalize("NFKD", str(value or "").strip())
+    ascii_value = "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return ascii_value.replace(" ", "").replace("-", "").replace("_", "").upper()
+
+
+def coverage_keys(city, zones):
+    keys = {}
+    for value in [city, *(zones or [])]:
+        label = str(value or "").strip()
+        if not label:
+            continue
+        for key in [zone_key(label), *(zone_key(token) for token in _TOKEN_SEPARATORS.split(label))]:
+            if key:
+                keys.setdefault(key, label)
+    return keys
+
+
+def backfill_coverage(apps, schema_editor):
+    CoverageZone = apps.get_model("shipping", "CoverageZone")
+    CourierProfile = apps.get_model("accounts", "CourierProfile")
+    DeliveryOrganizationProfile = apps.get_model("accounts", "DeliveryOrganizationProfile")
+    CourierCoverage = apps.get_model("shipping", "CourierCoverage")
+    OrganizationCoverage = apps.get_model("shipping", "OrganizationCoverage")
+
+    owners = [
+        (CourierCoverage, "courier_id", CourierProfile.objects.only("id", "city", "zones")),
+        (OrganizationCoverage, "organization_id", DeliveryOrganizationProfile.objects.only("id", "city", "zones")),
+    ]
+    keys_by_owner = []
+    labels = {}
+    for link_model, owner_field, profiles in owners:
+        for profile in profiles.iterator():
+            keys = coverage_keys(profile.city, profile.zones)
+            labels.update({key: label for key, label in keys.items() if key not in labels})
+            keys_by_owner.append((link_model, owner_field, profile.id, keys))
+
+    CoverageZone.objects.bulk_create(
+        [CoverageZone(key=key, label=label[:120]) for key, label in labels.items()],
+        ignore_conflicts=True,
+    )
+    zone_ids = dict(CoverageZone.objects.values_list("key", "id"))
+    for link_model, owner_field, owner_id, keys in keys_by_owner:
+        link_model.objects.bulk_create(
+            [link_model(zone_id=zone_ids[key], **{owner_field: owner_id}) for key in keys],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_broadcastjob'),
+        ('shipping', '0008_shipment_milestones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoverageZone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=120, unique=True)),
+                ('label', models.CharField(blank=True, default='', max_length=120)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Zone de couverture',
+                'verbose_name_plural': 'Zones de couverture',
+                'ordering': ['key'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CourierCoverage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('courier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coverage_links', to='accounts.courierprofile')),
+                ('zone', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='courier_links', to='shipping.coveragezone')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('zone', 'courier'), name='uniq_courier_coverage')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OrganizationCoverage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coverage_links', to='accounts.deliveryorganizationprofile')),
+                ('zone', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='organization_links', to='shipping.coveragezone')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('zone', 'organization'), name='uniq_organization_coverage')],
+            },
+        ),
+        migrations.RunPython(backfill_coverage, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.15 on 2026-10-19 15:02
+
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+ACTIVE_STATUSES = ["ASSIGNED", "PICKED_UP", "IN_TRANSIT", "OUT_FOR_DELIVERY"]
+
+
+def backfill_active_counts(apps, schema_editor):
+    Shipment = apps.get_model("shipping", "Shipment")
+    CourierProfile = apps.get_model("accounts", "CourierProfile")
+    DeliveryOrganizationProfile = apps.get_model("accounts", "DeliveryOrganizationProfile")
+
+    def active_count(outer_filter):
+        counts = (
+            Shipment.objects.filter(status__in=ACTIVE_STATUSES, **{outer_filter: OuterRef("pk")})
+            .order_by()
+            .values(outer_filter)
+            .annotate(total=Count("id"))
+            .values("total")
+        )
+        return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+    CourierProfile.objects.update(active_shipments_count=active_count("courier"))
+    DeliveryOrganizationProfile.objects.update(
+        active_shipments_count=active_count("courier__delivery_organization"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_active_shipments_count'),
+        ('shipping', '0009_coverage_zones'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_active_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.15 on 2026-10-19 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipping', '0010_backfill_active_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shipment',
+            name='drop_latitude',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True),
+        ),
+        migrations.AddField(
+            model_name='shipment',
+            name='drop_longitude',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True),
+        ),
+        migrations.AddField(
+            model_name='shipment',
+            name='pickup_latitude',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True),
+        ),
+        migrations.AddField(
+            model_name='shipment',
+            name='pickup_longitude',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True),
+        ),
+        migrations.AddField(
+            model_name='shipment',
+            name='route_km',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.15 on 2026-10-19 15:17
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def zone_key(value):
+    # Copie figée de apps.shipping.coverage.zone_key au moment de la migration
+    normalized = unicodedata.normalize("NFKD", str(value or "").strip())
+    ascii_value = "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return ascii_value.replace(" ", "").replace("-", "").replace("_", "").upper()
+
+
+def backfill_city_key(apps, schema_editor):
+    Shipment = apps.get_model("shipping", "Shipment")
+    # Une requête par ville distincte plutôt qu'une par shipment
+    cities = Shipment.objects.order_by().values_list("order__city", flat=True).distinct()
+    for city in list(cities):
+        key = zone_key(city)
+        if key:
+            Shipment.objects.filter(order__city=city, city_key="").update(city_key=key[:80])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0015_courier_last_position'),
+        ('orders', '0020_order_delivery_coordinates'),
+        ('shipping', '0011_shipment_geo_points'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shipment',
+            name='city_key',
+            field=models.CharField(blank=True, default='', max_length=80),
+        ),
+        migrations.RunPython(backfill_city_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='shipment',
+            index=models.Index(condition=models.Q(('courier__isnull', True), ('status', 'CREATED')), fields=['city_key', 'created_at'], name='shipment_available_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.15 on 2026-10-19 15:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0015_courier_last_position'),
+        ('orders', '0020_order_delivery_coordinates'),
+        ('shipping', '0012_shipment_city_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shipment',
+            name='claim_key',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='shipment',
+            constraint=models.UniqueConstraint(condition=models.Q(('claim_key', ''), _negated=True), fields=('courier', 'claim_key'), name='shipment_claim_key_uniq'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.15 on 2026-10-19 15:25
+
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+OCCUPYING_STATUSES = ["RECEIVED", "STORED"]
+
+
+def backfill_relay_occupancy(apps, schema_editor):
+    RelayParcel = apps.get_model("shipping", "RelayParcel")
+    RelayPointProfile = apps.get_model("accounts", "RelayPointProfile")
+
+    counts = (
+        RelayParcel.objects.filter(relay_point=OuterRef("pk"), status__in=OCCUPYING_STATUSES)
+        .order_by()
+        .values("relay_point")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    RelayPointProfile.objects.update(
+        stored_parcels_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0016_relay_point_stored_parcels'),
+        ('shipping', '0013_shipment_claim_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_relay_occupancy, migrations.RunPython.noop),
+    ]
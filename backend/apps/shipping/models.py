@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 from apps.orders.models import Order
 from apps.accounts.models import CourierProfile
@@ -28,6 +29,8 @@ class Shipment(models.Model):
 
     order = models.OneToOneField(Order, on_delete=models.CASCADE, related_name="shipment")
     status = models.CharField(max_length=32, choices=Status.choices, default=Status.CREATED)
+    # Ville de livraison normalisée (coverage.zone_key), clé de la file des disponibles
+    city_key = models.CharField(max_length=80, blank=True, default="")
 
     # Infos livreur (V1 simple)
     courier = models.ForeignKey(
@@ -47,15 +50,98 @@ class Shipment(models.Model):
     # Optional: point relais (plus tard)
     relay_point = models.CharField(max_length=120, blank=True, default="")
     accepted_at = models.DateTimeField(null=True, blank=True)
+    # Clé d'idempotence (en-tête Idempotency-Key) de la prise en charge en cours
+    claim_key = models.CharField(max_length=64, blank=True, default="")
     penalty_notified_at = models.DateTimeField(null=True, blank=True)
 
+    # Géolocalisation résolue à la création (cf. apps.shipping.geo)
+    pickup_latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    pickup_longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    drop_latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    drop_longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    route_km = models.FloatField(null=True, blank=True)
+
+    # Jalons posés au passage de statut (durée de livraison sans relire la timeline)
+    picked_up_at = models.DateTimeField(null=True, blank=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
     # Horodatage
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["courier", "status", "delivered_at"], name="shipment_courier_status_idx"),
+            # File des livraisons disponibles (CourierAvailableShipmentsView)
+            models.Index(
+                fields=["city_key", "created_at"],
+                name="shipment_available_idx",
+                condition=models.Q(status="CREATED", courier__isnull=True),
+            ),
+        ]
+        constraints = [
+            # Une clé rejouée par le même livreur désigne toujours la même prise en charge
+            models.UniqueConstraint(
+                fields=["courier", "claim_key"],
+                name="shipment_claim_key_uniq",
+                condition=~models.Q(claim_key=""),
+            ),
+        ]
+
     def __str__(self):
         return f"Shipment(order={self.order_id}, status={self.status})"
 
+    def _stamp_milestones(self):
+        """Renseigne picked_up_at / delivered_at ; retourne les champs modifiés."""
+        stamped = []
+        if self.status == self.Status.PICKED_UP and self.picked_up_at is None:
+            self.picked_up_at = timezone.now()
+            stamped.append("picked_up_at")
+        if self.status == self.Status.DELIVERED and self.delivered_at is None:
+            self.delivered_at = timezone.now()
+            stamped.append("delivered_at")
+        return stamped
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # État chargé, pour répercuter les transitions sur les compteurs de charge
+        if "courier_id" in instance.__dict__ and "status" in instance.__dict__:
+            instance._loaded_assignment = (instance.courier_id, instance.status)
+        return instance
+
+    def _previous_assignment(self):
+        if self._state.adding:
+            return None, None
+        if not hasattr(self, "_loaded_assignment"):
+            row = type(self).objects.filter(pk=self.pk).values_list("courier_id", "status").first()
+            return row or (None, None)
+        return self._loaded_assignment
+
+    def _stamp_city_key(self):
+        from .coverage import zone_key
+
+        if self.city_key or not self.order_id:
+            return []
+        self.city_key = zone_key(self.order.city)[:80]
+        return ["city_key"] if self.city_key else []
+
+    def save(self, *args, **kwargs):
+        from .capacity import apply_transition
+        from .queue import queue_transition
+
+        stamped = self._stamp_milestones() + self._stamp_city_key()
+        update_fields = kwargs.get("update_fields")
+        if stamped and update_fields is not None:
+            kwargs["update_fields"] = update_fields = {*update_fields, *stamped}
+        tracks_assignment = update_fields is None or bool({"status", "courier", "courier_id"} & set(update_fields))
+        previous = self._previous_assignment() if tracks_assignment else None
+        super().save(*args, **kwargs)
+        if previous is not None:
+            apply_transition(*previous, self.courier_id, self.status)
+            queue_transition(self.city_key, *previous, self.courier_id, self.status)
+            self._loaded_assignment = (self.courier_id, self.status)
+
 
 class ShipmentEvent(models.Model):
     """
@@ -110,6 +196,30 @@ class RelayParcel(models.Model):
     def __str__(self):
         return f"RelayParcel(shipment={self.shipment_id}, relay={self.relay_point_id}, status={self.status})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Emplacement chargé, pour tenir l'occupation des points relais
+        if "relay_point_id" in instance.__dict__ and "status" in instance.__dict__:
+            instance._loaded_placement = (instance.relay_point_id, instance.status)
+        return instance
+
+    def _previous_placement(self):
+        if self._state.adding:
+            return None, None
+        if not hasattr(self, "_loaded_placement"):
+            row = type(self).objects.filter(pk=self.pk).values_list("relay_point_id", "status").first()
+            return row or (None, None)
+        return self._loaded_placement
+
+    def save(self, *args, **kwargs):
+        from .relay import apply_occupancy
+
+        previous = self._previous_placement()
+        super().save(*args, **kwargs)
+        apply_occupancy(*previous, self.relay_point_id, self.status)
+        self._loaded_placement = (self.relay_point_id, self.status)
+
 
 class ShipmentMessage(models.Model):
     class Channel(models.TextChoices):
@@ -158,3 +268,50 @@ class CourierSOSAlert(models.Model):
 
     def __str__(self):
         return f"SOS #{self.id} - {self.courier.user.username} - {self.status}"
+
+
+class CoverageZone(models.Model):
+    """
+    Zone de couverture normalisée (clé canonique : sans accents, compactée,
+    majuscules — cf. apps.shipping.coverage.zone_key).
+    """
+
+    key = models.CharField(max_length=120, unique=True)
+    label = models.CharField(max_length=120, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["key"]
+        verbose_name = "Zone de couverture"
+        verbose_name_plural = "Zones de couverture"
+
+    def __str__(self):
+        return self.label or self.key
+
+
+class CourierCoverage(models.Model):
+    """Zones couvertes par un livreur (ville + zones), maintenu à l'enregistrement du profil."""
+
+    zone = models.ForeignKey(CoverageZone, on_delete=models.CASCADE, related_name="courier_links")
+    courier = models.ForeignKey(CourierProfile, on_delete=models.CASCADE, related_name="coverage_links")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["zone", "courier"], name="uniq_courier_coverage"),
+        ]
+
+
+class OrganizationCoverage(models.Model):
+    """Zones couvertes par une organisation de livraison."""
+
+    zone = models.ForeignKey(CoverageZone, on_delete=models.CASCADE, related_name="organization_links")
+    organization = models.ForeignKey(
+        "accounts.DeliveryOrganizationProfile",
+        on_delete=models.CASCADE,
+        related_name="coverage_links",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["zone", "organization"], name="uniq_organization_coverage"),
+        ]
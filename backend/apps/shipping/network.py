@@ -0,0 +1,177 @@
+# backend/apps/shipping/network.py
+# Réseau livreur (boutiques + points relais) servi depuis un instantané.
+#   - construction : 3 requêtes (emplacements, boutiques sans emplacement,
+#                    points relais approuvés et leur nombre de colis)
+#   - version      : jeton dans le cache partagé (CACHES → Redis en prod, vu
+#                    par tous les workers) renouvelé au post_save / post_delete
+#                    de VendorProfile, VendorLocation et RelayPointProfile ; il
+#                    sert de clé à l'instantané
+#   - ETag         : empreinte du contenu de l'instantané — deux processus qui
+#                    le reconstruisent pour la même version donnent le même ETag
+#   - index        : chaque entrée est rangée sous ses clés de zone (zone_key) ;
+#                    le filtrage par ville / zones du livreur se fait en mémoire
+#   - processus    : le dernier instantané reste en mémoire tant que la
+#                    version n'a pas changé (un seul cache.get par requête) ;
+#                    il est reconstruit au plus tard après SNAPSHOT_TTL pour
+#                    rafraîchir les compteurs de colis des points relais
+
+import hashlib
+import json
+import time
+import uuid
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save
+
+from apps.accounts.models import RelayPointProfile
+from apps.vendors.models import VendorLocation, VendorProfile
+from .coverage import coverage_keys, zone_key
+
+VERSION_KEY = "courier_network:version"
+SNAPSHOT_TTL = 600
+
+# Instantané du processus
+_local = {"version": None, "snapshot": None, "expires": 0.0}
+
+
+def network_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_network_version():
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+# ─── Construction ────────────────────────────────────────────────────────────
+
+def _shop(vendor, location=None):
+    return {
+        "vendor_id": vendor.id,
+        "vendor_name": vendor.business_name,
+        "shop_slug": vendor.shop_slug or "",
+        "city": vendor.city or "",
+        "address": (location.address if location else vendor.address) or "",
+        "phone": (location.phone if location else "") or vendor.phone or "",
+        "is_online": bool(vendor.is_online),
+        "location_name": location.name if location else "",
+        "representative_name": location.representative_name if location else "",
+        "representative_phone": location.representative_phone if location else "",
+        "latitude": float(location.latitude) if location and location.latitude is not None else None,
+        "longitude": float(location.longitude) if location and location.longitude is not None else None,
+    }
+
+
+def _index(entries, keys_of):
+    by_key = {}
+    for position, entry in enumerate(entries):
+        for key in keys_of(entry):
+            by_key.setdefault(key, []).append(position)
+    return by_key
+
+
+def build_snapshot():
+    locations = list(
+        VendorLocation.objects.filter(vendor__status=VendorProfile.Status.APPROVED, is_active=True)
+        .select_related("vendor")
+        .order_by("vendor__business_name", "name")
+    )
+    shops = [_shop(location.vendor, location) for location in locations]
+    with_location = {location.vendor_id for location in locations}
+    shops += [
+        _shop(vendor)
+        for vendor in VendorProfile.objects.filter(status=VendorProfile.Status.APPROVED)
+        .exclude(pk__in=with_location)
+        .order_by("business_name")
+    ]
+
+    relay_rows = list(
+        RelayPointProfile.objects.filter(status=RelayPointProfile.Status.APPROVED, is_active=True)
+        .annotate(shipments_count=Count("parcels"))
+        .order_by("-shipments_count", "name")
+    )
+    relay_points = [
+        {
+            "name": relay.name,
+            "city": relay.city or "",
+            "address": relay.address or "",
+            "shipments_count": relay.shipments_count,
+        }
+        for relay in relay_rows
+    ]
+    relay_keys = [set(coverage_keys(relay.city, relay.zones)) for relay in relay_rows]
+    content = json.dumps([shops, relay_points], cls=DjangoJSONEncoder, sort_keys=True)
+
+    return {
+        "token": hashlib.sha1(content.encode()).hexdigest()[:16],
+        "shops": shops,
+        "relay_points": relay_points,
+        "shops_by_key": _index(shops, lambda shop: [zone_key(shop["city"])] if shop["city"] else []),
+        "relay_points_by_key": _index(range(len(relay_points)), lambda position: relay_keys[position]),
+    }
+
+
+def current_snapshot():
+    """Instantané courant — reconstruit quand la version a changé ou a expiré."""
+    version = network_version()
+    if _local["version"] == version and time.monotonic() < _local["expires"]:
+        return _local["snapshot"]
+    key = f"courier_network:{version}"
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_snapshot()
+        cache.set(key, snapshot, SNAPSHOT_TTL)
+    _local.update(version=version, snapshot=snapshot, expires=time.monotonic() + SNAPSHOT_TTL)
+    return snapshot
+
+
+# ─── Lecture ─────────────────────────────────────────────────────────────────
+
+def _select(entries, by_key, keys):
+    positions = sorted({position for key in keys for position in by_key.get(key, ())})
+    return [entries[position] for position in positions]
+
+
+def courier_network(courier):
+    """(etag, {"shops", "relay_points"}) filtré sur la ville et les zones du livreur."""
+    snapshot = current_snapshot()
+    keys = sorted(coverage_keys(courier.city, courier.zones))
+    if not keys:
+        payload = {"shops": snapshot["shops"], "relay_points": snapshot["relay_points"]}
+    else:
+        payload = {
+            "shops": _select(snapshot["shops"], snapshot["shops_by_key"], keys),
+            "relay_points": _select(snapshot["relay_points"], snapshot["relay_points_by_key"], keys),
+        }
+    etag = f'"{snapshot["token"]}-{uuid.uuid5(uuid.NAMESPACE_OID, ",".join(keys)).hex[:12]}"'
+    return etag, payload
+
+
+# ─── Invalidation ────────────────────────────────────────────────────────────
+
+# Champs repris dans l'instantané ; None = tous (VendorLocation)
+_NETWORK_FIELDS = {
+    VendorProfile: {"status", "business_name", "shop_slug", "city", "address", "phone", "is_online"},
+    VendorLocation: None,
+    RelayPointProfile: {"status", "is_active", "name", "city", "zones", "address"},
+}
+
+
+def _network_saved(sender, update_fields=None, **kwargs):
+    fields = _NETWORK_FIELDS[sender]
+    if update_fields is None or fields is None or fields & set(update_fields):
+        bump_network_version()
+
+
+def _network_deleted(sender, **kwargs):
+    bump_network_version()
+
+
+for _model in _NETWORK_FIELDS:
+    post_save.connect(_network_saved, sender=_model, dispatch_uid=f"courier_network_save_{_model.__name__}")
+    post_delete.connect(_network_deleted, sender=_model, dispatch_uid=f"courier_network_delete_{_model.__name__}")
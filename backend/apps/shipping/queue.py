@@ -0,0 +1,208 @@
+# backend/apps/shipping/queue.py
+# File des livraisons disponibles (status CREATED, sans livreur).
+#   - Shipment.city_key : ville normalisée, posée à la création ; l'index partiel
+#                         shipment_available_idx (city_key, created_at) ne
+#                         couvre que les lignes de la file
+#   - available_count() : nombre de disponibles par ville, en cache ; les
+#                         livreurs le consultent avant de recharger la liste.
+#                         Les commandes du livreur lui-même (exclues de sa
+#                         liste) sont retirées hors cache
+#   - queue_transition(): invalide le compteur quand un shipment entre ou sort
+#                         de la file (Shipment.save) ; les UPDATE en masse
+#                         appellent invalidate_available_counts()
+#   - claim_next()      : le serveur classe les premières lignes de la file
+#                         (lecture sans verrou) puis verrouille la seule ligne
+#                         retenue (FOR UPDATE SKIP LOCKED sur son id) ; prise
+#                         ailleurs → candidate suivante, puis fenêtre suivante.
+#                         Deux livreurs ne se disputent plus la même, et aucun
+#                         ne reçoit 204 tant qu'il reste une ligne libre
+#   - idempotence       : Shipment.claim_key ; une requête rejouée avec la même
+#                         clé renvoie la prise en charge déjà faite
+#   - suites            : événement de timeline et notification au commit
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from apps.accounts.models import UserNotification
+from apps.accounts.notifications import notify
+from apps.orders.models import Order
+from .capacity import adjust_active_counts
+from .coverage import zone_key
+from .geo import pickup_distance_km
+from .models import Shipment, ShipmentEvent
+
+COUNT_CACHE_TTL = 60
+
+
+def _count_key(city_key):
+    return f"available_shipments:{city_key or '*'}"
+
+
+def is_available(courier_id, status):
+    return status == Shipment.Status.CREATED and not courier_id
+
+
+def available_queryset(city_key=None):
+    qs = Shipment.objects.filter(
+        status=Shipment.Status.CREATED,
+        courier__isnull=True,
+        order__delivery_method=Order.DeliveryMethod.DELIVERY,
+    )
+    if city_key:
+        qs = qs.filter(city_key=city_key)
+    return qs
+
+
+def available_count(city_key, exclude_user_id=None):
+    key = _count_key(city_key)
+    count = cache.get(key)
+    if count is None:
+        count = available_queryset(city_key).count()
+        cache.set(key, count, COUNT_CACHE_TTL)
+    if exclude_user_id:
+        # Comme la liste : les commandes passées par le livreur ne lui sont pas proposées
+        count -= available_queryset(city_key).filter(order__user_id=exclude_user_id).count()
+    return count
+
+
+def invalidate_available_counts(city_keys):
+    keys = {_count_key(city_key) for city_key in city_keys}
+    if keys:
+        cache.delete_many([*keys, _count_key(None)])
+
+
+def queue_transition(city_key, old_courier_id, old_status, new_courier_id, new_status):
+    if is_available(old_courier_id, old_status) != is_available(new_courier_id, new_status):
+        invalidate_available_counts([city_key])
+
+
+# ─── Prise en charge ─────────────────────────────────────────────────────────
+
+CLAIM_CANDIDATES = 10
+
+
+def claimed_with_key(courier, idempotency_key):
+    if not idempotency_key:
+        return None
+    return Shipment.objects.filter(courier=courier, claim_key=idempotency_key).first()
+
+
+def _claim_followups(shipment, courier):
+    order = shipment.order
+    ShipmentEvent.objects.create(
+        shipment=shipment,
+        status=Shipment.Status.ASSIGNED,
+        message="Mission acceptée par le livreur",
+        location=courier.city or "",
+    )
+    notify(
+        courier.user_id,
+        title=f"Livraison #{order.id} prise en charge",
+        message=f"Vous avez accepté la livraison vers {order.city} - {order.address}.",
+        notification_type=UserNotification.NotificationType.ORDER,
+        action_url="/courier",
+    )
+
+
+def _take(courier, shipments, idempotency_key=""):
+    """
+    Attribue au livreur le shipment de `shipments` (UPDATE conditionnel) ;
+    None si la ligne n'est plus dans la file. À appeler dans une transaction.
+    """
+    user = courier.user
+    now = timezone.now()
+    updated = shipments.filter(status=Shipment.Status.CREATED, courier__isnull=True).update(
+        courier=courier,
+        courier_name=user.get_full_name().strip() or user.username,
+        courier_phone=courier.phone or "",
+        status=Shipment.Status.ASSIGNED,
+        claim_key=idempotency_key,
+        updated_at=now,
+    )
+    if not updated:
+        return None
+    adjust_active_counts(courier.id, 1)
+
+    shipment = shipments.select_related("order", "courier", "courier__user").get()
+    Order.objects.filter(pk=shipment.order_id).update(
+        fulfillment_status=Order.FulfillmentStatus.DRIVER_ASSIGNED,
+        updated_at=now,
+    )
+    invalidate_available_counts([shipment.city_key])
+    transaction.on_commit(lambda: _claim_followups(shipment, courier))
+    return shipment
+
+
+def _closest_first(candidates, courier):
+    def rank(shipment):
+        distance = pickup_distance_km(shipment, courier)
+        return (distance is None, distance or 0.0, shipment.created_at, shipment.pk)
+    return sorted(candidates, key=rank)
+
+
+def claim_shipment(courier, shipment_id, idempotency_key=""):
+    """
+    Prise en charge d'un shipment précis. (shipment, rejoué) ; shipment None
+    si déjà pris, introuvable ou lié à une commande du livreur.
+    """
+    replayed = claimed_with_key(courier, idempotency_key)
+    if replayed is not None:
+        return replayed, True
+    shipments = Shipment.objects.filter(pk=shipment_id).exclude(order__user_id=courier.user_id)
+    try:
+        with transaction.atomic():
+            return _take(courier, shipments, idempotency_key), False
+    except IntegrityError:
+        # Même clé envoyée deux fois en parallèle : la première fait foi
+        replayed = claimed_with_key(courier, idempotency_key)
+        if replayed is None:
+            raise
+        return replayed, True
+
+
+def _lock_available(pk):
+    """Verrouille la ligne `pk` si elle est encore dans la file et libre ; None sinon."""
+    return (
+        available_queryset()
+        .filter(pk=pk)
+        .select_for_update(skip_locked=True, of=("self",))
+        .values_list("pk", flat=True)
+        .first()
+    )
+
+
+def claim_next(courier, idempotency_key=""):
+    """
+    Prise en charge de la meilleure livraison disponible pour le livreur :
+    parmi les CLAIM_CANDIDATES plus anciennes de sa ville, la plus proche de
+    lui (la plus ancienne à défaut de position). Seule la ligne retenue est
+    verrouillée ; si un autre livreur la tient, on passe à la suivante.
+    (shipment, rejoué) ; shipment None si la file est vide.
+    """
+    replayed = claimed_with_key(courier, idempotency_key)
+    if replayed is not None:
+        return replayed, True
+    queue = (
+        available_queryset(zone_key(courier.city))
+        .exclude(order__user_id=courier.user_id)
+        .order_by("created_at", "id")
+    )
+    try:
+        with transaction.atomic():
+            busy = set()
+            while True:
+                candidates = list(queue.exclude(pk__in=busy)[:CLAIM_CANDIDATES])
+                if not candidates:
+                    return None, False
+                for candidate in _closest_first(candidates, courier):
+                    if _lock_available(candidate.pk) is not None:
+                        shipment = _take(courier, Shipment.objects.filter(pk=candidate.pk), idempotency_key)
+                        if shipment is not None:
+                            return shipment, False
+                    busy.add(candidate.pk)
+    except IntegrityError:
+        replayed = claimed_with_key(courier, idempotency_key)
+        if replayed is None:
+            raise
+        return replayed, True
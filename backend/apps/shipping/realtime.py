@@ -0,0 +1,339 @@
+# backend/apps/shipping/realtime.py
+# Suivi temps réel des livraisons (diffusé en Server-Sent Events par sse.py).
+#   - broker      : pub/sub en mémoire du processus ; topics "shipment:<id>" et
+#                   "courier:<id>", une file asyncio bornée par flux abonné
+#   - publication : au commit des ShipmentEvent / ShipmentMessage (post_save
+#                   et écritures en bulk via publish_events) et à chaque
+#                   position livreur reçue
+#   - pont PG     : chaque publication part aussi en NOTIFY sur NOTIFY_CHANNEL ;
+#                   un thread LISTEN par worker relaie celles des autres
+#                   processus (les siennes sont ignorées grâce à ORIGIN)
+#   - reprise     : les trames portent l'id "<event_id>.<message_id>" ; replay()
+#                   relit depuis la base ce qui suit un Last-Event-ID
+
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connection, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import ShipmentEvent, ShipmentMessage
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "belivay_shipping"
+ORIGIN = uuid.uuid4().hex
+SUBSCRIBER_QUEUE_SIZE = 100
+REPLAY_LIMIT = 200
+
+# Trame spéciale : file pleine, le flux se ferme et le client reprend
+# avec son Last-Event-ID.
+OVERFLOW = {"kind": "overflow"}
+
+
+def shipment_topic(shipment_id):
+    return f"shipment:{shipment_id}"
+
+
+def courier_topic(courier_id):
+    return f"courier:{courier_id}"
+
+
+# ─── Broker en mémoire ───────────────────────────────────────────────────────
+
+def _offer(queue, frame):
+    try:
+        queue.put_nowait(frame)
+    except asyncio.QueueFull:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(OVERFLOW)
+
+
+class Subscription:
+    def __init__(self, broker, topics):
+        self.broker = broker
+        self.topics = list(topics)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, topics):
+        subscription = Subscription(self, topics)
+        with self._lock:
+            for topic in subscription.topics:
+                self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[topic]
+
+    def has_subscribers(self, topic):
+        return topic in self._subscribers
+
+    def dispatch(self, topic, frame):
+        """Appelable depuis n'importe quel thread."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(_offer, subscription.queue, frame)
+            except RuntimeError:
+                # Boucle fermée : flux terminé sans désabonnement
+                self.unsubscribe(subscription)
+
+
+broker = Broker()
+
+
+# ─── Trames ──────────────────────────────────────────────────────────────────
+
+def event_frame(event):
+    from .serializers import ShipmentEventSerializer
+
+    return {
+        "kind": "event",
+        "shipment_id": event.shipment_id,
+        "pk": event.pk,
+        "data": ShipmentEventSerializer(event).data,
+    }
+
+
+def message_frame(message):
+    from .serializers import ShipmentMessageSerializer
+
+    return {
+        "kind": "message",
+        "shipment_id": message.shipment_id,
+        "pk": message.pk,
+        "channel": message.channel,
+        "data": ShipmentMessageSerializer(message).data,
+    }
+
+
+def position_frame(courier_id, latitude, longitude, recorded_at):
+    return {
+        "kind": "position",
+        "courier_id": courier_id,
+        "data": {"latitude": float(latitude), "longitude": float(longitude), "recorded_at": recorded_at},
+    }
+
+
+def encode(frame):
+    return json.dumps(frame, cls=DjangoJSONEncoder)
+
+
+# ─── Publication ─────────────────────────────────────────────────────────────
+
+def _bridge_enabled():
+    return getattr(settings, "SHIPPING_REALTIME_BRIDGE", False) and connection.vendor == "postgresql"
+
+
+def _notify(payload):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, %s)", [NOTIFY_CHANNEL, encode(payload)])
+
+
+def publish(topic, kind, build, pk=None):
+    """
+    Diffuse une trame aux abonnés locaux (`build()` n'est appelé que s'il y en
+    a) et aux autres workers. Le NOTIFY ne porte qu'une référence (payload
+    limité à 8 Ko) : le worker distant relit la ligne ; seule la position,
+    qui n'est pas en base ligne à ligne, voyage en entier.
+    """
+    frame = None
+    if broker.has_subscribers(topic):
+        frame = build()
+        broker.dispatch(topic, frame)
+    if not _bridge_enabled():
+        return
+    payload = {"origin": ORIGIN, "topic": topic, "kind": kind, "pk": pk}
+    if kind == "position":
+        payload["frame"] = frame or build()
+    try:
+        _notify(payload)
+    except Exception:  # noqa: BLE001 — le temps réel ne bloque jamais l'écriture
+        logger.exception("NOTIFY %s en échec", NOTIFY_CHANNEL)
+
+
+def _publish_event(event):
+    publish(shipment_topic(event.shipment_id), "event", lambda: event_frame(event), pk=event.pk)
+
+
+def _publish_message(message):
+    publish(shipment_topic(message.shipment_id), "message", lambda: message_frame(message), pk=message.pk)
+
+
+def publish_events(events):
+    """À appeler après un bulk_create de ShipmentEvent (pas de post_save)."""
+    events = [event for event in events if event.pk]
+    if events:
+        transaction.on_commit(lambda: [_publish_event(event) for event in events])
+
+
+def publish_position(courier):
+    frame = position_frame(courier.pk, courier.last_latitude, courier.last_longitude, courier.last_position_at)
+    transaction.on_commit(lambda: publish(courier_topic(courier.pk), "position", lambda: frame))
+
+
+@receiver(post_save, sender=ShipmentEvent, dispatch_uid="shipping_realtime_event")
+def _event_saved(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: _publish_event(instance))
+
+
+@receiver(post_save, sender=ShipmentMessage, dispatch_uid="shipping_realtime_message")
+def _message_saved(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: _publish_message(instance))
+
+
+# ─── Pont LISTEN/NOTIFY ──────────────────────────────────────────────────────
+
+def relay(payload):
+    """Notification d'un autre worker → abonnés locaux."""
+    if payload.get("origin") == ORIGIN or not broker.has_subscribers(payload["topic"]):
+        return
+    kind = payload["kind"]
+    if kind == "position":
+        frame = payload["frame"]
+    elif kind == "event":
+        event = ShipmentEvent.objects.filter(pk=payload["pk"]).first()
+        frame = event and event_frame(event)
+    elif kind == "message":
+        message = ShipmentMessage.objects.select_related("sender").filter(pk=payload["pk"]).first()
+        frame = message and message_frame(message)
+    else:
+        frame = None
+    if frame:
+        broker.dispatch(payload["topic"], frame)
+
+
+def _connection_params():
+    settings_dict = connection.settings_dict
+    options = settings_dict.get("OPTIONS", {})
+    params = {
+        "dbname": settings_dict.get("NAME"),
+        "user": settings_dict.get("USER"),
+        "password": settings_dict.get("PASSWORD"),
+        "host": settings_dict.get("HOST"),
+        "port": settings_dict.get("PORT"),
+        "sslmode": options.get("sslmode"),
+        "connect_timeout": options.get("connect_timeout"),
+    }
+    return {key: value for key, value in params.items() if value}
+
+
+def _listen_forever():
+    import psycopg
+
+    while True:
+        try:
+            with psycopg.connect(**_connection_params(), autocommit=True) as listener:
+                listener.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                for notification in listener.notifies():
+                    close_old_connections()
+                    try:
+                        relay(json.loads(notification.payload))
+                    except Exception:  # noqa: BLE001
+                        logger.exception("Relais temps réel en échec")
+        except Exception:  # noqa: BLE001 — reconnexion après coupure
+            logger.exception("Écoute %s interrompue", NOTIFY_CHANNEL)
+            time.sleep(5)
+
+
+_bridge_lock = threading.Lock()
+_bridge_thread = None
+
+
+def ensure_bridge():
+    """Démarre (une fois par processus) le thread LISTEN."""
+    global _bridge_thread
+    if not _bridge_enabled() or _bridge_thread is not None:
+        return
+    with _bridge_lock:
+        if _bridge_thread is None:
+            _bridge_thread = threading.Thread(target=_listen_forever, name="shipping-realtime", daemon=True)
+            _bridge_thread.start()
+
+
+# ─── Reprise ─────────────────────────────────────────────────────────────────
+
+def parse_cursor(value):
+    """"<event_id>.<message_id>" → (int, int) ; None si absent ou illisible."""
+    try:
+        event_id, message_id = (value or "").split(".")
+        return int(event_id), int(message_id)
+    except ValueError:
+        return None
+
+
+def format_cursor(cursor):
+    return f"{cursor[0]}.{cursor[1]}"
+
+
+def advance(cursor, frame):
+    if frame["kind"] == "event":
+        return max(cursor[0], frame["pk"]), cursor[1]
+    if frame["kind"] == "message":
+        return cursor[0], max(cursor[1], frame["pk"])
+    return cursor
+
+
+def is_new(cursor, frame):
+    if frame["kind"] == "event":
+        return frame["pk"] > cursor[0]
+    if frame["kind"] == "message":
+        return frame["pk"] > cursor[1]
+    return True
+
+
+def visible(frame, channels):
+    return frame["kind"] != "message" or channels is None or frame["channel"] in channels
+
+
+def visible_messages(shipment_id, channels):
+    messages = ShipmentMessage.objects.filter(shipment_id=shipment_id).select_related("sender")
+    if channels is not None:
+        messages = messages.filter(channel__in=channels)
+    return messages
+
+
+def current_cursor(shipment_id, channels):
+    last_event = ShipmentEvent.objects.filter(shipment_id=shipment_id).order_by("-id").values_list("id", flat=True).first()
+    last_message = visible_messages(shipment_id, channels).order_by("-id").values_list("id", flat=True).first()
+    return last_event or 0, last_message or 0
+
+
+def replay(shipment_id, cursor, channels):
+    """Trames postérieures à `cursor`, dans l'ordre chronologique (REPLAY_LIMIT max par type)."""
+    events = ShipmentEvent.objects.filter(shipment_id=shipment_id, id__gt=cursor[0]).order_by("id")[:REPLAY_LIMIT]
+    messages = visible_messages(shipment_id, channels).filter(id__gt=cursor[1]).order_by("id")[:REPLAY_LIMIT]
+    frames = [(event.created_at, event_frame(event)) for event in events]
+    frames += [(message.created_at, message_frame(message)) for message in messages]
+    frames.sort(key=lambda item: item[0])
+    return [frame for _, frame in frames]
@@ -0,0 +1,297 @@
+# backend/apps/shipping/relay.py
+# Colis des points relais : occupation et opérations par lot.
+#   - stored_parcels_count (RelayPointProfile) : colis RECEIVED / STORED
+#     présents, tenu par F() à chaque changement (RelayParcel.save et lots) ;
+#     reconcile_relay_occupancy() le recalcule (reconcile_courier_capacity)
+#   - receive_batch / pickup_batch / return_batch : une dépose livreur ou un
+#     retrait de plusieurs colis en une requête — codes résolus en une
+#     requête (scan.resolve_scan_codes), point relais verrouillé pour le
+#     contrôle de capacité, UPDATE / INSERT en masse, un résultat par code
+#   - UPDATE en masse : Shipment.save / Order.save ne sont pas appelés. Les
+#     jalons du shipment (delivered_at) partent dans le même UPDATE ; côté
+#     commande, seul fulfillment_status change, que ni CustomerStats ni les
+#     stats vendeur ne suivent (client, paiement, total)
+
+import secrets
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.accounts.models import RelayPointProfile
+from apps.orders.models import Order
+from .capacity import bulk_adjust_active_counts, is_active
+from .models import RelayParcel, Shipment, ShipmentEvent
+from .queue import invalidate_available_counts, is_available
+from .realtime import publish_events
+from .scan import resolve_scan_codes
+
+OCCUPYING_STATUSES = [RelayParcel.Status.RECEIVED, RelayParcel.Status.STORED]
+CLOSED_SHIPMENT_STATUSES = [Shipment.Status.DELIVERED, Shipment.Status.CANCELLED]
+MAX_BATCH = 200
+
+
+def occupies(status):
+    return status in OCCUPYING_STATUSES
+
+
+# ─── Occupation ──────────────────────────────────────────────────────────────
+
+def bulk_adjust_occupancy(deltas):
+    """deltas : {relay_point_id: delta}. Un seul UPDATE."""
+    deltas = {relay_id: delta for relay_id, delta in deltas.items() if relay_id and delta}
+    if not deltas:
+        return
+    RelayPointProfile.objects.filter(pk__in=list(deltas)).update(
+        stored_parcels_count=F("stored_parcels_count") + Case(
+            *[When(pk=relay_id, then=Value(delta)) for relay_id, delta in deltas.items()],
+            default=Value(0),
+        ),
+    )
+
+
+def apply_occupancy(old_relay_id, old_status, new_relay_id, new_status):
+    """Répercute un changement (point relais, statut) d'un colis sur l'occupation."""
+    deltas = {}
+    if occupies(old_status):
+        deltas[old_relay_id] = -1
+    if occupies(new_status):
+        deltas[new_relay_id] = deltas.get(new_relay_id, 0) + 1
+    bulk_adjust_occupancy(deltas)
+
+
+def reconcile_relay_occupancy():
+    """Recalcule stored_parcels_count depuis les colis. Retourne le nombre de points corrigés."""
+    counts = (
+        RelayParcel.objects.filter(relay_point=OuterRef("pk"), status__in=OCCUPYING_STATUSES)
+        .order_by()
+        .values("relay_point")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    expected = Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+    fixed = RelayPointProfile.objects.annotate(expected=expected).exclude(
+        stored_parcels_count=F("expected"),
+    ).values_list("pk", flat=True)
+    return RelayPointProfile.objects.filter(pk__in=list(fixed)).update(stored_parcels_count=expected)
+
+
+@receiver(post_delete, sender=RelayParcel, dispatch_uid="shipping_relay_parcel_deleted")
+def _parcel_deleted(sender, instance, **kwargs):
+    if occupies(instance.status):
+        bulk_adjust_occupancy({instance.relay_point_id: -1})
+
+
+# ─── Lots ────────────────────────────────────────────────────────────────────
+
+def _result(code, parcel=None, error=""):
+    return {"code": code, "ok": not error, "parcel_id": parcel.pk if parcel else None, "error": error}
+
+
+def _resolve(queryset, items):
+    """Shipments des codes (verrouillés) et détection des doublons du lot."""
+    resolved = resolve_scan_codes(
+        queryset.select_related("order", "relay_parcel").select_for_update(of=("self",)),
+        [item["code"] for item in items],
+    )
+    seen = set()
+    for item in items:
+        shipment = resolved.get(item["code"])
+        duplicate = shipment is not None and shipment.pk in seen
+        if shipment is not None:
+            seen.add(shipment.pk)
+        yield item, shipment, duplicate
+
+
+def _move_shipments(shipments, status, now, **fields):
+    """
+    UPDATE en masse des shipments vers `status` ; Shipment.save n'étant pas
+    appelé, compteurs de charge et file des disponibles sont tenus ici.
+    """
+    if not shipments:
+        return
+    deltas, city_keys = {}, set()
+    for shipment in shipments:
+        if shipment.courier_id:
+            delta = int(is_active(status)) - int(is_active(shipment.status))
+            deltas[shipment.courier_id] = deltas.get(shipment.courier_id, 0) + delta
+        if is_available(shipment.courier_id, shipment.status) != is_available(shipment.courier_id, status):
+            city_keys.add(shipment.city_key)
+    Shipment.objects.filter(pk__in=[shipment.pk for shipment in shipments]).update(
+        status=status, updated_at=now, **fields,
+    )
+    bulk_adjust_active_counts(deltas)
+    invalidate_available_counts(city_keys)
+
+
+def _log_events(shipments, status, message, location):
+    events = ShipmentEvent.objects.bulk_create(
+        [
+            ShipmentEvent(
+                shipment_id=shipment.pk,
+                status=status if status is not None else shipment.status,
+                message=message,
+                location=location,
+            )
+            for shipment in shipments
+        ],
+    )
+    publish_events(events)
+
+
+def receive_batch(relay_point, items):
+    """Dépose de colis : items = [{code, slot_code, proof_note}] → résultats par code."""
+    now = timezone.now()
+    with transaction.atomic():
+        # Point relais verrouillé : deux dépôts simultanés ne dépassent pas la capacité
+        relay_point = RelayPointProfile.objects.select_for_update().get(pk=relay_point.pk)
+        free = None
+        if relay_point.storage_capacity:
+            free = max(relay_point.storage_capacity - relay_point.stored_parcels_count, 0)
+
+        results, accepted = [], []
+        for item, shipment, duplicate in _resolve(Shipment.objects.all(), items):
+            code = item["code"]
+            parcel = getattr(shipment, "relay_parcel", None) if shipment else None
+            if shipment is None:
+                results.append(_result(code, error="Code inconnu."))
+            elif duplicate:
+                results.append(_result(code, error="Colis déjà scanné dans ce lot."))
+            elif parcel and parcel.relay_point_id == relay_point.pk and occupies(parcel.status):
+                # Déjà en stock ici : rescanner est sans effet
+                results.append(_result(code, parcel))
+            elif shipment.status in CLOSED_SHIPMENT_STATUSES:
+                results.append(_result(code, error="Livraison terminée ou annulée."))
+            elif free is not None and len(accepted) >= free:
+                results.append(_result(code, error="Capacite point relais atteinte."))
+            else:
+                results.append(None)
+                accepted.append((len(results) - 1, item, shipment, parcel))
+
+        created, updated, deltas = [], [], {}
+        for _, item, shipment, parcel in accepted:
+            if parcel is None:
+                parcel = RelayParcel(shipment=shipment)
+                created.append(parcel)
+            else:
+                if occupies(parcel.status):
+                    deltas[parcel.relay_point_id] = deltas.get(parcel.relay_point_id, 0) - 1
+                updated.append(parcel)
+            deltas[relay_point.pk] = deltas.get(relay_point.pk, 0) + 1
+            parcel.relay_point = relay_point
+            parcel.status = RelayParcel.Status.STORED
+            parcel.slot_code = item.get("slot_code") or parcel.slot_code or f"SL-{relay_point.id}-{shipment.id}"
+            parcel.pickup_code = parcel.pickup_code or secrets.token_hex(3).upper()
+            parcel.proof_note = item.get("proof_note", "")
+            parcel.received_at = now
+            parcel.updated_at = now
+        RelayParcel.objects.bulk_create(created)
+        RelayParcel.objects.bulk_update(
+            updated, ["relay_point", "status", "slot_code", "pickup_code", "proof_note", "received_at", "updated_at"],
+        )
+        bulk_adjust_occupancy(deltas)
+
+        shipments = [shipment for _, _, shipment, _ in accepted]
+        _move_shipments(
+            shipments, Shipment.Status.IN_TRANSIT, now,
+            relay_point=relay_point.name, assignment_issue_code="", assignment_issue_message="",
+        )
+        _log_events(
+            shipments, Shipment.Status.IN_TRANSIT,
+            f"Colis recu et stocke au point relais {relay_point.name}", relay_point.name,
+        )
+
+    parcels = {parcel.shipment_id: parcel for parcel in created + updated}
+    for position, item, shipment, _ in accepted:
+        results[position] = _result(item["code"], parcels[shipment.pk])
+    return results
+
+
+def _stocked(relay_point, items, allowed_statuses):
+    """(résultats partiels, [(position, item, shipment, parcel)]) des colis présents au point relais."""
+    results, accepted = [], []
+    queryset = Shipment.objects.filter(relay_parcel__relay_point=relay_point)
+    for item, shipment, duplicate in _resolve(queryset, items):
+        code = item["code"]
+        if shipment is None:
+            results.append(_result(code, error="Colis introuvable dans ce point relais."))
+        elif duplicate:
+            results.append(_result(code, error="Colis déjà scanné dans ce lot."))
+        elif shipment.relay_parcel.status not in allowed_statuses:
+            results.append(_result(code, shipment.relay_parcel, error="Colis non disponible pour cette opération."))
+        else:
+            results.append(None)
+            accepted.append((len(results) - 1, item, shipment, shipment.relay_parcel))
+    return results, accepted
+
+
+def pickup_batch(relay_point, items):
+    """Retrait client : items = [{code, pickup_code, proof_note}] → résultats par code."""
+    now = timezone.now()
+    with transaction.atomic():
+        results, candidates = _stocked(relay_point, items, OCCUPYING_STATUSES)
+        accepted = []
+        for position, item, shipment, parcel in candidates:
+            if parcel.pickup_code and parcel.pickup_code != item.get("pickup_code"):
+                results[position] = _result(item["code"], parcel, error="Code de retrait incorrect.")
+                continue
+            parcel.status = RelayParcel.Status.PICKED_UP
+            parcel.proof_note = item.get("proof_note") or parcel.proof_note
+            parcel.picked_up_at = now
+            parcel.updated_at = now
+            results[position] = _result(item["code"], parcel)
+            accepted.append((shipment, parcel))
+
+        RelayParcel.objects.bulk_update(
+            [parcel for _, parcel in accepted], ["status", "proof_note", "picked_up_at", "updated_at"],
+        )
+        bulk_adjust_occupancy({relay_point.pk: -len(accepted)})
+        shipments = [shipment for shipment, _ in accepted]
+        _move_shipments(
+            shipments, Shipment.Status.DELIVERED, now,
+            delivered_at=Coalesce(F("delivered_at"), Value(now)),
+        )
+        # Sans Order.save : aucun signal de statistiques ne dépend de fulfillment_status
+        Order.objects.filter(pk__in=[shipment.order_id for shipment in shipments]).update(
+            fulfillment_status=Order.FulfillmentStatus.DELIVERED,
+            updated_at=now,
+        )
+        _log_events(
+            shipments, Shipment.Status.DELIVERED,
+            f"Colis retire au point relais {relay_point.name}", relay_point.name,
+        )
+    return results
+
+
+def return_batch(relay_point, destination, items):
+    """Retour vendeur / BelivaY : items = [{code, proof_note}] → résultats par code."""
+    now = timezone.now()
+    status = (
+        RelayParcel.Status.RETURNED_TO_VENDOR if destination == "VENDOR"
+        else RelayParcel.Status.RETURNED_TO_BELIVAY
+    )
+    with transaction.atomic():
+        results, accepted = _stocked(
+            relay_point, items, [*OCCUPYING_STATUSES, RelayParcel.Status.RETURN_REQUESTED],
+        )
+        freed = 0
+        for position, item, _, parcel in accepted:
+            freed += occupies(parcel.status)
+            parcel.status = status
+            parcel.proof_note = item.get("proof_note") or parcel.proof_note
+            parcel.returned_at = now
+            parcel.updated_at = now
+            results[position] = _result(item["code"], parcel)
+
+        RelayParcel.objects.bulk_update(
+            [parcel for *_, parcel in accepted], ["status", "proof_note", "returned_at", "updated_at"],
+        )
+        bulk_adjust_occupancy({relay_point.pk: -freed})
+        _log_events(
+            [shipment for _, _, shipment, _ in accepted], None,
+            f"Retour point relais vers {'vendeur' if destination == 'VENDOR' else 'BelivaY'}", relay_point.name,
+        )
+    return results
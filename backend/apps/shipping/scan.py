@@ -0,0 +1,50 @@
+# backend/apps/shipping/scan.py
+# Codes scannés sur les étiquettes colis.
+#   SHIP-<shipment_id> | BLV-<order_id> | <nombre> (id shipment, sinon id commande)
+# resolve_scan_codes() résout un lot entier de codes en une seule requête.
+
+from django.db.models import Q
+
+
+def parse_scan_code(code):
+    """("shipment" | "order" | "any", id) ; ValueError si le format est inconnu."""
+    raw = (code or "").strip().upper()
+    if raw.startswith("SHIP-"):
+        return "shipment", int(raw.replace("SHIP-", "", 1))
+    if raw.startswith("BLV-"):
+        return "order", int(raw.replace("BLV-", "", 1))
+    if raw.isdigit():
+        return "any", int(raw)
+    raise ValueError(f"Unsupported scan code format: {code!r}")
+
+
+def resolve_scan_codes(queryset, codes):
+    """{code: shipment | None} pour les shipments de `queryset`."""
+    targets = {}
+    for code in codes:
+        try:
+            targets[code] = parse_scan_code(code)
+        except ValueError:
+            targets[code] = None
+
+    shipment_ids = {value for kind, value in filter(None, targets.values()) if kind in ("shipment", "any")}
+    order_ids = {value for kind, value in filter(None, targets.values()) if kind in ("order", "any")}
+    by_id, by_order = {}, {}
+    if shipment_ids or order_ids:
+        for shipment in queryset.filter(Q(pk__in=shipment_ids) | Q(order_id__in=order_ids)):
+            by_id[shipment.pk] = shipment
+            by_order[shipment.order_id] = shipment
+
+    resolved = {}
+    for code, target in targets.items():
+        if target is None:
+            resolved[code] = None
+            continue
+        kind, value = target
+        if kind == "shipment":
+            resolved[code] = by_id.get(value)
+        elif kind == "order":
+            resolved[code] = by_order.get(value)
+        else:
+            resolved[code] = by_id.get(value) or by_order.get(value)
+    return resolved
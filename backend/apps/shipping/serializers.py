@@ -4,7 +4,10 @@ from django.utils import timezone
 from django.shortcuts import get_object_or_404
 from apps.orders.models import Dispute, Order
 from apps.accounts.models import UserNotification
+from apps.accounts.notifications import notify
+from .geo import pickup_distance_km
 from .models import CourierSOSAlert, RelayParcel, Shipment, ShipmentEvent, ShipmentMessage
+from .relay import MAX_BATCH
 
 
 class ShipmentEventSerializer(serializers.ModelSerializer):
@@ -26,6 +29,7 @@ class ShipmentSerializer(serializers.ModelSerializer):
     vendor_names = serializers.SerializerMethodField()
     assignment = serializers.SerializerMethodField()
     relay_parcel = serializers.SerializerMethodField()
+    pickup_distance_km = serializers.SerializerMethodField()
 
     class Meta:
         model = Shipment
@@ -49,6 +53,8 @@ class ShipmentSerializer(serializers.ModelSerializer):
             "parcel_size",
             "assignment",
             "relay_parcel",
+            "route_km",
+            "pickup_distance_km",
             "created_at",
             "updated_at",
             "events",
@@ -96,9 +102,19 @@ class ShipmentSerializer(serializers.ModelSerializer):
     def get_fulfillment_status(self, obj):
         return obj.order.fulfillment_status
 
+    def get_pickup_distance_km(self, obj):
+        # Livreur du contexte (liste des disponibles) ou livreur déjà chargé :
+        # pas de requête supplémentaire par ligne.
+        courier = self.context.get("courier")
+        if courier is None and Shipment.courier.is_cached(obj):
+            courier = obj.courier
+        return pickup_distance_km(obj, courier) if courier else None
+
     def get_vendor_names(self, obj):
         names = []
-        items = obj.order.items.select_related("product__vendor__vendor_profile")
+        items = obj.order.items.all()
+        if "items" not in getattr(obj.order, "_prefetched_objects_cache", {}):
+            items = items.select_related("product__vendor__vendor_profile")
         for item in items:
             vendor_user = getattr(item.product, "vendor", None)
             if not vendor_user:
@@ -196,8 +212,8 @@ class ShipmentCreateSerializer(serializers.Serializer):
         )
 
         if shipment.courier_id:
-            UserNotification.objects.create(
-                user=shipment.courier.user,
+            notify(
+                shipment.courier.user_id,
                 title=f"Nouvelle livraison #{shipment.order_id}",
                 message=(
                     f"Une commande a ete assignee a ta tournee: "
@@ -261,10 +277,8 @@ class RelayParcelReceiveSerializer(serializers.Serializer):
         else:
             shipment = get_object_or_404(shipment_qs, order_id=self.validated_data["order_id"])
 
-        active_count = RelayParcel.objects.filter(
-            relay_point=relay_point,
-            status__in=[RelayParcel.Status.RECEIVED, RelayParcel.Status.STORED],
-        ).count()
+        # Occupation tenue par apps.shipping.relay (plus de COUNT des colis)
+        active_count = type(relay_point).objects.values_list("stored_parcels_count", flat=True).get(pk=relay_point.pk)
         capacity = relay_point.storage_capacity or 0
         if capacity and active_count >= capacity:
             raise serializers.ValidationError({"capacity": "Capacite point relais atteinte."})
@@ -356,6 +370,35 @@ class RelayParcelReturnSerializer(serializers.Serializer):
         return parcel
 
 
+class RelayParcelScanItemSerializer(serializers.Serializer):
+    code = serializers.CharField(max_length=40)
+    slot_code = serializers.CharField(required=False, allow_blank=True, default="")
+    pickup_code = serializers.CharField(required=False, allow_blank=True, default="")
+    proof_note = serializers.CharField(required=False, allow_blank=True, default="")
+
+
+class RelayParcelBatchSerializer(serializers.Serializer):
+    """Lot de codes scannés (SHIP-<id>, BLV-<commande> ou identifiant)."""
+    items = serializers.ListField(child=RelayParcelScanItemSerializer(), allow_empty=False, max_length=MAX_BATCH)
+
+
+class RelayParcelBatchReturnSerializer(RelayParcelBatchSerializer):
+    destination = serializers.ChoiceField(choices=["VENDOR", "BELIVAY"])
+
+
+class RelayParcelBatchResultSerializer(serializers.Serializer):
+    code = serializers.CharField()
+    ok = serializers.BooleanField()
+    error = serializers.CharField()
+    parcel = RelayParcelSerializer(allow_null=True)
+
+
+class RelayParcelBatchResponseSerializer(serializers.Serializer):
+    processed = serializers.IntegerField()
+    failed = serializers.IntegerField()
+    results = RelayParcelBatchResultSerializer(many=True)
+
+
 class ShipmentEventCreateSerializer(serializers.Serializer):
     """
     Ajouter un event au shipment.
@@ -426,6 +469,7 @@ class CourierShipmentActionSerializer(serializers.Serializer):
             shipment.courier_name = ""
             shipment.courier_phone = ""
             shipment.accepted_at = None
+            shipment.claim_key = ""
             order.mark_ready_for_pickup()
         elif action == "PICKED_UP":
             shipment.status = Shipment.Status.PICKED_UP
@@ -439,7 +483,10 @@ class CourierShipmentActionSerializer(serializers.Serializer):
         elif action == "FAILED":
             shipment.status = Shipment.Status.FAILED
 
-        shipment.save(update_fields=["status", "courier", "courier_name", "courier_phone", "accepted_at", "penalty_notified_at", "updated_at"])
+        shipment.save(update_fields=[
+            "status", "courier", "courier_name", "courier_phone", "accepted_at", "claim_key",
+            "penalty_notified_at", "updated_at",
+        ])
 
         ShipmentEvent.objects.create(
             shipment=shipment,
@@ -474,6 +521,9 @@ class CourierDashboardWeekSerializer(serializers.Serializer):
 class CourierDashboardSerializer(serializers.Serializer):
     active_shipments = serializers.IntegerField()
     delivered_shipments = serializers.IntegerField()
+    stats_window_days = serializers.IntegerField(
+        help_text="Fenêtre (jours) des livrées, échouées, gains moyens, durée moyenne et performance",
+    )
     today_earnings_xaf = serializers.IntegerField()
     month_earnings_xaf = serializers.IntegerField()
     monthly_target_xaf = serializers.IntegerField()
@@ -651,6 +701,11 @@ class CourierSOSAlertSerializer(serializers.ModelSerializer):
         return full_name or obj.courier.user.username
 
 
+class CourierPositionSerializer(serializers.Serializer):
+    latitude = serializers.DecimalField(max_digits=9, decimal_places=6, min_value=-90, max_value=90)
+    longitude = serializers.DecimalField(max_digits=9, decimal_places=6, min_value=-180, max_value=180)
+
+
 class CourierSOSCreateSerializer(serializers.Serializer):
     message = serializers.CharField(required=False, allow_blank=True, default="")
     location = serializers.CharField(required=False, allow_blank=True, default="")
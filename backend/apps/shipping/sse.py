@@ -0,0 +1,182 @@
+# backend/apps/shipping/sse.py
+# Flux SSE de suivi d'une livraison (servi en ASGI, voir relaya/asgi.py).
+#   GET /api/shipping/orders/<order_id>/stream/   → client, livreur assigné, staff
+#   GET /api/shipping/shipments/<id>/stream/      → idem
+# Premier message : instantané (shipment + messages visibles) ; ensuite les
+# nouveaux événements, messages et positions du livreur au fil de l'eau.
+# Position du livreur : toujours pour le livreur et le staff ; pour le client,
+# seulement tant que la livraison est en course (capacity.ACTIVE_STATUSES) —
+# un événement qui la fait sortir de ces statuts coupe les positions.
+# Reconnexion : le client renvoie Last-Event-ID, seul le manquant est rejoué.
+# Un flux dure au plus STREAM_MAX_SECONDS ; EventSource se reconnecte seul.
+# Authentification : en-tête JWT, ou ?token= (EventSource ne sait pas envoyer
+# d'en-tête) — jeton signé, lié à l'utilisateur et à l'URL du flux, valable
+# STREAM_TOKEN_SECONDS, délivré par POST …/stream/token/ (ShipmentStreamTokenView).
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from . import realtime
+from .capacity import is_active
+from .models import Shipment, ShipmentMessage
+
+HEARTBEAT_SECONDS = 15
+STREAM_MAX_SECONDS = 300
+RETRY_MS = 3000
+STREAM_TOKEN_SECONDS = 60
+_TOKEN_SALT = "shipping.sse"
+
+
+# ─── Authentification ────────────────────────────────────────────────────────
+
+def issue_stream_token(user, path):
+    """Jeton signé pour ouvrir le flux `path` en tant que `user` (vérifié à la connexion seulement)."""
+    return signing.dumps({"user": user.pk, "path": path}, salt=_TOKEN_SALT)
+
+
+def _token_user(request):
+    token = request.GET.get("token")
+    if not token:
+        return None
+    try:
+        payload = signing.loads(token, salt=_TOKEN_SALT, max_age=STREAM_TOKEN_SECONDS)
+    except signing.BadSignature:  # SignatureExpired compris
+        return None
+    if payload.get("path") != request.path:
+        return None
+    return get_user_model().objects.filter(pk=payload.get("user"), is_active=True).first()
+
+
+def _authenticate(request):
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else _token_user(request)
+
+
+def stream_access(user, order_id=None, shipment_id=None):
+    """(statut HTTP, détail) ou (shipment, canaux visibles — None = tous)."""
+    shipments = Shipment.objects.select_related("order", "courier")
+    shipment = (
+        shipments.filter(order_id=order_id).first() if order_id is not None
+        else shipments.filter(pk=shipment_id).first()
+    )
+    if shipment is None:
+        return 404, "Aucune livraison pour cette commande."
+
+    if user.is_staff or (shipment.courier and shipment.courier.user_id == user.id):
+        return shipment, None
+    if shipment.order.user_id == user.id:
+        return shipment, [ShipmentMessage.Channel.CLIENT]
+    return 403, "Vous n'avez pas accès à cette livraison."
+
+
+def _resolve(request, order_id=None, shipment_id=None):
+    user = _authenticate(request)
+    if user is None:
+        return 401, "Authentification requise."
+    return stream_access(user, order_id=order_id, shipment_id=shipment_id)
+
+
+# ─── Flux ────────────────────────────────────────────────────────────────────
+
+def _snapshot(shipment, channels):
+    from .serializers import ShipmentMessageSerializer, ShipmentSerializer
+
+    messages = realtime.visible_messages(shipment.pk, channels)
+    frame = {
+        "kind": "snapshot",
+        "shipment_id": shipment.pk,
+        "data": {
+            "shipment": ShipmentSerializer(shipment).data,
+            "messages": ShipmentMessageSerializer(messages, many=True).data,
+        },
+    }
+    return frame, realtime.current_cursor(shipment.pk, channels)
+
+
+def _shares_position(status, channels):
+    """Le client (canaux restreints) ne suit le livreur que pendant la course."""
+    return channels is None or is_active(status)
+
+
+def _last_position(shipment):
+    courier = shipment.courier
+    if courier is None or courier.last_latitude is None or courier.last_longitude is None:
+        return None
+    return realtime.position_frame(courier.pk, courier.last_latitude, courier.last_longitude, courier.last_position_at)
+
+
+def _sse(frame, cursor=None):
+    lines = []
+    if cursor is not None:
+        lines.append(f"id: {realtime.format_cursor(cursor)}")
+    lines.append(f"event: {frame['kind']}")
+    lines.append(f"data: {realtime.encode(frame)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _stream(shipment, channels, cursor):
+    topics = [realtime.shipment_topic(shipment.pk)]
+    if shipment.courier_id:
+        topics.append(realtime.courier_topic(shipment.courier_id))
+    # Abonnement avant la lecture en base : rien ne tombe entre les deux
+    subscription = realtime.broker.subscribe(topics)
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        if cursor is None:
+            snapshot, cursor = await sync_to_async(_snapshot)(shipment, channels)
+            yield _sse(snapshot, cursor)
+        else:
+            for frame in await sync_to_async(realtime.replay)(shipment.pk, cursor, channels):
+                cursor = realtime.advance(cursor, frame)
+                yield _sse(frame, cursor)
+        follows_courier = _shares_position(shipment.status, channels)
+        position = _last_position(shipment) if follows_courier else None
+        if position:
+            yield _sse(position)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + STREAM_MAX_SECONDS
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                frame = await subscription.get(min(HEARTBEAT_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if frame is realtime.OVERFLOW:
+                break
+            if not realtime.visible(frame, channels) or not realtime.is_new(cursor, frame):
+                continue
+            if frame["kind"] == "position":
+                if follows_courier:
+                    yield _sse(frame)
+            else:
+                if frame["kind"] == "event":
+                    follows_courier = _shares_position(frame["data"]["status"], channels)
+                cursor = realtime.advance(cursor, frame)
+                yield _sse(frame, cursor)
+    finally:
+        subscription.close()
+
+
+@require_GET
+async def shipment_stream(request, order_id=None, id=None):
+    resolved, detail = await sync_to_async(_resolve)(request, order_id=order_id, shipment_id=id)
+    if isinstance(resolved, int):
+        return JsonResponse({"detail": detail}, status=resolved)
+
+    realtime.ensure_bridge()
+    cursor = realtime.parse_cursor(request.headers.get("Last-Event-ID") or request.GET.get("last_event_id"))
+    response = StreamingHttpResponse(_stream(resolved, detail, cursor), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -1,4 +1,5 @@
 from django.urls import path
+from .sse import shipment_stream
 from .views import (
     ClientOrderMessagesView,
     CourierDisputeMessageCreateView,
@@ -7,9 +8,13 @@ from .views import (
     CourierDashboardView,
     CourierNetworkView,
     CourierSettingsView,
+    CourierPositionView,
     CourierSOSAlertView,
     CourierShipmentMessageListCreateView,
     CourierShipmentScanView,
+    RelayPointParcelBatchPickupView,
+    RelayPointParcelBatchReceiveView,
+    RelayPointParcelBatchReturnView,
     RelayPointParcelListView,
     RelayPointParcelPickupView,
     RelayPointParcelReceiveView,
@@ -18,25 +23,36 @@ from .views import (
     CourierShipmentActionView,
     CourierShipmentDetailView,
     CourierAvailableShipmentsView,
+    CourierAvailableShipmentsCountView,
     CourierClaimShipmentView,
+    CourierClaimNextShipmentView,
     ShipmentCreateView,
     ShipmentEventCreateView,
+    ShipmentStreamTokenView,
     ShipmentTrackView,
 )
 
 urlpatterns = [
     path("orders/<int:order_id>/messages/", ClientOrderMessagesView.as_view(), name="shipping-client-messages"),
+    path("orders/<int:order_id>/stream/", shipment_stream, name="shipping-order-stream"),
+    path("shipments/<int:id>/stream/", shipment_stream, name="shipping-shipment-stream"),
+    path("orders/<int:order_id>/stream/token/", ShipmentStreamTokenView.as_view(), name="shipping-order-stream-token"),
+    path("shipments/<int:id>/stream/token/", ShipmentStreamTokenView.as_view(), name="shipping-shipment-stream-token"),
     path("create/", ShipmentCreateView.as_view(), name="shipping-create"),
     path("events/", ShipmentEventCreateView.as_view(), name="shipping-events"),
     path("relay-point/parcels/", RelayPointParcelListView.as_view(), name="shipping-relay-parcels"),
     path("relay-point/receive/", RelayPointParcelReceiveView.as_view(), name="shipping-relay-receive"),
     path("relay-point/pickup/", RelayPointParcelPickupView.as_view(), name="shipping-relay-pickup"),
     path("relay-point/return/", RelayPointParcelReturnView.as_view(), name="shipping-relay-return"),
+    path("relay-point/receive/batch/", RelayPointParcelBatchReceiveView.as_view(), name="shipping-relay-receive-batch"),
+    path("relay-point/pickup/batch/", RelayPointParcelBatchPickupView.as_view(), name="shipping-relay-pickup-batch"),
+    path("relay-point/return/batch/", RelayPointParcelBatchReturnView.as_view(), name="shipping-relay-return-batch"),
     path("track/", ShipmentTrackView.as_view(), name="shipping-track"),
     path("dashboard/", CourierDashboardView.as_view(), name="shipping-dashboard"),
     path("network/", CourierNetworkView.as_view(), name="shipping-network"),
     path("settings/", CourierSettingsView.as_view(), name="shipping-settings"),
     path("sos/", CourierSOSAlertView.as_view(), name="shipping-sos"),
+    path("position/", CourierPositionView.as_view(), name="shipping-position"),
     path("disputes/", CourierDisputeListView.as_view(), name="shipping-disputes"),
     path("disputes/<int:dispute_id>/request-reply/", CourierDisputeReplyPermissionRequestView.as_view(), name="shipping-dispute-request-reply"),
     path("disputes/<int:dispute_id>/messages/", CourierDisputeMessageCreateView.as_view(), name="shipping-dispute-message"),
@@ -46,5 +62,7 @@ urlpatterns = [
     path("my-shipments/<int:id>/messages/", CourierShipmentMessageListCreateView.as_view(), name="shipping-my-shipments-messages"),
     path("my-shipments/<int:id>/action/", CourierShipmentActionView.as_view(), name="shipping-my-shipments-action"),
     path("available/", CourierAvailableShipmentsView.as_view(), name="shipping-available"),
+    path("available/count/", CourierAvailableShipmentsCountView.as_view(), name="shipping-available-count"),
+    path("available/claim-next/", CourierClaimNextShipmentView.as_view(), name="shipping-claim-next"),
     path("available/<int:id>/claim/", CourierClaimShipmentView.as_view(), name="shipping-claim"),
 ]
@@ -2,23 +2,27 @@ from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.pagination import CursorPagination
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
-from django.db.models import Count
 from datetime import timedelta
-import unicodedata
 
 from .serializers import (
     CourierDisputeSerializer,
     CourierDashboardSerializer,
     CourierNetworkSerializer,
+    CourierPositionSerializer,
     CourierSettingsSerializer,
     CourierSOSAlertSerializer,
     CourierSOSCreateSerializer,
     CourierShipmentScanSerializer,
     CourierShipmentActionSerializer,
+    RelayParcelBatchResponseSerializer,
+    RelayParcelBatchReturnSerializer,
+    RelayParcelBatchSerializer,
     RelayParcelPickupSerializer,
     RelayParcelReceiveSerializer,
     RelayParcelReturnSerializer,
@@ -30,10 +34,24 @@ from .serializers import (
     ShipmentEventSerializer,
     ShipmentEventCreateSerializer,
 )
+from .coverage import zone_key
+from .dashboard import (
+    STATS_WINDOW_DAYS,
+    courier_distance_km,
+    courier_leaderboard,
+    courier_totals,
+    month_earnings,
+    zone_demand,
+)
+from .geo import update_courier_position
+from .network import courier_network
 from .models import CourierSOSAlert, RelayParcel, Shipment, ShipmentEvent, ShipmentMessage
-from apps.accounts.models import CourierProfile
+from .queue import available_count, available_queryset, claim_next, claim_shipment
+from .relay import pickup_batch, receive_batch, return_batch
+from .scan import parse_scan_code
+from .sse import STREAM_TOKEN_SECONDS, issue_stream_token, stream_access
 from apps.accounts.models import UserNotification
-from apps.vendors.models import VendorLocation, VendorProfile
+from apps.accounts.notifications import notify
 from apps.orders.models import Dispute, DisputeMessage, Order
 
 
@@ -43,77 +61,6 @@ def _get_active_relay_point(user):
         raise PermissionDenied("Relay point account is not active or approved")
     return relay_point
 
-
-def _city_variants(value):
-    raw = (value or "").strip()
-    if not raw:
-        return []
-
-    normalized = unicodedata.normalize("NFKD", raw)
-    ascii_city = "".join(ch for ch in normalized if not unicodedata.combining(ch))
-    compact = ascii_city.replace(" ", "").replace("-", "").replace("_", "").upper()
-
-    variants = {raw, ascii_city, raw.upper(), ascii_city.upper(), compact}
-    aliases = {
-        "YAOUNDE": {"YAOUNDE", "Yaounde", "Yaoundé", "yaounde", "yaoundé"},
-        "DOUALA": {"DOUALA", "Douala", "douala"},
-    }
-    variants.update(aliases.get(compact, set()))
-    return [variant for variant in variants if variant]
-
-
-def _release_overdue_accepted_shipments():
-    deadline = timezone.now() - timedelta(hours=1)
-    overdue = (
-        Shipment.objects.filter(
-            status=Shipment.Status.ASSIGNED,
-            courier__isnull=False,
-            accepted_at__isnull=False,
-            accepted_at__lte=deadline,
-            penalty_notified_at__isnull=True,
-        )
-        .select_related("order", "courier", "courier__user")
-    )
-
-    for shipment in overdue:
-        courier_user = shipment.courier.user
-        order = shipment.order
-        UserNotification.objects.create(
-            user=courier_user,
-            title=f"Penalite mission #{order.id}",
-            message=(
-                "Vous avez accepte cette mission mais le colis n'a pas ete marque pris en charge "
-                "dans le delai d'une heure. Vos points ont ete reduits et la mission a ete liberee."
-            ),
-            notification_type=UserNotification.NotificationType.SYSTEM,
-            action_url="/courier",
-        )
-        ShipmentEvent.objects.create(
-            shipment=shipment,
-            status=Shipment.Status.CREATED,
-            message="Mission liberee automatiquement apres depassement du delai de prise en charge.",
-            location=order.city,
-        )
-        shipment.status = Shipment.Status.CREATED
-        shipment.courier = None
-        shipment.courier_name = ""
-        shipment.courier_phone = ""
-        shipment.accepted_at = None
-        shipment.penalty_notified_at = timezone.now()
-        shipment.save(
-            update_fields=[
-                "status",
-                "courier",
-                "courier_name",
-                "courier_phone",
-                "accepted_at",
-                "penalty_notified_at",
-                "updated_at",
-            ]
-        )
-        order.mark_ready_for_pickup()
-
-
 @extend_schema(
     tags=["Shipping"],
     summary="Créer/assigner un shipment à une commande (V1)",
@@ -201,6 +148,78 @@ class RelayPointParcelReturnView(APIView):
         return Response(RelayParcelSerializer(parcel).data, status=status.HTTP_200_OK)
 
 
+def _batch_response(results):
+    parcels = RelayParcel.objects.filter(
+        pk__in=[result["parcel_id"] for result in results if result["parcel_id"]],
+    ).select_related("shipment", "shipment__order", "relay_point").in_bulk()
+    payload = [
+        {
+            "code": result["code"],
+            "ok": result["ok"],
+            "error": result["error"],
+            "parcel": RelayParcelSerializer(parcels[result["parcel_id"]]).data if result["parcel_id"] else None,
+        }
+        for result in results
+    ]
+    processed = sum(1 for result in results if result["ok"])
+    return Response(
+        {"processed": processed, "failed": len(results) - processed, "results": payload},
+        status=status.HTTP_200_OK,
+    )
+
+
+@extend_schema(
+    tags=["Relay Point"],
+    summary="Receptionner un lot de colis scannes",
+    request=RelayParcelBatchSerializer,
+    responses={200: RelayParcelBatchResponseSerializer},
+)
+class RelayPointParcelBatchReceiveView(APIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = RelayParcelBatchSerializer
+
+    def post(self, request):
+        relay_point = _get_active_relay_point(request.user)
+        serializer = RelayParcelBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return _batch_response(receive_batch(relay_point, serializer.validated_data["items"]))
+
+
+@extend_schema(
+    tags=["Relay Point"],
+    summary="Confirmer le retrait client d'un lot de colis",
+    request=RelayParcelBatchSerializer,
+    responses={200: RelayParcelBatchResponseSerializer},
+)
+class RelayPointParcelBatchPickupView(APIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = RelayParcelBatchSerializer
+
+    def post(self, request):
+        relay_point = _get_active_relay_point(request.user)
+        serializer = RelayParcelBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return _batch_response(pickup_batch(relay_point, serializer.validated_data["items"]))
+
+
+@extend_schema(
+    tags=["Relay Point"],
+    summary="Retourner un lot de colis depuis le point relais",
+    request=RelayParcelBatchReturnSerializer,
+    responses={200: RelayParcelBatchResponseSerializer},
+)
+class RelayPointParcelBatchReturnView(APIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = RelayParcelBatchReturnSerializer
+
+    def post(self, request):
+        relay_point = _get_active_relay_point(request.user)
+        serializer = RelayParcelBatchReturnSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        return _batch_response(return_batch(relay_point, data["destination"], data["items"]))
+
+
 @extend_schema(
     tags=["Shipping"],
     summary="Tracking client (timeline) d'une commande",
@@ -229,7 +248,6 @@ class CourierMyShipmentsView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        _release_overdue_accepted_shipments()
         courier = getattr(self.request.user, "courier_profile", None)
         if not courier or not courier.is_approved or not courier.is_active:
             raise PermissionDenied("Courier account is not approved")
@@ -278,6 +296,15 @@ class CourierShipmentActionView(generics.GenericAPIView):
         return Response(ShipmentSerializer(shipment, context={"request": request}).data, status=status.HTTP_200_OK)
 
 
+
+class AvailableShipmentsPagination(CursorPagination):
+    """Curseur sur (created_at, id) : suit l'index partiel shipment_available_idx."""
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("created_at", "id")
+
+
 def _get_active_courier(user):
     courier = getattr(user, "courier_profile", None)
     if not courier or not courier.is_approved or not courier.is_active:
@@ -288,59 +315,36 @@ def _get_active_courier(user):
     return courier
 
 
+def _idempotency_key(request):
+    key = (request.headers.get("Idempotency-Key") or "").strip()
+    if len(key) > 64:
+        raise ValidationError({"Idempotency-Key": "64 caractères maximum."})
+    return key
+
+
+def _claimed_response(request, shipment, replayed):
+    response = Response(ShipmentSerializer(shipment, context={"request": request}).data, status=status.HTTP_200_OK)
+    if replayed:
+        response["Idempotent-Replayed"] = "true"
+    return response
+
+
 def _resolve_scan_target(code: str, courier) -> Shipment:
-    raw = code.strip().upper()
-    if not raw:
+    if not code.strip():
         raise PermissionDenied("Scan code is empty")
 
     shipment_qs = Shipment.objects.filter(courier=courier).select_related("order", "courier", "courier__user")
 
     try:
-        if raw.startswith("SHIP-"):
-            shipment_id = raw.replace("SHIP-", "", 1)
-            return get_object_or_404(shipment_qs, id=int(shipment_id))
-
-        if raw.startswith("BLV-"):
-            order_id = raw.replace("BLV-", "", 1)
-            return get_object_or_404(shipment_qs, order_id=int(order_id))
-
-        if raw.isdigit():
-            return shipment_qs.filter(id=int(raw)).first() or get_object_or_404(shipment_qs, order_id=int(raw))
+        kind, value = parse_scan_code(code)
     except ValueError as exc:
         raise PermissionDenied("Unsupported scan code format") from exc
 
-    raise PermissionDenied("Unsupported scan code format")
-
-
-def _courier_payout_xaf(shipment: Shipment) -> int:
-    return round((shipment.order.total_xaf or 0) * 0.08)
-
-
-def _estimate_shipment_distance_km(shipment: Shipment) -> float:
-    order = shipment.order
-    city = (order.city or "").upper()
-    address_seed = f"{order.address or ''}|{shipment.relay_point or ''}|{order.id}"
-    address_score = sum(ord(ch) for ch in address_seed) % 36
-    city_base = 5.2 if "YAOUNDE" in city else 6.4 if "DOUALA" in city else 4.8
-    status_extra = {
-        Shipment.Status.CREATED: 0.0,
-        Shipment.Status.ASSIGNED: 0.8,
-        Shipment.Status.PICKED_UP: 1.8,
-        Shipment.Status.OUT_FOR_DELIVERY: 3.0,
-        Shipment.Status.DELIVERED: 0.0,
-        Shipment.Status.FAILED: 0.0,
-        Shipment.Status.CANCELLED: 0.0,
-    }.get(shipment.status, 0.0)
-    return round(city_base + (address_score / 10) + status_extra, 1)
-
-
-def _shipment_delivery_minutes(shipment: Shipment) -> int:
-    picked_up_event = next((event for event in shipment.events.all() if event.status == Shipment.Status.PICKED_UP), None)
-    delivered_event = next((event for event in shipment.events.all() if event.status == Shipment.Status.DELIVERED), None)
-
-    start_dt = picked_up_event.created_at if picked_up_event else shipment.created_at
-    end_dt = delivered_event.created_at if delivered_event else shipment.updated_at
-    return max(1, round((end_dt - start_dt).total_seconds() / 60))
+    if kind == "shipment":
+        return get_object_or_404(shipment_qs, id=value)
+    if kind == "order":
+        return get_object_or_404(shipment_qs, order_id=value)
+    return shipment_qs.filter(id=value).first() or get_object_or_404(shipment_qs, order_id=value)
 
 
 def _traffic_label(now):
@@ -359,32 +363,6 @@ def _weather_label(now):
     return "29°C, sec"
 
 
-def _leaderboard_tone(score: int) -> str:
-    if score >= 97:
-        return "text-emerald-300"
-    if score >= 92:
-        return "text-orange-300"
-    return "text-sky-300"
-
-
-def _leaderboard_badge(score: int) -> str:
-    if score >= 97:
-        return "Elite"
-    if score >= 92:
-        return "Top"
-    return "Stable"
-
-
-def _month_week_label(day: int) -> str:
-    if day <= 7:
-        return "S1"
-    if day <= 14:
-        return "S2"
-    if day <= 21:
-        return "S3"
-    return "S4"
-
-
 @extend_schema(tags=["Shipping"], summary="Dashboard livreur")
 class CourierDashboardView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
@@ -395,88 +373,33 @@ class CourierDashboardView(generics.GenericAPIView):
 
         now = timezone.now()
         today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        shipments = list(
-            Shipment.objects.filter(courier=courier)
-            .select_related("order", "courier", "courier__user")
-            .prefetch_related("events")
-            .order_by("-updated_at")
-        )
-
-        active_shipments = [shipment for shipment in shipments if shipment.status in [Shipment.Status.ASSIGNED, Shipment.Status.PICKED_UP, Shipment.Status.OUT_FOR_DELIVERY]]
-        delivered_shipments = [shipment for shipment in shipments if shipment.status == Shipment.Status.DELIVERED]
-        failed_shipments = [shipment for shipment in shipments if shipment.status == Shipment.Status.FAILED]
-
-        today_delivered = [shipment for shipment in delivered_shipments if shipment.updated_at >= today_start]
         month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        month_delivered = [shipment for shipment in delivered_shipments if shipment.updated_at >= month_start]
-        today_earnings = sum(_courier_payout_xaf(shipment) for shipment in today_delivered)
-        month_earnings = sum(_courier_payout_xaf(shipment) for shipment in month_delivered)
-        average_payout = round(sum(_courier_payout_xaf(shipment) for shipment in delivered_shipments) / len(delivered_shipments)) if delivered_shipments else 0
+
+        totals = courier_totals(courier, now - timedelta(days=STATS_WINDOW_DAYS))
+        delivered_count = totals["delivered"]
+        today_earnings, month_earnings_xaf, weeks = month_earnings(courier, today_start, month_start)
+        average_payout = round(totals["payout_total"] / delivered_count) if delivered_count else 0
         monthly_target = max(75000, average_payout * 25 if average_payout else 75000)
-        monthly_goal_percent = min(100, round((month_earnings / monthly_target) * 100)) if monthly_target else 0
+        monthly_goal_percent = min(100, round((month_earnings_xaf / monthly_target) * 100)) if monthly_target else 0
 
         if courier.is_online:
-            anchor_dt = min((shipment.updated_at for shipment in active_shipments), default=now)
+            anchor_dt = totals["active_since"] or now
             online_minutes = max(1, round((now - anchor_dt).total_seconds() / 60))
         else:
             online_minutes = 0
 
-        average_delivery_minutes = round(
-            sum(_shipment_delivery_minutes(shipment) for shipment in delivered_shipments) / len(delivered_shipments)
-        ) if delivered_shipments else 0
+        duration = totals["delivery_duration"]
+        average_delivery_minutes = max(1, round(duration.total_seconds() / 60)) if duration is not None else 0
 
-        completed_count = len(delivered_shipments) + len(failed_shipments)
-        performance_percent = round((len(delivered_shipments) / completed_count) * 100) if completed_count else 100
-
-        distance_km = round(
-            sum(_estimate_shipment_distance_km(shipment) for shipment in [*today_delivered, *active_shipments]),
-            1,
-        )
+        completed_count = delivered_count + totals["failed"]
+        performance_percent = round((delivered_count / completed_count) * 100) if completed_count else 100
 
-        approved_couriers = CourierProfile.objects.filter(is_approved=True, is_active=True).select_related("user")
-        leaderboard = []
-        for profile in approved_couriers:
-            courier_shipments = list(
-                Shipment.objects.filter(courier=profile)
-                .select_related("order", "courier", "courier__user")
-            )
-            courier_delivered = [shipment for shipment in courier_shipments if shipment.status == Shipment.Status.DELIVERED]
-            courier_failed = [shipment for shipment in courier_shipments if shipment.status == Shipment.Status.FAILED]
-            total_completed = len(courier_delivered) + len(courier_failed)
-            score = round((len(courier_delivered) / total_completed) * 100) if total_completed else 0
-            leaderboard.append(
-                {
-                    "name": profile.user.get_full_name().strip() or profile.user.username,
-                    "score": f"{score}%",
-                    "badge": _leaderboard_badge(score),
-                    "tone": _leaderboard_tone(score),
-                    "_sort_score": score,
-                    "_sort_volume": len(courier_delivered),
-                }
-            )
+        distance_km = courier_distance_km(courier, today_start)
 
-        leaderboard = sorted(
-            leaderboard,
-            key=lambda item: (item["_sort_score"], item["_sort_volume"]),
-            reverse=True,
-        )[:3]
-        for item in leaderboard:
-            item.pop("_sort_score", None)
-            item.pop("_sort_volume", None)
+        leaderboard = courier_leaderboard()
 
         zone_heatmap = []
-        courier_zones = courier.zones or [courier.city]
-        recent_shipments = [shipment for shipment in shipments if shipment.created_at >= now - timedelta(days=30)]
-        zone_counts = []
-        for zone in courier_zones:
-            count = sum(
-                1
-                for shipment in recent_shipments
-                if zone.lower() in (shipment.order.address or "").lower()
-                or zone.lower() in (shipment.order.city or "").lower()
-            )
-            zone_counts.append((zone, count))
-
+        zone_counts = zone_demand(courier, courier.zones or [courier.city], now - timedelta(days=30))
         max_count = max((count for _, count in zone_counts), default=0)
         for zone, count in zone_counts:
             percent = round((count / max_count) * 100) if max_count else 0
@@ -488,30 +411,26 @@ class CourierDashboardView(generics.GenericAPIView):
                 }
             )
 
-        weekly_buckets = {
-            "S1": {"label": "S1", "earnings_xaf": 0, "deliveries": 0, "percent": 0},
-            "S2": {"label": "S2", "earnings_xaf": 0, "deliveries": 0, "percent": 0},
-            "S3": {"label": "S3", "earnings_xaf": 0, "deliveries": 0, "percent": 0},
-            "S4": {"label": "S4", "earnings_xaf": 0, "deliveries": 0, "percent": 0},
-        }
         weekly_target = max(1, round(monthly_target / 4))
-        for shipment in month_delivered:
-            label = _month_week_label(shipment.updated_at.day)
-            weekly_buckets[label]["earnings_xaf"] += _courier_payout_xaf(shipment)
-            weekly_buckets[label]["deliveries"] += 1
-
         weekly_progress = []
         for label in ["S1", "S2", "S3", "S4"]:
-            bucket = weekly_buckets[label]
-            bucket["percent"] = min(100, round((bucket["earnings_xaf"] / weekly_target) * 100)) if weekly_target else 0
-            weekly_progress.append(bucket)
+            earnings, deliveries = weeks.get(label, (0, 0))
+            weekly_progress.append(
+                {
+                    "label": label,
+                    "earnings_xaf": earnings,
+                    "deliveries": deliveries,
+                    "percent": min(100, round((earnings / weekly_target) * 100)),
+                }
+            )
 
         recommended_departure_dt = (now + timedelta(minutes=12)).replace(second=0, microsecond=0)
         data = {
-            "active_shipments": len(active_shipments),
-            "delivered_shipments": len(delivered_shipments),
+            "active_shipments": totals["active"],
+            "delivered_shipments": delivered_count,
+            "stats_window_days": STATS_WINDOW_DAYS,
             "today_earnings_xaf": today_earnings,
-            "month_earnings_xaf": month_earnings,
+            "month_earnings_xaf": month_earnings_xaf,
             "monthly_target_xaf": monthly_target,
             "monthly_goal_percent": monthly_goal_percent,
             "average_payout_xaf": average_payout,
@@ -536,78 +455,15 @@ class CourierNetworkView(generics.GenericAPIView):
     serializer_class = CourierNetworkSerializer
 
     def get(self, request, *args, **kwargs):
-        _get_active_courier(request.user)
-
-        approved_vendors = list(
-            VendorProfile.objects.filter(status=VendorProfile.Status.APPROVED)
-            .select_related("user")
-            .order_by("business_name")
-        )
-        vendor_locations = list(
-            VendorLocation.objects.filter(vendor__status=VendorProfile.Status.APPROVED, is_active=True)
-            .select_related("vendor", "vendor__user")
-            .order_by("vendor__business_name", "name")
-        )
-
-        shops = []
-        vendors_with_locations = set()
-        for location in vendor_locations:
-            vendors_with_locations.add(location.vendor_id)
-            shops.append(
-                {
-                    "vendor_id": location.vendor_id,
-                    "vendor_name": location.vendor.business_name,
-                    "shop_slug": location.vendor.shop_slug or "",
-                    "city": location.vendor.city or "",
-                    "address": location.address or "",
-                    "phone": location.phone or location.vendor.phone or "",
-                    "is_online": bool(location.vendor.is_online),
-                    "location_name": location.name or "",
-                    "representative_name": location.representative_name or "",
-                    "representative_phone": location.representative_phone or "",
-                    "latitude": float(location.latitude) if location.latitude is not None else None,
-                    "longitude": float(location.longitude) if location.longitude is not None else None,
-                }
-            )
-
-        for vendor in approved_vendors:
-            if vendor.id in vendors_with_locations:
-                continue
-            shops.append(
-                {
-                    "vendor_id": vendor.id,
-                    "vendor_name": vendor.business_name,
-                    "shop_slug": vendor.shop_slug or "",
-                    "city": vendor.city or "",
-                    "address": vendor.address or "",
-                    "phone": vendor.phone or "",
-                    "is_online": bool(vendor.is_online),
-                    "location_name": "",
-                    "representative_name": "",
-                    "representative_phone": "",
-                    "latitude": None,
-                    "longitude": None,
-                }
-            )
-
-        relay_points = [
-            {
-                "name": item["relay_point"],
-                "city": item["order__city"] or "",
-                "address": item["relay_point"],
-                "shipments_count": item["shipments_count"],
-            }
-            for item in Shipment.objects.exclude(relay_point="")
-            .values("relay_point", "order__city")
-            .annotate(shipments_count=Count("id"))
-            .order_by("-shipments_count", "relay_point")
-        ]
-
-        data = {
-            "shops": shops,
-            "relay_points": relay_points,
-        }
-        return Response(CourierNetworkSerializer(data).data, status=status.HTTP_200_OK)
+        courier = _get_active_courier(request.user)
+        etag, data = courier_network(courier)
+        if request.headers.get("If-None-Match") == etag:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(CourierNetworkSerializer(data).data, status=status.HTTP_200_OK)
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
 
 
 @extend_schema(tags=["Shipping"], summary="Litiges lies aux commandes du livreur")
@@ -616,7 +472,6 @@ class CourierDisputeListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        _release_overdue_accepted_shipments()
         courier = _get_active_courier(self.request.user)
         return (
             Dispute.objects.filter(order__shipment__courier=courier)
@@ -636,8 +491,8 @@ class CourierDisputeReplyPermissionRequestView(APIView):
             Dispute.objects.filter(order__shipment__courier=courier),
             id=dispute_id,
         )
-        UserNotification.objects.create(
-            user=request.user,
+        notify(
+            request.user,
             title=f"Demande envoyée · litige #{dispute.id}",
             message="BelivaY a reçu votre demande de réponse. Un admin peut ouvrir le canal si votre précision est nécessaire.",
             notification_type=UserNotification.NotificationType.SUPPORT,
@@ -742,8 +597,8 @@ class ClientOrderMessagesView(generics.GenericAPIView):
             # Client → notifier le livreur
             if shipment.courier:
                 sender_display = request.user.get_full_name().strip() or request.user.username
-                UserNotification.objects.create(
-                    user=shipment.courier.user,
+                notify(
+                    shipment.courier.user_id,
                     title=f"Message client — Commande #{order_id}",
                     message=f"{sender_display} : {message_text[:100]}",
                     notification_type=UserNotification.NotificationType.ORDER,
@@ -751,8 +606,8 @@ class ClientOrderMessagesView(generics.GenericAPIView):
                 )
         else:
             # Livreur → notifier le client
-            UserNotification.objects.create(
-                user=shipment.order.user,
+            notify(
+                shipment.order.user_id,
                 title="Réponse de votre livreur",
                 message=f"{request.user.get_full_name().strip() or 'Livreur'} : {message_text[:100]}",
                 notification_type=UserNotification.NotificationType.ORDER,
@@ -862,8 +717,8 @@ class CourierSettingsView(generics.GenericAPIView):
         serializer.is_valid(raise_exception=True)
         courier = serializer.save()
 
-        UserNotification.objects.create(
-            user=request.user,
+        notify(
+            request.user,
             title="Parametres livreur mis a jour",
             message="Tes reglages livreur ont ete synchronises avec le backend.",
             notification_type=UserNotification.NotificationType.SYSTEM,
@@ -889,8 +744,10 @@ class CourierSOSAlertView(generics.GenericAPIView):
             latitude=serializer.validated_data.get("latitude"),
             longitude=serializer.validated_data.get("longitude"),
         )
-        UserNotification.objects.create(
-            user=request.user,
+        if alert.latitude is not None and alert.longitude is not None:
+            update_courier_position(courier, alert.latitude, alert.longitude)
+        notify(
+            request.user,
             title="Alerte SOS envoyee",
             message="Le support securite BelivaY a recu ton alerte SOS.",
             notification_type=UserNotification.NotificationType.SUPPORT,
@@ -899,29 +756,81 @@ class CourierSOSAlertView(generics.GenericAPIView):
         return Response(CourierSOSAlertSerializer(alert).data, status=status.HTTP_201_CREATED)
 
 
+@extend_schema(tags=["Shipping"], summary="Position GPS du livreur")
+class CourierPositionView(generics.GenericAPIView):
+    serializer_class = CourierPositionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        courier = _get_active_courier(request.user)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        update_courier_position(courier, serializer.validated_data["latitude"], serializer.validated_data["longitude"])
+        return Response(
+            {
+                "latitude": float(courier.last_latitude),
+                "longitude": float(courier.last_longitude),
+                "recorded_at": courier.last_position_at,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 @extend_schema(tags=["Shipping"], summary="Livraisons disponibles (non assignées, dans la zone du livreur)")
 class CourierAvailableShipmentsView(generics.ListAPIView):
     serializer_class = ShipmentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = AvailableShipmentsPagination
+    filter_backends = []
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["courier"] = _get_active_courier(self.request.user)
+        return context
 
     def get_queryset(self):
         courier = _get_active_courier(self.request.user)
-        city = (courier.city or "").strip()
-        qs = Shipment.objects.filter(
-            status=Shipment.Status.CREATED,
-            courier=None,
-            order__delivery_method=Order.DeliveryMethod.DELIVERY,
-        ).exclude(order__user=self.request.user).select_related("order", "order__user")
+        return (
+            available_queryset(zone_key(courier.city))
+            .exclude(order__user=self.request.user)
+            .select_related("order", "order__user", "relay_parcel__relay_point")
+            .prefetch_related("events", "order__items__product__vendor__vendor_profile")
+        )
 
-        if city:
-            from django.db.models import Q
 
-            city_filter = Q()
-            for variant in _city_variants(city):
-                city_filter |= Q(order__city__iexact=variant)
-            qs = qs.filter(city_filter)
+@extend_schema(
+    tags=["Shipping"],
+    summary="Jeton court pour ouvrir le flux SSE d'une livraison (EventSource)",
+    request=None,
+)
+class ShipmentStreamTokenView(APIView):
+    permission_classes = [IsAuthenticated]
 
-        return qs.order_by("created_at")
+    def post(self, request, order_id=None, id=None):
+        resolved, detail = stream_access(request.user, order_id=order_id, shipment_id=id)
+        if isinstance(resolved, int):
+            return Response({"detail": detail}, status=resolved)
+        if order_id is not None:
+            path = reverse("shipping-order-stream", kwargs={"order_id": order_id})
+        else:
+            path = reverse("shipping-shipment-stream", kwargs={"id": id})
+        return Response(
+            {"token": issue_stream_token(request.user, path), "stream_url": path, "expires_in": STREAM_TOKEN_SECONDS},
+            status=status.HTTP_200_OK,
+        )
+
+
+@extend_schema(tags=["Shipping"], summary="Nombre de livraisons disponibles dans la ville du livreur")
+class CourierAvailableShipmentsCountView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        courier = _get_active_courier(request.user)
+        city_key = zone_key(courier.city)
+        return Response(
+            {"city_key": city_key, "count": available_count(city_key, exclude_user_id=request.user.id)},
+            status=status.HTTP_200_OK,
+        )
 
 
 @extend_schema(tags=["Shipping"], summary="Réclamer une livraison disponible (auto-assignement)")
@@ -930,45 +839,29 @@ class CourierClaimShipmentView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, id):
-        _release_overdue_accepted_shipments()
         courier = _get_active_courier(request.user)
-
-        full_name = request.user.get_full_name().strip() or request.user.username
-        updated_count = Shipment.objects.filter(
-            id=id,
-            status=Shipment.Status.CREATED,
-            courier=None,
-        ).exclude(order__user=request.user).update(
-            courier=courier,
-            courier_name=full_name,
-            courier_phone=courier.phone or "",
-            status=Shipment.Status.ASSIGNED,
-        )
-
-        if updated_count == 0:
+        shipment, replayed = claim_shipment(courier, id, _idempotency_key(request))
+        if shipment is None:
             return Response(
                 {"detail": "Livraison déjà prise en charge, introuvable ou liée à votre propre commande."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        return _claimed_response(request, shipment, replayed)
 
-        shipment = Shipment.objects.select_related("order", "courier", "courier__user").get(id=id)
-
-        ShipmentEvent.objects.create(
-            shipment=shipment,
-            status=Shipment.Status.ASSIGNED,
-            message="Mission acceptée par le livreur",
-            location=courier.city or "",
-        )
-
-        order = shipment.order
-        order.assign_driver()
 
-        UserNotification.objects.create(
-            user=courier.user,
-            title=f"Livraison #{order.id} prise en charge",
-            message=f"Vous avez accepté la livraison vers {order.city} - {order.address}.",
-            notification_type=UserNotification.NotificationType.ORDER,
-            action_url="/courier",
-        )
+@extend_schema(
+    tags=["Shipping"],
+    summary="Prendre en charge la prochaine livraison disponible",
+    parameters=[OpenApiParameter(name="Idempotency-Key", required=False, type=str, location=OpenApiParameter.HEADER)],
+    responses={200: ShipmentSerializer, 204: None},
+)
+class CourierClaimNextShipmentView(generics.GenericAPIView):
+    serializer_class = ShipmentSerializer
+    permission_classes = [IsAuthenticated]
 
-        return Response(ShipmentSerializer(shipment, context={"request": request}).data, status=status.HTTP_200_OK)
+    def post(self, request):
+        courier = _get_active_courier(request.user)
+        shipment, replayed = claim_next(courier, _idempotency_key(request))
+        if shipment is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return _claimed_response(request, shipment, replayed)
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class VendorsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.vendors"
+
+    def ready(self):
+        # Instantané des statistiques vendeur tenu par signals
+        from . import stats  # noqa: F401
@@ -0,0 +1,14 @@
+# backend/apps/vendors/jobs.py
+# Tâches planifiées vendeurs (exécutées par run_scheduler).
+
+from apps.common.scheduler import periodic_job
+from . import stats
+
+
+@periodic_job("reconcile_vendor_stats", every=24 * 3600)
+def reconcile_vendor_stats():
+    """
+    Recalcule VendorStatsSnapshot pour tous les vendeurs : rattrape les
+    UPDATE en masse sur Product / Order qui ne passent pas par les signals.
+    """
+    return stats.reconcile_vendor_stats()
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.vendors.stats import reconcile_vendor_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule l'instantané des statistiques vendeur (produits, chiffre "
+        "d'affaires payé, commandes, note, dernière vente) depuis les produits, "
+        "commandes et avis (à planifier chaque nuit)."
+    )
+
+    def handle(self, *args, **opts):
+        refreshed = reconcile_vendor_stats()
+        self.stdout.write(self.style.SUCCESS(f"{refreshed} vendeur(s) recalculé(s)."))
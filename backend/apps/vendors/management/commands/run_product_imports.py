@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.vendors.product_import import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Exécute les imports CSV produits en attente (ProductImportJob). "
+        "--loop pour tourner en worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Tourne en continu (worker) au lieu d'un passage unique.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Pause (secondes) quand aucun import n'attend, en mode --loop.",
+        )
+
+    def handle(self, *args, **opts):
+        if not opts["loop"]:
+            self._log(run_pending_jobs())
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING("── Worker import CSV démarré ──"))
+        try:
+            while True:
+                done = run_pending_jobs(limit=1)
+                if done:
+                    self._log(done)
+                else:
+                    time.sleep(opts["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Worker import CSV arrêté.")
+
+    def _log(self, done):
+        self.stdout.write(self.style.SUCCESS(f"Imports traités : {done}"))
@@ -0,0 +1,83 @@
+# Generated by Django 5.1.15 on 2026-10-19 15:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.utils import timezone
+
+
+def backfill_vendor_stats(apps, schema_editor):
+    VendorProfile = apps.get_model("vendors", "VendorProfile")
+    VendorStatsSnapshot = apps.get_model("vendors", "VendorStatsSnapshot")
+    Product = apps.get_model("catalog", "Product")
+    OrderItem = apps.get_model("orders", "OrderItem")
+    ProductReview = apps.get_model("catalog", "ProductReview")
+
+    products = {
+        row["vendor_id"]: row
+        for row in Product.objects.filter(deleted_at__isnull=True)
+        .order_by()
+        .values("vendor_id")
+        .annotate(total=Count("id"), active=Count("id", filter=Q(is_active=True)))
+    }
+    sales = {
+        row["product__vendor_id"]: row
+        for row in OrderItem.objects.filter(order__payment_status="PAID")
+        .order_by()
+        .values("product__vendor_id")
+        .annotate(revenue=Sum("line_total_xaf"), orders=Count("order", distinct=True), last_sale=Max("order__created_at"))
+    }
+    reviews = {
+        row["product__vendor_id"]: row
+        for row in ProductReview.objects.filter(product__deleted_at__isnull=True, is_approved=True)
+        .order_by()
+        .values("product__vendor_id")
+        .annotate(total=Count("id"), avg=Avg("rating"))
+    }
+    now = timezone.now()
+    rows = []
+    for vendor_id, user_id in VendorProfile.objects.values_list("pk", "user_id").iterator(chunk_size=2000):
+        product, sale, review = products.get(user_id, {}), sales.get(user_id, {}), reviews.get(user_id, {})
+        rows.append(VendorStatsSnapshot(
+            vendor_id=vendor_id,
+            products_count=product.get("total", 0),
+            active_products_count=product.get("active", 0),
+            paid_orders_count=sale.get("orders", 0),
+            paid_revenue_xaf=sale.get("revenue") or 0,
+            last_sale_at=sale.get("last_sale"),
+            reviews_count=review.get("total", 0),
+            rating_avg=round(review["avg"], 2) if review.get("avg") is not None else None,
+            updated_at=now,
+        ))
+    VendorStatsSnapshot.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0007_systemlog'),
+        ('catalog', '0024_product_variant'),
+        ('orders', '0021_customer_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendorStatsSnapshot',
+            fields=[
+                ('vendor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats_snapshot', serialize=False, to='vendors.vendorprofile')),
+                ('products_count', models.IntegerField(default=0)),
+                ('active_products_count', models.IntegerField(default=0)),
+                ('paid_orders_count', models.IntegerField(default=0)),
+                ('paid_revenue_xaf', models.BigIntegerField(default=0)),
+                ('last_sale_at', models.DateTimeField(blank=True, null=True)),
+                ('reviews_count', models.IntegerField(default=0)),
+                ('rating_avg', models.DecimalField(blank=True, decimal_places=2, max_digits=3, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Statistiques vendeur',
+                'verbose_name_plural': 'Statistiques vendeurs',
+            },
+        ),
+        migrations.RunPython(backfill_vendor_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:10
+
+import apps.common.media
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0008_vendor_stats_snapshot'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='vendorprofile',
+            name='banner_image',
+            field=models.ImageField(blank=True, null=True, storage=apps.common.media.ContentAddressedStorage(), upload_to='vendors/banners/%Y/%m/'),
+        ),
+        migrations.AlterField(
+            model_name='vendorprofile',
+            name='profile_photo',
+            field=models.ImageField(blank=True, null=True, storage=apps.common.media.ContentAddressedStorage(), upload_to='vendors/photos/%Y/%m/'),
+        ),
+    ]
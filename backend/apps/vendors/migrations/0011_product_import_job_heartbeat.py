@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-19 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0010_product_import_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimportjob',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -4,6 +4,8 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils.text import slugify
 
+from apps.common.media import content_storage
+
 
 # ─── PLAN D'ABONNEMENT ────────────────────────────────────────────────────────
 
@@ -81,8 +83,8 @@ class VendorProfile(models.Model):
 
     # ── Boutique publique ────────────────────────────────────────────────────
     shop_slug         = models.SlugField(max_length=120, unique=True, blank=True)
-    banner_image      = models.ImageField(upload_to='vendors/banners/%Y/%m/', null=True, blank=True)
-    profile_photo     = models.ImageField(upload_to='vendors/photos/%Y/%m/', null=True, blank=True)
+    banner_image      = models.ImageField(upload_to='vendors/banners/%Y/%m/', storage=content_storage, null=True, blank=True)
+    profile_photo     = models.ImageField(upload_to='vendors/photos/%Y/%m/', storage=content_storage, null=True, blank=True)
     whatsapp_phone    = models.CharField(max_length=20, blank=True)
     default_withdrawal_operator = models.CharField(
         max_length=20,
@@ -164,6 +166,37 @@ class VendorProfile(models.Model):
         return 2000
 
 
+# ─── STATISTIQUES VENDEUR (instantané) ───────────────────────────────────────
+
+class VendorStatsSnapshot(models.Model):
+    """
+    Agrégats d'un vendeur lus par les listes admin, la carte, la file KYC et
+    la boutique publique, au lieu de COUNT / SUM par ligne. Tenus par F()
+    (apps.vendors.stats) à l'enregistrement des produits, au paiement et au
+    remboursement des commandes ; recalculés chaque nuit (reconcile_vendor_stats).
+    """
+    vendor = models.OneToOneField(
+        VendorProfile, on_delete=models.CASCADE, primary_key=True, related_name='stats_snapshot'
+    )
+    products_count        = models.IntegerField(default=0)
+    active_products_count = models.IntegerField(default=0)
+    # Commandes payées (PAID) contenant au moins un article du vendeur
+    paid_orders_count     = models.IntegerField(default=0)
+    paid_revenue_xaf      = models.BigIntegerField(default=0)
+    last_sale_at          = models.DateTimeField(null=True, blank=True)
+    # Avis approuvés sur les produits vivants du vendeur
+    reviews_count         = models.IntegerField(default=0)
+    rating_avg            = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True)
+    updated_at            = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Statistiques vendeur"
+        verbose_name_plural = "Statistiques vendeurs"
+
+    def __str__(self):
+        return f"Stats {self.vendor_id} — {self.paid_revenue_xaf} FCFA"
+
+
 # ─── HISTORIQUE ABONNEMENTS ───────────────────────────────────────────────────
 
 class VendorSubscription(models.Model):
@@ -480,4 +513,42 @@ class SystemLog(models.Model):
         ]
  
     def __str__(self):
-        return f'[{self.level}] [{self.service}] {self.message[:80]}'            
\ No newline at end of file
+        return f'[{self.level}] [{self.service}] {self.message[:80]}'            
+
+# ─── IMPORT CSV EN ARRIÈRE-PLAN ───────────────────────────────────────────────
+
+class ProductImportJob(models.Model):
+    """
+    Import CSV de produits exécuté par le worker `run_product_imports`
+    (gros catalogues). La ligne sert de suivi : le vendeur lit la progression
+    et le résultat via GET /api/vendors/products/import/jobs/<id>/.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'En attente'
+        RUNNING = 'RUNNING', 'En cours'
+        DONE    = 'DONE',    'Terminé'
+        FAILED  = 'FAILED',  'Échec'
+
+    vendor         = models.ForeignKey(User, on_delete=models.CASCADE, related_name='product_imports')
+    file           = models.FileField(upload_to='vendors/imports/%Y/%m/', blank=True)
+    dry_run        = models.BooleanField(default=False, verbose_name="Simulation")
+    status         = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING, db_index=True)
+    total_rows     = models.PositiveIntegerField(null=True, blank=True)
+    rows_processed = models.PositiveIntegerField(default=0)
+    created_count  = models.PositiveIntegerField(default=0)
+    error_count    = models.PositiveIntegerField(default=0)
+    errors         = models.JSONField(default=list, blank=True)  # 50 premières erreurs
+    message        = models.CharField(max_length=255, blank=True)
+    created_at     = models.DateTimeField(auto_now_add=True)
+    started_at     = models.DateTimeField(null=True, blank=True)
+    finished_at    = models.DateTimeField(null=True, blank=True)
+    updated_at     = models.DateTimeField(auto_now=True)  # signe de vie du worker
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Import CSV produits"
+        verbose_name_plural = "Imports CSV produits"
+
+    def __str__(self):
+        return f"Import #{self.pk} — {self.vendor} ({self.get_status_display()})"
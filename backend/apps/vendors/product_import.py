@@ -0,0 +1,415 @@
+# backend/apps/vendors/product_import.py
+# Moteur d'import CSV des produits vendeur.
+#   - lecture  : CSV lu en flux (TextIOWrapper sur le fichier uploadé), ligne
+#                par ligne ; seules les lignes analysées restent en mémoire
+#   - contrôle : passe de validation complète avant toute écriture (prix,
+#                stock, catégorie, attributs) ; catégories et attributs
+#                résolus en une requête chacun
+#   - écriture : une transaction ; slugs et ids (donc SKU automatiques)
+#                réservés en une requête chacun (apps.catalog.slugs), puis
+#                bulk_create des produits, stocks, valeurs d'attributs et audit
+#   - dry_run  : validation seule, rien n'est écrit
+#   - gros fichiers : ProductImportJob traité par le worker run_product_imports,
+#                progression enregistrée sur la ligne ; un import RUNNING
+#                sans signe de vie depuis STALE_AFTER (worker mort) passe en
+#                FAILED, fichier supprimé
+# Les bulk_create ne déclenchent pas les signals de Product : l'instantané
+# vendeur est recalculé et le journal d'audit écrit ici.
+
+import csv
+import io
+import logging
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from apps.accounts.notifications import notify
+from apps.catalog.models import Category, Inventory, Product, ProductAttribute, ProductAttributeValue
+from apps.catalog.slugs import allocate_slugs, reserve_ids, slug_base
+from apps.common.models import AuditLog
+from .models import ProductImportJob, VendorProfile
+from .stats import refresh_vendor_stats
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+PROGRESS_EVERY = 500
+MAX_ERRORS = 50
+STALE_AFTER = timedelta(minutes=30)
+ATTRIBUTE_PREFIX = "attribut"  # colonnes « Attribut : Taille » → valeurs séparées par | ou ,
+
+
+class RowError(Exception):
+    pass
+
+
+@dataclass
+class ProductRow:
+    line: int
+    title: str
+    category_name: str
+    price: int
+    stock: int
+    compare_at: int = None
+    threshold: int = None
+    sku: str = ""
+    description: str = ""
+    short_description: str = ""
+    attributes: dict = field(default_factory=dict)  # nom saisi → valeurs
+    category: Category = None
+    attribute_values: list = field(default_factory=list)  # [(ProductAttribute, valeurs)]
+
+
+# ─── Lecture ─────────────────────────────────────────────────────────────────
+
+def _cell(row, column):
+    return (row.get(column) or "").strip()
+
+
+def _integer(value):
+    return int(value.replace(" ", "").replace("\u202f", "").replace("\xa0", "") or 0)
+
+
+def _attribute_columns(fieldnames):
+    columns = {}
+    for name in fieldnames or ():
+        head, sep, attribute = (name or "").partition(":")
+        if sep and head.strip().lower() == ATTRIBUTE_PREFIX and attribute.strip():
+            columns[name] = attribute.strip()
+    return columns
+
+
+def parse_row(line, row, attribute_columns):
+    """Ligne CSV → ProductRow (lève RowError avec le message affiché au vendeur)."""
+    title = _cell(row, "Titre")
+    if not title:
+        raise RowError("Le titre est obligatoire.")
+    try:
+        price = _integer(_cell(row, "Prix (FCFA)"))
+    except ValueError:
+        raise RowError("Prix invalide.")
+    if price < 100:
+        raise RowError(f"Prix trop faible : {price} FCFA.")
+    try:
+        stock = max(_integer(_cell(row, "Stock")), 0)
+    except ValueError:
+        stock = 0
+
+    compare_at = None
+    if _cell(row, "Prix barré (FCFA)"):
+        try:
+            compare_at = _integer(_cell(row, "Prix barré (FCFA)"))
+        except ValueError:
+            compare_at = None
+        if compare_at is not None and compare_at <= price:
+            compare_at = None
+
+    threshold = None
+    if _cell(row, "Seuil alerte"):
+        try:
+            threshold = max(int(_cell(row, "Seuil alerte")), 0)
+        except ValueError:
+            threshold = None
+
+    attributes = {}
+    for column, name in attribute_columns.items():
+        values = [value.strip() for value in _cell(row, column).replace("|", ",").split(",") if value.strip()]
+        if values:
+            attributes[name] = values
+
+    return ProductRow(
+        line=line,
+        title=title[:200],
+        category_name=_cell(row, "Catégorie"),
+        price=price,
+        stock=stock,
+        compare_at=compare_at,
+        threshold=threshold,
+        sku=_cell(row, "SKU")[:60],
+        description=_cell(row, "Description"),
+        short_description=_cell(row, "Description courte")[:300],
+        attributes=attributes,
+    )
+
+
+def _text_stream(uploaded):
+    raw = uploaded
+    while hasattr(raw, "file"):  # UploadedFile / FieldFile → fichier binaire sous-jacent
+        raw = raw.file
+    raw.seek(0)
+    return io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")  # utf-8-sig gère le BOM Excel
+
+
+def count_rows(uploaded):
+    """Nombre de lignes de données (lecture en flux, sans analyse) ; sert à la progression."""
+    stream = _text_stream(uploaded)
+    try:
+        return max(sum(1 for _ in csv.reader(stream)) - 1, 0)
+    finally:
+        stream.detach()
+
+
+# ─── Résolution ──────────────────────────────────────────────────────────────
+
+def _resolve(rows, errors):
+    """Catégories et attributs en une requête chacun ; renvoie les lignes valides."""
+    names = {row.category_name.lower() for row in rows}
+    categories = {}
+    for category in Category.objects.filter(is_active=True).annotate(lname=Lower("name")).filter(lname__in=names):
+        categories.setdefault(category.lname, category)
+
+    attributes = {}
+    category_ids = {category.pk for category in categories.values()}
+    if any(row.attributes for row in rows):
+        for attribute in ProductAttribute.objects.filter(Q(category_id__in=category_ids) | Q(is_universal=True)):
+            attributes.setdefault((attribute.category_id, attribute.name.lower()), attribute)
+
+    valid = []
+    for row in rows:
+        row.category = categories.get(row.category_name.lower())
+        if row.category is None:
+            errors.append({"ligne": row.line, "erreur": f'Catégorie introuvable : "{row.category_name}".'})
+            continue
+        try:
+            row.attribute_values = [
+                _attribute_value(attributes, row.category, name, values) for name, values in row.attributes.items()
+            ]
+        except RowError as exc:
+            errors.append({"ligne": row.line, "erreur": str(exc)})
+            continue
+        valid.append(row)
+    return valid
+
+
+def _attribute_value(attributes, category, name, values):
+    attribute = attributes.get((category.pk, name.lower())) or attributes.get((None, name.lower()))
+    if attribute is None:
+        raise RowError(f'Attribut inconnu pour la catégorie "{category.name}" : "{name}".')
+    allowed = {str(value).lower(): value for value in attribute.values or []}
+    if not allowed:
+        return attribute, values
+    selected = []
+    for value in values:
+        if value.lower() not in allowed:
+            raise RowError(f'Valeur "{value}" non proposée pour l\'attribut "{attribute.name}".')
+        selected.append(allowed[value.lower()])
+    return attribute, selected
+
+
+# ─── Écriture ────────────────────────────────────────────────────────────────
+
+def write_products(vendor, rows):
+    """Crée les produits de `rows` (déjà validés) dans une transaction ; renvoie le nombre créé."""
+    max_length = Product._meta.get_field("slug").max_length
+    with transaction.atomic():
+        slugs = allocate_slugs(Product.all_objects, [slug_base(row.title, max_length, "produit") for row in rows])
+        products = [
+            Product(
+                pk=pk,
+                title=row.title,
+                slug=slug,
+                description=row.description,
+                short_description=row.short_description,
+                price_xaf=row.price,
+                compare_at_price=row.compare_at,
+                category=row.category,
+                vendor=vendor,
+                is_active=False,  # Inactif par défaut — modération
+                stock_threshold=row.threshold,
+                sku=row.sku,
+            )
+            for row, slug, pk in zip(rows, slugs, reserve_ids(Product, len(rows)))
+        ]
+        for product in products:
+            product.sku = product.sku or product.generate_sku()
+        Product.objects.bulk_create(products, batch_size=BATCH_SIZE)
+
+        Inventory.objects.bulk_create(
+            [Inventory(product=product, quantity=row.stock) for product, row in zip(products, rows)],
+            batch_size=BATCH_SIZE,
+        )
+        ProductAttributeValue.objects.bulk_create(
+            [
+                ProductAttributeValue(product=product, attribute=attribute, selected_values=values)
+                for product, row in zip(products, rows)
+                for attribute, values in row.attribute_values
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        content_type = ContentType.objects.get_for_model(Product)
+        AuditLog.objects.bulk_create(
+            [
+                AuditLog(
+                    action=AuditLog.Action.CREATE, content_type=content_type, actor=vendor,
+                    object_id=str(product.pk), object_repr=str(product)[:255],
+                )
+                for product in products
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        refresh_vendor_stats(VendorProfile.objects.filter(user=vendor).values_list("pk", flat=True))
+    return len(products)
+
+
+# ─── Import ──────────────────────────────────────────────────────────────────
+
+def import_products(vendor, uploaded, *, dry_run=False, max_rows=None, progress=None):
+    """
+    Importe le CSV `uploaded` pour `vendor`. Valide toutes les lignes, puis
+    écrit les valides (sauf `dry_run`). `progress(lignes lues)` est appelé
+    toutes les PROGRESS_EVERY lignes. Renvoie le résultat affiché au vendeur.
+    """
+    max_rows = max_rows or settings.PRODUCT_IMPORT_SYNC_MAX_ROWS
+    rows, errors, read = [], [], 0
+    stream = _text_stream(uploaded)
+    try:
+        reader = csv.DictReader(stream)
+        attribute_columns = _attribute_columns(reader.fieldnames)
+        for line, raw in enumerate(reader, start=2):  # Ligne 2 = première donnée
+            if read >= max_rows:
+                errors.append({"ligne": line, "erreur": f"Limite de {max_rows} produits par import atteinte."})
+                break
+            read += 1
+            try:
+                rows.append(parse_row(line, raw, attribute_columns))
+            except RowError as exc:
+                errors.append({"ligne": line, "erreur": str(exc)})
+            if progress and read % PROGRESS_EVERY == 0:
+                progress(read)
+    except (UnicodeDecodeError, csv.Error) as exc:
+        errors.append({"ligne": None, "erreur": f"Fichier illisible (CSV UTF-8 attendu) : {exc.__class__.__name__}."})
+        rows = []
+    finally:
+        stream.detach()
+
+    valid = _resolve(rows, errors) if rows else []
+    created = 0
+    if valid and not dry_run:
+        created = write_products(vendor, valid)
+    errors.sort(key=lambda error: error["ligne"] or 0)
+
+    if dry_run:
+        message = f"Simulation : {len(valid)} produit(s) importable(s). {len(errors)} erreur(s)."
+    else:
+        message = f"{created} produit(s) importé(s). {len(errors)} erreur(s)."
+    return {
+        "created": created,
+        "valid": len(valid),
+        "rows": read,
+        "dry_run": dry_run,
+        "error_count": len(errors),
+        "errors": errors[:MAX_ERRORS],
+        "message": message,
+    }
+
+
+# ─── Arrière-plan ────────────────────────────────────────────────────────────
+
+def claim_next_job():
+    """Passe le plus ancien import en attente à RUNNING (verrou skip_locked entre workers)."""
+    with transaction.atomic():
+        job = (
+            ProductImportJob.objects.select_for_update(skip_locked=True)
+            .filter(status=ProductImportJob.Status.PENDING)
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = ProductImportJob.Status.RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "started_at", "updated_at"])
+    return job
+
+
+def fail_stale_jobs():
+    """
+    Passe en FAILED les imports RUNNING sans signe de vie depuis STALE_AFTER
+    (worker arrêté en cours de route), supprime leur fichier et prévient le
+    vendeur. Pas de relance : l'écriture a pu aboutir avant l'arrêt.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            ProductImportJob.objects.select_for_update(skip_locked=True)
+            .filter(status=ProductImportJob.Status.RUNNING, updated_at__lt=now - STALE_AFTER)
+            .only("id", "vendor_id", "file")
+        )
+        if not jobs:
+            return 0
+        message = "Import interrompu (worker arrêté). Vérifiez vos produits puis relancez l'import."
+        ProductImportJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=ProductImportJob.Status.FAILED, file="", finished_at=now, updated_at=now, message=message,
+        )
+        for job in jobs:
+            notify(job.vendor_id, title="Import CSV interrompu", message=message, action_url="/seller/products")
+    for job in jobs:
+        job.file.delete(save=False)
+    return len(jobs)
+
+
+def run_job(job):
+    """Exécute un import claimé ; la ligne reflète la progression (hors transaction)."""
+    def progress(read):
+        ProductImportJob.objects.filter(pk=job.pk).update(rows_processed=read, updated_at=timezone.now())
+
+    try:
+        with job.file.open("rb") as handle:
+            ProductImportJob.objects.filter(pk=job.pk).update(
+                total_rows=count_rows(handle), updated_at=timezone.now(),
+            )
+            result = import_products(
+                job.vendor, handle, dry_run=job.dry_run,
+                max_rows=settings.PRODUCT_IMPORT_MAX_ROWS, progress=progress,
+            )
+    except Exception as exc:
+        ProductImportJob.objects.filter(pk=job.pk).update(
+            status=ProductImportJob.Status.FAILED, file="", finished_at=timezone.now(),
+            updated_at=timezone.now(), message=str(exc)[:255],
+        )
+        raise
+    finally:
+        job.file.delete(save=False)
+
+    ProductImportJob.objects.filter(pk=job.pk).update(
+        status=ProductImportJob.Status.DONE,
+        rows_processed=result["rows"],
+        created_count=result["created"],
+        error_count=result["error_count"],
+        errors=result["errors"],
+        message=result["message"],
+        file="",
+        finished_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+    notify(
+        job.vendor_id,
+        title="Import CSV terminé",
+        message=result["message"],
+        action_url="/seller/products",
+    )
+    return result
+
+
+def run_pending_jobs(limit=None):
+    """Traite les imports en attente ; renvoie le nombre d'imports exécutés."""
+    failed = fail_stale_jobs()
+    if failed:
+        logger.warning("%s import(s) CSV abandonné(s) passé(s) en échec", failed)
+    done = 0
+    while limit is None or done < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        try:
+            run_job(job)
+        except Exception:
+            logger.exception("Import CSV #%s en échec", job.pk)  # FAILED enregistré sur la ligne
+        done += 1
+    return done
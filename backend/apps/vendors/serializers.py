@@ -22,8 +22,9 @@ from .models import (
     VendorProfile, VendorOrderNote, WithdrawalRequest,
     SubscriptionPlan, VendorSubscription,
     RequiredDocumentType, ShopModificationRequest,
-    ShopModificationDocument, VendorLocation,
+    ShopModificationDocument, VendorLocation, ProductImportJob,
 )
+from apps.catalog.images import derivative_url
 from apps.catalog.models import (
     MasterProduct, ProductAttribute, ProductVariant, Brand, Category
 )
@@ -98,26 +99,22 @@ class VendorProfileSerializer(serializers.ModelSerializer):
         }
         return plan_names.get(obj.active_plan_code, obj.active_plan_code)
  
+    # ── Statistiques (VendorStatsSnapshot, à joindre par select_related) ────
+    def _snapshot(self, obj, field):
+        snapshot = getattr(obj, 'stats_snapshot', None)
+        return getattr(snapshot, field, 0) if snapshot else 0
+
     def get_total_products(self, obj):
-        from apps.catalog.models import Product
-        return Product.objects.filter(vendor=obj.user).count()
+        return self._snapshot(obj, 'products_count')
  
     def get_active_products(self, obj):
-        from apps.catalog.models import Product
-        return Product.objects.filter(vendor=obj.user, is_active=True).count()
+        return self._snapshot(obj, 'active_products_count')
  
     def get_total_revenue(self, obj):
-        from django.db.models import Sum
-        from apps.orders.models import OrderItem
-        return OrderItem.objects.filter(
-            product__vendor=obj.user
-        ).aggregate(t=Sum('line_total_xaf'))['t'] or 0
+        return self._snapshot(obj, 'paid_revenue_xaf')
  
     def get_total_orders(self, obj):
-        from apps.orders.models import OrderItem
-        return OrderItem.objects.filter(
-            product__vendor=obj.user
-        ).values('order').distinct().count()
+        return self._snapshot(obj, 'paid_orders_count')
 
 
 class VendorApplicationSerializer(serializers.ModelSerializer):
@@ -160,16 +157,27 @@ class VendorOrderItemSerializer(serializers.ModelSerializer):
 
     def get_product_image(self, obj):
         if obj.product and hasattr(obj.product, 'images'):
-            img = (
-                obj.product.images.filter(is_primary=True).first()
-                or obj.product.images.first()
-            )
-            if img and img.image:
-                request = self.context.get('request')
-                return request.build_absolute_uri(img.image.url) if request else img.image.url
+            # images.all() : profite du prefetch_related('product__images') des listes
+            images = list(obj.product.images.all())
+            img = next((image for image in images if image.is_primary), None) or (images[0] if images else None)
+            # Vignette 200 px WebP (l'original tant qu'elle n'est pas générée)
+            return derivative_url(img, 'thumb', self.context.get('request'))
         return None
 
 
+def vendor_order_items_prefetch(vendor):
+    """Prefetch des articles du vendeur (to_attr='vendor_items') pour VendorOrderSerializer."""
+    from django.db.models import Prefetch
+    return Prefetch(
+        'items',
+        queryset=OrderItem.objects.filter(product__vendor=vendor)
+        .select_related('product')
+        .prefetch_related('product__images')
+        .order_by('id'),
+        to_attr='vendor_items',
+    )
+
+
 class VendorOrderSerializer(serializers.ModelSerializer):
     """
     Commande vue vendeur.
@@ -234,7 +242,7 @@ class VendorOrderSerializer(serializers.ModelSerializer):
         Exemple : "Acheteur #A3F7"
         Le même acheteur aura toujours le même code → repérage sans identification.
         """
-        if obj.user:
+        if obj.user_id:
             raw  = hashlib.sha256(str(obj.user_id).encode()).hexdigest()
             code = raw[:4].upper()
             return f"Acheteur #{code}"
@@ -247,11 +255,15 @@ class VendorOrderSerializer(serializers.ModelSerializer):
     # ── Finances ─────────────────────────────────────────────────────────────
 
     def _vendor_items(self, obj):
+        # Listes : articles du vendeur préchargés (vendor_order_items_prefetch)
+        if hasattr(obj, 'vendor_items'):
+            return obj.vendor_items
         vendor = self.context.get('vendor')
         return obj.items.filter(product__vendor=vendor) if vendor else obj.items.none()
 
     def get_vendor_subtotal(self, obj) -> int:
-        return sum(item.line_total_xaf for item in self._vendor_items(obj))
+        vendor = self.context.get('vendor')
+        return obj.vendor_subtotal(vendor.id) if vendor else 0
 
     def get_commission_rate(self, obj) -> float:
         return float(obj.commission_rate_snapshot)
@@ -324,7 +336,7 @@ class VendorOrderSerializer(serializers.ModelSerializer):
                 'location': event.location,
                 'created_at': event.created_at,
             }
-            for event in shipment.events.all().order_by('created_at')
+            for event in sorted(shipment.events.all(), key=lambda event: event.created_at)
         ]
 
         timeline = sorted(
@@ -515,14 +527,14 @@ class AdminUserListSerializer(serializers.ModelSerializer):
         ]
  
     # ── Rôle vendeur ────────────────────────────────────────────────────────
-    def get_is_vendor(self, obj):
+    def get_is_vendor(self, obj) -> bool:
         return hasattr(obj, 'vendor_profile')
 
-    def get_is_courier(self, obj):
+    def get_is_courier(self, obj) -> bool:
         courier = getattr(obj, 'courier_profile', None)
         return bool(courier and courier.is_active)
 
-    def get_courier_status(self, obj):
+    def get_courier_status(self, obj) -> str | None:
         courier = getattr(obj, 'courier_profile', None)
         if not courier:
             return None
@@ -532,7 +544,7 @@ class AdminUserListSerializer(serializers.ModelSerializer):
             return 'PENDING'
         return 'INACTIVE'
 
-    def get_actor_roles(self, obj):
+    def get_actor_roles(self, obj) -> list[str]:
         roles = ['CLIENT']
         if hasattr(obj, 'vendor_profile'):
             roles.append('VENDOR')
@@ -545,54 +557,58 @@ class AdminUserListSerializer(serializers.ModelSerializer):
             roles.append('ADMIN')
         return roles
  
-    def get_vendor_status(self, obj):
+    def get_vendor_status(self, obj) -> str | None:
         if hasattr(obj, 'vendor_profile'):
             return obj.vendor_profile.status
         return None
  
-    def get_vendor_business_name(self, obj):
+    def get_vendor_business_name(self, obj) -> str | None:
         if hasattr(obj, 'vendor_profile'):
             return obj.vendor_profile.business_name
         return None
  
-    def get_vendor_plan(self, obj):
+    def get_vendor_plan(self, obj) -> str | None:
         """Retourne le code du plan actif : FREE | STARTER | PRO | BUSINESS"""
         if hasattr(obj, 'vendor_profile'):
             return obj.vendor_profile.active_plan_code
         return None
  
-    # ── Commandes ───────────────────────────────────────────────────────────
-    def get_orders_count(self, obj):
-        return obj.orders.count()
+    # ── Commandes (annotations de directory_queryset, sinon CustomerStats) ──
+    def _order_stat(self, obj, annotation, field):
+        value = getattr(obj, annotation, None)
+        if value is not None:
+            return value
+        stats = getattr(obj, 'order_stats', None)
+        return getattr(stats, field, 0) if stats else 0
 
-    def get_total_orders(self, obj):
+    def get_orders_count(self, obj) -> int:
+        return self._order_stat(obj, 'orders_count', 'orders_count')
+
+    def get_total_orders(self, obj) -> int:
         return self.get_orders_count(obj)
  
-    def get_total_spent(self, obj):
-        from django.db.models import Sum
-        return obj.orders.filter(
-            payment_status='PAID'
-        ).aggregate(t=Sum('total_xaf'))['t'] or 0
+    def get_total_spent(self, obj) -> int:
+        return self._order_stat(obj, 'total_spent', 'total_spent_xaf')
  
     # ── Profil & fidélité ────────────────────────────────────────────────────
-    def get_is_banned(self, obj):
+    def get_is_banned(self, obj) -> bool:
         profile = getattr(obj, 'profile', None)
         if profile:
             return getattr(profile, 'is_banned', False)
         return False
  
-    def get_loyalty_points(self, obj):
-        """Points = commandes payées × 100 (même logique que accounts/serializers.py)"""
-        return obj.orders.count() * 100
+    def get_loyalty_points(self, obj) -> int:
+        """Points = commandes × 100 (même logique que accounts/serializers.py)"""
+        return self.get_orders_count(obj) * 100
  
-    def get_loyalty_tier(self, obj):
+    def get_loyalty_tier(self, obj) -> str:
         points = self.get_loyalty_points(obj)
         if points >= 2000: return 'DIAMOND'
         if points >= 1000: return 'GOLD'
         if points >= 500:  return 'SILVER'
         return 'BRONZE'
  
-    def get_city(self, obj):
+    def get_city(self, obj) -> str | None:
         """Ville depuis VendorProfile (si vendeur) ou UserProfile"""
         courier = getattr(obj, 'courier_profile', None)
         if courier:
@@ -603,6 +619,23 @@ class AdminUserListSerializer(serializers.ModelSerializer):
         if profile:
             return getattr(profile, 'city', None)
         return None
+
+
+class AdminUserDirectoryTotalsSerializer(serializers.Serializer):
+    """Compteurs globaux de l'annuaire (indépendants des filtres)"""
+    total    = serializers.IntegerField()
+    vendors  = serializers.IntegerField()
+    couriers = serializers.IntegerField()
+    banned   = serializers.IntegerField()
+
+
+class AdminUserDirectoryPageSerializer(serializers.Serializer):
+    """Page de l'annuaire admin : enveloppe PageNumberPagination + totals"""
+    count    = serializers.IntegerField()
+    next     = serializers.URLField(allow_null=True)
+    previous = serializers.URLField(allow_null=True)
+    results  = AdminUserListSerializer(many=True)
+    totals   = AdminUserDirectoryTotalsSerializer()
     
 
 class AdminUserDetailSerializer(serializers.ModelSerializer):
@@ -1124,10 +1157,15 @@ class AdminOrderListSerializer(serializers.ModelSerializer):
         return "Invité"
 
     def get_items_count(self, obj):
-        return obj.items.count()
+        return obj.items_count
 
     def get_vendor_names(self, obj):
-        return list(obj.items.values_list('product__vendor__username', flat=True).distinct())
+        # context['vendor_usernames'] : {id: username} chargé une fois pour la page
+        names = self.context.get('vendor_usernames')
+        if names is None:
+            from django.contrib.auth.models import User
+            names = dict(User.objects.filter(id__in=obj.vendor_ids).values_list('id', 'username'))
+        return [names[vendor_id] for vendor_id in obj.vendor_ids if vendor_id in names]
 
     def get_commission_amount(self, obj):
         return round(obj.subtotal_xaf * float(obj.commission_rate_snapshot) / 100)
@@ -1143,6 +1181,27 @@ class AdminOrderListSerializer(serializers.ModelSerializer):
         }
 
 
+class AdminOrderTotalsSerializer(serializers.Serializer):
+    """KPIs de la liste admin, calculés sur l'ensemble filtré"""
+    total     = serializers.IntegerField()
+    pending   = serializers.IntegerField()
+    paid      = serializers.IntegerField()
+    failed    = serializers.IntegerField()
+    refunded  = serializers.IntegerField()
+    revenue   = serializers.IntegerField()
+    delivered = serializers.IntegerField()
+    cancelled = serializers.IntegerField()
+
+
+class AdminOrderPageSerializer(serializers.Serializer):
+    """Page de la liste admin des commandes : enveloppe PageNumberPagination + totals"""
+    count    = serializers.IntegerField()
+    next     = serializers.URLField(allow_null=True)
+    previous = serializers.URLField(allow_null=True)
+    results  = AdminOrderListSerializer(many=True)
+    totals   = AdminOrderTotalsSerializer()
+
+
 class AdminOrderDetailSerializer(serializers.ModelSerializer):
     customer_name        = serializers.SerializerMethodField()
     items                = serializers.SerializerMethodField()
@@ -1758,4 +1817,15 @@ class SubscriptionPlanSerializer(serializers.ModelSerializer):
             'commission_rate', 'max_products', 'max_boosts_month',
             'features', 'trial_days', 'plan_duration_days',
             'display_order',
-        ]    
+        ]
+ 
+ 
+class ProductImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model  = ProductImportJob
+        fields = [
+            'id', 'status', 'dry_run', 'total_rows', 'rows_processed',
+            'created_count', 'error_count', 'errors', 'message',
+            'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
@@ -0,0 +1,206 @@
+# backend/apps/vendors/stats.py
+# Instantané des statistiques vendeur (VendorStatsSnapshot).
+#   - produits : post_save / post_delete de Product → ±1 par F() selon
+#     (vendeur, actif, vivant) chargé (Product.listing_key)
+#   - ventes   : post_save d'Order quand payment_status entre dans PAID ou en
+#     sort (remboursement) → ± chiffre d'affaires et commandes, un UPDATE
+#     pour tous les vendeurs de la commande
+#   - note     : post_save / post_delete de ProductReview → note moyenne du
+#     vendeur recalculée (une agrégation)
+#   - refresh_vendor_stats() / reconcile_vendor_stats() : recalcul ensembliste,
+#     commande reconcile_vendor_stats et job nocturne (les UPDATE en masse sur
+#     Product ou Order ne passent pas par les signals)
+
+from django.db import transaction
+from django.db.models import Avg, Case, Count, F, Max, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.catalog.models import Product, ProductReview
+from apps.orders.models import Order, OrderItem
+from .models import VendorProfile, VendorStatsSnapshot
+
+RECONCILE_BATCH = 500
+_STAT_FIELDS = [
+    "products_count", "active_products_count", "paid_orders_count", "paid_revenue_xaf",
+    "last_sale_at", "reviews_count", "rating_avg", "updated_at",
+]
+
+
+def _round_rating(value):
+    return round(value, 2) if value is not None else None
+
+
+# ─── Recalcul ────────────────────────────────────────────────────────────────
+
+def refresh_vendor_stats(vendor_ids):
+    """Recalcule l'instantané des VendorProfile de `vendor_ids` (quatre requêtes)."""
+    users = dict(VendorProfile.objects.filter(pk__in=set(vendor_ids)).values_list("user_id", "pk"))
+    if not users:
+        return 0
+
+    products = {
+        row["vendor_id"]: row
+        for row in Product.objects.filter(vendor_id__in=users)
+        .order_by()
+        .values("vendor_id")
+        .annotate(total=Count("id"), active=Count("id", filter=Q(is_active=True)))
+    }
+    sales = {
+        row["product__vendor_id"]: row
+        for row in OrderItem.objects.filter(
+            product__vendor_id__in=users, order__payment_status=Order.PaymentStatus.PAID,
+        )
+        .order_by()
+        .values("product__vendor_id")
+        .annotate(
+            revenue=Sum("line_total_xaf"),
+            orders=Count("order", distinct=True),
+            last_sale=Max("order__created_at"),
+        )
+    }
+    reviews = {
+        row["product__vendor_id"]: row
+        for row in ProductReview.objects.filter(
+            product__vendor_id__in=users, product__deleted_at__isnull=True, is_approved=True,
+        )
+        .order_by()
+        .values("product__vendor_id")
+        .annotate(total=Count("id"), avg=Avg("rating"))
+    }
+
+    rows = []
+    for user_id, vendor_id in users.items():
+        product, sale, review = products.get(user_id, {}), sales.get(user_id, {}), reviews.get(user_id, {})
+        rows.append(VendorStatsSnapshot(
+            vendor_id=vendor_id,
+            products_count=product.get("total", 0),
+            active_products_count=product.get("active", 0),
+            paid_orders_count=sale.get("orders", 0),
+            paid_revenue_xaf=sale.get("revenue") or 0,
+            last_sale_at=sale.get("last_sale"),
+            reviews_count=review.get("total", 0),
+            rating_avg=_round_rating(review.get("avg")),
+        ))
+    VendorStatsSnapshot.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=["vendor"], update_fields=_STAT_FIELDS,
+    )
+    return len(rows)
+
+
+def reconcile_vendor_stats():
+    """Recalcule l'instantané de tous les vendeurs, par lots de RECONCILE_BATCH."""
+    refreshed, last_id = 0, 0
+    while True:
+        vendor_ids = list(
+            VendorProfile.objects.filter(pk__gt=last_id).order_by("pk").values_list("pk", flat=True)[:RECONCILE_BATCH]
+        )
+        if not vendor_ids:
+            return refreshed
+        with transaction.atomic():
+            refreshed += refresh_vendor_stats(vendor_ids)
+        last_id = vendor_ids[-1]
+
+
+# ─── Tenue à jour ────────────────────────────────────────────────────────────
+
+@receiver(post_save, sender=VendorProfile, dispatch_uid="vendors_stats_profile_created")
+def _vendor_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        VendorStatsSnapshot.objects.get_or_create(vendor=instance)
+
+
+def _adjust_products(user_id, products, active):
+    if user_id and (products or active):
+        VendorStatsSnapshot.objects.filter(vendor__user_id=user_id).update(
+            products_count=F("products_count") + products,
+            active_products_count=F("active_products_count") + active,
+            updated_at=timezone.now(),
+        )
+
+
+@receiver(post_save, sender=Product, dispatch_uid="vendors_stats_product_saved")
+def _product_saved(sender, instance, created, **kwargs):
+    current = instance.listing_key()
+    previous = (None, False, False) if created else getattr(instance, "_loaded_listing", None)
+    instance._loaded_listing = current
+    if previous == current:
+        return
+    if previous is None or current is None:
+        # Champs non chargés (only / defer) : recalcul du vendeur
+        vendor_ids = VendorProfile.objects.filter(user_id=instance.vendor_id).values_list("pk", flat=True)
+        refresh_vendor_stats(vendor_ids)
+        return
+
+    old_vendor, old_active, old_alive = previous
+    new_vendor, new_active, new_alive = current
+    if old_vendor == new_vendor:
+        _adjust_products(new_vendor, int(new_alive) - int(old_alive),
+                         int(new_alive and new_active) - int(old_alive and old_active))
+        return
+    _adjust_products(old_vendor, -int(old_alive), -int(old_alive and old_active))
+    _adjust_products(new_vendor, int(new_alive), int(new_alive and new_active))
+
+
+@receiver(post_delete, sender=Product, dispatch_uid="vendors_stats_product_deleted")
+def _product_deleted(sender, instance, **kwargs):
+    if instance.deleted_at is None:
+        _adjust_products(instance.vendor_id, -1, -int(instance.is_active))
+
+
+@receiver(post_save, sender=Order, dispatch_uid="vendors_stats_order_saved")
+def _order_saved(sender, instance, created, **kwargs):
+    current = instance.__dict__.get("payment_status")
+    previous = None if created else getattr(instance, "_loaded_payment_status", None)
+    instance._loaded_payment_status = current
+    if current is None or (previous is None and not created):
+        return
+    sign = int(current == Order.PaymentStatus.PAID) - int(previous == Order.PaymentStatus.PAID)
+    if sign:
+        apply_order_sales(instance, sign)
+
+
+def apply_order_sales(order, sign):
+    """±(chiffre d'affaires, commande) de `order` sur chacun de ses vendeurs. Un seul UPDATE."""
+    lines = {
+        row["vendor_id"]: row["revenue"] or 0
+        for row in OrderItem.objects.filter(order=order, product__vendor__vendor_profile__isnull=False)
+        .order_by()
+        .values(vendor_id=F("product__vendor__vendor_profile"))
+        .annotate(revenue=Sum("line_total_xaf"))
+    }
+    if not lines:
+        return
+    updates = {
+        "paid_revenue_xaf": F("paid_revenue_xaf") + Case(
+            *[When(vendor_id=vendor_id, then=Value(sign * revenue)) for vendor_id, revenue in lines.items()],
+            default=Value(0),
+        ),
+        "paid_orders_count": F("paid_orders_count") + sign,
+        "updated_at": timezone.now(),
+    }
+    if sign > 0 and order.created_at:
+        updates["last_sale_at"] = Greatest(Coalesce(F("last_sale_at"), Value(order.created_at)), Value(order.created_at))
+    VendorStatsSnapshot.objects.filter(vendor_id__in=list(lines)).update(**updates)
+
+
+def refresh_vendor_rating(user_id):
+    """Note moyenne et nombre d'avis approuvés du vendeur `user_id` (utilisateur)."""
+    rating = ProductReview.objects.filter(
+        product__vendor_id=user_id, product__deleted_at__isnull=True, is_approved=True,
+    ).aggregate(total=Count("id"), avg=Avg("rating"))
+    VendorStatsSnapshot.objects.filter(vendor__user_id=user_id).update(
+        reviews_count=rating["total"],
+        rating_avg=_round_rating(rating["avg"]),
+        updated_at=timezone.now(),
+    )
+
+
+@receiver(post_save, sender=ProductReview, dispatch_uid="vendors_stats_review_saved")
+@receiver(post_delete, sender=ProductReview, dispatch_uid="vendors_stats_review_deleted")
+def _review_changed(sender, instance, **kwargs):
+    vendor_id = Product.all_objects.filter(pk=instance.product_id).values_list("vendor_id", flat=True).first()
+    if vendor_id:
+        refresh_vendor_rating(vendor_id)
@@ -47,6 +47,7 @@ urlpatterns = [
 
      # Import CSV produits
      path('products/import/csv/', views.vendor_import_products_csv, name='vendor-import-products-csv'),
+     path('products/import/jobs/<int:job_id>/', views.vendor_product_import_job, name='vendor-product-import-job'),
      
      # Fiche produit PDF/HTML
      path('products/<int:product_id>/pdf/', views.vendor_product_pdf, name='vendor-product-pdf'),    
@@ -148,6 +149,7 @@ urlpatterns = [
     path('admin/orders/<int:order_id>/',             views.admin_order_detail,      name='admin-order-detail'),
     path('admin/orders/<int:order_id>/update/',      views.admin_update_order,      name='admin-update-order'),
     path('admin/orders/<int:order_id>/cancel/',      views.admin_cancel_order,      name='admin-cancel-order'),
+    path('admin/shipments/dispatch/',                views.admin_dispatch_pending,  name='admin-dispatch-pending'),
     path('admin/orders/export/csv/',                 views.admin_export_orders_csv, name='admin-export-orders-csv'),
 
     #  ADMINISTRATION - UTILISATEURS 
@@ -16,6 +16,7 @@ from rest_framework.permissions import IsAdminUser
 from django.utils import timezone
 from datetime import timedelta, date
 from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
 from django.http import HttpResponse
 from django.db import transaction
 
@@ -31,13 +32,14 @@ from .serializers import (
     ShopModificationRequestSerializer, ShopModificationDocumentSerializer,
     RequiredDocumentTypeSerializer, SubscriptionPlanSerializer,
 )
-from django.core.mail import send_mail
+from apps.common.mail import queue_email
 from django.conf import settings as django_settings
 from .serializers import (
     VendorProfileSerializer, 
     VendorApplicationSerializer,
     VendorStatsSerializer,
     VendorOrderSerializer,
+    vendor_order_items_prefetch,
     UpdateFulfillmentStatusSerializer,
     UpdatePaymentStatusSerializer,
     AdminProductUpdateSerializer,
@@ -51,7 +53,11 @@ from .serializers import (
     VendorDisputeMessageCreateSerializer,
     VendorDisputeEvidenceSerializer,
     VendorDisputeMessageSerializer,
+    AdminUserDirectoryPageSerializer,
+    AdminOrderPageSerializer,
 )
+from apps.catalog.images import derivative_url, srcset
+from apps.common.media import retain
 from apps.catalog.models import Product, ProductImage
 from apps.catalog.serializers import ProductImageSerializer, ProductSerializer, ProductCreateUpdateSerializer
 from apps.orders.models import Order, OrderItem
@@ -194,6 +200,7 @@ class VendorProductViewSet(viewsets.ModelViewSet):
     def duplicate(self, request, pk=None):
         """
         Duplique un produit avec toutes ses images et attributs.
+        Les images partagent les fichiers de l'original (aucune copie disque).
         Nouveau titre : "Copie de {titre original}"
         Nouveau SKU : auto-généré après création
         Stock initial : 0 (le vendeur doit le renseigner)
@@ -231,8 +238,16 @@ class VendorProductViewSet(viewsets.ModelViewSet):
                     selected_values = attr_val.selected_values,
                 )
  
-            # Note : on ne duplique pas les images (fichiers physiques)
-            # Le vendeur devra en rajouter manuellement
+            # Images : stockage adressé par contenu → on copie les lignes
+            # (nom du fichier, dérivés), sans copier aucun fichier
+            images = ProductImage.objects.bulk_create([
+                ProductImage(
+                    product=copy, image=image.image.name, is_primary=image.is_primary, order=image.order,
+                    width=image.width, height=image.height, derivatives=image.derivatives,
+                )
+                for image in original.images.all()
+            ])
+            retain(image.image.name for image in images)
  
             from apps.catalog.serializers import ProductSerializer
             serializer = ProductSerializer(copy, context={'request': request})
@@ -372,6 +387,8 @@ def upload_product_image(request, product_id):
         # ON PASSE LE PRODUIT EXPLICITEMENT — c'est le fix du bug 500.
         # validated_data sera étendu avec product=product avant la création.
         image = serializer.save(product=product)
+    # Dérivés WebP générés au commit (apps.catalog.images) : on relit la ligne
+    image.refresh_from_db(fields=['width', 'height', 'derivatives'])
  
     return Response(
         ProductImageSerializer(image, context={'request': request}).data,
@@ -431,9 +448,18 @@ def upload_master_image(request, master_id):
             master=master, image=image_file,
             is_primary=(current == 0), order=current,
         )
+    img.refresh_from_db(fields=['width', 'height', 'derivatives'])
 
     return Response(
-        {'id': img.id, 'image': request.build_absolute_uri(img.image.url), 'is_primary': img.is_primary},
+        {
+            'id': img.id,
+            'image': request.build_absolute_uri(img.image.url),
+            'thumbnail': derivative_url(img, 'thumb', request),
+            'srcset': srcset(img, request),
+            'width': img.width,
+            'height': img.height,
+            'is_primary': img.is_primary,
+        },
         status=status.HTTP_201_CREATED,
     )
 
@@ -491,9 +517,8 @@ def delete_product_image(request, product_id, image_id):
     product = image.product
  
     with transaction.atomic():
-        # .delete() supprime aussi le fichier physique grâce au signal
-        # post_delete (à vérifier — sinon, ajouter image.image.delete(save=False))
-        image.image.delete(save=False)  # nettoyage explicite du fichier
+        # Le fichier peut être partagé (autres offres, fiche) : il est libéré
+        # par `media_gc` quand plus aucune ligne ne le référence
         image.delete()
  
         # Promouvoir une autre image en principale si nécessaire
@@ -595,11 +620,11 @@ def vendor_orders(request):
                 status=status.HTTP_403_FORBIDDEN,
             )
  
+        # vendor_ids (index GIN) : ni jointure sur les articles ni DISTINCT
         orders = (
-            Order.objects.filter(items__product__vendor=request.user)
+            Order.objects.filter(vendor_ids__contains=[request.user.id])
             .select_related('shipment')
-            .prefetch_related('shipment__events')
-            .distinct()
+            .prefetch_related('shipment__events', vendor_order_items_prefetch(request.user))
             .order_by('-created_at')
         )
  
@@ -1304,14 +1329,17 @@ def vendor_export_products_csv(request):
     description=(
         "Importe des produits depuis un fichier CSV. "
         "Colonnes requises : Titre, Catégorie (nom), Prix (FCFA), Stock. "
-        "Colonnes optionnelles : Description, Description courte, Prix barré, SKU, Seuil alerte. "
-        "Format attendu : UTF-8 avec BOM. Max 500 lignes."
+        "Colonnes optionnelles : Description, Description courte, Prix barré, SKU, Seuil alerte, "
+        "« Attribut : <nom> » (valeurs séparées par | ou ,). "
+        "Format attendu : UTF-8 avec BOM. Max 2000 lignes traitées dans la requête. "
+        "dry_run=true : validation seule. Fichier volumineux ou background=true : import en "
+        "arrière-plan (202 + suivi via products/import/jobs/<id>/)."
     ),
 )
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def vendor_import_products_csv(request):
-    """Import CSV de produits pour le vendeur."""
+    """Import CSV de produits pour le vendeur (moteur : apps.vendors.product_import)."""
     try:
         vendor_profile = VendorProfile.objects.get(user=request.user)
         if not vendor_profile.is_active_vendor:
@@ -1324,87 +1352,44 @@ def vendor_import_products_csv(request):
         if not file.name.endswith('.csv'):
             return Response({'detail': 'Seuls les fichiers .csv sont acceptés.'}, status=400)
  
-        import csv, io
-        from apps.catalog.models import Product, Category, Inventory
- 
-        content = file.read().decode('utf-8-sig')  # utf-8-sig gère le BOM Excel
-        reader  = csv.DictReader(io.StringIO(content))
- 
-        created_count = 0
-        errors        = []
- 
-        for i, row in enumerate(reader, start=2):  # Ligne 2 = première donnée
-            if i > 502:  # Max 500 lignes
-                errors.append({'ligne': i, 'erreur': 'Limite de 500 produits par import atteinte.'})
-                break
- 
-            titre = (row.get('Titre') or '').strip()
-            if not titre:
-                errors.append({'ligne': i, 'erreur': 'Le titre est obligatoire.'})
-                continue
- 
-            cat_name = (row.get('Catégorie') or '').strip()
-            category = Category.objects.filter(name__iexact=cat_name, is_active=True).first()
-            if not category:
-                errors.append({'ligne': i, 'erreur': f'Catégorie introuvable : "{cat_name}".'})
-                continue
- 
-            try:
-                price = int(row.get('Prix (FCFA)', '0').replace(' ', '').replace('\u202f', '') or 0)
-            except ValueError:
-                errors.append({'ligne': i, 'erreur': 'Prix invalide.'})
-                continue
- 
-            if price < 100:
-                errors.append({'ligne': i, 'erreur': f'Prix trop faible : {price} FCFA.'})
-                continue
- 
-            try:
-                stock = int(row.get('Stock', '0') or 0)
-            except ValueError:
-                stock = 0
+        from .models import ProductImportJob
+        from .product_import import import_products
+        from .serializers import ProductImportJobSerializer
+
+        dry_run    = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'oui')
+        background = str(request.data.get('background', '')).lower() in ('1', 'true', 'oui')
  
-            compare_at = None
-            if row.get('Prix barré (FCFA)'):
-                try:
-                    compare_at = int(row['Prix barré (FCFA)'].replace(' ', '') or 0)
-                    if compare_at <= price:
-                        compare_at = None
-                except ValueError:
-                    compare_at = None
- 
-            threshold = None
-            if row.get('Seuil alerte'):
-                try:
-                    threshold = int(row['Seuil alerte'])
-                except ValueError:
-                    threshold = None
- 
-            product = Product.objects.create(
-                title             = titre[:200],
-                description       = (row.get('Description') or '').strip(),
-                short_description = (row.get('Description courte') or '').strip()[:300],
-                price_xaf         = price,
-                compare_at_price  = compare_at,
-                category          = category,
-                vendor            = request.user,
-                is_active         = False,  # Inactif par défaut — modération
-                stock_threshold   = threshold,
-                sku               = (row.get('SKU') or '').strip()[:60],
-            )
-            Inventory.objects.create(product=product, quantity=stock)
-            created_count += 1
+        # Gros catalogue : ligne de suivi + worker run_product_imports
+        if background or file.size > django_settings.PRODUCT_IMPORT_SYNC_MAX_BYTES:
+            job = ProductImportJob.objects.create(vendor=request.user, file=file, dry_run=dry_run)
+            return Response(ProductImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
  
-        return Response({
-            'created': created_count,
-            'errors':  errors[:50],  # Max 50 erreurs retournées
-            'message': f'{created_count} produit(s) importé(s). {len(errors)} erreur(s).',
-        }, status=status.HTTP_201_CREATED if created_count > 0 else status.HTTP_400_BAD_REQUEST)
+        result = import_products(request.user, file, dry_run=dry_run)
+        if dry_run:
+            response_status = status.HTTP_200_OK
+        else:
+            response_status = status.HTTP_201_CREATED if result['created'] > 0 else status.HTTP_400_BAD_REQUEST
+        return Response(result, status=response_status)
  
     except VendorProfile.DoesNotExist:
         return Response({'detail': 'Profil vendeur introuvable.'}, status=404)
  
  
+@extend_schema(tags=["Vendors"], summary="Product CSV import job status")
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def vendor_product_import_job(request, job_id):
+    """Progression et résultat d'un import CSV en arrière-plan."""
+    from .models import ProductImportJob
+    from .serializers import ProductImportJobSerializer
+
+    try:
+        job = ProductImportJob.objects.get(pk=job_id, vendor=request.user)
+    except ProductImportJob.DoesNotExist:
+        return Response({'detail': 'Import introuvable.'}, status=404)
+    return Response(ProductImportJobSerializer(job).data)
+ 
+ 
 @extend_schema(
     tags=["Vendors"],
     summary="Download product PDF sheet",
@@ -1941,7 +1926,9 @@ def vendor_dispute_upload_evidence(request, dispute_id):
 @permission_classes([IsAdminUser])
 def admin_list_vendors(request):
     """Liste tous les vendeurs avec filtre optionnel par statut"""
-    vendors = VendorProfile.objects.all().select_related('user').order_by('-created_at')
+    vendors = VendorProfile.objects.select_related(
+        'user', 'current_plan', 'stats_snapshot',
+    ).order_by('-created_at')
     
     # Filtre optionnel par statut
     status = request.query_params.get('status')
@@ -2547,23 +2534,25 @@ def admin_vendors_map(request):
     Distribution géographique des vendeurs par ville.
     Retourne les données pour la visualisation SVG Cameroun.
     """
-    from django.db.models import Sum, Count
- 
-    approved = VendorProfile.objects.filter(status='APPROVED').select_related('user')
-    all_vp   = VendorProfile.objects.select_related('user')
+    from django.db.models.functions import Coalesce
  
-    # Agréger par ville
+    # Agréger par ville en SQL (GMV = CA payé de l'instantané vendeur)
     city_data: dict = {}
-    for vp in all_vp:
-        city = vp.city or 'Autre'
-        if city not in city_data:
-            city_data[city] = {'city': city, 'count': 0, 'approved': 0, 'pending': 0, 'gmv': 0, 'lat': 0, 'lng': 0}
-        city_data[city]['count'] += 1
-        if vp.status == 'APPROVED':
-            city_data[city]['approved'] += 1
-            city_data[city]['gmv'] += getattr(vp, 'total_revenue', 0) or 0
-        if vp.status == 'PENDING':
-            city_data[city]['pending'] += 1
+    by_city = (
+        VendorProfile.objects.order_by()
+        .values('city')
+        .annotate(
+            count=Count('id'),
+            approved=Count('id', filter=Q(status='APPROVED')),
+            pending=Count('id', filter=Q(status='PENDING')),
+            gmv=Coalesce(Sum('stats_snapshot__paid_revenue_xaf', filter=Q(status='APPROVED')), 0),
+        )
+    )
+    for row in by_city:
+        city = row['city'] or 'Autre'
+        data = city_data.setdefault(city, {'city': city, 'count': 0, 'approved': 0, 'pending': 0, 'gmv': 0, 'lat': 0, 'lng': 0})
+        for key in ('count', 'approved', 'pending', 'gmv'):
+            data[key] += row[key]
  
     # Coordonnées approximatives des villes camerounaises (lat/lng)
     COORDS = {
@@ -2587,16 +2576,20 @@ def admin_vendors_map(request):
  
     cities_list.sort(key=lambda x: -x['count'])
  
-    # Liste des boutiques pour le panneau latéral
+    # Liste des boutiques pour le panneau latéral (meilleur CA d'abord)
+    approved = VendorProfile.objects.filter(status='APPROVED').select_related('stats_snapshot').order_by(
+        F('stats_snapshot__paid_revenue_xaf').desc(nulls_last=True), 'id',
+    )
     vendors_list = []
     for vp in approved[:100]:
+        snapshot = getattr(vp, 'stats_snapshot', None)
         vendors_list.append({
             'id':                vp.id,
             'business_name':     vp.business_name,
             'city':              vp.city or 'N/A',
             'status':            vp.status,
             'certification_tier':vp.certification_tier or 'BRONZE',
-            'total_revenue':     getattr(vp, 'total_revenue', 0) or 0,
+            'total_revenue':     snapshot.paid_revenue_xaf if snapshot else 0,
         })
  
     top_city = cities_list[0]['city'] if cities_list else 'N/A'
@@ -2604,7 +2597,7 @@ def admin_vendors_map(request):
     return Response({
         'cities':        cities_list,
         'vendors':       vendors_list,
-        'total_approved':approved.count(),
+        'total_approved':sum(c['approved'] for c in cities_list),
         'total_cities':  len([c for c in cities_list if c['approved'] > 0]),
         'top_city':      top_city,
     })  
@@ -2612,53 +2605,9 @@ def admin_vendors_map(request):
 
     
 def _get_target_customers(filters: dict):
-    """
-    Retourne un queryset d'utilisateurs selon les filtres :
-      - audience : 'all' | 'city' | 'tier' | 'user'
-      - city     : str (si audience == 'city')
-      - tier     : str BRONZE|SILVER|GOLD|DIAMOND (si audience == 'tier')
-      - user_id  : int (si audience == 'user')
-    N'inclut que les acheteurs actifs non bannis.
-    """
-    audience = filters.get('audience', 'all')
- 
-    # Base : acheteurs actifs non bannis
-    qs = User.objects.filter(is_active=True, is_staff=False)
- 
-    if audience == 'all':
-        pass  # Tous les clients
- 
-    elif audience == 'city':
-        city = filters.get('city', '')
-        if city:
-            # Cherche dans le profil vendeur ou le profil utilisateur
-            from django.db.models import Q
-            qs = qs.filter(
-                Q(vendor_profile__city__iexact=city) |
-                Q(profile__city__iexact=city)
-            ).distinct()
- 
-    elif audience == 'tier':
-        tier = filters.get('tier', 'BRONZE')
-        # Le tier est dans VendorProfile pour les vendeurs
-        # Pour les acheteurs, on utilise loyalty_tier dans UserProfile si disponible
-        from django.db.models import Q
-        qs = qs.filter(
-            Q(vendor_profile__certification_tier=tier) |
-            Q(profile__loyalty_tier=tier)
-        ).distinct()
- 
-    elif audience == 'user':
-        user_id = filters.get('user_id')
-        if user_id:
-            qs = qs.filter(id=user_id)
-        else:
-            qs = qs.none()
- 
-    # Exclure les utilisateurs bannis
-    qs = qs.exclude(profile__is_banned=True)
- 
-    return qs
+    """Ciblage clients — voir apps.accounts.broadcasts.customer_targets."""
+    from apps.accounts.broadcasts import customer_targets
+    return customer_targets(filters)
  
  
 @extend_schema(tags=["Admin"], summary="Preview customer broadcast audience count")
@@ -2693,12 +2642,11 @@ def admin_customers_broadcast_preview(request):
 def admin_customers_broadcast(request):
     """
     Envoie une notification à l'audience cible.
-    Crée un UserNotification pour chaque destinataire.
-    Stocke l'historique dans le cache Redis (max 50 entrées).
+    Crée un BroadcastJob : exécuté tout de suite s'il est petit, sinon par le
+    worker `run_broadcasts` (insertion par lots). Le job sert d'historique.
     """
-    import json
-    from django.core.cache import cache
-    from apps.accounts.models import UserNotification
+    from apps.accounts.broadcasts import create_job
+    from apps.accounts.models import BroadcastJob
  
     title     = request.data.get('title', '').strip()
     message   = request.data.get('message', '').strip()
@@ -2714,52 +2662,21 @@ def admin_customers_broadcast(request):
     if not title or not message:
         return Response({'detail': 'Titre et message requis.'}, status=400)
  
-    qs    = _get_target_customers(filters)
-    users = list(qs)
-    count = len(users)
- 
-    if count == 0:
-        return Response({'detail': 'Aucun utilisateur ciblé avec ces filtres.'}, status=400)
- 
-    # Créer les notifications en bulk
-    notifications = [
-        UserNotification(
-            user=u,
-            title=title,
-            message=message,
-            notification_type=notif_type,
-            action_url=action_url,
+    try:
+        job = create_job(
+            title=title, message=message, notification_type=notif_type,
+            action_url=action_url, scope=BroadcastJob.Scope.CUSTOMERS,
+            filters=filters, created_by=request.user,
         )
-        for u in users
-    ]
-    UserNotification.objects.bulk_create(notifications, batch_size=500)
- 
-    # Stocker dans l'historique cache (max 50)
-    HISTORY_KEY = 'belivay_broadcast_history'
-    history = cache.get(HISTORY_KEY, [])
-    if isinstance(history, str):
-        try:
-            history = json.loads(history)
-        except Exception:
-            history = []
- 
-    history.insert(0, {
-        'id':          timezone.now().timestamp(),
-        'title':       title,
-        'message':     message[:120] + ('…' if len(message) > 120 else ''),
-        'audience':    filters['audience'],
-        'city':        filters.get('city', ''),
-        'tier':        filters.get('tier', ''),
-        'type':        notif_type,
-        'sent_to':     count,
-        'sent_by':     request.user.username,
-        'sent_at':     timezone.now().isoformat(),
-    })
-    cache.set(HISTORY_KEY, history[:50], 86400 * 30)  # 30 jours
+    except ValueError as exc:
+        return Response({'detail': str(exc)}, status=400)
  
+    count = job.total
     return Response({
         'detail': f'Notification envoyée à {count} utilisateur{"s" if count > 1 else ""}.',
         'sent_to': count,
+        'job_id':  job.id,
+        'status':  job.status,
     })
  
  
@@ -2767,19 +2684,15 @@ def admin_customers_broadcast(request):
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def admin_customers_broadcast_history(request):
-    """Retourne les 50 derniers broadcasts envoyés aux clients."""
-    import json
-    from django.core.cache import cache
- 
-    HISTORY_KEY = 'belivay_broadcast_history'
-    history = cache.get(HISTORY_KEY, [])
-    if isinstance(history, str):
-        try:
-            history = json.loads(history)
-        except Exception:
-            history = []
+    """Retourne les 50 derniers broadcasts envoyés aux clients (avec progression)."""
+    from apps.accounts.broadcasts import history_entry
+    from apps.accounts.models import BroadcastJob
  
-    return Response({'history': history})    
+    jobs = (
+        BroadcastJob.objects.filter(scope=BroadcastJob.Scope.CUSTOMERS)
+        .select_related('created_by')[:50]
+    )
+    return Response({'history': [history_entry(job) for job in jobs]})
 
 
 
@@ -3346,11 +3259,12 @@ def admin_kyc_queue(request):
  
     vendors = VendorProfile.objects.filter(
         status=status_filter
-    ).select_related('user', 'current_plan').order_by('created_at')
+    ).select_related('user', 'current_plan', 'stats_snapshot').order_by('created_at')
  
     result = []
     for vp in vendors:
         days_waiting = (timezone.now() - vp.created_at).days
+        snapshot = getattr(vp, 'stats_snapshot', None)
         result.append({
             'id':               vp.id,
             'user_id':          vp.user.id,
@@ -3366,14 +3280,17 @@ def admin_kyc_queue(request):
             'days_waiting':     days_waiting,
             'created_at':       vp.created_at.isoformat(),
             'approved_at':      vp.approved_at.isoformat() if vp.approved_at else None,
+            'total_products':   snapshot.products_count if snapshot else 0,
+            'total_orders':     snapshot.paid_orders_count if snapshot else 0,
+            'total_revenue':    snapshot.paid_revenue_xaf if snapshot else 0,
         })
  
-    kpis = {
-        'pending':   VendorProfile.objects.filter(status='PENDING').count(),
-        'approved':  VendorProfile.objects.filter(status='APPROVED').count(),
-        'rejected':  VendorProfile.objects.filter(status='REJECTED').count(),
-        'suspended': VendorProfile.objects.filter(status='SUSPENDED').count(),
-    }
+    kpis = VendorProfile.objects.aggregate(
+        pending=Count('id', filter=Q(status='PENDING')),
+        approved=Count('id', filter=Q(status='APPROVED')),
+        rejected=Count('id', filter=Q(status='REJECTED')),
+        suspended=Count('id', filter=Q(status='SUSPENDED')),
+    )
  
     return Response({'kpis': kpis, 'vendors': result})   
 
@@ -3871,9 +3788,10 @@ def admin_broadcast_notification(request):
     """
     Envoie une notification à une audience.
     Body : { audience: 'all'|'customers'|'vendors'|'active_vendors', title, message }
-    Stocke en BDD (modèle Notification si existant) ou envoie par email.
+    Passe par le moteur BroadcastJob (même ciblage que le broadcast étendu).
     """
-    from django.contrib.auth.models import User
+    from apps.accounts.broadcasts import create_job
+    from apps.accounts.models import BroadcastJob
  
     audience = request.data.get('audience', 'all')
     title    = request.data.get('title', '').strip()
@@ -3882,25 +3800,25 @@ def admin_broadcast_notification(request):
     if not title or not message:
         return Response({'detail': 'title et message sont requis.'}, status=400)
  
-    # Sélection des destinataires
-    users = User.objects.filter(is_active=True)
-    if audience == 'customers':
-        users = users.filter(is_staff=False).exclude(vendor_profile__isnull=False)
-    elif audience == 'vendors':
-        users = users.filter(vendor_profile__isnull=False)
-    elif audience == 'active_vendors':
-        users = users.filter(vendor_profile__status='APPROVED')
- 
-    count = users.count()
- 
-    # Ici : créer les notifications en BDD ou envoyer emails
-    # Pour l'instant on retourne le décompte (intégration email/push à compléter)
+    try:
+        job = create_job(
+            title=title, message=message,
+            notification_type=request.data.get('type', 'SYSTEM'),
+            action_url=request.data.get('action_url', ''),
+            scope=BroadcastJob.Scope.ACTORS,
+            filters={'audience': audience},
+            created_by=request.user,
+        )
+    except ValueError as exc:
+        return Response({'detail': str(exc)}, status=400)
  
     return Response({
         'success':    True,
-        'recipients': count,
+        'recipients': job.total,
         'audience':   audience,
         'title':      title,
+        'job_id':     job.id,
+        'status':     job.status,
     })
 
 
@@ -4304,6 +4222,31 @@ def admin_toggle_product_status(request, product_id):
 
 #  ADMINISTRATION - GESTION COMMANDES 
 
+ADMIN_ORDER_ORDERING = ('id', 'created_at', 'total_xaf')
+
+
+class AdminOrderListPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+def admin_order_totals(orders):
+    """KPIs de la liste admin sur l'ensemble filtré, en une requête."""
+    paid = Q(payment_status=Order.PaymentStatus.PAID)
+    totals = orders.order_by().aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(payment_status=Order.PaymentStatus.PENDING)),
+        paid=Count('id', filter=paid),
+        failed=Count('id', filter=Q(payment_status=Order.PaymentStatus.FAILED)),
+        refunded=Count('id', filter=Q(payment_status=Order.PaymentStatus.REFUNDED)),
+        revenue=Sum('total_xaf', filter=paid),
+        delivered=Count('id', filter=Q(fulfillment_status=Order.FulfillmentStatus.DELIVERED)),
+        cancelled=Count('id', filter=Q(fulfillment_status=Order.FulfillmentStatus.CANCELLED)),
+    )
+    totals['revenue'] = totals['revenue'] or 0
+    return totals
+
 @extend_schema(
     tags=["Admin"],
     summary="List all orders (admin)",
@@ -4316,21 +4259,25 @@ def admin_toggle_product_status(request, product_id):
         OpenApiParameter(name='date_to', description='Date fin (YYYY-MM-DD)', required=False, type=str),
         OpenApiParameter(name='min_amount', description='Montant minimum', required=False, type=int),
         OpenApiParameter(name='max_amount', description='Montant maximum', required=False, type=int),
-        OpenApiParameter(name='search', description='Recherche (ID, email, phone, transaction)', required=False, type=str),
+        OpenApiParameter(name='search', description='Recherche (ID, email, téléphone, ville, client, transaction)', required=False, type=str),
+        OpenApiParameter(name='user', description='Filtrer par client (user ID)', required=False, type=int),
+        OpenApiParameter(name='ordering', description='Tri : id, created_at, total_xaf (préfixe - pour décroissant)', required=False, type=str),
+        OpenApiParameter(name='page', description='Numéro de page', required=False, type=int),
+        OpenApiParameter(name='page_size', description='Taille de page (max 200)', required=False, type=int),
     ],
-    responses={200: 'AdminOrderListSerializer(many=True)'}
+    responses={200: AdminOrderPageSerializer}
 )
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def admin_list_orders(request):
     """
-    Liste admin de toutes les commandes avec filtres avancés
+    Liste admin des commandes avec filtres avancés, paginée ; `totals` porte
+    les compteurs de l'ensemble filtré (une requête d'agrégat)
     """
     from apps.vendors.serializers import AdminOrderListSerializer
     
-    orders = Order.objects.select_related(
-        'user', 'shipment', 'shipment__courier', 'shipment__courier__user'
-    ).prefetch_related('items', 'items__product__vendor')
+    # Articles et vendeurs lus dans le modèle de lecture (items_count, vendor_ids)
+    orders = Order.objects.select_related('user', 'shipment')
 
     # Filtres statuts
     payment_status = request.query_params.get('payment_status')
@@ -4345,7 +4292,12 @@ def admin_list_orders(request):
     # Filtre vendeur
     vendor_id = request.query_params.get('vendor')
     if vendor_id:
-        orders = orders.filter(items__product__vendor_id=vendor_id).distinct()
+        orders = orders.filter(vendor_ids__contains=[int(vendor_id)])
+
+    # Filtre client
+    user_id = request.query_params.get('user')
+    if user_id:
+        orders = orders.filter(user_id=int(user_id))
     
     # Filtre dates
     date_from = request.query_params.get('date_from')
@@ -4378,15 +4330,28 @@ def admin_list_orders(request):
             orders = orders.filter(
                 Q(customer_email__icontains=search) |
                 Q(customer_phone__icontains=search) |
+                Q(city__icontains=search) |
                 Q(user__username__icontains=search) |
                 Q(user__email__icontains=search) |
                 Q(payments__external_ref__icontains=search)
             ).distinct()
     
-    orders = orders.order_by('-created_at')
-    
-    serializer = AdminOrderListSerializer(orders, many=True, context={'request': request})
-    return Response(serializer.data)
+    ordering = request.query_params.get('ordering') or '-created_at'
+    if ordering.lstrip('-') not in ADMIN_ORDER_ORDERING:
+        ordering = '-created_at'
+    tie_break = '-id' if ordering.startswith('-') else 'id'
+
+    paginator = AdminOrderListPagination()
+    page = paginator.paginate_queryset(orders.order_by(ordering, tie_break), request)
+    vendor_ids = {vendor_id for order in page for vendor_id in order.vendor_ids}
+    vendor_usernames = dict(User.objects.filter(id__in=vendor_ids).values_list('id', 'username'))
+
+    serializer = AdminOrderListSerializer(
+        page, many=True, context={'request': request, 'vendor_usernames': vendor_usernames},
+    )
+    response = paginator.get_paginated_response(serializer.data)
+    response.data['totals'] = admin_order_totals(orders)
+    return response
 
 
 @extend_schema(
@@ -4507,6 +4472,22 @@ def admin_cancel_order(request, order_id):
     return Response(serializer.data)
 
 
+@extend_schema(
+    tags=["Admin"],
+    summary="Dispatch blocked shipments (admin)",
+    description="Relance en une passe l'affectation des livraisons bloquées (dry_run possible)",
+)
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def admin_dispatch_pending(request):
+    """Ré-affecte les livraisons bloquées aux livreurs disponibles."""
+    from apps.shipping.dispatch import dispatch_pending
+
+    dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+    stats = dispatch_pending(dry_run=dry_run)
+    return Response({**stats, 'dry_run': dry_run})
+
+
 @extend_schema(
     tags=["Admin"],
     summary="Export orders to CSV",
@@ -4570,80 +4551,43 @@ def admin_export_orders_csv(request):
 
 #  ADMINISTRATION - GESTION UTILISATEURS 
 
+class AdminUserDirectoryPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
 @extend_schema(
     tags=["Admin"],
     summary="List all users (admin)",
-    description="Liste tous les utilisateurs avec filtres",
+    description="Liste paginée des utilisateurs avec filtres, tri et compteurs globaux (totals)",
     parameters=[
-        OpenApiParameter(name='role', description='Filtrer par rôle (vendor/admin/customer)', required=False, type=str),
+        OpenApiParameter(name='role', description='Filtrer par rôle (vendor/courier/customer/admin)', required=False, type=str),
         OpenApiParameter(name='is_banned', description='Filtrer par statut ban', required=False, type=bool),
         OpenApiParameter(name='is_active', description='Filtrer par statut actif', required=False, type=bool),
+        OpenApiParameter(name='status', description='active / inactive / banned', required=False, type=str),
+        OpenApiParameter(name='plan', description='Plan vendeur actif (FREE/STARTER/PRO/BUSINESS)', required=False, type=str),
         OpenApiParameter(name='date_from', description='Date inscription début', required=False, type=str),
         OpenApiParameter(name='date_to', description='Date inscription fin', required=False, type=str),
-        OpenApiParameter(name='search', description='Recherche (username, email, nom)', required=False, type=str),
+        OpenApiParameter(name='search', description='Recherche (username, email, nom, boutique)', required=False, type=str),
+        OpenApiParameter(name='ordering', description='Tri : username, date_joined, last_login, orders_count, total_spent (préfixe - pour décroissant)', required=False, type=str),
+        OpenApiParameter(name='page', description='Numéro de page', required=False, type=int),
+        OpenApiParameter(name='page_size', description='Taille de page (max 200)', required=False, type=int),
     ],
-    responses={200: 'AdminUserListSerializer(many=True)'}
+    responses={200: AdminUserDirectoryPageSerializer}
 )
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def admin_list_users(request):
-    """Liste admin de tous les utilisateurs"""
+    """Liste admin de tous les utilisateurs (paginée, agrégats lus dans CustomerStats)"""
+    from apps.accounts.directory import directory_queryset, directory_totals
     from apps.vendors.serializers import AdminUserListSerializer
-    from apps.accounts.models import UserProfile
-    
-    users = User.objects.select_related('vendor_profile', 'courier_profile', 'profile').prefetch_related('orders')
-    
-    # Filtre par rôle
-    role = request.query_params.get('role')
-    if role == 'vendor':
-        users = users.filter(vendor_profile__isnull=False)
-    elif role == 'courier':
-        users = users.filter(courier_profile__isnull=False)
-    elif role == 'customer':
-        users = users.filter(is_staff=False, is_superuser=False)
-    elif role in {'staff', 'admin'}:
-        users = users.filter(Q(is_staff=True) | Q(is_superuser=True))
-    
-    # Filtre actif/inactif
-    is_active = request.query_params.get('is_active')
-    if is_active is not None:
-        users = users.filter(is_active=is_active.lower() == 'true')
-    
-    # Filtre banni
-    is_banned = request.query_params.get('is_banned')
-    if is_banned is not None:
-        # Créer les profils manquants si nécessaire
-        for user in users:
-            UserProfile.objects.get_or_create(user=user)
-        
-        if is_banned.lower() == 'true':
-            users = users.filter(profile__is_banned=True)
-        else:
-            users = users.filter(Q(profile__is_banned=False) | Q(profile__isnull=True))
-    
-    # Filtre dates
-    date_from = request.query_params.get('date_from')
-    if date_from:
-        users = users.filter(date_joined__date__gte=date_from)
-    
-    date_to = request.query_params.get('date_to')
-    if date_to:
-        users = users.filter(date_joined__date__lte=date_to)
-    
-    # Recherche
-    search = request.query_params.get('search')
-    if search:
-        users = users.filter(
-            Q(username__icontains=search) |
-            Q(email__icontains=search) |
-            Q(first_name__icontains=search) |
-            Q(last_name__icontains=search)
-        )
-    
-    users = users.order_by('-date_joined')
-    
-    serializer = AdminUserListSerializer(users, many=True)
-    return Response(serializer.data)
+
+    paginator = AdminUserDirectoryPagination()
+    page = paginator.paginate_queryset(directory_queryset(request.query_params), request)
+    response = paginator.get_paginated_response(AdminUserListSerializer(page, many=True).data)
+    response.data['totals'] = directory_totals()
+    return response
 
 
 @extend_schema(
@@ -5723,7 +5667,7 @@ def vendor_mod_request_create(request):
  
         # Notification email au vendeur
         try:
-            send_mail(
+            queue_email(
                 subject=f'[BelivaY] Demande de modification #{mod_request.id} reçue',
                 message=(
                     f'Bonjour {profile.business_name},\n\n'
@@ -5734,7 +5678,6 @@ def vendor_mod_request_create(request):
                 ),
                 from_email=getattr(django_settings, 'DEFAULT_FROM_EMAIL', 'noreply@belivay.com'),
                 recipient_list=[profile.user.email],
-                fail_silently=True,
             )
         except Exception:
             pass
@@ -5789,7 +5732,7 @@ def vendor_mod_request_upload_docs(request, request_id):
  
         # Notification email
         try:
-            send_mail(
+            queue_email(
                 subject=f'[BelivaY] Documents ajoutés — Demande #{mod_request.id}',
                 message=(
                     f'Bonjour {profile.business_name},\n\n'
@@ -5799,7 +5742,6 @@ def vendor_mod_request_upload_docs(request, request_id):
                 ),
                 from_email=getattr(django_settings, 'DEFAULT_FROM_EMAIL', 'noreply@belivay.com'),
                 recipient_list=[profile.user.email],
-                fail_silently=True,
             )
         except Exception:
             pass
@@ -6296,7 +6238,7 @@ def vendor_trial_activate(request):
  
         # Notification email
         try:
-            send_mail(
+            queue_email(
                 subject=f'[BelivaY] Essai gratuit {plan.name} activé !',
                 message=(
                     f'Bonjour {profile.business_name},\n\n'
@@ -6307,7 +6249,6 @@ def vendor_trial_activate(request):
                 ),
                 from_email=getattr(django_settings, 'DEFAULT_FROM_EMAIL', 'noreply@belivay.com'),
                 recipient_list=[profile.user.email],
-                fail_silently=True,
             )
         except Exception:
             pass
@@ -6426,7 +6367,7 @@ def vendor_subscription_history(request):
 def public_shop(request, slug):
     """Page publique d'une boutique — accessible sans authentification."""
     try:
-        profile = VendorProfile.objects.select_related('user', 'current_plan').get(
+        profile = VendorProfile.objects.select_related('user', 'current_plan', 'stats_snapshot').get(
             shop_slug=slug, status='APPROVED', is_online=True,
         )
     except VendorProfile.DoesNotExist:
@@ -6434,10 +6375,9 @@ def public_shop(request, slug):
  
     from apps.catalog.models import Product
     from apps.catalog.serializers import ProductSerializer
-    from django.db.models import Avg, Count
  
     products = Product.objects.filter(vendor=profile.user, is_active=True).order_by('-created_at')
-    stats    = products.aggregate(total=Count('id'), avg_rating=Avg('reviews__rating'))
+    snapshot = getattr(profile, 'stats_snapshot', None)
  
     banner_url = request.build_absolute_uri(profile.banner_image.url) if profile.banner_image else None
     photo_url  = request.build_absolute_uri(profile.profile_photo.url) if profile.profile_photo else None
@@ -6457,8 +6397,9 @@ def public_shop(request, slug):
         'is_online':          profile.is_online,
         'member_since':       profile.approved_at.isoformat() if profile.approved_at else profile.created_at.isoformat(),
         'stats': {
-            'total_products': stats['total'] or 0,
-            'avg_rating':     round(stats['avg_rating'], 1) if stats['avg_rating'] else None,
+            'total_products': snapshot.active_products_count if snapshot else 0,
+            'avg_rating':     round(float(snapshot.rating_avg), 1) if snapshot and snapshot.rating_avg else None,
+            'reviews_count':  snapshot.reviews_count if snapshot else 0,
         },
         'locations':  locations_data,
         'products':   ProductSerializer(products[:20], many=True, context={'request': request}).data,
@@ -6568,83 +6509,39 @@ def admin_broadcast_extended(request):
       'vendors'          — tous les vendeurs
       'active_vendors'   — vendeurs approuvés
     """
-    from django.contrib.auth.models import User
-    from apps.accounts.models import UserNotification, CourierProfile
+    from apps.accounts.broadcasts import create_job
+    from apps.accounts.models import BroadcastJob
 
     audience         = request.data.get('audience', 'all')
     title            = request.data.get('title', '').strip()
     message          = request.data.get('message', '').strip()
     notif_type       = request.data.get('type', 'SYSTEM')
     action_url       = request.data.get('action_url', '')
-    vendor_user_id   = request.data.get('vendor_user_id')
-    courier_user_id  = request.data.get('courier_user_id')
 
     if not title or not message:
         return Response({'detail': 'Titre et message sont requis.'}, status=400)
 
-    users = User.objects.none()
-
-    if audience == 'all_actors':
-        users = User.objects.filter(is_active=True, is_staff=False)
-
-    elif audience == 'couriers':
-        courier_user_ids = CourierProfile.objects.filter(
-            user__is_active=True
-        ).values_list('user_id', flat=True)
-        users = User.objects.filter(id__in=courier_user_ids)
-
-    elif audience == 'specific_courier':
-        if not courier_user_id:
-            return Response({'detail': 'courier_user_id requis pour ce ciblage.'}, status=400)
-        users = User.objects.filter(id=courier_user_id, is_active=True)
-
-    elif audience == 'specific_vendor':
-        if not vendor_user_id:
-            return Response({'detail': 'vendor_user_id requis pour ce ciblage.'}, status=400)
-        users = User.objects.filter(id=vendor_user_id, is_active=True)
-
-    elif audience == 'all':
-        users = User.objects.filter(is_active=True, is_staff=False)
-
-    elif audience == 'customers':
-        users = User.objects.filter(
-            is_active=True, is_staff=False,
-            vendor_profile__isnull=True,
-            courier_profile__isnull=True,
-        )
-
-    elif audience == 'vendors':
-        users = User.objects.filter(is_active=True, vendor_profile__isnull=False)
-
-    elif audience == 'active_vendors':
-        users = User.objects.filter(is_active=True, vendor_profile__status='APPROVED')
-
-    else:
-        return Response({'detail': f'Audience inconnue : {audience}'}, status=400)
-
-    user_list = list(users)
-    count = len(user_list)
-
-    if count == 0:
-        return Response({'detail': 'Aucun utilisateur ciblé.'}, status=400)
-
-    notifications = [
-        UserNotification(
-            user=u,
-            title=title,
-            message=message,
-            notification_type=notif_type,
-            action_url=action_url,
+    try:
+        job = create_job(
+            title=title, message=message, notification_type=notif_type,
+            action_url=action_url, scope=BroadcastJob.Scope.ACTORS,
+            filters={
+                'audience':        audience,
+                'vendor_user_id':  request.data.get('vendor_user_id'),
+                'courier_user_id': request.data.get('courier_user_id'),
+            },
+            created_by=request.user,
         )
-        for u in user_list
-    ]
-    UserNotification.objects.bulk_create(notifications, batch_size=500)
+    except ValueError as exc:
+        return Response({'detail': str(exc)}, status=400)
 
     return Response({
         'success':    True,
-        'recipients': count,
+        'recipients': job.total,
         'audience':   audience,
         'title':      title,
+        'job_id':     job.id,
+        'status':     job.status,
     })
 
 
@@ -6682,7 +6579,7 @@ def admin_approve_product(request, product_id):
 def admin_reject_product(request, product_id):
     from apps.catalog.models import Product, ModerationStatus
     from apps.catalog.serializers import ProductSerializer
-    from apps.accounts.models import UserNotification
+    from apps.accounts.notifications import notify
     from django.utils import timezone
     try:
         product = Product.objects.get(id=product_id)
@@ -6702,8 +6599,8 @@ def admin_reject_product(request, product_id):
         message = f"Votre produit « {product.title} » a été rejeté."
         if reason:
             message += f"\nMotif : {reason}"
-        UserNotification.objects.create(
-            user=product.vendor,
+        notify(
+            product.vendor,
             title="Produit rejeté",
             message=message,
             notification_type='SYSTEM',
@@ -15,4 +15,17 @@ def _clear_cache():
     from django.core.cache import cache
     cache.clear()
     yield
-    cache.clear()
\ No newline at end of file
+    cache.clear()
+
+@pytest.fixture(autouse=True)
+def _clear_coverage_map():
+    """La carte clé → zone est par processus : elle ne survit pas au rollback."""
+    from apps.shipping import coverage
+    coverage._zone_ids.clear()
+
+
+@pytest.fixture(autouse=True)
+def _reset_assistant_index():
+    """L'index catalogue de l'assistant est par processus : il ne survit pas au rollback."""
+    from apps.catalog import assistant_index
+    assistant_index.reset_index()
@@ -110,6 +110,22 @@ DATABASES = {
     "default": build_database_config(),
 }
 
+# Cache partagé par tous les processus (workers web, scheduler, workers de fond) :
+# compteurs de non-lus, version du réseau livreurs, positions, assistant catalogue.
+# Sans REDIS_URL (dev local) : cache mémoire d'un seul processus.
+REDIS_URL = os.getenv("REDIS_URL", "")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        },
+    }
+else:
+    CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+
 LANGUAGE_CODE = "fr"
 TIME_ZONE = "Africa/Douala"
 USE_I18N = True
@@ -119,6 +135,9 @@ STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.getenv('MEDIA_ROOT', str(BASE_DIR / 'mediafiles'))
+# Dérivés WebP des images produit / fiche générés au commit de l'upload ;
+# à False, seul le job generate_image_derivatives les produit
+IMAGE_DERIVATIVES_ON_UPLOAD = os.getenv('IMAGE_DERIVATIVES_ON_UPLOAD', 'True') == 'True'
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # CORS
@@ -261,6 +280,18 @@ OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "")
 OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "openrouter/free")
 OPENROUTER_SITE_URL = os.getenv("OPENROUTER_SITE_URL", "http://localhost:5174")
 OPENROUTER_APP_NAME = os.getenv("OPENROUTER_APP_NAME", "Belivay Catalog Assistant")
+OPENROUTER_API_URL = os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
+OPENROUTER_TIMEOUT = float(os.getenv("OPENROUTER_TIMEOUT", "45"))
+ASSISTANT_CACHE_TTL = int(os.getenv("ASSISTANT_CACHE_TTL", "600"))        # réponses identiques
+ASSISTANT_SOFT_TIMEOUT = float(os.getenv("ASSISTANT_SOFT_TIMEOUT", "8"))   # au-delà : fallback mock
+
+# Import CSV produits (apps.vendors.product_import)
+PRODUCT_IMPORT_SYNC_MAX_ROWS = int(os.getenv("PRODUCT_IMPORT_SYNC_MAX_ROWS", "2000"))      # import dans la requête
+PRODUCT_IMPORT_SYNC_MAX_BYTES = int(os.getenv("PRODUCT_IMPORT_SYNC_MAX_BYTES", "524288"))  # au-delà : worker
+PRODUCT_IMPORT_MAX_ROWS = int(os.getenv("PRODUCT_IMPORT_MAX_ROWS", "50000"))               # import en arrière-plan
+
+# Suivi temps réel (SSE) : relais LISTEN/NOTIFY entre workers
+SHIPPING_REALTIME_BRIDGE = os.getenv("SHIPPING_REALTIME_BRIDGE", "1") == "1"
 
 SUPPORT_EMAIL = "support@belivay.com"
 
@@ -14,10 +14,15 @@ PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
 # Pas d'envoi réel d'e-mail pendant les tests
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
+# Cache mémoire même si REDIS_URL est défini dans l'environnement
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
 # Logging minimal : on évite le handler base de données (apps.vendors.log_handler)
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "handlers": {"console": {"class": "logging.StreamHandler"}},
     "root": {"handlers": ["console"], "level": "ERROR"},
-}
\ No newline at end of file
+}
+# Pas de thread LISTEN ni de NOTIFY : le broker en mémoire suffit aux tests
+SHIPPING_REALTIME_BRIDGE = False
@@ -0,0 +1,94 @@
+# backend/tests/test_admin_user_directory.py
+# Annuaire admin des utilisateurs : pagination, tri SQL, CustomerStats, profils.
+
+import pytest
+from django.db import transaction
+
+from apps.accounts.models import UserProfile
+from apps.orders.customer_stats import reconcile_customer_stats
+from apps.orders.models import CustomerStats, Order
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+URL = "/api/vendors/admin/users/"
+
+
+@pytest.fixture
+def admin_client(api_client, django_user_model):
+    admin = django_user_model.objects.create_superuser("adm-dir", "adm-dir@belivay.test", "p")
+    api_client.force_authenticate(user=admin)
+    return api_client
+
+
+def _order(user, total, paid=False):
+    order = Order.objects.create(
+        user=user, customer_phone="690000002", city="Douala", address="Akwa", total_xaf=total,
+    )
+    if paid:
+        order.confirm_payment()
+    return order
+
+
+def test_page_paginee_sans_requete_par_ligne(admin_client, django_assert_max_num_queries):
+    for _ in range(30):
+        _order(UserFactory(), 1000)
+
+    with django_assert_max_num_queries(6):
+        resp = admin_client.get(URL, {"page_size": 25})
+    assert resp.status_code == 200, resp.content
+    assert resp.data["count"] == 31 and len(resp.data["results"]) == 25
+    assert resp.data["totals"]["total"] == 31
+    assert resp.data["next"] is not None
+
+
+def test_tri_par_depenses_et_stats_a_jour(admin_client, django_capture_on_commit_callbacks):
+    big, small, idle = UserFactory(), UserFactory(), UserFactory()
+    with django_capture_on_commit_callbacks(execute=True):
+        _order(big, 50_000, paid=True)
+        _order(big, 9_000)
+        _order(small, 3_000, paid=True)
+
+    assert CustomerStats.objects.get(user=big).total_spent_xaf == 50_000
+    assert CustomerStats.objects.get(user=big).orders_count == 2
+
+    resp = admin_client.get(URL, {"ordering": "-total_spent", "role": "customer"})
+    rows = [(row["username"], row["total_spent"], row["total_orders"]) for row in resp.data["results"]]
+    assert rows[:3] == [(big.username, 50_000, 2), (small.username, 3_000, 1), (idle.username, 0, 0)]
+    assert resp.data["results"][0]["loyalty_points"] == 200
+
+
+def test_recalcul_unique_par_transaction_et_reconciliation(
+    django_capture_on_commit_callbacks, django_assert_num_queries,
+):
+    user, other = UserFactory(), UserFactory()
+    with django_capture_on_commit_callbacks() as callbacks:
+        with transaction.atomic():
+            _order(user, 1_000, paid=True)
+            _order(user, 2_000, paid=True)
+            _order(other, 500)
+        # Pas encore commité : le recalcul attend le commit
+        assert not CustomerStats.objects.filter(user=user).exists()
+    with django_assert_num_queries(3):  # un seul recalcul (GROUP BY, users, upsert) pour les deux clients
+        for callback in callbacks:
+            callback()
+    assert CustomerStats.objects.get(user=other).orders_count == 1
+    stats = CustomerStats.objects.get(user=user)
+    assert (stats.orders_count, stats.paid_orders_count, stats.total_spent_xaf) == (2, 2, 3_000)
+
+    # UPDATE en masse : hors signals, rattrapé par la réconciliation
+    Order.objects.filter(user=user).update(payment_status=Order.PaymentStatus.REFUNDED)
+    reconcile_customer_stats()
+    assert CustomerStats.objects.get(user=user).total_spent_xaf == 0
+
+
+def test_profil_cree_a_l_inscription_et_filtre_banni(admin_client):
+    banned, clean = UserFactory(), UserFactory()
+    assert UserProfile.objects.filter(user__in=[banned, clean]).count() == 2
+    UserProfile.objects.filter(user=banned).update(is_banned=True)
+
+    resp = admin_client.get(URL, {"is_banned": "true"})
+    assert [row["username"] for row in resp.data["results"]] == [banned.username]
+    assert resp.data["totals"]["banned"] == 1
+    resp = admin_client.get(URL, {"status": "active", "search": clean.username})
+    assert [row["username"] for row in resp.data["results"]] == [clean.username]
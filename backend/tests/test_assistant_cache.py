@@ -0,0 +1,167 @@
+# backend/tests/test_assistant_cache.py
+# Cache de l'assistant catalogue : clé normalisée, TTL, single-flight,
+# fallback mock sur fournisseur lent, compteurs.
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncClient
+
+from apps.common import views as assistant_views
+from apps.common.assistant_cache import LOCK_PREFIX, _inflight, cache_key, cached_answer
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+URL = "/api/ai/catalog-assistant/"
+STATS_URL = "/api/ai/catalog-assistant/stats/"
+PAYLOAD = {
+    "message": "Je cherche un produit pas cher",
+    "products": [{"id": 1, "title": "Sac"}, {"id": 2, "title": "Chapeau"}],
+    "filters": {"maxPrice": 5000},
+}
+
+
+def _completion(answer="Prends le sac"):
+    content = json.dumps({"answer": answer, "suggestions": [], "followUp": []})
+    return {"choices": [{"message": {"content": content}}]}
+
+
+@pytest.fixture
+def openrouter(settings, monkeypatch):
+    settings.OPENROUTER_API_KEY = "test-key"
+    state = {"calls": 0, "handler": lambda request: httpx.Response(200, json=_completion())}
+
+    async def transport(request):
+        state["calls"] += 1
+        result = state["handler"](request)
+        return await result if asyncio.iscoroutine(result) else result
+
+    monkeypatch.setattr(
+        assistant_views, "async_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(transport)),
+    )
+    return state
+
+
+def _post(client, payload=PAYLOAD):
+    return client.post(URL, payload, content_type="application/json").json()
+
+
+def _stats(api_client, django_user_model):
+    admin = django_user_model.objects.create_superuser("adm-ai", "adm-ai@belivay.test", "p")
+    api_client.force_authenticate(user=admin)
+    return api_client.get(STATS_URL).data
+
+
+def test_cle_normalisee(settings):
+    variant = {
+        **PAYLOAD,
+        "message": "  je CHERCHE un produit, pas chér ! ",
+        "products": list(reversed(PAYLOAD["products"])),
+    }
+    assert cache_key(variant) == cache_key(PAYLOAD)
+    assert cache_key({**PAYLOAD, "products": PAYLOAD["products"][:1]}) != cache_key(PAYLOAD)
+    assert cache_key({**PAYLOAD, "filters": {"maxPrice": 9000}}) != cache_key(PAYLOAD)
+    settings.OPENROUTER_MODEL = "autre/modele"
+    assert cache_key(variant) != cache_key({**PAYLOAD, "message": "autre chose"})
+
+
+def test_hit_apres_miss_et_compteurs(client, api_client, django_user_model, openrouter):
+    assert _post(client)["cache"] == "miss"
+    again = _post(client, {**PAYLOAD, "message": "je cherche un produit pas cher !"})
+    assert (again["cache"], again["source"], again["answer"]) == ("hit", "openrouter", "Prends le sac")
+    assert openrouter["calls"] == 1
+
+    # Erreur fournisseur : fallback, rien en cache
+    openrouter["handler"] = lambda request: httpx.Response(500)
+    other = {**PAYLOAD, "message": "montre-moi les promotions"}
+    assert [_post(client, other)["cache"] for _ in range(2)] == ["fallback", "fallback"]
+    assert openrouter["calls"] == 3
+
+    stats = _stats(api_client, django_user_model)
+    assert (stats["hits"], stats["misses"], stats["errors"]) == (1, 3, 2)
+    assert stats["hit_ratio"] == 0.25
+    assert stats["provider"]["calls"] == 1 and stats["provider"]["p50_ms"] == 500
+
+
+def test_demandes_identiques_en_vol_partagent_un_appel(openrouter):
+    async def slow(request):
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, json=_completion())
+
+    openrouter["handler"] = slow
+
+    async def burst():
+        async_client = AsyncClient()
+        return await asyncio.gather(*[
+            async_client.post(URL, PAYLOAD, content_type="application/json") for _ in range(5)
+        ])
+
+    statuses = sorted(resp.json()["cache"] for resp in async_to_sync(burst)())
+    assert statuses == ["coalesced"] * 4 + ["miss"]
+    assert openrouter["calls"] == 1
+
+
+def test_fournisseur_lent_fallback_puis_cache(settings, openrouter):
+    settings.ASSISTANT_SOFT_TIMEOUT = 0.1
+
+    async def slow(request):
+        await asyncio.sleep(0.3)
+        return httpx.Response(200, json=_completion("Réponse tardive"))
+
+    openrouter["handler"] = slow
+
+    async def scenario():
+        async_client = AsyncClient()
+        first = (await async_client.post(URL, PAYLOAD, content_type="application/json")).json()
+        await asyncio.sleep(0.4)  # l'appel continue en arrière-plan et remplit le cache
+        second = (await async_client.post(URL, PAYLOAD, content_type="application/json")).json()
+        return first, second
+
+    first, second = async_to_sync(scenario)()
+    assert (first["cache"], first["source"], first["error"]) == ("fallback", "mock", "provider timeout")
+    assert (second["cache"], second["answer"]) == ("hit", "Réponse tardive")
+    assert openrouter["calls"] == 1
+
+
+def test_sous_wsgi_appel_lent_annule_et_verrou_libere(settings):
+    settings.ASSISTANT_SOFT_TIMEOUT = 0.05
+    key = cache_key(PAYLOAD)
+    cancelled = []
+
+    async def slow(payload):
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return {"answer": "trop tard"}
+
+    result = async_to_sync(cached_answer)(
+        PAYLOAD, slow, lambda payload: {"source": "mock"}, (), background=False,
+    )
+    assert result["cache"] == "fallback"
+    assert cancelled == [True]
+    assert cache.get(LOCK_PREFIX + key) is None and key not in _inflight
+
+
+def test_verrou_d_un_autre_worker_jamais_efface(settings):
+    settings.OPENROUTER_TIMEOUT = 0.3  # attente de l'autre worker puis appel direct
+    key = cache_key(PAYLOAD)
+    cache.set(LOCK_PREFIX + key, "jeton-autre-worker", 30)
+
+    async def fetch(payload):
+        return {"answer": "ok", "source": "openrouter"}
+
+    result = async_to_sync(cached_answer)(PAYLOAD, fetch, lambda payload: {}, ())
+    assert result["answer"] == "ok"
+    assert cache.get(LOCK_PREFIX + key) == "jeton-autre-worker"
+
+
+def test_stats_reservees_aux_admins(api_client):
+    api_client.force_authenticate(user=UserFactory())
+    assert api_client.get(STATS_URL).status_code == 403
@@ -0,0 +1,102 @@
+# backend/tests/test_assistant_index.py
+# Index catalogue de l'assistant : recherche sur tout le catalogue approuvé,
+# jetons normalisés, intentions, filtres, top-k, reconstruction incrémentale.
+
+import pytest
+
+from apps.catalog import assistant_index
+from apps.catalog.assistant_index import current_index, search_catalog
+from apps.catalog.models import Category, Inventory, ModerationStatus, Product, ProductReview
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+URL = "/api/ai/catalog-assistant/"
+
+
+@pytest.fixture
+def categories():
+    return Category.objects.create(name="Maroquinerie", slug="maroquinerie"), Category.objects.create(
+        name="Chaussures", slug="chaussures",
+    )
+
+
+def _product(title, category, price=10000, stock=5, status=ModerationStatus.APPROVED, **fields):
+    product = Product.objects.create(
+        title=title, slug=f"p-{Product.all_objects.count()}", category=category, price_xaf=price,
+        moderation_status=status, **fields,
+    )
+    Inventory.objects.create(product=product, quantity=stock)
+    return product
+
+
+def _ids(results):
+    return [row["id"] for row in results]
+
+
+def test_mots_normalises_sur_tout_le_catalogue(categories):
+    leather, shoes = categories
+    bags = [_product(f"Sac à main cuir n°{i}", leather, price=20000 + i) for i in range(3)]
+    _product("Baskets légères", shoes, description="Chaussure de sport")
+    _product("Sac en attente", leather, status=ModerationStatus.PENDING)
+    _product("Sac désactivé", leather, is_active=False)
+    for i in range(20):
+        _product(f"Ceinture {i}", leather)
+
+    assert sorted(_ids(search_catalog("Je cherche des SACS en cuir !"))) == sorted(p.id for p in bags)
+    assert [row["title"] for row in search_catalog("chaussures de sport")] == ["Baskets légères"]
+    assert len(search_catalog("quelque chose", limit=5)) == 5
+
+
+def test_intentions_filtres_et_classement(categories):
+    leather, shoes = categories
+    cheap = _product("Sac simple", leather, price=3000)
+    pricey = _product("Sac luxe", leather, price=90000)
+    sold_out = _product("Sac épuisé", leather, price=1000, stock=0)
+    promo = _product("Sac soldé", leather, price=50000, compare_at_price=60000)
+    rated = _product("Sac robuste", leather, price=70000)
+    ProductReview.objects.create(product=rated, user=UserFactory(), rating=5)
+    boots = _product("Bottes", shoes, price=2000)
+
+    assert _ids(search_catalog("un sac pas cher", limit=2)) == [cheap.id, sold_out.id]
+    assert search_catalog("sac de qualite")[0]["id"] == rated.id
+    assert search_catalog("sac en promotion")[0]["id"] == promo.id
+    assert _ids(search_catalog("sac", filters={"promoOnly": True})) == [promo.id]
+    assert pricey.id not in _ids(search_catalog("sac", filters={"minRating": 4}))
+    assert all(row["stock_quantity"] > 0 for row in search_catalog("sac", filters={"inStockOnly": True}))
+    assert _ids(search_catalog("pas cher", category="Chaussures")) == [boots.id]
+    assert len(search_catalog("pas cher", category="Toutes les catégories")) == 6
+
+
+def test_index_en_memoire_et_retokenisation_partielle(categories, monkeypatch, django_assert_num_queries):
+    leather, _ = categories
+    products = [_product(f"Sac {i}", leather) for i in range(5)]
+
+    with django_assert_num_queries(3):
+        search_catalog("sac")
+    with django_assert_num_queries(0):
+        search_catalog("sac pas cher")
+
+    calls = []
+    tokenize = assistant_index.tokenize
+    monkeypatch.setattr(assistant_index, "tokenize", lambda text: calls.append(text) or tokenize(text))
+    products[0].title = "Portefeuille"
+    products[0].save()
+    monkeypatch.setattr(assistant_index, "REBUILD_MIN_SECONDS", 0)
+    assert _ids(search_catalog("portefeuille")) == [products[0].id]
+    assert [text for text in calls if "Maroquinerie" in text] == ["Portefeuille   Maroquinerie"]  # seul le modifié
+    assert len(current_index()) == 5
+
+
+def test_assistant_recommande_depuis_le_catalogue(client, settings, categories):
+    settings.OPENROUTER_API_KEY = ""
+    leather, _ = categories
+    bag = _product("Sac besace", leather, price=15000)
+    payload = {"message": "une besace", "products": [{"id": 999, "title": "Produit chargé côté client"}]}
+    data = client.post(URL, payload, content_type="application/json").json()
+    assert [suggestion["productId"] for suggestion in data["suggestions"]] == [bag.id]
+
+    Product.objects.all().delete()
+    assistant_index.reset_index()
+    data = client.post(URL, payload, content_type="application/json").json()
+    assert data["suggestions"][0]["productId"] == 999  # catalogue vide : produits du client
@@ -0,0 +1,121 @@
+# backend/tests/test_async_assistant.py
+# Chemin ASGI : assistant IA async (client httpx partagé), géolocalisation async,
+# middlewares compatibles async.
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncClient
+from rest_framework.throttling import AnonRateThrottle
+
+from apps.common import views as assistant_views
+from apps.core import middleware as activity
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+URL = "/api/ai/catalog-assistant/"
+PAYLOAD = {"message": "un sac pas cher", "products": [{"id": 1, "title": "Sac", "price_xaf": 1000}]}
+
+
+def _completion(answer="Prends le sac"):
+    content = json.dumps({"answer": answer, "suggestions": [], "followUp": []})
+    return {"choices": [{"message": {"content": content}}]}
+
+
+@pytest.fixture
+def openrouter(settings, monkeypatch):
+    """Remplace le transport httpx de l'assistant ; `calls` garde les requêtes reçues."""
+    settings.OPENROUTER_API_KEY = "test-key"
+    state = {"calls": [], "handler": lambda request: httpx.Response(200, json=_completion())}
+
+    async def transport(request):
+        state["calls"].append(request)
+        result = state["handler"](request)
+        return await result if asyncio.iscoroutine(result) else result
+
+    monkeypatch.setattr(
+        assistant_views, "async_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(transport)),
+    )
+    return state
+
+
+def test_reponse_openrouter_et_fallback(client, openrouter):
+    resp = client.post(URL, PAYLOAD, content_type="application/json")
+    assert resp.status_code == 200
+    assert (resp.json()["source"], resp.json()["answer"]) == ("openrouter", "Prends le sac")
+    sent = openrouter["calls"][0]
+    assert sent.headers["authorization"] == "Bearer test-key"
+    assert json.loads(sent.content)["messages"][1]["role"] == "user"
+
+    def timeout(request):
+        raise httpx.ReadTimeout("trop lent", request=request)
+
+    openrouter["handler"] = timeout
+    data = client.post(URL, {**PAYLOAD, "message": "un sac solide"}, content_type="application/json").json()
+    assert data["source"] == "mock" and data["suggestions"][0]["productId"] == 1
+    assert data["error"] == "trop lent"
+
+    openrouter["handler"] = lambda request: httpx.Response(502)
+    data = client.post(URL, {**PAYLOAD, "message": "un sac rouge"}, content_type="application/json").json()
+    assert data["source"] == "mock"
+
+    assert client.post(URL, {"message": ""}, content_type="application/json").status_code == 400
+    assert client.post(URL, "{", content_type="application/json").status_code == 400
+    assert client.get(URL).status_code == 405
+
+
+def test_appels_lents_concurrents_sans_bloquer(openrouter):
+    async def slow(request):
+        await asyncio.sleep(0.3)
+        return httpx.Response(200, json=_completion())
+
+    openrouter["handler"] = slow
+
+    async def burst():
+        async_client = AsyncClient()
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[
+            async_client.post(URL, {**PAYLOAD, "message": f"sac {index}"}, content_type="application/json")
+            for index in range(5)
+        ])
+        return responses, time.perf_counter() - started
+
+    responses, elapsed = async_to_sync(burst)()
+    assert [resp.json()["source"] for resp in responses] == ["openrouter"] * 5
+    # 5 × 0,3 s en série = 1,5 s ; en async les attentes se recouvrent
+    assert elapsed < 1.0
+
+
+def test_geolocalisation_async_dans_le_middleware(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200, json={"status": "success", "lat": 4.05, "lon": 9.7, "city": "Douala"})
+
+    monkeypatch.setattr(activity, "async_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    user = UserFactory()
+
+    async def scenario():
+        async_client = AsyncClient()
+        await async_client.aforce_login(user)
+        for _ in range(2):
+            await async_client.get("/api/notifications/", headers={"X-Forwarded-For": "41.202.219.1"})
+
+    async_to_sync(scenario)()
+    record = json.loads(cache.get(f"{activity.USER_KEY_PREFIX}{user.id}"))
+    assert (record["city"], record["lat"], record["has_gps"]) == ("Douala", 4.05, True)
+    assert calls == ["/json/41.202.219.1"]  # second passage : cache
+    assert async_to_sync(activity.ageolocate_ip)("192.168.1.10") == {}
+
+
+def test_throttle_anonyme_applique(client, openrouter, monkeypatch):
+    monkeypatch.setattr(AnonRateThrottle, "THROTTLE_RATES", {**AnonRateThrottle.THROTTLE_RATES, "anon": "2/min"})
+    statuses = [client.post(URL, PAYLOAD, content_type="application/json").status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
@@ -0,0 +1,86 @@
+# backend/tests/test_available_queue.py
+# File des livraisons disponibles : city_key, pagination par curseur, compteur en cache.
+
+import pytest
+
+from apps.accounts.models import CourierProfile
+from apps.orders.models import Order
+from apps.shipping.models import Shipment
+from apps.shipping.queue import available_count
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+LIST_URL = "/api/shipping/available/"
+COUNT_URL = "/api/shipping/available/count/"
+
+
+@pytest.fixture
+def courier():
+    return CourierProfile.objects.create(
+        user=UserFactory(), phone="690000001", city="Yaoundé", id_card="CNI", is_approved=True, is_online=True,
+    )
+
+
+@pytest.fixture
+def courier_client(api_client, courier):
+    api_client.force_authenticate(user=courier.user)
+    return api_client
+
+
+def _shipment(city="Yaounde", **kwargs):
+    order = Order.objects.create(user=UserFactory(), customer_phone="690000002", city=city, address="Centre", **kwargs)
+    return Shipment.objects.create(order=order)
+
+
+def test_city_key_normalise_a_la_creation():
+    assert _shipment(city=" yaoundé ").city_key == "YAOUNDE"
+    assert _shipment(city="Douala").city_key == "DOUALA"
+
+
+def test_liste_paginee_par_curseur(courier_client, django_assert_max_num_queries):
+    expected = [_shipment().pk for _ in range(5)]
+    _shipment(city="Douala")
+    _shipment(delivery_method=Order.DeliveryMethod.PICKUP)
+
+    with django_assert_max_num_queries(5):  # page + événements + articles, indépendant de la taille
+        first = courier_client.get(LIST_URL, {"page_size": 3})
+    assert first.status_code == 200, first.content
+    assert first.data["next"]
+    second = courier_client.get(first.data["next"])
+    assert second.data["next"] is None
+    assert [row["id"] for row in first.data["results"] + second.data["results"]] == expected
+
+
+def test_compteur_en_cache_et_invalide(courier_client, django_assert_num_queries):
+    _shipment()
+    shipment = _shipment()
+
+    assert courier_client.get(COUNT_URL).data == {"city_key": "YAOUNDE", "count": 2}
+    with django_assert_num_queries(0):
+        assert available_count("YAOUNDE") == 2
+
+    # Entrée dans la file : création
+    _shipment()
+    assert available_count("YAOUNDE") == 3
+
+    # Sortie de la file : prise en charge par un livreur
+    resp = courier_client.post(f"{LIST_URL}{shipment.pk}/claim/")
+    assert resp.status_code == 200, resp.content
+    assert courier_client.get(COUNT_URL).data["count"] == 2
+
+    # Sortie de la file : changement de statut via save()
+    remaining = Shipment.objects.filter(status=Shipment.Status.CREATED, city_key="YAOUNDE").first()
+    remaining.status = Shipment.Status.CANCELLED
+    remaining.save()
+    assert available_count("YAOUNDE") == 1
+
+
+def test_compteur_exclut_les_commandes_du_livreur(courier, courier_client):
+    _shipment()
+    own = Order.objects.create(user=courier.user, customer_phone="690000003", city="Yaounde", address="Centre")
+    Shipment.objects.create(order=own)
+
+    assert available_count("YAOUNDE") == 2
+    assert courier_client.get(COUNT_URL).data["count"] == 1
+    assert len(courier_client.get(LIST_URL).data["results"]) == 1
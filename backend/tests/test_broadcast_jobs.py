@@ -0,0 +1,109 @@
+# backend/tests/test_broadcast_jobs.py
+# Diffusions admin : BroadcastJob, insertion par lots, reprise, historique.
+
+import pytest
+from django.core.management import call_command
+
+from apps.accounts import broadcasts
+from apps.accounts.models import BroadcastJob, UserNotification
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def admin_client(api_client, django_user_model):
+    admin = django_user_model.objects.create_superuser("adm-bc", "adm@belivay.test", "p")
+    api_client.force_authenticate(user=admin)
+    return api_client
+
+
+def test_petite_diffusion_executee_dans_la_requete(admin_client):
+    users = [UserFactory() for _ in range(3)]
+    resp = admin_client.post(
+        "/api/vendors/admin/customers/broadcast/",
+        {"title": "Promo", "message": "-20 % ce week-end", "audience": "all"},
+        format="json",
+    )
+    assert resp.status_code == 200, resp.content
+    assert resp.data["sent_to"] == 3
+    job = BroadcastJob.objects.get(pk=resp.data["job_id"])
+    assert job.status == BroadcastJob.Status.DONE
+    assert job.sent == 3
+    assert set(UserNotification.objects.values_list("user_id", flat=True)) == {u.id for u in users}
+
+    history = admin_client.get("/api/vendors/admin/customers/broadcast/history/").data["history"]
+    assert history[0]["title"] == "Promo"
+    assert history[0]["sent_to"] == 3
+    assert history[0]["status"] == "DONE"
+
+
+def test_diffusion_en_ligne_non_reservable_par_le_worker(monkeypatch):
+    UserFactory()
+    run_job = broadcasts.run_job
+    claimed = []
+
+    def run_while_worker_polls(job, **kwargs):
+        claimed.append(broadcasts.claim_next_job())  # worker qui passe pendant l'exécution
+        return run_job(job, **kwargs)
+
+    monkeypatch.setattr(broadcasts, "run_job", run_while_worker_polls)
+    job = broadcasts.create_job(
+        title="Promo", message="-", notification_type="SYSTEM", action_url="",
+        scope=BroadcastJob.Scope.CUSTOMERS, filters={"audience": "all"}, created_by=None,
+    )
+    assert claimed == [None]
+    assert job.started_at is not None
+    assert UserNotification.objects.count() == 1
+
+
+def test_grosse_diffusion_confiee_au_worker(admin_client, monkeypatch):
+    monkeypatch.setattr(broadcasts, "INLINE_MAX", 2)
+    monkeypatch.setattr(broadcasts, "CHUNK_SIZE", 2)
+    users = [UserFactory() for _ in range(5)]
+
+    resp = admin_client.post(
+        "/api/vendors/admin/notifications/broadcast-extended/",
+        {"title": "Maintenance", "message": "Ce soir 22h", "audience": "all_actors", "action_url": "/courier"},
+        format="json",
+    )
+    assert resp.status_code == 200, resp.content
+    job = BroadcastJob.objects.get(pk=resp.data["job_id"])
+    assert job.status == BroadcastJob.Status.PENDING
+    assert not UserNotification.objects.exists()
+
+    call_command("run_broadcasts")
+    job.refresh_from_db()
+    assert job.status == BroadcastJob.Status.DONE
+    assert job.sent == 5
+    assert job.last_user_id == max(u.id for u in users)
+    assert UserNotification.objects.filter(audience="COURIER").count() == 5
+
+
+def test_reprise_apres_interruption_sans_doublon():
+    users = [UserFactory() for _ in range(4)]
+    job = BroadcastJob.objects.create(
+        title="Info", message="m", scope=BroadcastJob.Scope.CUSTOMERS,
+        filters={"audience": "all"}, total=4,
+    )
+    # Premier lot déjà livré avant l'interruption
+    ordered = sorted(u.id for u in users)
+    for user_id in ordered[:2]:
+        UserNotification.objects.create(user_id=user_id, title="Info", message="m")
+    job.sent, job.last_user_id = 2, ordered[1]
+    job.save()
+
+    broadcasts.run_job(job, chunk_size=10)
+    assert job.status == BroadcastJob.Status.DONE
+    assert job.sent == 4
+    assert UserNotification.objects.count() == 4
+
+
+def test_ciblage_invalide_refuse(admin_client):
+    resp = admin_client.post(
+        "/api/vendors/admin/notifications/broadcast-extended/",
+        {"title": "X", "message": "Y", "audience": "specific_vendor"},
+        format="json",
+    )
+    assert resp.status_code == 400
+    assert not BroadcastJob.objects.exists()
@@ -0,0 +1,111 @@
+# backend/tests/test_claim_next.py
+# Prise en charge « suivante » : choix serveur, idempotence, suites au commit.
+
+from decimal import Decimal
+
+import pytest
+
+from apps.accounts.models import CourierProfile, UserNotification
+from apps.orders.models import Order
+from apps.shipping import queue
+from apps.shipping.geo import update_courier_position
+from apps.shipping.models import Shipment, ShipmentEvent
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+NEXT_URL = "/api/shipping/available/claim-next/"
+
+
+@pytest.fixture
+def courier():
+    return CourierProfile.objects.create(
+        user=UserFactory(), phone="690000001", city="Douala", id_card="CNI", is_approved=True, is_online=True,
+    )
+
+
+@pytest.fixture
+def courier_client(api_client, courier):
+    api_client.force_authenticate(user=courier.user)
+    return api_client
+
+
+def _shipment(city="Douala", pickup=None, user=None):
+    order = Order.objects.create(user=user or UserFactory(), customer_phone="690000002", city=city, address="Akwa")
+    shipment = Shipment.objects.create(order=order)
+    if pickup:
+        shipment.pickup_latitude, shipment.pickup_longitude = (Decimal(str(value)) for value in pickup)
+        shipment.save(update_fields=["pickup_latitude", "pickup_longitude"])
+    return shipment
+
+
+def test_prend_la_plus_proche_puis_suites_au_commit(courier_client, courier, django_capture_on_commit_callbacks):
+    update_courier_position(courier, 4.05, 9.70)
+    _shipment(pickup=(4.20, 9.90))
+    nearest = _shipment(pickup=(4.051, 9.701))
+    _shipment(city="Yaoundé")
+
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        resp = courier_client.post(NEXT_URL)
+        assert resp.status_code == 200, resp.content
+        assert resp.data["id"] == nearest.pk
+        # Événement et notification attendent le commit
+        assert not ShipmentEvent.objects.filter(shipment=nearest).exists()
+    # Les suites notifient à leur tour au commit
+    with django_capture_on_commit_callbacks(execute=True):
+        for callback in callbacks:
+            callback()
+
+    nearest.refresh_from_db()
+    courier.refresh_from_db()
+    assert nearest.status == Shipment.Status.ASSIGNED and nearest.courier_id == courier.pk
+    assert nearest.order.fulfillment_status == Order.FulfillmentStatus.DRIVER_ASSIGNED
+    assert courier.active_shipments_count == 1
+    assert ShipmentEvent.objects.filter(shipment=nearest, status=Shipment.Status.ASSIGNED).count() == 1
+    assert UserNotification.objects.filter(user=courier.user, title__contains=f"#{nearest.order_id}").exists()
+
+
+def test_cle_d_idempotence_rejouee(courier_client):
+    first, second = _shipment(), _shipment()
+
+    resp = courier_client.post(NEXT_URL, HTTP_IDEMPOTENCY_KEY="retry-1")
+    replay = courier_client.post(NEXT_URL, HTTP_IDEMPOTENCY_KEY="retry-1")
+    assert resp.data["id"] == replay.data["id"] == first.pk
+    assert replay["Idempotent-Replayed"] == "true"
+    second.refresh_from_db()
+    assert second.courier_id is None
+
+    # Nouvelle clé : livraison suivante
+    assert courier_client.post(NEXT_URL, HTTP_IDEMPOTENCY_KEY="retry-2").data["id"] == second.pk
+    # Clé rejouée sur l'API par id : même réponse, pas de 400
+    replay_by_id = courier_client.post(f"/api/shipping/available/{first.pk}/claim/", HTTP_IDEMPOTENCY_KEY="retry-1")
+    assert replay_by_id.status_code == 200 and replay_by_id.data["id"] == first.pk
+
+
+def test_file_vide_et_propres_commandes(courier_client, courier):
+    _shipment(user=courier.user)
+    assert courier_client.post(NEXT_URL).status_code == 204
+
+    taken = _shipment()
+    assert courier_client.post(f"/api/shipping/available/{taken.pk}/claim/").status_code == 200
+    assert courier_client.post(f"/api/shipping/available/{taken.pk}/claim/").status_code == 400
+
+
+def test_ligne_verrouillee_ailleurs_passe_a_la_suivante(courier_client, courier, monkeypatch):
+    update_courier_position(courier, 4.05, 9.70)
+    locked = _shipment(pickup=(4.051, 9.701))
+    others = [_shipment(pickup=(4.20, 9.90)) for _ in range(queue.CLAIM_CANDIDATES)]
+    original = queue._lock_available
+    tried = []
+
+    def lock(pk):
+        tried.append(pk)
+        # Les CLAIM_CANDIDATES premières lignes sont tenues par d'autres livreurs
+        return None if pk in {locked.pk, *[s.pk for s in others[:-1]]} else original(pk)
+
+    monkeypatch.setattr(queue, "_lock_available", lock)
+    resp = courier_client.post(NEXT_URL)
+    assert resp.status_code == 200, resp.content
+    assert resp.data["id"] == others[-1].pk  # fenêtre suivante, pas de 204
+    assert tried[0] == locked.pk
+    assert len(tried) == len(set(tried)) == queue.CLAIM_CANDIDATES + 1
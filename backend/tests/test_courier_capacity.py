@@ -0,0 +1,87 @@
+# backend/tests/test_courier_capacity.py
+# Compteurs de charge (active_shipments_count) et assignation au moins chargé.
+
+import pytest
+from django.core.management import call_command
+
+from apps.accounts.models import CourierProfile, DeliveryOrganizationProfile
+from apps.orders.models import Order
+from apps.shipping.assignment import assign_shipment_or_mark_blocked
+from apps.shipping.models import Shipment
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def organization():
+    return DeliveryOrganizationProfile.objects.create(
+        user=UserFactory(), company_name="Rapide", phone="690000000", city="Douala", status="APPROVED",
+    )
+
+
+def _courier(organization, **kwargs):
+    fields = {
+        "phone": "690000001", "city": "Douala", "id_card": "CNI", "is_approved": True,
+        "is_online": True, "delivery_organization": organization, **kwargs,
+    }
+    return CourierProfile.objects.create(user=UserFactory(), **fields)
+
+
+def _shipment(**kwargs):
+    order = Order.objects.create(user=UserFactory(), customer_phone="690000002", city="Douala", address="Akwa")
+    return Shipment.objects.create(order=order, **kwargs)
+
+
+def _counts(*profiles):
+    return [type(p).objects.values_list("active_shipments_count", flat=True).get(pk=p.pk) for p in profiles]
+
+
+def test_compteurs_suivent_les_transitions(organization):
+    courier = _courier(organization)
+    shipment = _shipment(courier=courier, status=Shipment.Status.ASSIGNED)
+    assert _counts(courier, organization) == [1, 1]
+
+    shipment = Shipment.objects.get(pk=shipment.pk)
+    shipment.status = Shipment.Status.PICKED_UP
+    shipment.save(update_fields=["status", "updated_at"])
+    assert _counts(courier, organization) == [1, 1]
+
+    shipment.status = Shipment.Status.DELIVERED
+    shipment.save()
+    assert _counts(courier, organization) == [0, 0]
+
+
+def test_save_complet_du_profil_n_ecrase_pas_le_compteur(organization):
+    courier = _courier(organization)
+    stale = CourierProfile.objects.get(pk=courier.pk)
+    _shipment(courier=courier, status=Shipment.Status.ASSIGNED)
+
+    stale.phone = "699999999"
+    stale.save()
+    assert _counts(courier) == [1]
+
+
+def test_assignation_au_moins_charge_et_plafond(organization):
+    busy = _courier(organization)
+    idle = _courier(organization)
+    _shipment(courier=busy, status=Shipment.Status.ASSIGNED)
+
+    shipment = assign_shipment_or_mark_blocked(_shipment())
+    assert shipment.courier == idle
+    assert _counts(busy, idle, organization) == [1, 1, 2]
+
+    CourierProfile.objects.filter(pk__in=[busy.pk, idle.pk]).update(max_active_shipments=1)
+    shipment = assign_shipment_or_mark_blocked(_shipment())
+    assert shipment.courier is None
+    assert shipment.status == Shipment.Status.CAPACITY_BLOCKED
+
+
+def test_reconciliation_corrige_la_derive(organization):
+    courier = _courier(organization)
+    _shipment(courier=courier, status=Shipment.Status.OUT_FOR_DELIVERY)
+    CourierProfile.objects.filter(pk=courier.pk).update(active_shipments_count=7)
+    DeliveryOrganizationProfile.objects.filter(pk=organization.pk).update(active_shipments_count=0)
+
+    call_command("reconcile_courier_capacity")
+    assert _counts(courier, organization) == [1, 1]
@@ -0,0 +1,132 @@
+# backend/tests/test_courier_dashboard.py
+# Dashboard livreur : classement groupé et mis en cache.
+
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.accounts.models import CourierProfile
+from apps.orders.models import Order
+from apps.shipping.dashboard import STATS_WINDOW_DAYS, courier_leaderboard
+from apps.shipping.models import Shipment
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _courier(username, **kwargs):
+    user = UserFactory(username=username, first_name=username.capitalize(), last_name="")
+    fields = {"phone": "690000000", "city": "Douala", "id_card": "CNI", "is_approved": True, **kwargs}
+    return CourierProfile.objects.create(user=user, **fields)
+
+
+def _shipments(courier, status, count):
+    for _ in range(count):
+        order = Order.objects.create(
+            user=UserFactory(), customer_phone="690000001", city="Douala",
+            address="Akwa", total_xaf=10000,
+        )
+        Shipment.objects.create(order=order, courier=courier, status=status)
+
+
+def test_classement_trie_par_score_puis_volume(django_assert_num_queries):
+    alice, bruno, carl, dan = (_courier(n) for n in ("alice", "bruno", "carl", "dan"))
+    _shipments(alice, Shipment.Status.DELIVERED, 2)
+    _shipments(bruno, Shipment.Status.DELIVERED, 5)
+    _shipments(carl, Shipment.Status.DELIVERED, 9)
+    _shipments(carl, Shipment.Status.FAILED, 1)
+    _courier("eve", is_approved=False)
+
+    with django_assert_num_queries(1):
+        board = courier_leaderboard()
+
+    assert [(e["name"], e["score"], e["badge"]) for e in board] == [
+        ("Bruno", "100%", "Elite"),
+        ("Alice", "100%", "Elite"),
+        ("Carl", "90%", "Stable"),
+    ]
+    assert dan.pk  # sans course terminée : score 0, hors podium
+
+
+def test_classement_servi_depuis_le_cache(django_assert_num_queries):
+    courier = _courier("alice")
+    _shipments(courier, Shipment.Status.DELIVERED, 1)
+    courier_leaderboard()
+
+    with django_assert_num_queries(0):
+        assert courier_leaderboard()[0]["name"] == "Alice"
+
+
+def test_dashboard_expose_le_classement(api_client):
+    courier = _courier("alice")
+    _shipments(courier, Shipment.Status.DELIVERED, 1)
+    api_client.force_authenticate(user=courier.user)
+
+    resp = api_client.get("/api/shipping/dashboard/")
+    assert resp.status_code == 200, resp.content
+    assert resp.data["leaderboard"][0]["name"] == "Alice"
+    assert resp.data["delivered_shipments"] == 1
+
+
+def test_jalons_poses_au_changement_de_statut():
+    courier = _courier("alice")
+    _shipments(courier, Shipment.Status.ASSIGNED, 1)
+    shipment = Shipment.objects.get()
+
+    shipment.status = Shipment.Status.PICKED_UP
+    shipment.save(update_fields=["status", "updated_at"])
+    shipment.status = Shipment.Status.DELIVERED
+    shipment.save(update_fields=["status", "updated_at"])
+
+    shipment.refresh_from_db()
+    assert shipment.picked_up_at is not None
+    assert shipment.delivered_at >= shipment.picked_up_at
+
+
+def test_dashboard_agrege_sans_dependre_de_l_historique(api_client, django_assert_max_num_queries):
+    courier = _courier("alice", zones=["Akwa", "Bonapriso"], is_online=True)
+    _shipments(courier, Shipment.Status.DELIVERED, 4)
+    _shipments(courier, Shipment.Status.FAILED, 1)
+    _shipments(courier, Shipment.Status.ASSIGNED, 1)
+    api_client.force_authenticate(user=courier.user)
+
+    with django_assert_max_num_queries(12) as captured:
+        resp = api_client.get("/api/shipping/dashboard/")
+    baseline = len(captured)
+    data = resp.data
+    assert data["active_shipments"] == 1
+    assert data["delivered_shipments"] == 4
+    assert data["performance_percent"] == 80
+    assert data["today_earnings_xaf"] == 4 * 800
+    assert data["month_earnings_xaf"] == 4 * 800
+    assert data["average_payout_xaf"] == 800
+    assert sum(week["deliveries"] for week in data["weekly_progress"]) == 4
+    assert data["zone_heatmap"][0] == {
+        "zone": "Akwa", "demand_percent": 100, "hint": "Demande observee sur les 30 derniers jours",
+    }
+    assert data["zone_heatmap"][1]["demand_percent"] == 0
+
+    _shipments(courier, Shipment.Status.DELIVERED, 20)
+    cache.clear()
+    with django_assert_max_num_queries(baseline):
+        api_client.get("/api/shipping/dashboard/")
+
+
+def test_totaux_bornes_a_la_fenetre(api_client):
+    courier = _courier("alice")
+    _shipments(courier, Shipment.Status.DELIVERED, 3)
+    _shipments(courier, Shipment.Status.FAILED, 1)
+    long_ago = timezone.now() - timedelta(days=STATS_WINDOW_DAYS + 5)
+    Shipment.objects.filter(status=Shipment.Status.DELIVERED).exclude(
+        pk=Shipment.objects.filter(status=Shipment.Status.DELIVERED).order_by("pk").values("pk")[:1],
+    ).update(delivered_at=long_ago, updated_at=long_ago)
+    Shipment.objects.filter(status=Shipment.Status.FAILED).update(updated_at=long_ago)
+    api_client.force_authenticate(user=courier.user)
+
+    data = api_client.get("/api/shipping/dashboard/").data
+    assert data["stats_window_days"] == STATS_WINDOW_DAYS
+    assert data["delivered_shipments"] == 1
+    assert data["performance_percent"] == 100
+    assert data["average_payout_xaf"] == 800
@@ -0,0 +1,93 @@
+# backend/tests/test_courier_network.py
+# Réseau livreur : instantané versionné, filtrage par zone, ETag / 304.
+
+import pytest
+from django.core.cache import cache
+
+from apps.accounts.models import CourierProfile, RelayPointProfile
+from apps.shipping import network
+from apps.vendors.models import VendorLocation, VendorProfile
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+URL = "/api/shipping/network/"
+
+
+def _vendor(name, city, **kwargs):
+    return VendorProfile.objects.create(
+        user=UserFactory(), business_name=name, business_description="-", phone="690000003",
+        address="Centre", city=city, status="APPROVED", **kwargs,
+    )
+
+
+def _relay(name, city, **kwargs):
+    return RelayPointProfile.objects.create(
+        user=UserFactory(), name=name, phone="690000004", city=city, status="APPROVED", **kwargs,
+    )
+
+
+@pytest.fixture
+def courier_client(api_client):
+    courier = CourierProfile.objects.create(
+        user=UserFactory(), phone="690000001", city="Douala", zones=["Yaoundé"], id_card="CNI",
+        is_approved=True, is_online=True,
+    )
+    api_client.force_authenticate(user=courier.user)
+    return api_client
+
+
+def test_filtre_zone_et_points_relais(courier_client):
+    akwa = _vendor("Akwa Shop", "Douala")
+    VendorLocation.objects.create(
+        vendor=akwa, name="Akwa", address="Rue Joss", phone="690000005",
+        representative_name="Rep", representative_phone="690000005",
+    )
+    _vendor("Mokolo", "Yaounde")
+    _vendor("Garoua Shop", "Garoua")
+    _relay("Relais Bonapriso", "Douala")
+    _relay("Relais Nord", "Garoua")
+    _relay("Relais suspendu", "Douala", is_active=False)
+
+    resp = courier_client.get(URL)
+    assert resp.status_code == 200, resp.content
+    assert [(s["vendor_name"], s["location_name"]) for s in resp.data["shops"]] == [
+        ("Akwa Shop", "Akwa"), ("Mokolo", ""),
+    ]
+    assert [r["name"] for r in resp.data["relay_points"]] == ["Relais Bonapriso"]
+
+
+def test_etag_304_puis_invalidation(courier_client, django_assert_max_num_queries):
+    vendor = _vendor("Akwa Shop", "Douala")
+
+    first = courier_client.get(URL)
+    etag = first["ETag"]
+    with django_assert_max_num_queries(2):  # session livreur uniquement : instantané en mémoire
+        second = courier_client.get(URL, HTTP_IF_NONE_MATCH=etag)
+    assert second.status_code == 304
+
+    vendor.business_name = "Akwa Shop 2"
+    vendor.save()
+    third = courier_client.get(URL, HTTP_IF_NONE_MATCH=etag)
+    assert third.status_code == 200
+    assert third["ETag"] != etag
+    assert third.data["shops"][0]["vendor_name"] == "Akwa Shop 2"
+
+
+def test_sauvegarde_partielle_hors_reseau_n_invalide_pas(courier_client):
+    vendor = _vendor("Akwa Shop", "Douala")
+    etag = courier_client.get(URL)["ETag"]
+
+    VendorProfile.objects.filter(pk=vendor.pk).first().save(update_fields=["updated_at"])
+    assert courier_client.get(URL, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+
+def test_etag_identique_d_un_processus_a_l_autre(courier_client):
+    _vendor("Akwa Shop", "Douala")
+    _relay("Relais Bonapriso", "Douala")
+    etag = courier_client.get(URL)["ETag"]
+
+    # Autre worker : ni instantané en mémoire ni instantané en cache, même version
+    network._local.update(version=None, snapshot=None, expires=0.0)
+    cache.delete(f"courier_network:{network.network_version()}")
+    assert courier_client.get(URL, HTTP_IF_NONE_MATCH=etag).status_code == 304
@@ -0,0 +1,72 @@
+# backend/tests/test_coverage_index.py
+# Index de couverture : zones canoniques maintenues au save, assignation par jointure.
+
+import pytest
+
+from apps.accounts.models import CourierProfile, DeliveryOrganizationProfile
+from apps.orders.models import Order
+from apps.shipping.assignment import choose_courier_for_order, organization_covers
+from apps.shipping.coverage import zone_key
+from apps.shipping.models import CourierCoverage, CoverageZone
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _organization(**kwargs):
+    fields = {"company_name": "Rapide", "phone": "690000000", "city": "Douala", "status": "APPROVED", **kwargs}
+    return DeliveryOrganizationProfile.objects.create(user=UserFactory(), **fields)
+
+
+def _courier(organization, **kwargs):
+    fields = {
+        "phone": "690000001", "city": "Douala", "id_card": "CNI",
+        "is_approved": True, "is_online": True, "delivery_organization": organization, **kwargs,
+    }
+    return CourierProfile.objects.create(user=UserFactory(), **fields)
+
+
+def _order(city):
+    return Order.objects.create(user=UserFactory(), customer_phone="690000002", city=city, address="Centre")
+
+
+def test_cle_canonique():
+    assert zone_key(" Yaoundé ") == zone_key("yaounde") == "YAOUNDE"
+    assert zone_key("Bonamoussadi-Nord") == "BONAMOUSSADINORD"
+
+
+def test_zones_maintenues_au_save():
+    organization = _organization(city="Yaoundé", zones=["Bastos", "Douala - Akwa"])
+    keys = set(CoverageZone.objects.filter(organization_links__organization=organization).values_list("key", flat=True))
+    assert keys == {"YAOUNDE", "BASTOS", "DOUALAAKWA", "DOUALA", "AKWA"}
+
+    organization.zones = ["Bastos"]
+    organization.save(update_fields=["zones", "updated_at"])
+    keys = set(CoverageZone.objects.filter(organization_links__organization=organization).values_list("key", flat=True))
+    assert keys == {"YAOUNDE", "BASTOS"}
+
+
+def test_save_sans_champ_de_couverture_ne_resynchronise_pas(django_assert_num_queries):
+    courier = _courier(_organization())
+    courier.is_online = False
+    with django_assert_num_queries(1):
+        courier.save(update_fields=["is_online", "updated_at"])
+    assert CourierCoverage.objects.filter(courier=courier).exists()
+
+
+def test_assignation_par_zone_sans_accents():
+    organization = _organization(city="Yaoundé")
+    courier = _courier(organization, city="Yaounde")
+    _courier(organization, city="Douala")
+
+    assert list(organization_covers("YAOUNDÉ")) == [organization]
+    chosen, code, _ = choose_courier_for_order(_order("yaoundé"))
+    assert code == ""
+    assert chosen == courier
+
+
+def test_zone_non_couverte():
+    _courier(_organization())
+    chosen, code, _ = choose_courier_for_order(_order("Garoua"))
+    assert chosen is None
+    assert code == "ZONE_UNCOVERED"
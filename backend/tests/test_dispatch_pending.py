@@ -0,0 +1,135 @@
+# backend/tests/test_dispatch_pending.py
+# Dispatch groupé des livraisons bloquées.
+
+import pytest
+from django.core.management import call_command
+
+from apps.accounts.models import CourierProfile, DeliveryOrganizationProfile, UserNotification
+from apps.orders.models import Order
+from apps.shipping.dispatch import dispatch_pending
+from apps.shipping.models import Shipment, ShipmentEvent
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def organization():
+    return DeliveryOrganizationProfile.objects.create(
+        user=UserFactory(), company_name="Rapide", phone="690000000", city="Douala", status="APPROVED",
+    )
+
+
+def _courier(organization, **kwargs):
+    fields = {
+        "phone": "690000001", "city": "Douala", "id_card": "CNI", "is_approved": True,
+        "is_online": True, "delivery_organization": organization, "max_active_shipments": 2, **kwargs,
+    }
+    return CourierProfile.objects.create(user=UserFactory(), **fields)
+
+
+def _blocked(city="Douala", **kwargs):
+    order = Order.objects.create(user=UserFactory(), customer_phone="690000002", city=city, address="Akwa")
+    fields = {"status": Shipment.Status.CAPACITY_BLOCKED, "assignment_issue_code": "CAPACITY_BLOCKED", **kwargs}
+    return Shipment.objects.create(order=order, **fields)
+
+
+def test_repartition_gloutonne_par_charge_et_capacite(
+    organization, django_assert_max_num_queries, django_capture_on_commit_callbacks,
+):
+    first = _courier(organization)
+    second = _courier(organization)
+    shipments = [_blocked() for _ in range(5)]
+    uncovered = _blocked(city="Garoua")
+
+    with django_assert_max_num_queries(17), django_capture_on_commit_callbacks(execute=True):
+        stats = dispatch_pending()
+
+    assert stats == {"examined": 6, "assigned": 4, "remaining": 2}
+    assigned = Shipment.objects.filter(status=Shipment.Status.ASSIGNED)
+    assert sorted(assigned.values_list("courier_id", flat=True)) == sorted([first.id, first.id, second.id, second.id])
+    assert set(assigned.values_list("pk", flat=True)) == {s.pk for s in shipments[:4]}  # FIFO
+    assert Shipment.objects.get(pk=uncovered.pk).status == Shipment.Status.CAPACITY_BLOCKED
+
+    assert list(CourierProfile.objects.values_list("active_shipments_count", flat=True)) == [2, 2]
+    assert DeliveryOrganizationProfile.objects.get().active_shipments_count == 4
+    assert ShipmentEvent.objects.filter(status=Shipment.Status.ASSIGNED).count() == 4
+    assert Order.objects.filter(fulfillment_status=Order.FulfillmentStatus.DRIVER_ASSIGNED).count() == 4
+    assert UserNotification.objects.filter(user__in=[first.user, second.user]).count() == 4
+
+
+def test_capacite_prise_pendant_le_dispatch(organization, monkeypatch):
+    from apps.shipping import dispatch
+
+    first = _courier(organization)
+    second = _courier(organization)
+    shipments = [_blocked() for _ in range(4)]
+    load = dispatch._load_couriers
+
+    def load_then_checkout():
+        loaded = load()
+        # Checkout concurrent : les livreurs ne sont pas verrouillés à la lecture
+        CourierProfile.objects.filter(pk=first.pk).update(active_shipments_count=2)
+        return loaded
+
+    monkeypatch.setattr(dispatch, "_load_couriers", load_then_checkout)
+    assert dispatch_pending() == {"examined": 4, "assigned": 2, "remaining": 2}
+    assigned = Shipment.objects.filter(status=Shipment.Status.ASSIGNED)
+    assert set(assigned.values_list("courier_id", flat=True)) == {second.id}
+    assert CourierProfile.objects.get(pk=first.pk).active_shipments_count == 2
+    assert len(shipments) - assigned.count() == 2
+
+
+def test_capacite_organisation_prise_pendant_le_dispatch(organization, monkeypatch):
+    from apps.shipping import dispatch
+
+    organization.max_active_shipments = 3
+    organization.save(update_fields=["max_active_shipments"])
+    first = _courier(organization)
+    second = _courier(organization)
+    for _ in range(3):
+        _blocked()
+    load = dispatch._load_couriers
+
+    def load_then_checkout():
+        loaded = load()
+        # Checkout concurrent chez un autre livreur : l'organisation n'a plus qu'une place
+        DeliveryOrganizationProfile.objects.filter(pk=organization.pk).update(active_shipments_count=2)
+        return loaded
+
+    monkeypatch.setattr(dispatch, "_load_couriers", load_then_checkout)
+    assert dispatch_pending() == {"examined": 3, "assigned": 1, "remaining": 2}
+    organization.refresh_from_db()
+    assert organization.active_shipments_count == 3
+    assert Shipment.objects.filter(status=Shipment.Status.ASSIGNED, courier__in=[first, second]).count() == 1
+
+
+def test_vehicule_requis_respecte(organization):
+    _courier(organization, vehicle_type="MOTORBIKE")
+    van = _courier(organization, vehicle_type="VAN")
+    shipment = _blocked(status=Shipment.Status.VEHICLE_INCOMPATIBLE, required_vehicle_type="VAN")
+
+    dispatch_pending()
+    assert Shipment.objects.get(pk=shipment.pk).courier_id == van.id
+
+
+def test_dry_run_et_commande(organization, capsys):
+    _courier(organization)
+    shipment = _blocked()
+
+    call_command("dispatch_pending", "--dry-run")
+    assert "[dry-run] 1/1" in capsys.readouterr().out
+    assert Shipment.objects.get(pk=shipment.pk).status == Shipment.Status.CAPACITY_BLOCKED
+
+    call_command("dispatch_pending")
+    assert Shipment.objects.get(pk=shipment.pk).status == Shipment.Status.ASSIGNED
+
+
+def test_declenchement_admin(api_client, django_user_model, organization):
+    _courier(organization)
+    _blocked()
+    api_client.force_authenticate(user=django_user_model.objects.create_superuser("adm-dp", "adm@belivay.test", "p"))
+
+    resp = api_client.post("/api/vendors/admin/shipments/dispatch/", {}, format="json")
+    assert resp.status_code == 200, resp.content
+    assert resp.data["assigned"] == 1
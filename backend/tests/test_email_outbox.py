@@ -0,0 +1,89 @@
+# backend/tests/test_email_outbox.py
+# Outbox e-mail : les vues écrivent un OutboundEmail, le worker envoie.
+
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.accounts.models import UserProfile
+from apps.common.mail import MAX_ATTEMPTS, deliver_pending, queue_email
+from apps.common.models import OutboundEmail
+from tests.factories import UserFactory, TEST_PASSWORD
+
+pytestmark = pytest.mark.django_db
+
+
+def test_login_2fa_met_le_code_en_file_sans_envoyer(api_client):
+    user = UserFactory()
+    UserProfile.objects.update_or_create(user=user, defaults={"two_factor_enabled": True})
+
+    resp = api_client.post(
+        "/api/auth/login/",
+        {"username": user.username, "password": TEST_PASSWORD},
+        format="json",
+    )
+    assert resp.status_code == 200, resp.content
+    assert resp.data["2fa_required"] is True
+    assert mail.outbox == []
+
+    queued = OutboundEmail.objects.get()
+    assert queued.to == [user.email]
+    assert queued.status == OutboundEmail.Status.PENDING
+
+    call_command("send_queued_emails")
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == [user.email]
+    queued.refresh_from_db()
+    assert queued.status == OutboundEmail.Status.SENT
+    assert queued.sent_at is not None
+
+
+def test_contact_met_deux_emails_en_file(api_client):
+    resp = api_client.post(
+        "/api/contact/",
+        {
+            "name": "Awa",
+            "email": "awa@belivay.test",
+            "subject": "Question livraison",
+            "message": "Bonjour, combien de temps pour Douala ?",
+        },
+        format="json",
+    )
+    assert resp.status_code == 201, resp.content
+    assert OutboundEmail.objects.count() == 2
+    assert mail.outbox == []
+
+    stats = deliver_pending()
+    assert stats["sent"] == 2
+    confirmation = next(m for m in mail.outbox if m.to == ["awa@belivay.test"])
+    assert confirmation.alternatives  # version HTML jointe
+
+
+def test_echec_smtp_reprogramme_puis_abandonne(monkeypatch):
+    email = queue_email("Sujet", "Corps", ["client@belivay.test"])
+
+    def _boom(self):
+        raise OSError("SMTP indisponible")
+
+    monkeypatch.setattr("django.core.mail.EmailMessage.send", _boom)
+
+    stats = deliver_pending()
+    assert stats == {"sent": 0, "retried": 1, "failed": 0}
+    email.refresh_from_db()
+    assert email.status == OutboundEmail.Status.PENDING
+    assert email.attempts == 1
+    assert email.next_attempt_at > timezone.now()
+    assert "SMTP indisponible" in email.last_error
+
+    # Pas encore échu : le worker l'ignore
+    assert deliver_pending() == {"sent": 0, "retried": 0, "failed": 0}
+
+    OutboundEmail.objects.filter(pk=email.pk).update(
+        attempts=MAX_ATTEMPTS - 1, next_attempt_at=timezone.now() - timedelta(seconds=1),
+    )
+    assert deliver_pending()["failed"] == 1
+    email.refresh_from_db()
+    assert email.status == OutboundEmail.Status.FAILED
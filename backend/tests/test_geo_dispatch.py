@@ -0,0 +1,148 @@
+# backend/tests/test_geo_dispatch.py
+# Positions livreurs, voisinage en base, distances d'enlèvement / livraison.
+
+from decimal import Decimal
+
+import pytest
+
+from apps.accounts.models import CourierProfile, DeliveryOrganizationProfile
+from apps.catalog.models import Category, Product
+from apps.orders.models import Order, OrderItem
+from apps.shipping.assignment import assign_shipment_or_mark_blocked
+from apps.shipping.geo import (
+    NEAREST_K,
+    haversine_km,
+    locate_shipment,
+    nearest_couriers,
+    update_courier_position,
+)
+from apps.shipping.models import Shipment
+from apps.vendors.models import VendorLocation, VendorProfile
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+AKWA = (4.0500, 9.7000)
+BONAPRISO = (4.0300, 9.6950)
+BONABERI = (4.0700, 9.6600)
+YAOUNDE = (3.8480, 11.5021)
+
+
+@pytest.fixture
+def organization():
+    return DeliveryOrganizationProfile.objects.create(
+        user=UserFactory(), company_name="Rapide", phone="690000000", city="Douala", status="APPROVED",
+    )
+
+
+def _courier(organization, position=None, **kwargs):
+    fields = {
+        "phone": "690000001", "city": "Douala", "id_card": "CNI", "is_approved": True,
+        "is_online": True, "delivery_organization": organization, **kwargs,
+    }
+    courier = CourierProfile.objects.create(user=UserFactory(), **fields)
+    if position:
+        update_courier_position(courier, *position)
+    return courier
+
+
+def _order_from_shop(shop=AKWA, **kwargs):
+    vendor = UserFactory()
+    profile = VendorProfile.objects.create(
+        user=vendor, business_name="Boutique", business_description="-", phone="690000003",
+        address="Akwa", city="Douala",
+    )
+    VendorLocation.objects.create(
+        vendor=profile, name="Akwa", address="Akwa", phone="690000003",
+        representative_name="Rep", representative_phone="690000003",
+        latitude=Decimal(str(shop[0])), longitude=Decimal(str(shop[1])),
+    )
+    category, _ = Category.objects.get_or_create(slug="geo", defaults={"name": "Geo"})
+    product = Product.objects.create(
+        title="Sac", slug=f"sac-{vendor.pk}", category=category, price_xaf=1000, vendor=vendor,
+    )
+    fields = {"customer_phone": "690000002", "city": "Douala", "address": "Bonapriso", **kwargs}
+    order = Order.objects.create(user=UserFactory(), **fields)
+    OrderItem.objects.create(order=order, product=product, title_snapshot="Sac", price_xaf_snapshot=1000, qty=1)
+    return order
+
+
+def test_haversine():
+    assert haversine_km(AKWA, AKWA) == 0
+    assert 200 < haversine_km(AKWA, YAOUNDE) < 215
+
+
+def test_nearest_couriers_trie_et_borne(organization):
+    near = _courier(organization, BONAPRISO)
+    far = _courier(organization, BONABERI)
+    _courier(organization, YAOUNDE)
+    _courier(organization, AKWA, is_online=False)
+
+    ranked = nearest_couriers(*AKWA)
+    assert [courier_id for courier_id, _ in ranked] == [near.id, far.id]
+    assert ranked[0][1] < ranked[1][1] < 15
+
+    # Un déplacement est vu aussitôt, par tous les processus
+    update_courier_position(far, *AKWA)
+    assert nearest_couriers(*AKWA, k=1)[0][0] == far.id
+
+
+def test_position_une_ecriture_sans_index_partage(organization, django_assert_num_queries):
+    couriers = [_courier(organization, AKWA) for _ in range(20)]
+    mover = couriers[0]
+    with django_assert_num_queries(1):  # un UPDATE, quel que soit le nombre de livreurs en ligne
+        update_courier_position(mover, *BONABERI)
+    # Deux positions écrites « en même temps » sont toutes deux visibles
+    update_courier_position(couriers[1], *BONABERI)
+    near_bonaberi = {courier_id for courier_id, km in nearest_couriers(*BONABERI) if km < 0.1}
+    assert near_bonaberi == {mover.id, couriers[1].id}
+
+
+def test_locate_shipment_boutique_et_centre_ville():
+    order = _order_from_shop(delivery_latitude=Decimal("4.030000"), delivery_longitude=Decimal("9.695000"))
+    shipment = locate_shipment(Shipment.objects.create(order=order))
+    assert (float(shipment.pickup_latitude), float(shipment.pickup_longitude)) == AKWA
+    assert shipment.route_km == pytest.approx(haversine_km(AKWA, BONAPRISO), abs=0.01)
+
+    # Sans coordonnées client : centre-ville
+    order = _order_from_shop(city="Douala")
+    shipment = locate_shipment(Shipment.objects.create(order=order))
+    assert float(shipment.drop_latitude) == pytest.approx(4.0511)
+
+
+def test_assignation_prefere_le_plus_proche_a_charge_egale(organization):
+    _courier(organization, BONABERI)
+    near = _courier(organization, BONAPRISO)
+    _courier(organization)  # sans position
+
+    shipment = assign_shipment_or_mark_blocked(Shipment.objects.create(order=_order_from_shop()))
+    assert shipment.courier == near
+    assert shipment.route_km is not None
+
+
+def test_assignation_classe_parmi_les_eligibles(organization):
+    # Plus de NEAREST_K livreurs en ligne plus proches, mais d'une organisation hors zone
+    elsewhere = DeliveryOrganizationProfile.objects.create(
+        user=UserFactory(), company_name="Ailleurs", phone="690000009", city="Yaounde", status="PENDING",
+    )
+    for _ in range(NEAREST_K + 2):
+        _courier(elsewhere, AKWA)
+    _courier(organization)  # éligible sans position, le plus anciennement servi
+    far = _courier(organization, BONABERI)
+
+    shipment = assign_shipment_or_mark_blocked(Shipment.objects.create(order=_order_from_shop()))
+    assert shipment.courier == far
+
+
+def test_endpoint_position(api_client, organization):
+    courier = _courier(organization)
+    api_client.force_authenticate(user=courier.user)
+
+    resp = api_client.post("/api/shipping/position/", {"latitude": "4.05", "longitude": "9.70"}, format="json")
+    assert resp.status_code == 200, resp.content
+    courier.refresh_from_db()
+    assert courier.last_latitude == Decimal("4.050000")
+    assert nearest_couriers(*AKWA)[0][0] == courier.id
+
+    resp = api_client.post("/api/shipping/position/", {"latitude": "120", "longitude": "9.70"}, format="json")
+    assert resp.status_code == 400
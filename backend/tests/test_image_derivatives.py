@@ -0,0 +1,167 @@
+# backend/tests/test_image_derivatives.py
+# Dérivés des images produit / fiche : tailles, WebP sans EXIF, chemins
+# déterministes, dimensions, srcset, rattrapage par le job, partage.
+
+import io
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from apps.catalog import images
+from apps.catalog.jobs import generate_image_derivatives
+from apps.catalog.models import Category, MasterProduct, Product, ProductImage
+from apps.catalog.serializers import ProductImageSerializer
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def vendor(django_user_model):
+    return django_user_model.objects.create_user(username="vendeur-img", password="p")
+
+
+@pytest.fixture
+def product(vendor):
+    category = Category.objects.create(name="Mode", slug="mode")
+    return Product.objects.create(title="Sac", category=category, price_xaf=1000, vendor=vendor)
+
+
+def _upload(name, size=(2400, 1600), fmt="JPEG", mode="RGB", color="red", **save_options):
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, fmt, **save_options)
+    content_type = {"JPEG": "image/jpeg", "PNG": "image/png"}[fmt]
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=content_type)
+
+
+def _exif_portrait_with_gps():
+    exif = Image.Exif()
+    exif[0x0112] = 6                       # rotation 90° : l'original est « couché »
+    exif[0x010F] = "Phone"
+    exif.get_ifd(0x8825)[2] = (4.0, 3.0, 0.0)  # latitude GPS
+    return exif
+
+
+def _open(name):
+    with default_storage.open(name, "rb") as handle:
+        image = Image.open(io.BytesIO(handle.read()))
+        image.load()
+        return image
+
+
+def test_upload_produit_genere_les_derives(api_client, vendor, product, django_capture_on_commit_callbacks):
+    api_client.force_authenticate(user=vendor)
+    upload = _upload("photo.jpg", exif=_exif_portrait_with_gps())
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = api_client.post(f"/api/vendors/products/{product.id}/images/", {"image": upload}, format="multipart")
+    assert resp.status_code == 201
+    image_obj = ProductImage.objects.get(pk=resp.data["id"])
+    data = ProductImageSerializer(image_obj).data
+    assert (data["width"], data["height"]) == (1600, 2400)  # orientation EXIF appliquée
+
+    stem = image_obj.image.name.rsplit(".", 1)[0]
+    sizes = image_obj.derivatives["sizes"]
+    assert {size: entry["name"] for size, entry in sizes.items()} == {
+        size: f"derivatives/{stem}/{size}.webp" for size in ("thumb", "medium", "large")
+    }
+    assert {size: (entry["width"], entry["height"]) for size, entry in sizes.items()} == {
+        "thumb": (200, 200), "medium": (400, 600), "large": (800, 1200),
+    }
+
+    large = _open(sizes["large"]["name"])
+    assert large.format == "WEBP" and large.size == (800, 1200)
+    assert not large.getexif() and "exif" not in large.info
+
+    assert data["thumbnail_url"] == f"/media/derivatives/{stem}/thumb.webp"
+    assert data["srcset"] == (
+        f"/media/derivatives/{stem}/medium.webp 400w, /media/derivatives/{stem}/large.webp 800w"
+    )
+    assert data["image_url"].endswith(image_obj.image.name)  # l'original reste disponible
+
+
+def test_petite_image_fiche_sans_agrandissement(api_client, vendor, product, django_capture_on_commit_callbacks):
+    master = MasterProduct.objects.create(title="Fiche", category=product.category)
+    product.master = master
+    product.save()
+    api_client.force_authenticate(user=vendor)
+    upload = _upload("logo.png", size=(300, 150), fmt="PNG", mode="RGBA", color=(255, 0, 0, 128))
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = api_client.post(f"/api/vendors/masters/{master.id}/images/", {"image": upload}, format="multipart")
+    assert resp.status_code == 201
+
+    image_obj = master.images.get()
+    sizes = image_obj.derivatives["sizes"]
+    assert set(sizes) == {"thumb", "medium"}  # large = medium : non produit
+    assert (sizes["thumb"]["width"], sizes["medium"]["width"]) == (150, 300)
+    assert _open(sizes["medium"]["name"]).mode == "RGBA"
+    assert images.derivative_url(image_obj, "large") == images.derivative_url(image_obj, "medium")
+    assert images.srcset(image_obj).endswith("/medium.webp 300w")
+
+
+def test_job_rattrape_et_original_illisible(settings, product):
+    settings.IMAGE_DERIVATIVES_ON_UPLOAD = False
+    good = ProductImage.objects.create(product=product, image=_upload("a.jpg", size=(900, 900)))
+    broken = ProductImage.objects.create(
+        product=product, image=SimpleUploadedFile("b.jpg", b"pas une image", content_type="image/jpeg"),
+    )
+    assert ProductImageSerializer(good).data["thumbnail_url"] == good.image.url  # original en attendant
+    assert ProductImageSerializer(good).data["srcset"] is None
+
+    assert generate_image_derivatives() == 2
+    assert generate_image_derivatives() == 0
+    good.refresh_from_db()
+    broken.refresh_from_db()
+    assert (good.width, sorted(good.derivatives["sizes"])) == (900, ["large", "medium", "thumb"])
+    assert broken.derivatives == {"source": broken.image.name, "sizes": {}, "error": "UnidentifiedImageError"}
+    assert ProductImageSerializer(broken).data["thumbnail_url"] == broken.image.url
+
+
+def test_original_introuvable_reessaye_plus_tard(settings, product, media_root):
+    settings.IMAGE_DERIVATIVES_ON_UPLOAD = False
+    missing = ProductImage.objects.create(product=product, image=_upload("f.jpg", size=(300, 300), color="blue"))
+    good = ProductImage.objects.create(product=product, image=_upload("g.jpg", size=(300, 300)))
+    (media_root / missing.image.name).unlink()  # volume média non monté / fichier absent
+
+    assert generate_image_derivatives() == 1
+    missing.refresh_from_db()
+    good.refresh_from_db()
+    assert missing.derivatives is None  # pas marqué en échec définitif
+    assert good.derivatives["sizes"]
+
+    (media_root / missing.image.name).write_bytes(_upload("f.jpg", size=(300, 300), color="blue").read())
+    assert generate_image_derivatives() == 1
+    missing.refresh_from_db()
+    assert missing.width == 300
+
+
+def test_remplacement_regenere_les_derives(product, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        image_obj = ProductImage.objects.create(product=product, image=_upload("c.jpg"))
+    image_obj.refresh_from_db()
+    assert image_obj.width == 2400
+
+    with django_capture_on_commit_callbacks(execute=True):
+        image_obj.image = _upload("d.jpg", size=(700, 500))
+        image_obj.save()
+    image_obj.refresh_from_db()
+    assert image_obj.derivatives["source"] == image_obj.image.name
+    assert (image_obj.width, image_obj.derivatives["sizes"]["medium"]["width"]) == (700, 600)
+
+
+def test_meme_original_derives_partages(product, monkeypatch, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        first = ProductImage.objects.create(product=product, image=_upload("e.jpg"))
+    monkeypatch.setattr(images, "render", lambda source: pytest.fail("dérivés déjà produits"))
+    with django_capture_on_commit_callbacks(execute=True):
+        second = ProductImage.objects.create(product=product, image=_upload("e-bis.jpg"))
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert second.image.name == first.image.name
+    assert second.derivatives == first.derivatives
@@ -1,6 +1,7 @@
 # backend/tests/test_masterproduct_api.py
 import pytest
-from apps.catalog.models import Category, Product, MasterProduct
+from apps.catalog.models import Category, Product, MasterProduct, MasterProductImage
+from apps.catalog.serializers import MasterProductListSerializer
 
 pytestmark = pytest.mark.django_db
 
@@ -32,4 +33,17 @@ def test_api_master_detail(api_client):
     assert resp.status_code == 200
     data = resp.json()
     assert len(data["offers"]) == 2
-    assert data["offers"][0]["price_xaf"] == 450000        # offres triées par prix
\ No newline at end of file
+    assert data["offers"][0]["price_xaf"] == 450000        # offres triées par prix
+
+def test_api_master_list_image_principale_prechargee(api_client, django_assert_num_queries):
+    master = _setup()
+    MasterProductImage.objects.create(master=master, image="masters/a.jpg", order=0)
+    MasterProductImage.objects.create(master=master, image="masters/b.jpg", order=1, is_primary=True)
+    resp = api_client.get("/api/catalog/master-products/")
+    assert resp.json()["results"][0]["primary_image"].endswith("masters/b.jpg")
+
+    obj = MasterProduct.objects.prefetch_related("images").get(pk=master.pk)
+    serializer = MasterProductListSerializer()
+    with django_assert_num_queries(0):  # images préchargées, choix fait une fois
+        serializer.get_primary_image(obj)
+        serializer.get_primary_image_srcset(obj)
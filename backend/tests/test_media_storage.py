@@ -0,0 +1,182 @@
+# backend/tests/test_media_storage.py
+# Stockage média adressé par contenu : déduplication SHA-256, compteurs de
+# références, duplication sans copie, ramasse-miettes (media_gc).
+
+import hashlib
+import io
+import os
+from datetime import timedelta
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction
+from PIL import Image
+
+from apps.catalog.models import Category, Product, ProductImage
+from apps.common.media import collect_garbage
+from apps.common.models import MediaBlob
+from apps.vendors.models import VendorProfile
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+NO_GRACE = timedelta(0)
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.IMAGE_DERIVATIVES_ON_UPLOAD = False
+    return tmp_path
+
+
+@pytest.fixture
+def vendor():
+    return UserFactory()
+
+
+@pytest.fixture
+def products(vendor):
+    category = Category.objects.create(name="Mode", slug="mode")
+    return [
+        Product.objects.create(title=f"Sac {i}", slug=f"sac-{i}", category=category, price_xaf=1000, vendor=vendor)
+        for i in range(2)
+    ]
+
+
+def _jpeg(color="red"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (40, 30), color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def _upload(content, name="photo.JPG"):
+    return SimpleUploadedFile(name, content, content_type="image/jpeg")
+
+
+def _files(root, prefix="cas"):
+    return sorted(
+        os.path.relpath(os.path.join(directory, name), root)
+        for directory, _, names in os.walk(os.path.join(root, prefix)) for name in names
+    )
+
+
+def _blob(name):
+    return MediaBlob.objects.get(name=name)
+
+
+def test_meme_contenu_un_seul_fichier(api_client, vendor, products, media_root):
+    content = _jpeg()
+    digest = hashlib.sha256(content).hexdigest()
+    api_client.force_authenticate(user=vendor)
+    for product in products:
+        resp = api_client.post(
+            f"/api/vendors/products/{product.id}/images/", {"image": _upload(content)}, format="multipart",
+        )
+        assert resp.status_code == 201
+
+    names = set(ProductImage.objects.values_list("image", flat=True))
+    assert names == {f"cas/{digest[:2]}/{digest[2:4]}/{digest}.jpg"}
+    assert _files(media_root) == [f"cas/{digest[:2]}/{digest[2:4]}/{digest}.jpg"]
+    blob = _blob(names.pop())
+    assert (blob.ref_count, blob.size) == (2, len(content))
+
+
+def test_duplication_produit_sans_copie(api_client, vendor, products, media_root):
+    source = products[0]
+    for color in ("red", "blue"):
+        ProductImage.objects.create(product=source, image=_upload(_jpeg(color)))
+    api_client.force_authenticate(user=vendor)
+    resp = api_client.post(f"/api/vendors/products/{source.id}/duplicate/")
+    assert resp.status_code == 201
+
+    copy = Product.objects.get(pk=resp.data["id"])
+    assert sorted(copy.images.values_list("image", flat=True)) == sorted(source.images.values_list("image", flat=True))
+    assert len(_files(media_root)) == 2
+    assert sorted(MediaBlob.objects.values_list("ref_count", flat=True)) == [2, 2]
+
+
+def test_references_suivies_sur_tous_les_champs(products):
+    content = _jpeg()
+    image = ProductImage.objects.create(product=products[0], image=_upload(content))
+    profile = VendorProfile.objects.create(
+        user=products[0].vendor, business_name="Boutique", business_description="-", phone="690000004",
+        address="Akwa", city="Douala", profile_photo=_upload(content, "moi.jpg"),
+    )
+    assert profile.profile_photo.name == image.image.name
+    assert _blob(image.image.name).ref_count == 2
+
+    profile.profile_photo.delete(save=False)  # ancien code des vues : ne doit rien effacer
+    profile.profile_photo = _upload(_jpeg("green"), "moi.jpg")
+    profile.save(update_fields=["profile_photo", "updated_at"])
+    assert default_storage.exists(image.image.name)
+    assert _blob(image.image.name).ref_count == 1
+    assert _blob(profile.profile_photo.name).ref_count == 1
+
+    image.delete()
+    assert _blob(image.image.name).ref_count == 0
+
+
+def test_gc_supprime_seulement_le_non_reference(products, media_root, django_capture_on_commit_callbacks):
+    kept = ProductImage.objects.create(product=products[0], image=_upload(_jpeg("red")))
+    dropped = ProductImage.objects.create(product=products[1], image=_upload(_jpeg("blue")))
+    dropped_name = dropped.image.name
+    dropped.delete()
+    default_storage.save("cas/00/00/orphelin.jpg", ContentFile(b"x"))  # upload annulé : fichier sans blob
+    legacy_kept = default_storage.save("products/2025/01/ancien.jpg", ContentFile(b"a"))
+    default_storage.save("products/2025/01/oublie.jpg", ContentFile(b"b"))
+    default_storage.save("derivatives/products/2025/01/oublie/thumb.webp", ContentFile(b"c"))
+    ProductImage.objects.create(product=products[0], image=legacy_kept)
+
+    # Recent : rien n'est supprimé pendant le délai de grâce
+    assert collect_garbage()["blobs"] == 0
+    assert default_storage.exists(dropped_name)
+
+    preview = collect_garbage(grace=NO_GRACE, dry_run=True)
+    assert default_storage.exists(dropped_name)
+    with django_capture_on_commit_callbacks(execute=True):
+        stats = collect_garbage(grace=NO_GRACE)
+    assert {key: stats[key] for key in ("blobs", "orphans", "legacy", "derivatives")} == {
+        "blobs": 1, "orphans": 1, "legacy": 1, "derivatives": 1,
+    } == {key: preview[key] for key in ("blobs", "orphans", "legacy", "derivatives")}
+    assert not default_storage.exists(dropped_name)
+    assert not MediaBlob.objects.filter(name=dropped_name).exists()
+    assert _files(media_root) == [kept.image.name]
+    assert _files(media_root, "products") == ["products/2025/01/ancien.jpg"]
+    assert _files(media_root, "derivatives") == []
+
+
+def test_gc_recale_les_compteurs(products, media_root, django_capture_on_commit_callbacks):
+    red = ProductImage.objects.create(product=products[0], image=_upload(_jpeg("red")))
+    blue = ProductImage.objects.create(product=products[1], image=_upload(_jpeg("blue")))
+    ProductImage.objects.filter(pk=blue.pk).update(image=red.image.name)  # UPDATE en masse : sans signal
+    assert (_blob(red.image.name).ref_count, _blob(blue.image.name).ref_count) == (1, 1)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("media_gc", "--grace-hours", "0", stdout=io.StringIO())
+    assert _blob(red.image.name).ref_count == 2
+    assert not MediaBlob.objects.filter(name=blue.image.name).exists()
+    assert _files(media_root) == [red.image.name]
+
+
+def test_gc_efface_les_fichiers_au_commit_seulement(products, media_root):
+    dropped = ProductImage.objects.create(product=products[0], image=_upload(_jpeg("blue")))
+    name = dropped.image.name
+    dropped.delete()
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():  # job planifié annulé après le GC
+            assert collect_garbage(grace=NO_GRACE)["blobs"] == 1
+            raise RuntimeError("rollback")
+    assert default_storage.exists(name)
+    assert _blob(name).ref_count == 0
+
+
+def test_gc_refuse_sans_volume_media(settings, products, tmp_path):
+    ProductImage.objects.create(product=products[0], image=_upload(_jpeg()))
+    settings.MEDIA_ROOT = str(tmp_path / "non-monte")
+    with pytest.raises(RuntimeError, match="volume média"):
+        collect_garbage(grace=NO_GRACE)
+    assert MediaBlob.objects.count() == 1
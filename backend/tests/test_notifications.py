@@ -0,0 +1,102 @@
+# backend/tests/test_notifications.py
+# Service de notifications : audience indexée, écriture groupée au commit,
+# compteur de non-lus servi depuis le cache.
+
+import pytest
+from django.db import transaction
+
+from apps.accounts.models import UserNotification
+from apps.accounts.notifications import notify
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_audience_deduite_de_action_url(django_capture_on_commit_callbacks):
+    user = UserFactory()
+    with django_capture_on_commit_callbacks(execute=True):
+        notify(user, "A", "m", action_url="/courier")
+        notify(user, "B", "m", action_url="/seller/orders")
+        notify(user, "C", "m", action_url="/orders/3")
+
+    audiences = dict(UserNotification.objects.values_list("title", "audience"))
+    assert audiences == {"A": "COURIER", "B": "VENDOR", "C": "CUSTOMER"}
+
+
+def test_liste_filtree_par_audience(api_client, django_capture_on_commit_callbacks):
+    user = UserFactory()
+    with django_capture_on_commit_callbacks(execute=True):
+        notify(user, "Livreur", "m", action_url="/courier")
+        notify(user, "Client", "m", action_url="/orders")
+    api_client.force_authenticate(user=user)
+
+    titles = [n["title"] for n in api_client.get("/api/auth/notifications/?audience=livreur").data]
+    assert titles == ["Livreur"]
+    titles = [n["title"] for n in api_client.get("/api/auth/notifications/").data]
+    assert titles == ["Client"]
+
+
+def test_transaction_collecte_puis_insere_au_commit(django_capture_on_commit_callbacks, django_assert_num_queries):
+    users = [UserFactory() for _ in range(3)]
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        with transaction.atomic():
+            notify(users[:2], "Commande", "m", action_url="/seller/orders")
+            notify(users[2], "Livraison", "m", action_url="/courier")
+            assert UserNotification.objects.count() == 0
+
+    with django_assert_num_queries(1):  # un seul bulk_create pour toute la transaction
+        for callback in callbacks:
+            callback()
+    assert UserNotification.objects.count() == 3
+
+
+def test_rollback_n_insere_rien(django_capture_on_commit_callbacks):
+    user = UserFactory()
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                notify(user, "Perdue", "m")
+                raise RuntimeError
+    assert not UserNotification.objects.exists()
+
+
+def test_savepoint_annule_emporte_ses_notifications(django_capture_on_commit_callbacks):
+    user = UserFactory()
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            notify(user, "Avant", "m")
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    notify(user, "Annulée", "m")
+                    raise RuntimeError
+            with transaction.atomic():
+                notify(user, "Savepoint validé", "m")
+            notify(user, "Après", "m")
+
+    titles = set(UserNotification.objects.values_list("title", flat=True))
+    assert titles == {"Avant", "Savepoint validé", "Après"}
+
+
+def test_compteur_non_lus_sans_count_apres_le_premier_appel(
+    api_client, django_assert_num_queries, django_capture_on_commit_callbacks,
+):
+    user = UserFactory()
+    with django_capture_on_commit_callbacks(execute=True):
+        notify(user, "Un", "m")
+    api_client.force_authenticate(user=user)
+    url = "/api/auth/notifications/unread-count/?audience=customer"
+
+    assert api_client.get(url).data["unread"] == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        notify(user, "Deux", "m")
+    with django_assert_num_queries(0):
+        assert api_client.get(url).data["unread"] == 2
+
+    first = UserNotification.objects.filter(user=user).order_by("id").first()
+    api_client.post(f"/api/auth/notifications/{first.id}/read/")
+    assert api_client.get(url).data["unread"] == 1
+
+    api_client.post("/api/auth/notifications/read-all/")
+    assert api_client.get(url).data["unread"] == 0
@@ -0,0 +1,134 @@
+# backend/tests/test_order_read_model.py
+# Modèle de lecture des commandes : checkout, tenue à jour, listes admin / vendeur à requêtes constantes.
+
+import pytest
+
+from apps.catalog.models import Category, Product
+from apps.orders.models import Order, OrderItem
+from apps.shipping.models import Shipment, ShipmentEvent
+from apps.vendors.models import VendorProfile
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def category():
+    return Category.objects.create(name="Mode", slug="mode")
+
+
+def _vendor(name):
+    return VendorProfile.objects.create(
+        user=UserFactory(), business_name=name, business_description="-", phone="690000003",
+        address="Akwa", city="Douala", status="APPROVED",
+    ).user
+
+
+def _product(vendor, category, price=1000):
+    return Product.objects.create(
+        title="Sac", slug=f"sac-{Product.all_objects.count()}", category=category, price_xaf=price, vendor=vendor,
+    )
+
+
+def _order(*lines):
+    order = Order.objects.create(user=UserFactory(), customer_phone="690000002", city="Douala", address="Akwa")
+    for product, qty in lines:
+        OrderItem.objects.create(
+            order=order, product=product, title_snapshot="Sac", price_xaf_snapshot=product.price_xaf, qty=qty,
+            line_total_xaf=product.price_xaf * qty,
+        )
+    return order
+
+
+def test_checkout_fige_le_modele_de_lecture(api_client, category):
+    alpha, beta = _vendor("Alpha"), _vendor("Beta")
+    bag, hat = _product(alpha, category, 1000), _product(beta, category, 2500)
+
+    api_client.force_authenticate(user=UserFactory())
+    resp = api_client.post("/api/orders/", {
+        "cart_items": [{"product_id": bag.pk, "qty": 2}, {"product_id": hat.pk, "qty": 1}],
+        "city": "DOUALA", "address": "Akwa", "customer_phone": "690000002",
+    }, format="json")
+    assert resp.status_code == 201, resp.content
+
+    order = Order.objects.latest("id")
+    assert order.items_count == 2
+    assert order.vendor_ids == sorted([alpha.id, beta.id])
+    assert order.vendor_subtotal(alpha.id) == 2000 and order.vendor_subtotal(beta.id) == 2500
+
+
+def test_article_ajoute_ou_supprime_recalcule(category):
+    alpha, beta = _vendor("Alpha"), _vendor("Beta")
+    order = _order((_product(alpha, category), 1))
+    extra = OrderItem.objects.create(
+        order=order, product=_product(beta, category, 3000), title_snapshot="Sac", price_xaf_snapshot=3000,
+        qty=1, line_total_xaf=3000,
+    )
+    order.refresh_from_db()
+    assert (order.items_count, order.vendor_ids) == (2, sorted([alpha.id, beta.id]))
+
+    extra.delete()
+    order.refresh_from_db()
+    assert (order.items_count, order.vendor_ids, order.vendor_subtotals) == (1, [alpha.id], {str(alpha.id): 1000})
+
+
+def test_listes_admin_et_vendeur_a_requetes_constantes(api_client, django_user_model, category,
+                                                       django_assert_num_queries):
+    alpha, beta = _vendor("Alpha"), _vendor("Beta")
+    products = [_product(alpha, category), _product(beta, category, 500)]
+
+    def fill(count):
+        for _ in range(count):
+            shipment = Shipment.objects.create(order=_order((products[0], 2), (products[1], 1)))
+            ShipmentEvent.objects.create(shipment=shipment, status=shipment.status, message="Créée")
+
+    admin = django_user_model.objects.create_superuser("adm-orders", "adm-orders@belivay.test", "p")
+
+    # Même nombre de requêtes pour 2 et pour 8 commandes (hors suivi d'activité du
+    # middleware, écarté par une première requête de chaque utilisateur)
+    for user in (admin, alpha):
+        api_client.force_authenticate(user=user)
+        api_client.get("/api/vendors/orders/")
+    for total in (2, 8):
+        fill(total - Order.objects.count())
+        api_client.force_authenticate(user=admin)
+        with django_assert_num_queries(4):  # COUNT, page, vendeurs de la page, totals
+            resp = api_client.get("/api/vendors/admin/orders/")
+        assert resp.data["count"] == len(resp.data["results"]) == total
+        assert resp.data["totals"]["total"] == total
+        assert resp.data["results"][0]["items_count"] == 2
+        assert sorted(resp.data["results"][0]["vendor_names"]) == sorted([alpha.username, beta.username])
+
+        api_client.force_authenticate(user=alpha)
+        with django_assert_num_queries(5):
+            resp = api_client.get("/api/vendors/orders/")
+        assert len(resp.data) == total
+        assert resp.data[0]["vendor_subtotal"] == 2000
+        assert [item["line_total_xaf"] for item in resp.data[0]["items"]] == [2000]
+
+    resp = api_client.get("/api/vendors/admin/orders/", {"vendor": beta.id})
+    assert resp.status_code == 403  # alpha n'est pas admin
+    api_client.force_authenticate(user=admin)
+    assert api_client.get("/api/vendors/admin/orders/", {"vendor": beta.id}).data["count"] == 8
+
+
+def test_liste_admin_paginee_triee_avec_totals(api_client, django_user_model, category):
+    alpha = _vendor("Alpha")
+    product = _product(alpha, category)
+    orders = [_order((product, qty)) for qty in (1, 3, 2)]
+    for order, total in zip(orders, (1000, 3000, 2000)):
+        Order.objects.filter(pk=order.pk).update(total_xaf=total)
+    Order.objects.filter(pk=orders[1].pk).update(payment_status=Order.PaymentStatus.PAID)
+    admin = django_user_model.objects.create_superuser("adm-page", "adm-page@belivay.test", "p")
+    api_client.force_authenticate(user=admin)
+
+    resp = api_client.get("/api/vendors/admin/orders/", {"page_size": 2, "ordering": "-total_xaf"})
+    assert resp.data["count"] == 3 and resp.data["next"] is not None
+    assert [row["id"] for row in resp.data["results"]] == [orders[1].pk, orders[2].pk]
+    assert resp.data["totals"] == {
+        "total": 3, "pending": 2, "paid": 1, "failed": 0, "refunded": 0,
+        "revenue": 3000, "delivered": 0, "cancelled": 0,
+    }
+
+    resp = api_client.get("/api/vendors/admin/orders/", {"user": orders[0].user_id})
+    assert [row["id"] for row in resp.data["results"]] == [orders[0].pk]
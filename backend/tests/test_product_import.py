@@ -0,0 +1,171 @@
+# backend/tests/test_product_import.py
+# Import CSV produits : validation complète avant écriture, écritures groupées
+# (nombre de requêtes borné), simulation, slugs / SKU, import en arrière-plan.
+
+import io
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.catalog.models import Category, Inventory, Product, ProductAttribute, ProductAttributeValue
+from apps.common.models import AuditLog
+from apps.vendors.models import ProductImportJob, VendorProfile
+from apps.vendors.product_import import STALE_AFTER, import_products, run_pending_jobs
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+URL = "/api/vendors/products/import/csv/"
+HEADER = "Titre,Catégorie,Prix (FCFA),Stock,SKU,Attribut : Taille\n"
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def vendor():
+    user = UserFactory()
+    VendorProfile.objects.create(
+        user=user, business_name="Boutique Import", business_description="-", phone="690000010",
+        address="Akwa", city="Douala", status="APPROVED",
+    )
+    return user
+
+
+@pytest.fixture
+def category():
+    category = Category.objects.create(name="Mode", slug="mode")
+    ProductAttribute.objects.create(category=category, name="Taille", slug="mode-taille", values=["S", "M", "L"])
+    return category
+
+
+def _csv(lines, name="produits.csv"):
+    return SimpleUploadedFile(name, ("\ufeff" + HEADER + "".join(lines)).encode("utf-8"), content_type="text/csv")
+
+
+def _lines(count, title="T-shirt"):
+    return [f"{title} {i},mode,{1000 + i},{i},,S|M\n" for i in range(count)]
+
+
+def test_import_groupe_requetes_bornees(api_client, vendor, category, django_assert_max_num_queries):
+    api_client.force_authenticate(user=vendor)
+    with django_assert_max_num_queries(40):
+        resp = api_client.post(URL, {"file": _csv(_lines(300))}, format="multipart")
+    assert resp.status_code == 201
+    assert (resp.data["created"], resp.data["error_count"]) == (300, 0)
+
+    products = Product.all_objects.filter(vendor=vendor)
+    assert products.count() == 300
+    assert not products.filter(is_active=True).exists()  # modération
+    assert Inventory.objects.filter(product__vendor=vendor).count() == 300
+    assert Inventory.objects.get(product__slug="t-shirt-7").quantity == 7
+    value = ProductAttributeValue.objects.get(product__slug="t-shirt-7")
+    assert value.selected_values == ["S", "M"]
+    assert AuditLog.objects.filter(action=AuditLog.Action.CREATE, actor=vendor).count() == 300
+    assert VendorProfile.objects.get(user=vendor).stats_snapshot.products_count == 300
+
+
+def test_simulation_n_ecrit_rien(api_client, vendor, category):
+    api_client.force_authenticate(user=vendor)
+    lines = _lines(3) + ["Sans catégorie,Inconnue,1000,1,,\n"]
+    resp = api_client.post(URL, {"file": _csv(lines), "dry_run": "true"}, format="multipart")
+    assert resp.status_code == 200
+    assert (resp.data["created"], resp.data["valid"], resp.data["error_count"]) == (0, 3, 1)
+    assert not Product.all_objects.exists()
+    assert not AuditLog.objects.filter(actor=vendor).exists()
+
+
+def test_erreurs_par_ligne(vendor, category):
+    lines = [
+        "Bon produit,MODE,2500,3,,L\n",
+        ",mode,2500,3,,\n",
+        "Prix texte,mode,abc,3,,\n",
+        "Trop bas,mode,50,3,,\n",
+        "Catégorie,Electronique,2500,3,,\n",
+        "Taille,mode,2500,3,,XXL\n",
+    ]
+    result = import_products(vendor, _csv(lines))
+    assert result["created"] == 1
+    assert [(error["ligne"], error["erreur"]) for error in result["errors"]] == [
+        (3, "Le titre est obligatoire."),
+        (4, "Prix invalide."),
+        (5, "Prix trop faible : 50 FCFA."),
+        (6, 'Catégorie introuvable : "Electronique".'),
+        (7, 'Valeur "XXL" non proposée pour l\'attribut "Taille".'),
+    ]
+    assert Product.all_objects.get().title == "Bon produit"
+
+
+def test_slugs_uniques_et_sku(vendor, category):
+    Product.objects.create(title="Sac", slug="sac", category=category, price_xaf=1000, vendor=vendor)
+    Product.objects.create(title="Sac", slug="sac-1", category=category, price_xaf=1000, vendor=vendor)
+    result = import_products(vendor, _csv(["Sac,mode,1000,1,,\n", "Sac,mode,1000,1,REF-42,\n"]))
+    assert result["created"] == 2
+
+    imported = list(Product.all_objects.filter(vendor=vendor).order_by("pk")[2:])
+    assert [product.slug for product in imported] == ["sac-2", "sac-3"]
+    assert imported[0].sku == f"BLV-MOD-{imported[0].pk:05d}"
+    assert imported[1].sku == "REF-42"
+
+
+def test_fichier_illisible(vendor, category):
+    upload = SimpleUploadedFile("produits.csv", b"Titre\n\xff\xfe\x00", content_type="text/csv")
+    result = import_products(vendor, upload)
+    assert result["created"] == 0
+    assert result["errors"][0]["erreur"].startswith("Fichier illisible")
+
+
+def test_import_en_arriere_plan(api_client, settings, vendor, category, media_root, django_capture_on_commit_callbacks):
+    settings.PRODUCT_IMPORT_SYNC_MAX_BYTES = 100
+    api_client.force_authenticate(user=vendor)
+    resp = api_client.post(URL, {"file": _csv(_lines(20))}, format="multipart")
+    assert resp.status_code == 202
+    assert resp.data["status"] == ProductImportJob.Status.PENDING
+    assert not Product.all_objects.exists()
+
+    job = ProductImportJob.objects.get(pk=resp.data["id"])
+    stored = media_root / job.file.name
+    assert stored.exists()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("run_product_imports", stdout=io.StringIO())
+    assert run_pending_jobs() == 0
+
+    status_resp = api_client.get(f"/api/vendors/products/import/jobs/{job.pk}/")
+    assert status_resp.status_code == 200
+    assert status_resp.data["status"] == ProductImportJob.Status.DONE
+    assert (status_resp.data["total_rows"], status_resp.data["rows_processed"]) == (20, 20)
+    assert status_resp.data["created_count"] == 20
+    assert Product.all_objects.filter(vendor=vendor).count() == 20
+    assert not stored.exists()
+    assert vendor.notifications.filter(title="Import CSV terminé").exists()
+
+    api_client.force_authenticate(user=UserFactory())
+    assert api_client.get(f"/api/vendors/products/import/jobs/{job.pk}/").status_code == 404
+
+
+def test_import_abandonne_passe_en_echec(vendor, category, media_root, django_capture_on_commit_callbacks):
+    crashed = ProductImportJob.objects.create(
+        vendor=vendor, file=_csv(_lines(3)), status=ProductImportJob.Status.RUNNING, started_at=timezone.now(),
+    )
+    alive = ProductImportJob.objects.create(
+        vendor=vendor, file=_csv(_lines(3)), status=ProductImportJob.Status.RUNNING, started_at=timezone.now(),
+    )
+    stored = media_root / crashed.file.name
+    ProductImportJob.objects.filter(pk=crashed.pk).update(updated_at=timezone.now() - STALE_AFTER * 2)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert run_pending_jobs() == 0
+
+    crashed.refresh_from_db()
+    assert crashed.status == ProductImportJob.Status.FAILED and not crashed.file
+    assert not stored.exists()
+    assert vendor.notifications.filter(title="Import CSV interrompu").exists()
+    # Un import qui progresse encore n'est pas touché
+    assert ProductImportJob.objects.get(pk=alive.pk).status == ProductImportJob.Status.RUNNING
+    assert not Product.all_objects.exists()
@@ -15,12 +15,13 @@ def _setup(django_user_model, status="PENDING"):
     return vendor, product
 
 
-def test_reject_avec_motif_stocke_et_notifie(api_client, django_user_model):
+def test_reject_avec_motif_stocke_et_notifie(api_client, django_user_model, django_capture_on_commit_callbacks):
     admin = django_user_model.objects.create_superuser("adm1", "a1@a.co", "p")
     vendor, product = _setup(django_user_model)
     api_client.force_authenticate(user=admin)
-    resp = api_client.post(f"/api/vendors/admin/products/{product.id}/reject/",
-                           {"reason": "Photos floues"}, format="json")
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = api_client.post(f"/api/vendors/admin/products/{product.id}/reject/",
+                               {"reason": "Photos floues"}, format="json")
     assert resp.status_code == 200
     product.refresh_from_db()
     assert product.moderation_status == "REJECTED"
@@ -30,11 +31,12 @@ def test_reject_avec_motif_stocke_et_notifie(api_client, django_user_model):
     assert "Photos floues" in notif.message
 
 
-def test_reject_sans_motif_notifie_quand_meme(api_client, django_user_model):
+def test_reject_sans_motif_notifie_quand_meme(api_client, django_user_model, django_capture_on_commit_callbacks):
     admin = django_user_model.objects.create_superuser("adm2", "a2@a.co", "p")
     vendor, product = _setup(django_user_model)
     api_client.force_authenticate(user=admin)
-    resp = api_client.post(f"/api/vendors/admin/products/{product.id}/reject/")
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = api_client.post(f"/api/vendors/admin/products/{product.id}/reject/")
     assert resp.status_code == 200
     assert UserNotification.objects.filter(user=vendor).exists()
 
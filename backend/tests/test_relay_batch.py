@@ -0,0 +1,120 @@
+# backend/tests/test_relay_batch.py
+# Points relais : réception / retrait / retour par lot, occupation maintenue.
+
+import pytest
+
+from apps.accounts.models import CourierProfile, RelayPointProfile
+from apps.orders.models import Order
+from apps.shipping.models import RelayParcel, Shipment, ShipmentEvent
+from apps.shipping.relay import reconcile_relay_occupancy
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+BASE = "/api/shipping/relay-point"
+
+
+@pytest.fixture
+def relay_point():
+    return RelayPointProfile.objects.create(
+        user=UserFactory(), name="Relais Akwa", phone="690000004", city="Douala",
+        status="APPROVED", storage_capacity=3,
+    )
+
+
+@pytest.fixture
+def relay_client(api_client, relay_point):
+    api_client.force_authenticate(user=relay_point.user)
+    return api_client
+
+
+@pytest.fixture
+def courier():
+    return CourierProfile.objects.create(
+        user=UserFactory(), phone="690000001", city="Douala", id_card="CNI", is_approved=True, is_online=True,
+    )
+
+
+def _shipment(courier=None):
+    order = Order.objects.create(user=UserFactory(), customer_phone="690000002", city="Douala", address="Akwa")
+    return Shipment.objects.create(
+        order=order, courier=courier, status=Shipment.Status.ASSIGNED if courier else Shipment.Status.CREATED,
+    )
+
+
+def test_reception_par_lot_capacite_et_resultats(relay_client, relay_point, courier, django_assert_max_num_queries):
+    shipments = [_shipment(courier) for _ in range(4)]
+    codes = [
+        f"SHIP-{shipments[0].pk}",
+        f"BLV-{shipments[1].order_id}",
+        str(shipments[2].pk),
+        f"SHIP-{shipments[0].pk}",
+        "XYZ",
+        f"SHIP-{shipments[3].pk}",
+    ]
+
+    with django_assert_max_num_queries(16):
+        resp = relay_client.post(f"{BASE}/receive/batch/", {"items": [{"code": code} for code in codes]}, format="json")
+    assert resp.status_code == 200, resp.content
+    assert [(row["ok"], row["error"]) for row in resp.data["results"]] == [
+        (True, ""), (True, ""), (True, ""),
+        (False, "Colis déjà scanné dans ce lot."),
+        (False, "Code inconnu."),
+        (False, "Capacite point relais atteinte."),
+    ]
+    assert resp.data["processed"] == 3 and resp.data["results"][0]["parcel"]["status"] == "STORED"
+
+    relay_point.refresh_from_db()
+    courier.refresh_from_db()
+    assert relay_point.stored_parcels_count == 3
+    assert courier.active_shipments_count == 4  # ASSIGNED → IN_TRANSIT : toujours actives
+    assert Shipment.objects.filter(status=Shipment.Status.IN_TRANSIT, relay_point="Relais Akwa").count() == 3
+    assert ShipmentEvent.objects.filter(status=Shipment.Status.IN_TRANSIT).count() == 3
+
+    # Rescanner un colis déjà en stock est sans effet
+    again = relay_client.post(f"{BASE}/receive/batch/", {"items": [{"code": codes[0]}]}, format="json")
+    assert again.data["results"][0]["ok"]
+    relay_point.refresh_from_db()
+    assert relay_point.stored_parcels_count == 3
+
+
+def test_retrait_et_retour_par_lot(relay_client, relay_point, courier):
+    shipments = [_shipment(courier) for _ in range(3)]
+    relay_client.post(
+        f"{BASE}/receive/batch/", {"items": [{"code": f"SHIP-{s.pk}"} for s in shipments]}, format="json",
+    )
+    parcels = {parcel.shipment_id: parcel for parcel in RelayParcel.objects.all()}
+
+    resp = relay_client.post(f"{BASE}/pickup/batch/", {"items": [
+        {"code": f"SHIP-{shipments[0].pk}", "pickup_code": parcels[shipments[0].pk].pickup_code},
+        {"code": f"SHIP-{shipments[1].pk}", "pickup_code": "FAUX"},
+    ]}, format="json")
+    assert [row["ok"] for row in resp.data["results"]] == [True, False]
+    delivered = Shipment.objects.get(pk=shipments[0].pk)
+    assert delivered.status == Shipment.Status.DELIVERED and delivered.delivered_at is not None
+    assert delivered.order.fulfillment_status == Order.FulfillmentStatus.DELIVERED
+
+    resp = relay_client.post(f"{BASE}/return/batch/", {"destination": "VENDOR", "items": [
+        {"code": f"SHIP-{shipments[1].pk}"},
+        {"code": f"SHIP-{shipments[0].pk}"},
+    ]}, format="json")
+    assert [row["ok"] for row in resp.data["results"]] == [True, False]
+    assert RelayParcel.objects.get(shipment=shipments[1]).status == RelayParcel.Status.RETURNED_TO_VENDOR
+
+    relay_point.refresh_from_db()
+    courier.refresh_from_db()
+    assert relay_point.stored_parcels_count == 1
+    assert courier.active_shipments_count == 2
+    assert reconcile_relay_occupancy() == 0
+
+
+def test_colis_unitaire_tient_l_occupation(relay_client, relay_point):
+    shipment = _shipment()
+    resp = relay_client.post(f"{BASE}/receive/", {"shipment_id": shipment.pk}, format="json")
+    assert resp.status_code == 201, resp.content
+    relay_point.refresh_from_db()
+    assert relay_point.stored_parcels_count == 1
+
+    RelayParcel.objects.get(shipment=shipment).delete()
+    relay_point.refresh_from_db()
+    assert relay_point.stored_parcels_count == 0
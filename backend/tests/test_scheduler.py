@@ -0,0 +1,155 @@
+# backend/tests/test_scheduler.py
+# Planificateur (run_scheduler) : verrou de leader et jobs ensemblistes.
+
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.utils import timezone
+
+from apps.accounts.jobs import expire_auth_records
+from apps.accounts.models import CourierProfile, DeliveryOrganizationProfile, OTPCode, UserNotification, UserSession
+from apps.catalog.jobs import expire_promotion_campaigns
+from apps.catalog.models import Category, Product, PromotionCampaign
+from apps.common.scheduler import LOCK_KEY, PeriodicJob, Scheduler
+from apps.orders.jobs import auto_confirm_delivered_orders
+from apps.orders.models import Order, OrderHistory
+from apps.shipping.jobs import release_overdue_accepted_shipments
+from apps.shipping.models import Shipment, ShipmentEvent
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _order(**kwargs):
+    return Order.objects.create(user=UserFactory(), customer_phone="690000002", city="Douala", address="Akwa", **kwargs)
+
+
+@pytest.fixture
+def courier():
+    organization = DeliveryOrganizationProfile.objects.create(
+        user=UserFactory(), company_name="Rapide", phone="690000000", city="Douala", status="APPROVED",
+    )
+    return CourierProfile.objects.create(
+        user=UserFactory(), phone="690000001", city="Douala", id_card="CNI",
+        is_approved=True, is_online=True, delivery_organization=organization,
+    )
+
+
+def test_leader_unique():
+    calls = []
+    jobs = {"compteur": PeriodicJob(name="compteur", func=lambda: calls.append(1), every=60)}
+
+    other = connections.create_connection("default")
+    try:
+        with other.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s)", [LOCK_KEY])
+        follower = Scheduler(jobs)
+        assert follower.tick() == []
+        assert not follower.is_leader and calls == []
+
+        with other.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [LOCK_KEY])
+        assert len(follower.tick()) == 1
+        assert follower.is_leader and calls == [1]
+        # Pas encore à échéance
+        assert follower.tick() == []
+        follower.stop()
+    finally:
+        other.close()
+
+
+def test_job_en_echec_n_arrete_pas_les_autres():
+    def boom():
+        raise RuntimeError("boom")
+
+    scheduler = Scheduler({
+        "boom": PeriodicJob(name="boom", func=boom, every=60),
+        "ok": PeriodicJob(name="ok", func=lambda: 3, every=60),
+    })
+    ran = {job.name: (result, error) for job, result, error in scheduler.tick()}
+    scheduler.stop()
+    assert isinstance(ran["boom"][1], RuntimeError)
+    assert ran["ok"] == (3, None)
+
+
+def test_liberation_des_missions_en_retard(courier, django_capture_on_commit_callbacks):
+    overdue = Shipment.objects.create(
+        order=_order(fulfillment_status=Order.FulfillmentStatus.DRIVER_ASSIGNED),
+        courier=courier, status=Shipment.Status.ASSIGNED, accepted_at=timezone.now() - timedelta(hours=2),
+    )
+    recent = Shipment.objects.create(
+        order=_order(), courier=courier, status=Shipment.Status.ASSIGNED, accepted_at=timezone.now(),
+    )
+    assert CourierProfile.objects.get(pk=courier.pk).active_shipments_count == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert release_overdue_accepted_shipments() == 1
+
+    overdue.refresh_from_db()
+    assert (overdue.status, overdue.courier_id, overdue.penalty_notified_at is not None) == (
+        Shipment.Status.CREATED, None, True,
+    )
+    assert overdue.order.fulfillment_status == Order.FulfillmentStatus.READY_FOR_PICKUP
+    assert Shipment.objects.get(pk=recent.pk).status == Shipment.Status.ASSIGNED
+    assert CourierProfile.objects.get(pk=courier.pk).active_shipments_count == 1
+    assert ShipmentEvent.objects.filter(shipment=overdue, status=Shipment.Status.CREATED).exists()
+    assert UserNotification.objects.filter(user=courier.user, title__startswith="Penalite").count() == 1
+
+
+def test_auto_confirmation_apres_48h():
+    old = _order(fulfillment_status=Order.FulfillmentStatus.DELIVERED)
+    Shipment.objects.create(order=old, status=Shipment.Status.DELIVERED, delivered_at=timezone.now() - timedelta(hours=49))
+    fresh = _order(fulfillment_status=Order.FulfillmentStatus.DELIVERED)
+    Shipment.objects.create(order=fresh, status=Shipment.Status.DELIVERED, delivered_at=timezone.now() - timedelta(hours=2))
+
+    assert auto_confirm_delivered_orders() == 1
+    old.refresh_from_db()
+    assert old.fulfillment_status == Order.FulfillmentStatus.AUTO_CONFIRMED
+    assert old.escrow_status == Order.EscrowStatus.RELEASE_PENDING
+    assert Order.objects.get(pk=fresh.pk).fulfillment_status == Order.FulfillmentStatus.DELIVERED
+    assert OrderHistory.objects.filter(order=old, new_value=Order.FulfillmentStatus.AUTO_CONFIRMED).exists()
+
+
+def test_expiration_des_campagnes(django_capture_on_commit_callbacks):
+    vendor = UserFactory()
+    category = Category.objects.create(name="Promo", slug="promo")
+    product = Product.objects.create(title="Sac", slug="sac-promo", category=category, price_xaf=1000, vendor=vendor)
+    now = timezone.now()
+    fields = {"product": product, "title": "Soldes", "reference_price_xaf": 1000, "promo_price_xaf": 800}
+    ended = PromotionCampaign.objects.create(
+        status=PromotionCampaign.Status.APPROVED, starts_at=now - timedelta(days=3), ends_at=now - timedelta(hours=1), **fields,
+    )
+    running = PromotionCampaign.objects.create(
+        status=PromotionCampaign.Status.APPROVED, starts_at=now - timedelta(days=1), ends_at=now + timedelta(days=1), **fields,
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert expire_promotion_campaigns() == 1
+    assert PromotionCampaign.objects.get(pk=ended.pk).status == PromotionCampaign.Status.EXPIRED
+    assert PromotionCampaign.objects.get(pk=running.pk).status == PromotionCampaign.Status.APPROVED
+    assert UserNotification.objects.filter(user=vendor, audience=UserNotification.Audience.VENDOR).count() == 1
+
+
+def test_expiration_otp_et_sessions():
+    user = UserFactory()
+    now = timezone.now()
+    OTPCode.objects.create(user=user, code="111111", purpose="2FA_LOGIN", expires_at=now - timedelta(days=2))
+    kept = OTPCode.objects.create(user=user, code="222222", purpose="2FA_LOGIN", expires_at=now + timedelta(minutes=5))
+    stale = UserSession.objects.create(user=user, jti="old")
+    UserSession.objects.filter(pk=stale.pk).update(last_activity=now - timedelta(days=30))
+    UserSession.objects.create(user=user, jti="new")
+
+    assert expire_auth_records() == {"otp_deleted": 1, "sessions_expired": 1}
+    assert list(OTPCode.objects.values_list("pk", flat=True)) == [kept.pk]
+    assert list(UserSession.objects.filter(is_active=True).values_list("jti", flat=True)) == ["new"]
+
+
+def test_commande_run_scheduler(capsys):
+    _order(fulfillment_status=Order.FulfillmentStatus.DELIVERED)
+    Order.objects.update(updated_at=timezone.now() - timedelta(days=3))
+
+    call_command("run_scheduler", "--job", "auto_confirm_delivered_orders")
+    assert "auto_confirm_delivered_orders : 1" in capsys.readouterr().out
+    assert Order.objects.get().fulfillment_status == Order.FulfillmentStatus.AUTO_CONFIRMED
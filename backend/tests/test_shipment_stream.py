@@ -0,0 +1,192 @@
+# backend/tests/test_shipment_stream.py
+# Flux SSE de suivi : instantané, diffusion en direct, reprise Last-Event-ID.
+
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import RequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import CourierProfile
+from apps.orders.models import Order
+from apps.shipping import realtime
+from apps.shipping.geo import update_courier_position
+from apps.shipping.models import Shipment, ShipmentEvent, ShipmentMessage
+from apps.shipping import sse
+from apps.shipping.sse import shipment_stream
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def shipment():
+    courier = CourierProfile.objects.create(
+        user=UserFactory(), phone="690000001", city="Douala", id_card="CNI", is_approved=True, is_online=True,
+    )
+    order = Order.objects.create(user=UserFactory(), customer_phone="690000002", city="Douala", address="Akwa")
+    return Shipment.objects.create(order=order, courier=courier, status=Shipment.Status.ASSIGNED)
+
+
+def _request(user, path="/", **headers):
+    return RequestFactory().get(path, HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}", **headers)
+
+
+def _parse(chunk):
+    fields = {}
+    for line in chunk.decode().strip().splitlines():
+        key, _, value = line.partition(": ")
+        fields[key] = value
+    if "data" in fields:
+        fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+def _open(request, **kwargs):
+    async def scenario(steps):
+        response = await shipment_stream(request, **kwargs)
+        if response.status_code != 200:
+            return response.status_code, []
+        stream = aiter(response.streaming_content)
+        frames = []
+        try:
+            for step in steps:
+                if step is not None:
+                    await sync_to_async(step)()
+                frames.append(_parse(await asyncio.wait_for(anext(stream), 2)))
+        finally:
+            await stream.aclose()
+        return response.status_code, frames
+    return scenario
+
+
+def test_instantane_puis_diffusion(shipment, django_capture_on_commit_callbacks):
+    ShipmentMessage.objects.create(shipment=shipment, sender=shipment.order.user, channel="CLIENT", message="Bonjour")
+    event = ShipmentEvent.objects.create(shipment=shipment, status=Shipment.Status.ASSIGNED, message="Assignée")
+
+    def courier_writes():
+        with django_capture_on_commit_callbacks(execute=True):
+            ShipmentMessage.objects.create(shipment=shipment, sender=shipment.courier.user, channel="VENDOR", message="Interne")
+            ShipmentMessage.objects.create(shipment=shipment, sender=shipment.courier.user, channel="CLIENT", message="J'arrive")
+
+    def courier_moves():
+        with django_capture_on_commit_callbacks(execute=True):
+            update_courier_position(shipment.courier, 4.05, 9.70)
+
+    client = shipment.order.user
+    status, frames = async_to_sync(_open(_request(client), order_id=shipment.order_id))(
+        [None, None, courier_writes, courier_moves],
+    )
+    assert status == 200
+    retry, snapshot, message, position = frames
+    assert "retry" in retry
+    assert snapshot["event"] == "snapshot"
+    assert [m["message"] for m in snapshot["data"]["data"]["messages"]] == ["Bonjour"]
+    assert snapshot["id"].startswith(f"{event.pk}.")
+    # Canal VENDOR invisible pour le client
+    assert message["event"] == "message" and message["data"]["data"]["message"] == "J'arrive"
+    assert message["id"] == f"{event.pk}.{message['data']['pk']}"
+    assert position["event"] == "position" and position["data"]["data"]["latitude"] == 4.05
+
+
+def test_client_sans_position_hors_course(shipment, django_capture_on_commit_callbacks):
+    update_courier_position(shipment.courier, 4.05, 9.70)
+    shipment.status = Shipment.Status.DELIVERED
+    shipment.save(update_fields=["status"])
+
+    def courier_moves_then_writes():
+        with django_capture_on_commit_callbacks(execute=True):
+            update_courier_position(shipment.courier, 4.06, 9.71)
+            ShipmentMessage.objects.create(shipment=shipment, sender=shipment.courier.user, channel="CLIENT", message="Fin")
+
+    client = shipment.order.user
+    _, frames = async_to_sync(_open(_request(client), order_id=shipment.order_id))(
+        [None, None, courier_moves_then_writes],
+    )
+    # Ni dernière position après l'instantané, ni position en direct
+    assert [frame.get("event") for frame in frames[1:]] == ["snapshot", "message"]
+
+    # Le livreur, lui, garde ses positions
+    _, frames = async_to_sync(_open(_request(shipment.courier.user), id=shipment.pk))([None, None, None])
+    assert frames[2]["event"] == "position"
+
+
+def test_client_perd_la_position_a_la_livraison(shipment, django_capture_on_commit_callbacks):
+    def delivered():
+        with django_capture_on_commit_callbacks(execute=True):
+            ShipmentEvent.objects.create(shipment=shipment, status=Shipment.Status.DELIVERED, message="Livrée")
+
+    def courier_moves_then_writes():
+        with django_capture_on_commit_callbacks(execute=True):
+            update_courier_position(shipment.courier, 4.06, 9.71)
+            ShipmentMessage.objects.create(shipment=shipment, sender=shipment.courier.user, channel="CLIENT", message="Fin")
+
+    _, frames = async_to_sync(_open(_request(shipment.order.user), order_id=shipment.order_id))(
+        [None, None, delivered, courier_moves_then_writes],
+    )
+    assert [frame.get("event") for frame in frames[1:]] == ["snapshot", "event", "message"]
+
+
+def test_reprise_last_event_id(shipment):
+    first = ShipmentEvent.objects.create(shipment=shipment, status=Shipment.Status.ASSIGNED, message="1")
+    ShipmentEvent.objects.create(shipment=shipment, status=Shipment.Status.PICKED_UP, message="2")
+    ShipmentMessage.objects.create(shipment=shipment, sender=shipment.courier.user, channel="CLIENT", message="3")
+
+    request = _request(shipment.courier.user, HTTP_LAST_EVENT_ID=f"{first.pk}.0")
+    _, frames = async_to_sync(_open(request, id=shipment.pk))([None, None, None])
+    assert [frame["data"]["data"]["message"] for frame in frames[1:]] == ["2", "3"]
+
+
+def test_acces_refuse(shipment):
+    status, _ = async_to_sync(_open(_request(UserFactory()), order_id=shipment.order_id))([])
+    assert status == 403
+    status, _ = async_to_sync(_open(RequestFactory().get("/"), order_id=shipment.order_id))([])
+    assert status == 401
+
+
+def test_jeton_de_flux_pour_eventsource(api_client, shipment, monkeypatch):
+    client = shipment.order.user
+    api_client.force_authenticate(user=client)
+    resp = api_client.post(f"/api/shipping/orders/{shipment.order_id}/stream/token/")
+    assert resp.status_code == 200
+    path, token = resp.data["stream_url"], resp.data["token"]
+    assert path == f"/api/shipping/orders/{shipment.order_id}/stream/"
+
+    # Sans en-tête Authorization, comme EventSource
+    status, frames = async_to_sync(_open(RequestFactory().get(path, {"token": token}), order_id=shipment.order_id))([None])
+    assert status == 200 and "retry" in frames[0]
+
+    # Jeton lié à l'URL du flux : inutilisable pour une autre livraison
+    other = f"/api/shipping/shipments/{shipment.pk}/stream/"
+    status, _ = async_to_sync(_open(RequestFactory().get(other, {"token": token}), id=shipment.pk))([])
+    assert status == 401
+
+    monkeypatch.setattr(sse, "STREAM_TOKEN_SECONDS", -1)  # expiré
+    status, _ = async_to_sync(_open(RequestFactory().get(path, {"token": token}), order_id=shipment.order_id))([])
+    assert status == 401
+
+    api_client.force_authenticate(user=UserFactory())
+    assert api_client.post(f"/api/shipping/orders/{shipment.order_id}/stream/token/").status_code == 403
+
+
+def test_relais_d_un_autre_worker(shipment):
+    message = ShipmentMessage.objects.create(shipment=shipment, sender=shipment.courier.user, channel="CLIENT", message="Relais")
+
+    async def scenario():
+        subscription = realtime.broker.subscribe([realtime.shipment_topic(shipment.pk)])
+        try:
+            payload = {"origin": "autre", "topic": realtime.shipment_topic(shipment.pk), "kind": "message", "pk": message.pk}
+            await sync_to_async(realtime.relay)(payload)
+            # Ses propres notifications sont ignorées
+            await sync_to_async(realtime.relay)({**payload, "origin": realtime.ORIGIN})
+            frame = await subscription.get(1)
+            assert subscription.queue.empty()
+            return frame
+        finally:
+            subscription.close()
+
+    frame = async_to_sync(scenario)()
+    assert frame["kind"] == "message" and frame["pk"] == message.pk
+    assert not realtime.broker.has_subscribers(realtime.shipment_topic(shipment.pk))
@@ -0,0 +1,103 @@
+# backend/tests/test_slug_allocation.py
+# Attribution des slugs / SKU (apps.catalog.slugs) : une requête quel que soit
+# le nombre de collisions, lots, lignes supprimées en douceur, reprise sur
+# violation d'unicité, SKU écrit dans l'INSERT.
+
+import pytest
+from django.db.models.signals import post_save
+
+from apps.catalog import slugs
+from apps.catalog.models import Category, MasterProduct, Product
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def category():
+    return Category.objects.create(name="Mode", slug="mode")
+
+
+@pytest.fixture
+def make_product(category):
+    vendor = UserFactory()
+
+    def make(title="Sac", **fields):
+        return Product.objects.create(title=title, category=category, price_xaf=1000, vendor=vendor, **fields)
+    return make
+
+
+def test_une_requete_quel_que_soit_le_nombre_de_collisions(make_product, django_assert_num_queries):
+    for slug in ("sac", "sac-1", "sac-2", "sac-7", "sac-a-dos", "sac-a-dos-9"):
+        make_product(slug=slug)
+    with django_assert_num_queries(1):
+        allocated = slugs.allocate_slugs(Product.all_objects, ["sac", "sac", "sac-a-dos", "valise", "valise"])
+    assert allocated == ["sac-3", "sac-4", "sac-a-dos-1", "valise", "valise-1"]
+
+
+def test_suffixe_naturel_d_un_autre_produit_ignore(make_product):
+    make_product(title="iPhone 15")
+    assert make_product(title="iPhone").slug == "iphone"
+    assert make_product(title="iPhone").slug == "iphone-1"
+
+
+def test_lot_au_dela_de_la_limite_des_colonnes(make_product, django_assert_num_queries):
+    make_product(slug="produit-1699")
+    bases = [f"produit-{i}" for i in range(1700)]  # > 1664 colonnes si un agrégat par base
+    with django_assert_num_queries(-(-len(bases) // slugs.SLUG_CHUNK)):
+        allocated = slugs.allocate_slugs(Product.all_objects, bases + ["produit-1699"])
+    assert allocated[:1699] == bases[:1699]
+    assert allocated[1699:] == ["produit-1699-1", "produit-1699-2"]
+
+
+def test_lignes_supprimees_et_collisions_dans_le_lot(make_product):
+    make_product(slug="sac").delete()  # suppression douce : le slug reste pris
+    assert Product.objects.count() == 0
+    assert slugs.allocate_slugs(Product.all_objects, ["sac", "sac", "sac-2", "sac"]) == [
+        "sac-1", "sac-2", "sac-2-1", "sac-3",
+    ]
+
+
+def test_save_produit_sans_update_sku(make_product):
+    make_product()
+    seen = []
+
+    def record(sender, instance, created, **kwargs):
+        seen.append(Product.all_objects.filter(pk=instance.pk).values_list("sku", flat=True).get())
+
+    post_save.connect(record, sender=Product, dispatch_uid="test_sku_at_insert")
+    try:
+        product = make_product()
+    finally:
+        post_save.disconnect(sender=Product, dispatch_uid="test_sku_at_insert")
+
+    assert product.slug == "sac-1"
+    assert product.sku == f"BLV-MOD-{product.pk:05d}"
+    assert seen == [product.sku]  # déjà en base au post_save : pas d'UPDATE de rattrapage
+    product.sku = ""
+    product.save(update_fields=["sku"])
+    assert Product.all_objects.get(pk=product.pk).sku == product.sku
+
+
+def test_reprise_sur_violation_unicite(make_product, monkeypatch):
+    make_product()
+    original = slugs.allocate_slugs
+    calls = []
+
+    def stale(queryset, bases, field="slug"):
+        calls.append(bases)
+        # Premier essai : vue périmée (une écriture concurrente a pris « sac »)
+        return ["sac"] if len(calls) == 1 else original(queryset, bases, field)
+
+    monkeypatch.setattr(slugs, "allocate_slugs", stale)
+    product = make_product()
+    assert len(calls) == 2
+    assert product.slug == "sac-1"
+    assert Product.objects.filter(slug="sac-1").exists()
+
+
+def test_fiche_produit_slug_et_titre_vide(category):
+    MasterProduct.objects.create(title="Téléphone X", category=category)
+    master = MasterProduct.objects.create(title="Téléphone X", category=category)
+    assert master.slug == "telephone-x-1"
+    assert MasterProduct.objects.create(title="!!!", category=category).slug == "fiche"
@@ -0,0 +1,135 @@
+# backend/tests/test_vendor_stats.py
+# Instantané des statistiques vendeur : tenue à jour, réconciliation, lectures admin / boutique.
+
+import pytest
+from django.contrib import admin
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.management import call_command
+from django.test import RequestFactory
+
+from apps.catalog.models import Category, Product, ProductReview
+from apps.orders.models import CustomerStats, Order, OrderItem
+from apps.vendors.models import VendorProfile, VendorStatsSnapshot
+from apps.vendors.stats import reconcile_vendor_stats
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def category():
+    return Category.objects.create(name="Mode", slug="mode")
+
+
+def _vendor(name="Boutique", **fields):
+    return VendorProfile.objects.create(
+        user=UserFactory(), business_name=name, business_description="-", phone="690000003",
+        address="Akwa", city="Douala", status="APPROVED", **fields,
+    )
+
+
+def _product(vendor, category, **fields):
+    return Product.objects.create(
+        title="Sac", slug=f"sac-{Product.all_objects.count()}", category=category, price_xaf=1000,
+        vendor=vendor.user, **fields,
+    )
+
+
+def _order(*lines):
+    order = Order.objects.create(user=UserFactory(), customer_phone="690000002", city="Douala", address="Akwa")
+    for product, total in lines:
+        OrderItem.objects.create(
+            order=order, product=product, title_snapshot="Sac", price_xaf_snapshot=total, qty=1, line_total_xaf=total,
+        )
+    return order
+
+
+def _snapshot(vendor):
+    return VendorStatsSnapshot.objects.get(vendor=vendor)
+
+
+def test_produits_paiement_remboursement_et_note(category):
+    vendor, other = _vendor(), _vendor("Autre")
+    bag, hat = _product(vendor, category), _product(vendor, category, is_active=False)
+    snapshot = _snapshot(vendor)
+    assert (snapshot.products_count, snapshot.active_products_count) == (2, 1)
+
+    hat.is_active = True
+    hat.save()
+    bag.delete()  # suppression douce
+    snapshot = _snapshot(vendor)
+    assert (snapshot.products_count, snapshot.active_products_count) == (1, 1)
+
+    order = _order((hat, 4000), (hat, 1000), (_product(other, category), 2500))
+    order.confirm_payment()
+    order.save()  # ré-enregistrement sans changement de statut : sans effet
+    snapshot = _snapshot(vendor)
+    assert (snapshot.paid_orders_count, snapshot.paid_revenue_xaf) == (1, 5000)
+    assert snapshot.last_sale_at == order.created_at
+    assert _snapshot(other).paid_revenue_xaf == 2500
+
+    Order.objects.get(pk=order.pk).refund()
+    snapshot = _snapshot(vendor)
+    assert (snapshot.paid_orders_count, snapshot.paid_revenue_xaf) == (0, 0)
+
+    ProductReview.objects.create(product=hat, user=UserFactory(), rating=5)
+    ProductReview.objects.create(product=hat, user=UserFactory(), rating=4)
+    snapshot = _snapshot(vendor)
+    assert (snapshot.reviews_count, float(snapshot.rating_avg)) == (2, 4.5)
+
+
+def test_reconciliation_rattrape_les_update_en_masse(category):
+    vendor = _vendor()
+    product = _product(vendor, category)
+    order = _order((product, 3000))
+    Product.objects.filter(pk=product.pk).update(is_active=False)
+    Order.objects.filter(pk=order.pk).update(payment_status=Order.PaymentStatus.PAID)
+    VendorStatsSnapshot.objects.filter(vendor=vendor).delete()
+
+    assert reconcile_vendor_stats() == 1
+    snapshot = _snapshot(vendor)
+    assert (snapshot.products_count, snapshot.active_products_count) == (1, 0)
+    assert (snapshot.paid_orders_count, snapshot.paid_revenue_xaf) == (1, 3000)
+    call_command("reconcile_vendor_stats")
+
+
+def test_listes_admin_et_boutique_lisent_l_instantane(api_client, django_user_model, category,
+                                                     django_assert_max_num_queries):
+    vendors = [_vendor(f"Boutique {i}") for i in range(5)]
+    for vendor in vendors:
+        order = _order((_product(vendor, category), 1500))
+        order.confirm_payment()
+
+    admin = django_user_model.objects.create_superuser("adm-vs", "adm-vs@belivay.test", "p")
+    api_client.force_authenticate(user=admin)
+    with django_assert_max_num_queries(3):
+        resp = api_client.get("/api/vendors/admin/vendors/")
+    assert resp.status_code == 200, resp.content
+    assert {(row["total_revenue"], row["total_orders"], row["total_products"]) for row in resp.data} == {(1500, 1, 1)}
+
+    resp = api_client.get("/api/vendors/admin/vendors/map/")
+    assert resp.data["cities"][0]["gmv"] == 7500
+    assert resp.data["vendors"][0]["total_revenue"] == 1500
+
+    vendors[0].is_online = True
+    vendors[0].save()
+    resp = api_client.get(f"/api/boutique/{vendors[0].shop_slug}/")
+    assert resp.status_code == 200, resp.content
+    assert resp.data["stats"]["total_products"] == 1
+
+
+def test_action_admin_marquer_payee_tient_les_stats(category, django_capture_on_commit_callbacks):
+    vendor = _vendor()
+    order = _order((_product(vendor, category), 3000))
+    request = RequestFactory().post("/admin/orders/order/")
+    request.user = UserFactory(is_staff=True, is_superuser=True)
+    request.session = {}
+    request._messages = FallbackStorage(request)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        admin.site._registry[Order].mark_paid(request, Order.objects.filter(pk=order.pk))
+
+    snapshot = _snapshot(vendor)
+    assert (snapshot.paid_orders_count, snapshot.paid_revenue_xaf) == (1, 3000)
+    stats = CustomerStats.objects.get(user=order.user)
+    assert (stats.paid_orders_count, stats.total_spent_xaf) == (1, order.total_xaf)
@@ -19,7 +19,7 @@ import {
   Ban,
 } from 'lucide-react';
 import { Card, Badge } from '@/components/ui';
-import { adminApi, type AdminOrder, type OrderFilters } from '@/services/api/admin';
+import { adminApi, type AdminOrder, type AdminOrderPage, type OrderFilters } from '@/services/api/admin';
 import { useToast } from '@/context/ToastContext';
 
 export default function OrdersManagementPage() {
@@ -27,6 +27,7 @@ export default function OrdersManagementPage() {
   const { showToast } = useToast();
 
   const [orders, setOrders] = useState<AdminOrder[]>([]);
+  const [totals, setTotals] = useState<AdminOrderPage['totals'] | null>(null);
   const [loading, setLoading] = useState(true);
   const [searchQuery, setSearchQuery] = useState('');
   const [filters, setFilters] = useState<OrderFilters>({});
@@ -34,8 +35,10 @@ export default function OrdersManagementPage() {
   const loadOrders = useCallback(async () => {
     try {
       setLoading(true);
-      const data = await adminApi.listOrders(filters);
-      setOrders(data);
+      // Les 200 plus récentes ; les compteurs portent sur tout l'ensemble filtré
+      const data = await adminApi.listOrdersPage({ ...filters, page_size: 200 });
+      setOrders(data.results);
+      setTotals(data.totals);
     } catch (error) {
       console.error('Erreur chargement commandes:', error);
       showToast(t('admin.orders_load_error'), 'error');
@@ -95,14 +98,12 @@ export default function OrdersManagementPage() {
 
   // Stats calculées
   const stats = {
-    total: orders.length,
-    pending_payment: orders.filter((o) => o.payment_status === 'PENDING').length,
-    paid: orders.filter((o) => o.payment_status === 'PAID').length,
+    total: totals?.total ?? 0,
+    pending_payment: totals?.pending ?? 0,
+    paid: totals?.paid ?? 0,
     pending_fulfillment: orders.filter((o) => o.fulfillment_status === 'PENDING').length,
-    delivered: orders.filter((o) => o.fulfillment_status === 'DELIVERED').length,
-    total_revenue: orders
-      .filter((o) => o.payment_status === 'PAID')
-      .reduce((sum, o) => sum + o.total_xaf, 0),
+    delivered: totals?.delivered ?? 0,
+    total_revenue: totals?.revenue ?? 0,
   };
 
   if (loading) {
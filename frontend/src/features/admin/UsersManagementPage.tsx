@@ -8,7 +8,7 @@ import {
   ShieldOff, Shield, Trash2, ChevronLeft, ChevronRight,
   ArrowUpDown, ArrowUp, ArrowDown, Store, Filter, ChevronDown, X, Bike,
 } from 'lucide-react';
-import { adminApi, type AdminUser, type UserFilters } from '@/services/api/admin';
+import { adminApi, type AdminUser, type AdminUserPage, type UserFilters } from '@/services/api/admin';
 import { useAdminTheme } from '@/hooks/useAdminTheme';
 import { useToast } from '@/context/ToastContext';
 import { useConfirm } from '@/context/ConfirmContext';
@@ -90,6 +90,8 @@ export default function UsersManagementPage() {
   useEffect(() => { toastRef.current = showToast; });
 
   const [users,    setUsers]    = useState<AdminUser[]>([]);
+  const [count,    setCount]    = useState(0);
+  const [totals,   setTotals]   = useState<AdminUserPage['totals']>({ total: 0, vendors: 0, couriers: 0, banned: 0 });
   const [loading,  setLoading]  = useState(true);
   const [acting,   setActing]   = useState<number | null>(null);
 
@@ -102,44 +104,34 @@ export default function UsersManagementPage() {
   const [openDrop, setOpenDrop] = useState<'role' | null>(null);
   const searchRef  = useRef<ReturnType<typeof setTimeout> | null>(null);
 
-  // ── Chargement ───────────────────────────────────────────────────────────
+  // ── Chargement (filtres, tri et pagination côté serveur) ──────────────────
   const load = useCallback(async () => {
     setLoading(true);
-    const filters: UserFilters = {};
+    const filters: UserFilters = {
+      ordering: `${dir === 'desc' ? '-' : ''}${sort}`,
+      page,
+      page_size: pageSize,
+    };
     if (roleF === 'vendor') filters.role = 'vendor';
     if (roleF === 'courier') filters.role = 'courier';
     if (roleF === 'banned') filters.is_banned = true;
+    if (search) filters.search = search;
     try {
-      const data = await adminApi.listUsers(filters);
-      setUsers(data);
+      const data = await adminApi.listUsersPage(filters);
+      setUsers(data.results);
+      setCount(data.count);
+      setTotals(data.totals);
     } catch {
       toastRef.current('Erreur chargement des utilisateurs', 'error');
     } finally {
       setLoading(false);
     }
-  }, [roleF]);
+  }, [roleF, search, sort, dir, page, pageSize]);
 
   useEffect(() => { load(); }, [load]);
 
-  // ── Filtrage local ────────────────────────────────────────────────────────
-  const filtered = users.filter(u => {
-    if (!search) return true;
-    const q = search.toLowerCase();
-    return [u.username, u.email, u.first_name, u.last_name]
-      .some(v => v?.toLowerCase().includes(q));
-  });
-
-  // ── Tri ───────────────────────────────────────────────────────────────────
-  const sorted = [...filtered].sort((a, b) => {
-    const va = sort === 'username' ? a.username : sort === 'date_joined' ? a.date_joined : a.last_login ?? '';
-    const vb = sort === 'username' ? b.username : sort === 'date_joined' ? b.date_joined : b.last_login ?? '';
-    if (va < vb) return dir === 'asc' ? -1 : 1;
-    if (va > vb) return dir === 'asc' ?  1 : -1;
-    return 0;
-  });
-
-  const totalPages = Math.max(1, Math.ceil(sorted.length / pageSize));
-  const paginated  = sorted.slice((page - 1) * pageSize, page * pageSize);
+  const totalPages = Math.max(1, Math.ceil(count / pageSize));
+  const paginated  = users;
 
   const toggleSort = (k: SortKey) => {
     if (sort === k) setDir(d => d === 'asc' ? 'desc' : 'asc');
@@ -157,13 +149,8 @@ export default function UsersManagementPage() {
       ? <ArrowUpDown size={11} style={{ color: T.muted, opacity: 0.4 }} />
       : dir === 'asc' ? <ArrowUp size={11} style={{ color: T.red }} /> : <ArrowDown size={11} style={{ color: T.red }} />;
 
-  // ── KPIs ─────────────────────────────────────────────────────────────────
-  const kpis = {
-    total:   users.length,
-    couriers: users.filter(u => u.is_courier).length,
-    vendors: users.filter(u => u.is_vendor).length,
-    banned:  users.filter(u => u.is_banned).length,
-  };
+  // ── KPIs (globaux, calculés par le serveur) ───────────────────────────────
+  const kpis = totals;
 
   // ── Actions ───────────────────────────────────────────────────────────────
   const handleBan = async (u: AdminUser) => {
@@ -236,7 +223,7 @@ export default function UsersManagementPage() {
           </h1>
           <p style={{ fontSize: 13, color: T.muted }}>
             {kpis.banned > 0 && <span style={{ color: T.red, fontWeight: 700, marginRight: 6 }}>{kpis.banned} bannis ·</span>}
-            {users.length.toLocaleString('fr-FR')} utilisateurs
+            {totals.total.toLocaleString('fr-FR')} utilisateurs
           </p>
         </div>
         <div className="flex items-center gap-2 flex-shrink-0">
@@ -312,7 +299,7 @@ export default function UsersManagementPage() {
             onFocus={e => (e.target.style.borderColor = T.red)}
             onBlur={e  => (e.target.style.borderColor = T.inputBorder)} />
         </div>
-        <p style={{ fontSize: 12, color: T.muted, flexShrink: 0 }}>{sorted.length} résultat{sorted.length > 1 ? 's' : ''}</p>
+        <p style={{ fontSize: 12, color: T.muted, flexShrink: 0 }}>{count} résultat{count > 1 ? 's' : ''}</p>
       </div>
 
       {/* Tableau */}
@@ -463,7 +450,7 @@ export default function UsersManagementPage() {
         </div>
 
         {/* Pagination */}
-        {!loading && sorted.length > 0 && (
+        {!loading && count > 0 && (
           <div className="flex items-center justify-between px-4 sm:px-5 py-3 flex-wrap gap-3" style={{ borderTop: `1px solid ${T.border}` }}>
             <div className="flex items-center gap-2">
               <span style={{ fontSize: 12, color: T.muted }}>Lignes :</span>
@@ -476,7 +463,7 @@ export default function UsersManagementPage() {
               ))}
             </div>
             <p style={{ fontSize: 12, color: T.muted }}>
-              {(page - 1) * pageSize + 1}–{Math.min(page * pageSize, sorted.length)} sur {sorted.length}
+              {(page - 1) * pageSize + 1}–{Math.min(page * pageSize, count)} sur {count}
             </p>
             <div className="flex items-center gap-1">
               <button onClick={() => setPage(p => Math.max(1, p - 1))} disabled={page === 1}
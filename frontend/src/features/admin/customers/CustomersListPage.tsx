@@ -1,10 +1,10 @@
 // frontend/src/features/admin/customers/CustomersListPage.tsx
 // Gestion clients BelivaY — page admin complète.
 // Sections : KPIs · Charts · Filtres · Sélection groupée · Tableau/Cards · Pagination
-// Backend   : GET /api/vendors/admin/users/ (liste enrichie)
+// Backend   : GET /api/vendors/admin/users/ (liste enrichie, filtres / tri / pagination serveur)
 //             GET /api/vendors/admin/customers/stats/ (KPIs + graphiques)
 
-import { useEffect, useState, useCallback, useRef } from 'react';
+import { useEffect, useMemo, useState, useCallback, useRef } from 'react';
 import { Link } from 'react-router-dom';
 import {
   Search, RefreshCw, AlertCircle, ChevronLeft, ChevronRight,
@@ -17,7 +17,9 @@ import {
   AreaChart, Area, XAxis, YAxis, CartesianGrid, Tooltip,
   ResponsiveContainer, PieChart, Pie, Cell,
 } from 'recharts';
-import { adminApi, type AdminUser as AdminUserBase, type CustomerStats } from '@/services/api/admin';
+import {
+  adminApi, type AdminUser as AdminUserBase, type AdminUserPage, type CustomerStats, type UserFilters,
+} from '@/services/api/admin';
 
 // Extension locale du type AdminUser avec les champs enrichis du nouveau serializer.
 // Compatible avec l'ancien admin.ts (sans les champs) ET le nouveau (avec les champs).
@@ -235,6 +237,8 @@ export default function CustomersListPage() {
 
   // ── État données ──────────────────────────────────────────────────────────
   const [users,    setUsers]   = useState<AdminUser[]>([]);
+  const [count,    setCount]   = useState(0);
+  const [totals,   setTotals]  = useState<AdminUserPage['totals'] | null>(null);
   const [stats,    setStats]   = useState<CustomerStats | null>(null);
   const [loading,  setLoading] = useState(true);
 
@@ -256,76 +260,53 @@ export default function CustomersListPage() {
   const [openDropdown, setOpenDropdown] = useState<'status' | 'plan' | 'date' | null>(null);
   const searchRef = useRef<ReturnType<typeof setTimeout> | null>(null);
 
-  // ── Chargement ───────────────────────────────────────────────────────────
+  // ── Chargement (filtres, tri et pagination côté serveur) ──────────────────
+  const filters = useMemo<UserFilters>(() => {
+    const f: UserFilters = {
+      ordering: `${dir === 'desc' ? '-' : ''}${sort}`,
+      page,
+      page_size: pageSize,
+    };
+    if (search) f.search = search;
+    if (roleTab === 'buyer')   f.role = 'customer';
+    if (roleTab === 'vendor')  f.role = 'vendor';
+    if (roleTab === 'courier') f.role = 'courier';
+    if (roleTab === 'staff')   f.role = 'staff';
+    if (statusF !== 'all') f.status = statusF;
+    if (planF !== 'all') f.plan = planF;
+    if (dateF !== 'all') {
+      const days = dateF === 'today' ? 0 : dateF === 'week' ? 7 : 30;
+      f.date_from = new Date(Date.now() - days * 86400_000).toISOString().slice(0, 10);
+    }
+    return f;
+  }, [search, roleTab, statusF, planF, dateF, sort, dir, page, pageSize]);
+
+  const loadUsers = useCallback(async () => {
+    const data = await adminApi.listUsersPage(filters);
+    setUsers(data.results);
+    setCount(data.count);
+    setTotals(data.totals);
+  }, [filters]);
+
   const load = useCallback(async () => {
     setLoading(true);
     try {
-      const [usersData, statsData] = await Promise.all([
-        adminApi.listUsers(),
+      const [, statsData] = await Promise.all([
+        loadUsers(),
         adminApi.getCustomerStats(),
       ]);
-      setUsers(usersData);
       setStats(statsData);
     } catch {
       showToast('Erreur chargement des clients', 'error');
     } finally {
       setLoading(false);
     }
-  }, [showToast]);
+  }, [loadUsers, showToast]);
 
   useEffect(() => { load(); }, [load]);
 
-  // ── Filtrage ─────────────────────────────────────────────────────────────
-  const now = Date.now();
-  const filtered = users.filter(u => {
-    const q = search.toLowerCase();
-    if (q && ![u.username, u.email, u.first_name, u.last_name, u.vendor_business_name]
-      .some(v => v?.toLowerCase().includes(q))) return false;
-
-    if (roleTab === 'buyer'  && !u.actor_roles?.includes('CLIENT') && (u.is_staff || u.is_superuser)) return false;
-    if (roleTab === 'vendor' && !u.is_vendor) return false;
-    if (roleTab === 'courier' && !u.is_courier) return false;
-    if (roleTab === 'staff'  && !u.is_staff && !u.is_superuser) return false;
-
-    if (statusF === 'active'   && (!u.is_active || u.is_banned)) return false;
-    if (statusF === 'banned'   && !u.is_banned) return false;
-    if (statusF === 'inactive' && (u.is_active || u.is_banned)) return false;
-
-    if (planF !== 'all' && u.vendor_plan !== planF) return false;
-
-    const joined = new Date(u.date_joined).getTime();
-    if (dateF === 'today' && now - joined > 86400_000)         return false;
-    if (dateF === 'week'  && now - joined > 7 * 86400_000)     return false;
-    if (dateF === 'month' && now - joined > 30 * 86400_000)    return false;
-
-    return true;
-  });
-
-  // ── Tri ───────────────────────────────────────────────────────────────────
-  const sorted = [...filtered].sort((a, b) => {
-    const va =
-      sort === 'username'      ? a.username :
-      sort === 'date_joined'   ? a.date_joined :
-      sort === 'last_login'    ? (a.last_login ?? '') :
-      sort === 'total_orders'  ? a.total_orders :
-      sort === 'total_spent'   ? a.total_spent :
-      sort === 'loyalty_points'? a.loyalty_points :
-      '';
-    const vb =
-      sort === 'username'      ? b.username :
-      sort === 'date_joined'   ? b.date_joined :
-      sort === 'last_login'    ? (b.last_login ?? '') :
-      sort === 'total_orders'  ? b.total_orders :
-      sort === 'total_spent'   ? b.total_spent :
-      sort === 'loyalty_points'? b.loyalty_points :
-      '';
-    if (va < vb) return dir === 'asc' ? -1 : 1;
-    if (va > vb) return dir === 'asc' ?  1 : -1;
-    return 0;
-  });
-
-  const totalPages = Math.max(1, Math.ceil(sorted.length / pageSize));
-  const paginated  = sorted.slice((page - 1) * pageSize, page * pageSize);
+  const totalPages = Math.max(1, Math.ceil(count / pageSize));
+  const paginated  = users;
 
   const toggleSort = (k: SortKey) => {
     if (sort === k) setDir(d => d === 'asc' ? 'desc' : 'asc');
@@ -401,7 +382,7 @@ export default function CustomersListPage() {
 
   // ── Export CSV ────────────────────────────────────────────────────────────
   const exportCSV = (ids?: Set<number>) => {
-    const data = ids ? sorted.filter(u => ids.has(u.id)) : sorted;
+    const data = ids ? users.filter(u => ids.has(u.id)) : users;
     const rows = data.map(u => [
       u.id, u.username, u.email,
       `${u.first_name} ${u.last_name}`.trim(),
@@ -483,7 +464,7 @@ export default function CustomersListPage() {
                 +{stats.kpis.new_this_week} cette semaine ·
               </span>
             )}
-            {users.length.toLocaleString('fr-FR')} comptes enregistrés
+            {(totals?.total ?? count).toLocaleString('fr-FR')} comptes enregistrés
           </p>
         </div>
         <div className="flex items-center gap-2 flex-shrink-0">
@@ -695,12 +676,12 @@ export default function CustomersListPage() {
               {/* Tabs */}
               <div className="flex gap-1 overflow-x-auto" style={{ scrollbarWidth: 'none' }}>
                 {([
-                  { key: 'all' as RoleTab,    label: 'Tous',      count: users.length },
-                  { key: 'buyer' as RoleTab,  label: 'Clients',   count: users.filter(u => u.actor_roles?.includes('CLIENT') ?? true).length },
-                  { key: 'vendor' as RoleTab, label: 'Vendeurs',  count: users.filter(u => u.is_vendor).length },
-                  { key: 'courier' as RoleTab,label: 'Livreurs',  count: users.filter(u => u.is_courier).length },
-                  { key: 'staff' as RoleTab,  label: 'Staff',     count: users.filter(u => u.is_staff || u.is_superuser).length },
-                ] as { key: RoleTab; label: string; count: number }[]).map(t => (
+                  { key: 'all' as RoleTab,    label: 'Tous',      count: totals?.total },
+                  { key: 'buyer' as RoleTab,  label: 'Clients' },
+                  { key: 'vendor' as RoleTab, label: 'Vendeurs',  count: totals?.vendors },
+                  { key: 'courier' as RoleTab,label: 'Livreurs',  count: totals?.couriers },
+                  { key: 'staff' as RoleTab,  label: 'Staff' },
+                ] as { key: RoleTab; label: string; count?: number }[]).map(t => (
                   <button
                     key={t.key}
                     onClick={() => { setRoleTab(t.key); setPage(1); setSelected(new Set()); }}
@@ -710,13 +691,13 @@ export default function CustomersListPage() {
                     onMouseLeave={e => { if (roleTab !== t.key) (e.currentTarget.style.color = T.muted); }}
                   >
                     {t.label}
-                    <span style={{
+                    {t.count !== undefined && <span style={{
                       fontSize: 10, padding: '1px 5px', borderRadius: 999, fontWeight: 700,
                       background: roleTab === t.key ? 'rgba(255,255,255,0.25)' : T.cardAlt,
                       color: roleTab === t.key ? '#fff' : T.muted,
                     }}>
                       {t.count}
-                    </span>
+                    </span>}
                   </button>
                 ))}
               </div>
@@ -798,7 +779,7 @@ export default function CustomersListPage() {
               )}
 
               <p style={{ fontSize: 12, color: T.muted, marginLeft: 'auto' }}>
-                {sorted.length} résultat{sorted.length > 1 ? 's' : ''}
+                {count} résultat{count > 1 ? 's' : ''}
               </p>
             </div>
           </div>
@@ -1150,7 +1131,7 @@ export default function CustomersListPage() {
         </div>
 
         {/* ── Pagination ── */}
-        {!loading && sorted.length > 0 && (
+        {!loading && count > 0 && (
           <div
             className="flex items-center justify-between px-4 sm:px-5 py-3 flex-wrap gap-3"
             style={{ borderTop: `1px solid ${T.border}` }}
@@ -1176,7 +1157,7 @@ export default function CustomersListPage() {
 
             {/* Info */}
             <p style={{ fontSize: 12, color: T.muted }}>
-              {(page - 1) * pageSize + 1}–{Math.min(page * pageSize, sorted.length)} sur {sorted.length}
+              {(page - 1) * pageSize + 1}–{Math.min(page * pageSize, count)} sur {count}
             </p>
 
             {/* Navigation */}
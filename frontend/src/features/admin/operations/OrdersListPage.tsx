@@ -1,6 +1,7 @@
 // frontend/src/features/admin/orders/OrdersListPage.tsx
 // Gestion des commandes — admin BelivaY
 // KPIs · Filtres multi-niveaux · Tableau/Cards · Pagination
+// Filtres, tri, pagination et KPIs calculés côté serveur (une page chargée à la fois)
 
 import { useEffect, useState, useCallback, useRef } from 'react';
 import { Link, useSearchParams } from 'react-router-dom';
@@ -10,7 +11,7 @@ import {
   Clock, Truck, Package, Ban, ArrowUpDown, ArrowUp, ArrowDown,
   Filter, ChevronDown, X,
 } from 'lucide-react';
-import { adminApi, type AdminOrder } from '@/services/api/admin';
+import { adminApi, type AdminOrder, type AdminOrderPage, type OrderFilters } from '@/services/api/admin';
 import { useAdminTheme } from '@/hooks/useAdminTheme';
 import { useToast } from '@/context/ToastContext';
 import { useConfirm } from '@/context/ConfirmContext';
@@ -52,6 +53,12 @@ type DateFilter = 'all' | 'today' | 'week' | 'month';
 
 const PAGE_SIZES = [10, 20, 50] as const;
 
+const DATE_FILTER_DAYS: Record<Exclude<DateFilter, 'all'>, number> = { today: 1, week: 7, month: 30 };
+
+const EMPTY_TOTALS: AdminOrderPage['totals'] = {
+  total: 0, pending: 0, paid: 0, failed: 0, refunded: 0, revenue: 0, delivered: 0, cancelled: 0,
+};
+
 // ─────────────────────────────────────────────────────────────────────────────
 // SOUS-COMPOSANTS
 // ─────────────────────────────────────────────────────────────────────────────
@@ -98,6 +105,8 @@ export default function OrdersListPage() {
   const [searchParams] = useSearchParams();
 
   const [orders,   setOrders]  = useState<AdminOrder[]>([]);
+  const [count,    setCount]   = useState(0);
+  const [kpis,     setKpis]    = useState<AdminOrderPage['totals']>(EMPTY_TOTALS);
   const [loading,  setLoading] = useState(true);
   const [acting,   setActing]  = useState<number | null>(null);
 
@@ -119,58 +128,41 @@ export default function OrdersListPage() {
   const [openDrop, setOpenDrop]= useState<'date' | 'fulfill' | null>(null);
   const searchRef = useRef<ReturnType<typeof setTimeout> | null>(null);
 
-  // ── Chargement ───────────────────────────────────────────────────────────
+  // ── Chargement (une page, filtrée et triée par le backend) ────────────────
   const load = useCallback(async () => {
     setLoading(true);
     try {
-      // Passage des filtres backend pour réduire la charge
-      const filters: Record<string, string> = {};
+      const filters: OrderFilters = {
+        ordering: `${dir === 'desc' ? '-' : ''}${sort}`,
+        page,
+        page_size: pageSize,
+      };
       if (payTab     !== 'all') filters.payment_status     = payTab;
       if (fulfillTab !== 'all') filters.fulfillment_status = fulfillTab;
+      if (dateF !== 'all') {
+        const since = new Date(Date.now() - DATE_FILTER_DAYS[dateF] * 86400_000);
+        filters.date_from = since.toISOString().slice(0, 10);
+      }
+      if (search) filters.search = search;
       const vendorId = searchParams.get('vendor');
-      if (vendorId) filters.vendor = vendorId;
+      if (vendorId) filters.vendor = Number(vendorId);
       const userId = searchParams.get('user');
-      if (userId) filters.search = `user:${userId}`;
-      const data = await adminApi.listOrders(filters);
-      setOrders(data);
+      if (userId) filters.user = Number(userId);
+      const data = await adminApi.listOrdersPage(filters);
+      setOrders(data.results);
+      setCount(data.count);
+      setKpis(data.totals);
     } catch {
       showToast('Erreur chargement des commandes', 'error');
     } finally {
       setLoading(false);
     }
-  }, [payTab, fulfillTab, searchParams, showToast]);
+  }, [payTab, fulfillTab, dateF, search, sort, dir, page, pageSize, searchParams, showToast]);
 
   useEffect(() => { load(); }, [load]);
 
-  // ── Filtrage local (date + recherche texte) ───────────────────────────────
-  const now = Date.now();
-  const filtered = orders.filter(o => {
-    const created = new Date(o.created_at).getTime();
-    if (dateF === 'today' && now - created > 86400_000)      return false;
-    if (dateF === 'week'  && now - created > 7 * 86400_000)  return false;
-    if (dateF === 'month' && now - created > 30 * 86400_000) return false;
-    if (search) {
-      const q = search.toLowerCase();
-      const matchId = o.id.toString().includes(q);
-      const matchCust = [o.customer_name, o.customer_email, o.customer_phone, o.city]
-        .some(v => v?.toLowerCase().includes(q));
-      const matchVendor = o.vendor_names?.some(v => v.toLowerCase().includes(q));
-      if (!matchId && !matchCust && !matchVendor) return false;
-    }
-    return true;
-  });
-
-  // ── Tri ───────────────────────────────────────────────────────────────────
-  const sorted = [...filtered].sort((a, b) => {
-    const va = sort === 'id' ? a.id : sort === 'created_at' ? a.created_at : a.total_xaf;
-    const vb = sort === 'id' ? b.id : sort === 'created_at' ? b.created_at : b.total_xaf;
-    if (va < vb) return dir === 'asc' ? -1 : 1;
-    if (va > vb) return dir === 'asc' ?  1 : -1;
-    return 0;
-  });
-
-  const totalPages = Math.max(1, Math.ceil(sorted.length / pageSize));
-  const paginated  = sorted.slice((page - 1) * pageSize, page * pageSize);
+  const totalPages = Math.max(1, Math.ceil(count / pageSize));
+  const paginated  = orders;
 
   const toggleSort = (k: SortKey) => {
     if (sort === k) setDir(d => d === 'asc' ? 'desc' : 'asc');
@@ -186,16 +178,6 @@ export default function OrdersListPage() {
   const activeFilters = [dateF !== 'all'].filter(Boolean).length;
   const resetFilters  = () => { setDateF('all'); setSearch(''); setPage(1); };
 
-  // ── KPIs calculés ────────────────────────────────────────────────────────
-  const kpis = {
-    total:     orders.length,
-    pending:   orders.filter(o => o.payment_status === 'PENDING').length,
-    paid:      orders.filter(o => o.payment_status === 'PAID').length,
-    revenue:   orders.filter(o => o.payment_status === 'PAID').reduce((s, o) => s + o.total_xaf, 0),
-    delivered: orders.filter(o => o.fulfillment_status === 'DELIVERED').length,
-    cancelled: orders.filter(o => o.fulfillment_status === 'CANCELLED').length,
-  };
-
   // ── Annulation ────────────────────────────────────────────────────────────
   const handleCancel = async (o: AdminOrder) => {
     const ok = await confirm({
@@ -250,7 +232,7 @@ export default function OrdersListPage() {
           </h1>
           <p style={{ fontSize: 13, color: T.muted }}>
             {kpis.pending > 0 && <span style={{ color: T.red, fontWeight: 700, marginRight: 6 }}>{kpis.pending} en attente ·</span>}
-            {orders.length.toLocaleString('fr-FR')} commandes au total
+            {kpis.total.toLocaleString('fr-FR')} commandes au total
           </p>
         </div>
         <div className="flex items-center gap-2 flex-shrink-0">
@@ -275,10 +257,10 @@ export default function OrdersListPage() {
       {/* ── KPI Cards ────────────────────────────────────────────────────── */}
       <div className="grid grid-cols-2 lg:grid-cols-4 gap-3">
         {[
-          { label: 'Total',        value: kpis.total,                  sub: 'toutes commandes',   accent: T.text,    click: () => { setPayTab('all'); setFulfillTab('all'); } },
-          { label: 'Paiement att.',value: kpis.pending,                sub: 'à encaisser',        accent: '#F59E0B', click: () => setPayTab('PENDING') },
-          { label: 'Revenus (payé)',value: fmtXaf(kpis.revenue),       sub: `${kpis.paid} payées`,accent: '#10B981', click: () => setPayTab('PAID') },
-          { label: 'Livrées',      value: kpis.delivered,              sub: `${kpis.cancelled} annulées`, accent: '#3B82F6', click: () => setFulfillTab('DELIVERED') },
+          { label: 'Total',        value: kpis.total,                  sub: 'toutes commandes',   accent: T.text,    click: () => { setPayTab('all'); setFulfillTab('all'); setPage(1); } },
+          { label: 'Paiement att.',value: kpis.pending,                sub: 'à encaisser',        accent: '#F59E0B', click: () => { setPayTab('PENDING'); setPage(1); } },
+          { label: 'Revenus (payé)',value: fmtXaf(kpis.revenue),       sub: `${kpis.paid} payées`,accent: '#10B981', click: () => { setPayTab('PAID'); setPage(1); } },
+          { label: 'Livrées',      value: kpis.delivered,              sub: `${kpis.cancelled} annulées`, accent: '#3B82F6', click: () => { setFulfillTab('DELIVERED'); setPage(1); } },
         ].map((k, i) => (
           <button key={i} onClick={() => { k.click(); setPage(1); }}
             className="rounded-2xl p-4 text-left transition-all w-full"
@@ -302,15 +284,15 @@ export default function OrdersListPage() {
           <div className="flex gap-1 overflow-x-auto flex-shrink-0" style={{ scrollbarWidth: 'none' }}>
             {(['all','PENDING','PAID','FAILED','REFUNDED'] as PayTab[]).map(t => {
               const cfg = t === 'all' ? null : PAYMENT_CFG[t];
-              const count = t === 'all' ? orders.length : orders.filter(o => o.payment_status === t).length;
+              const tabCount = ({ all: kpis.total, PENDING: kpis.pending, PAID: kpis.paid, FAILED: kpis.failed, REFUNDED: kpis.refunded } as Record<PayTab, number>)[t];
               return (
-                <button key={t} onClick={() => { setPayTab(t); setPage(1); load(); }}
+                <button key={t} onClick={() => { setPayTab(t); setPage(1); }}
                   className="flex items-center gap-1.5 px-3 py-1.5 rounded-lg text-[12px] font-semibold whitespace-nowrap transition-all"
                   style={{ background: payTab === t ? (cfg?.color ?? T.red) : 'transparent', color: payTab === t ? '#fff' : (cfg?.color ?? T.muted) }}
                   onMouseEnter={e => { if (payTab !== t) (e.currentTarget.style.color = T.text); }}
                   onMouseLeave={e => { if (payTab !== t) (e.currentTarget.style.color = cfg?.color ?? T.muted); }}>
                   {t === 'all' ? 'Tous' : cfg?.label}
-                  <span style={{ fontSize: 10, padding: '1px 5px', borderRadius: 999, fontWeight: 700, background: payTab === t ? 'rgba(255,255,255,0.25)' : T.cardAlt, color: payTab === t ? '#fff' : T.muted }}>{count}</span>
+                  <span style={{ fontSize: 10, padding: '1px 5px', borderRadius: 999, fontWeight: 700, background: payTab === t ? 'rgba(255,255,255,0.25)' : T.cardAlt, color: payTab === t ? '#fff' : T.muted }}>{tabCount}</span>
                 </button>
               );
             })}
@@ -340,7 +322,7 @@ export default function OrdersListPage() {
               {fulfillTab === 'all' ? 'Livraison' : FULFILLMENT_CFG[fulfillTab]?.label} <ChevronDown size={11} />
             </button>
             <DropMenu show={openDrop === 'fulfill'}>
-              <DropItem label="Tous" active={fulfillTab === 'all'} onClick={() => { setFulfillTab('all'); setPage(1); load(); }} />
+              <DropItem label="Tous" active={fulfillTab === 'all'} onClick={() => { setFulfillTab('all'); setPage(1); }} />
               {(['PENDING','PROCESSING','SHIPPED','DELIVERED','CANCELLED'] as FulfillTab[]).map(f => (
                 <DropItem key={f} label={FULFILLMENT_CFG[f]?.label ?? f} active={fulfillTab === f} onClick={() => { setFulfillTab(f); setPage(1); }} />
               ))}
@@ -370,7 +352,7 @@ export default function OrdersListPage() {
           )}
 
           <p style={{ fontSize: 12, color: T.muted, marginLeft: 'auto' }}>
-            {sorted.length} résultat{sorted.length > 1 ? 's' : ''}
+            {count} résultat{count > 1 ? 's' : ''}
           </p>
         </div>
       </div>
@@ -543,7 +525,7 @@ export default function OrdersListPage() {
         </div>
 
         {/* Pagination */}
-        {!loading && sorted.length > 0 && (
+        {!loading && count > 0 && (
           <div className="flex items-center justify-between px-4 sm:px-5 py-3 flex-wrap gap-3" style={{ borderTop: `1px solid ${T.border}` }}>
             <div className="flex items-center gap-2">
               <span style={{ fontSize: 12, color: T.muted }}>Lignes :</span>
@@ -556,7 +538,7 @@ export default function OrdersListPage() {
               ))}
             </div>
             <p style={{ fontSize: 12, color: T.muted }}>
-              {(page - 1) * pageSize + 1}–{Math.min(page * pageSize, sorted.length)} sur {sorted.length}
+              {(page - 1) * pageSize + 1}–{Math.min(page * pageSize, count)} sur {count}
             </p>
             <div className="flex items-center gap-1">
               <button onClick={() => setPage(p => Math.max(1, p - 1))} disabled={page === 1}
@@ -189,6 +189,8 @@ function groupByCity(orders: AdminOrder[]): CityGroup[] {
 
 type FilterGroup = 'all' | 'recent' | 'active' | 'delivered';
 
+const MAP_ORDERS_LIMIT = 200;
+
 export default function OrdersMapPage() {
   const T             = useAdminTheme();
   const { showToast } = useToast();
@@ -200,8 +202,9 @@ export default function OrdersMapPage() {
   const load = useCallback(async () => {
     setLoading(true);
     try {
-      const data = await adminApi.listOrders();
-      setOrders(data);
+      // Carte de l'activité récente : les MAP_ORDERS_LIMIT dernières commandes
+      const data = await adminApi.listOrdersPage({ page_size: MAP_ORDERS_LIMIT });
+      setOrders(data.results);
     } catch {
       showToast('Erreur chargement des commandes', 'error');
     } finally {
@@ -239,9 +239,15 @@ export default function CourierDashboardPage() {
   const [disputes, setDisputes] = useState<CourierDispute[]>([]);
   const [selectedDispute, setSelectedDispute] = useState<CourierDispute | null>(null);
   const [notifications, setNotifications] = useState<CourierNotification[]>([]);
+  // Compteur serveur (servi depuis le cache) : la liste chargée n'est pas exhaustive
+  const [unreadTotal, setUnreadTotal] = useState<number | null>(null);
   const [selectedNotification, setSelectedNotification] = useState<CourierNotification | null>(null);
   const [shipments, setShipments] = useState<CourierShipment[]>([]);
   const [availableShipmentsFromAPI, setAvailableShipmentsFromAPI] = useState<CourierShipment[]>([]);
+  // Pagination par curseur de la file disponible + total de la ville (compteur serveur)
+  const [availableNext, setAvailableNext] = useState<string | null>(null);
+  const [availableTotal, setAvailableTotal] = useState<number | null>(null);
+  const [availableLoadingMore, setAvailableLoadingMore] = useState(false);
   const [selectedShipmentId, setSelectedShipmentId] = useState<number | null>(null);
   const [noteDraft, setNoteDraft] = useState("");
   const [scanCode, setScanCode] = useState("");
@@ -256,24 +262,47 @@ export default function CourierDashboardPage() {
   const [clientMessages, setClientMessages] = useState<OrderChatMessage[]>([]);
   const [clientReplyDraft, setClientReplyDraft] = useState("");
   const clientChatEndRef = useRef<HTMLDivElement | null>(null);
+  const claimKeysRef = useRef(new Map<string, string>());
   const [disputePermissionStatus, setDisputePermissionStatus] = useState<Record<number, "locked" | "requested" | "granted">>({});
   const [disputeReplyDraft, setDisputeReplyDraft] = useState("");
   const [disputeFeedback, setDisputeFeedback] = useState("");
 
   const refreshCourierWork = useCallback(async () => {
-    const [shipmentsResult, dashboardResult, availableResult, notificationsResult] = await Promise.allSettled([
+    const [shipmentsResult, dashboardResult, availableResult, availableCountResult, notificationsResult, unreadResult] = await Promise.allSettled([
       courierApi.listMyShipments(),
       courierApi.getDashboard(),
-      courierApi.listAvailableShipments(),
+      courierApi.listAvailablePage(),
+      courierApi.countAvailableShipments(),
       courierApi.getNotifications(),
+      courierApi.getUnreadNotificationsCount(),
     ]);
 
     if (shipmentsResult.status === "fulfilled") setShipments(shipmentsResult.value);
     if (dashboardResult.status === "fulfilled") setDashboard(dashboardResult.value);
-    if (availableResult.status === "fulfilled") setAvailableShipmentsFromAPI(availableResult.value);
+    if (availableResult.status === "fulfilled") {
+      setAvailableShipmentsFromAPI(availableResult.value.results);
+      setAvailableNext(availableResult.value.next);
+    }
+    if (availableCountResult.status === "fulfilled") setAvailableTotal(availableCountResult.value.count);
     if (notificationsResult.status === "fulfilled") setNotifications(notificationsResult.value);
+    if (unreadResult.status === "fulfilled") setUnreadTotal(unreadResult.value.unread);
   }, []);
 
+  const loadMoreAvailable = useCallback(async () => {
+    if (!availableNext) return;
+    setAvailableLoadingMore(true);
+    try {
+      const page = await courierApi.listAvailablePage(availableNext);
+      setAvailableShipmentsFromAPI((prev) => {
+        const known = new Set(prev.map((shipment) => shipment.id));
+        return [...prev, ...page.results.filter((shipment) => !known.has(shipment.id))];
+      });
+      setAvailableNext(page.next);
+    } finally {
+      setAvailableLoadingMore(false);
+    }
+  }, [availableNext]);
+
   useEffect(() => {
     const interval = window.setInterval(() => {
       setProgress((value) => Math.min(value + 12, 94));
@@ -288,16 +317,18 @@ export default function CourierDashboardPage() {
       courierApi.getSettings(),
       courierApi.getDisputes(),
       courierApi.getNotifications(),
-      courierApi.listAvailableShipments(),
+      courierApi.listAvailablePage(),
+      courierApi.countAvailableShipments(),
+      courierApi.getUnreadNotificationsCount(),
     ])
-      .then(([profileResult, applicationResult, shipmentsResult, dashboardResult, networkResult, settingsResult, disputesResult, notificationsResult, availableResult]) => {
+      .then(([profileResult, applicationResult, shipmentsResult, dashboardResult, networkResult, settingsResult, disputesResult, notificationsResult, availableResult, availableCountResult, unreadResult]) => {
         const resolvedShipments =
           shipmentsResult.status === "fulfilled"
             ? shipmentsResult.value
             : [];
         const resolvedAvailable =
           availableResult.status === "fulfilled"
-            ? availableResult.value
+            ? availableResult.value.results
             : [];
 
         if (profileResult.status === "fulfilled") setUser(profileResult.value);
@@ -307,8 +338,11 @@ export default function CourierDashboardPage() {
         if (settingsResult.status === "fulfilled") setCourierSettings(settingsResult.value);
         if (disputesResult.status === "fulfilled") setDisputes(disputesResult.value);
         if (notificationsResult.status === "fulfilled") setNotifications(notificationsResult.value);
+        if (unreadResult.status === "fulfilled") setUnreadTotal(unreadResult.value.unread);
         setShipments(resolvedShipments);
         setAvailableShipmentsFromAPI(resolvedAvailable);
+        setAvailableNext(availableResult.status === "fulfilled" ? availableResult.value.next : null);
+        if (availableCountResult.status === "fulfilled") setAvailableTotal(availableCountResult.value.count);
         setSelectedShipmentId((current) => current ?? resolvedShipments[0]?.id ?? resolvedAvailable[0]?.id ?? null);
       })
       .finally(() => {
@@ -349,6 +383,8 @@ export default function CourierDashboardPage() {
     [shipments],
   );
   const availableShipments = availableShipmentsFromAPI;
+  // Total de la ville (la liste n'en charge qu'une page à la fois)
+  const availableShipmentsCount = Math.max(availableTotal ?? 0, availableShipments.length);
   const visibleCourseShipments = useMemo(() => {
     const byId = new globalThis.Map<number, CourierShipment>();
     for (const shipment of availableShipmentsFromAPI) byId.set(shipment.id, shipment);
@@ -444,23 +480,64 @@ export default function CourierDashboardPage() {
     }
   };
 
+  // Clé d'idempotence par geste : conservée tant que la réponse n'est pas arrivée
+  // (coupure réseau), pour qu'un nouveau clic rejoue la même prise en charge
+  const claimKeyFor = (gesture: string) => {
+    const key = claimKeysRef.current.get(gesture) ?? crypto.randomUUID();
+    claimKeysRef.current.set(gesture, key);
+    return key;
+  };
+
+  const settleClaimKey = (gesture: string, error?: unknown) => {
+    if (!(error instanceof TypeError)) claimKeysRef.current.delete(gesture);
+  };
+
+  const registerClaimed = (claimed: CourierShipment) => {
+    setAvailableShipmentsFromAPI((prev) => prev.filter((s) => s.id !== claimed.id));
+    setAvailableTotal((total) => (total === null ? total : Math.max(total - 1, 0)));
+    setShipments((prev) => [claimed, ...prev.filter((s) => s.id !== claimed.id)]);
+    setSelectedShipmentId(claimed.id);
+    setActionFeedback("Mission prise en charge avec succès.");
+    refreshCourierWork();
+  };
+
   const handleClaimShipment = async (id: number) => {
+    const gesture = `shipment:${id}`;
     setActionLoading("CLAIM");
     setActionFeedback("");
     try {
-      const claimed = await courierApi.claimShipment(id);
-      setAvailableShipmentsFromAPI((prev) => prev.filter((s) => s.id !== id));
-      setShipments((prev) => [claimed, ...prev]);
-      setSelectedShipmentId(claimed.id);
-      setActionFeedback("Mission prise en charge avec succès.");
-      refreshCourierWork();
-    } catch {
+      const claimed = await courierApi.claimShipment(id, claimKeyFor(gesture));
+      settleClaimKey(gesture);
+      registerClaimed(claimed);
+    } catch (error) {
+      settleClaimKey(gesture, error);
       setActionFeedback("Impossible de prendre cette mission. Elle a peut-être déjà été assignée.");
     } finally {
       setActionLoading(null);
     }
   };
 
+  const handleClaimNextShipment = async () => {
+    const gesture = "next";
+    setActionLoading("CLAIM");
+    setActionFeedback("");
+    try {
+      const claimed = await courierApi.claimNextShipment(claimKeyFor(gesture));
+      settleClaimKey(gesture);
+      if (claimed) {
+        registerClaimed(claimed);
+      } else {
+        setActionFeedback("Aucune livraison disponible pour le moment.");
+        refreshCourierWork();
+      }
+    } catch (error) {
+      settleClaimKey(gesture, error);
+      setActionFeedback("Impossible de prendre une mission pour le moment.");
+    } finally {
+      setActionLoading(null);
+    }
+  };
+
   const handleContactClient = async () => {
     if (!selectedShipment) return;
     setContactLoading(true);
@@ -596,10 +673,10 @@ export default function CourierDashboardPage() {
     { label: "Statut", value: dashboard?.status_label ?? (currentIsOnline ? "En ligne" : "Hors ligne"), tone: "text-green-300" },
     { label: "Parcourus", value: `${(dashboard?.distance_km ?? 0).toFixed(1)} km`, tone: "text-sky-300" },
     { label: "Temps moyen / livraison", value: `${dashboard?.average_delivery_minutes ?? 0} min`, tone: "text-cyan-300" },
-    { label: "Performance", value: `${dashboard?.performance_percent ?? 0}%`, tone: "text-orange-300" },
+    { label: dashboard ? `Performance (${dashboard.stats_window_days} j)` : "Performance", value: `${dashboard?.performance_percent ?? 0}%`, tone: "text-orange-300" },
   ];
 
-  const unreadNotifications = notifications.filter((item) => !item.is_read).length;
+  const unreadNotifications = unreadTotal ?? notifications.filter((item) => !item.is_read).length;
 
   const mapShipment = selectedShipment ?? activeShipments[0] ?? shipments[0] ?? null;
   const nextTourStop = activeShipments[0] ?? tourShipments[0] ?? null;
@@ -687,6 +764,7 @@ export default function CourierDashboardPage() {
     setSelectedNotification(notification);
 
     if (!notification.is_read) {
+      setUnreadTotal((total) => (total === null ? total : Math.max(total - 1, 0)));
       try {
         const updated = await courierApi.markNotificationRead(notification.id);
         setNotifications((current) =>
@@ -709,6 +787,7 @@ export default function CourierDashboardPage() {
       await courierApi.markAllNotificationsRead();
     } finally {
       setNotifications((current) => current.map((item) => ({ ...item, is_read: true })));
+      setUnreadTotal(0);
     }
   }
 
@@ -737,7 +816,9 @@ export default function CourierDashboardPage() {
       <section className="grid gap-4 md:grid-cols-4">
         {[
           { ...quickStats[0], value: dashboard?.active_shipments ?? quickStats[0].value },
-          { ...quickStats[1], value: dashboard?.delivered_shipments ?? quickStats[1].value },
+          dashboard
+            ? { ...quickStats[1], label: `Livrees (${dashboard.stats_window_days} j)`, value: dashboard.delivered_shipments }
+            : quickStats[1],
           quickStats[2],
           quickStats[3],
         ].map((item) => (
@@ -952,9 +1033,9 @@ export default function CourierDashboardPage() {
           ) : availableShipments.length ? (
             <div className="space-y-3">
               <div className="rounded-[18px] border border-sky-500/20 bg-sky-500/5 p-4 text-[13px] leading-6 text-sky-100">
-                Aucune mission n'est encore dans ta tournee, mais {availableShipments.length} livraison
-                {availableShipments.length > 1 ? "s" : ""} disponible{availableShipments.length > 1 ? "s" : ""} attend
-                {availableShipments.length > 1 ? "ent" : ""} une prise en charge.
+                Aucune mission n'est encore dans ta tournee, mais {availableShipmentsCount} livraison
+                {availableShipmentsCount > 1 ? "s" : ""} disponible{availableShipmentsCount > 1 ? "s" : ""} attend
+                {availableShipmentsCount > 1 ? "ent" : ""} une prise en charge.
               </div>
               {availableShipments.slice(0, 5).map((shipment, index) => (
                 <div
@@ -1023,7 +1104,7 @@ export default function CourierDashboardPage() {
         <div className="mb-4 flex flex-wrap gap-2">
           {[
             { label: "Actives", count: activeShipments.length, tone: "border-emerald-500/20 bg-emerald-500/10 text-emerald-300" },
-            { label: "Disponibles", count: availableShipments.length, tone: "border-sky-500/20 bg-sky-500/10 text-sky-300" },
+            { label: "Disponibles", count: availableShipmentsCount, tone: "border-sky-500/20 bg-sky-500/10 text-sky-300" },
             { label: "Historique", count: completedShipments.length, tone: "border-white/10 bg-white/5 text-white" },
           ].map((pill) => (
             <div key={pill.label} className={`rounded-full border px-4 py-2 text-[12px] font-bold ${pill.tone}`}>
@@ -1066,6 +1147,30 @@ export default function CourierDashboardPage() {
             </button>
             );
           })}
+          {availableShipmentsCount ? (
+            <button
+              type="button"
+              onClick={() => handleClaimNextShipment()}
+              disabled={actionLoading === "CLAIM"}
+              className="inline-flex w-full items-center justify-center gap-2 rounded-[18px] border border-emerald-500/20 bg-emerald-500/10 p-3 text-[12px] font-extrabold text-emerald-300 transition hover:bg-emerald-500/15 disabled:cursor-not-allowed disabled:opacity-60"
+            >
+              {actionLoading === "CLAIM" ? <LoaderCircle size={14} className="animate-spin" /> : null}
+              Prendre la prochaine livraison disponible
+            </button>
+          ) : null}
+          {availableNext ? (
+            <button
+              type="button"
+              onClick={() => loadMoreAvailable()}
+              disabled={availableLoadingMore}
+              className="inline-flex w-full items-center justify-center gap-2 rounded-[18px] border border-sky-500/20 bg-sky-500/5 p-3 text-[12px] font-extrabold text-sky-300 transition hover:bg-sky-500/10 disabled:cursor-not-allowed disabled:opacity-60"
+            >
+              {availableLoadingMore ? <LoaderCircle size={14} className="animate-spin" /> : null}
+              {availableLoadingMore
+                ? "Chargement..."
+                : `Voir plus de livraisons disponibles (${availableShipments.length}/${availableShipmentsCount})`}
+            </button>
+          ) : null}
           {!visibleCourseShipments.length ? (
             <div className="rounded-[18px] border border-dashed border-white/10 p-6 text-[13px] leading-6 text-[#8B949E]">
               Aucune course trouvee. Sur Render, une nouvelle commande apparait ici seulement si son mode est
@@ -77,6 +77,8 @@ export default function NotificationsPage() {
   ];
 
   const [notifications, setNotifications] = useState<NotificationCard[]>([]);
+  // Compteur serveur (servi depuis le cache) ; null pour les visiteurs (démo locale)
+  const [unreadTotal, setUnreadTotal] = useState<number | null>(null);
   const [loading, setLoading] = useState(true);
   const [selectedNotification, setSelectedNotification] = useState<NotificationCard | null>(null);
 
@@ -84,8 +86,12 @@ export default function NotificationsPage() {
     const fetchNotifications = async () => {
       try {
         if (localStorage.getItem('access_token')) {
-          const data = await customerApi.getNotifications();
+          const [data, unread] = await Promise.all([
+            customerApi.getNotifications(),
+            customerApi.getUnreadNotificationsCount(),
+          ]);
           setNotifications(data);
+          setUnreadTotal(unread.unread);
         } else {
           setNotifications(
             fallbackNotifications.map((notification) => ({
@@ -112,7 +118,7 @@ export default function NotificationsPage() {
     return () => window.removeEventListener("belivay-new-notification", handleNewNotification);
   }, []);
 
-  const unreadCount = notifications.filter((notification) => !notification.is_read).length;
+  const unreadCount = unreadTotal ?? notifications.filter((notification) => !notification.is_read).length;
   const notificationText = (notification: NotificationCard) =>
     'description' in notification && notification.description ? notification.description : notification.message;
   const notificationTime = (notification: NotificationCard) =>
@@ -159,6 +165,7 @@ export default function NotificationsPage() {
   const openNotification = async (notification: NotificationCard) => {
     setSelectedNotification(notification);
     if (!notification.is_read) {
+      setUnreadTotal((total) => (total === null ? total : Math.max(total - 1, 0)));
       setNotifications((current) =>
         current.map((item) => item.id === notification.id ? { ...item, is_read: true } : item)
       );
@@ -174,6 +181,9 @@ export default function NotificationsPage() {
 
   const deleteNotification = async (notification: NotificationCard) => {
     setNotifications((current) => current.filter((item) => item.id !== notification.id));
+    if (!notification.is_read) {
+      setUnreadTotal((total) => (total === null ? total : Math.max(total - 1, 0)));
+    }
     if (selectedNotification?.id === notification.id) {
       setSelectedNotification(null);
     }
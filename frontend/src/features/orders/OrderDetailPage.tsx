@@ -23,6 +23,7 @@ import {
 } from "lucide-react";
 import { ordersApi } from "@/services/api/orders";
 import { customerApi, type Dispute, type Shipment, type OrderChatMessage } from "@/services/api/customer";
+import { openOrderStream } from "@/services/api/shipping";
 import TrackingMap from "@/components/TrackingMap";
 import type { FulfillmentStatus, Order, PaymentStatus } from "@/types/order";
 import { formatRemainingDisputeTime, getDisputeEligibility } from "@/lib/orderDisputes";
@@ -37,6 +38,9 @@ const DISPUTE_REASONS = [
   "Autre motif",
 ];
 
+// Statuts où le client suit la position du livreur (apps.shipping.capacity.ACTIVE_STATUSES)
+const COURIER_ACTIVE_STATUSES = ["ASSIGNED", "PICKED_UP", "IN_TRANSIT", "OUT_FOR_DELIVERY"];
+
 export default function OrderDetailPage() {
   const { t } = useTranslation();
   const { user } = useAuth();
@@ -56,6 +60,9 @@ export default function OrderDetailPage() {
   const [courierMessages, setCourierMessages] = useState<OrderChatMessage[]>([]);
   const [courierChatDraft, setCourierChatDraft] = useState("");
   const [chatSending, setChatSending] = useState(false);
+  // Flux SSE ouvert : messages, événements et position arrivent en direct
+  const [streamLive, setStreamLive] = useState(false);
+  const [courierPosition, setCourierPosition] = useState<[number, number] | null>(null);
   const disputeSectionRef = useRef<HTMLElement | null>(null);
   const courierChatEndRef = useRef<HTMLDivElement | null>(null);
 
@@ -171,9 +178,35 @@ export default function OrderDetailPage() {
     };
 
     fetchMessages();
+    if (streamLive) return () => { cancelled = true; };
+    // Repli tant que le flux n'est pas ouvert
     const interval = window.setInterval(fetchMessages, showCourierChat ? 4000 : 12000);
     return () => { cancelled = true; window.clearInterval(interval); };
-  }, [order, showCourierChat]);
+  }, [order, showCourierChat, streamLive]);
+
+  useEffect(() => {
+    if (!order || order.delivery_mode === "PICKUP") return;
+    return openOrderStream(order.id, {
+      onSnapshot: ({ shipment, messages }) => {
+        setTracking(shipment);
+        setCourierMessages(messages);
+      },
+      onEvent: (event) => {
+        // Hors course, le serveur n'envoie plus la position du livreur
+        if (!COURIER_ACTIVE_STATUSES.includes(event.status)) setCourierPosition(null);
+        setTracking((prev) =>
+          prev && !prev.events.some((known) => known.id === event.id)
+            ? { ...prev, status: event.status, events: [...prev.events, event] }
+            : prev,
+        );
+      },
+      onMessage: (message) => {
+        setCourierMessages((prev) => (prev.some((known) => known.id === message.id) ? prev : [...prev, message]));
+      },
+      onPosition: ({ latitude, longitude }) => setCourierPosition([latitude, longitude]),
+      onLiveChange: setStreamLive,
+    });
+  }, [order?.id, order?.delivery_mode]);
 
   useEffect(() => {
     if (!showCourierChat) return;
@@ -406,6 +439,7 @@ export default function OrderDetailPage() {
                       destinationCity={order.city}
                       destinationLabel={`Adresse de livraison : ${order.address}`}
                       originLabel={tracking?.courier_name ? `Livreur : ${tracking.courier_name}` : "Position livreur"}
+                      currentLocation={courierPosition ?? undefined}
                       height={280}
                       className="rounded-none border-0"
                     />
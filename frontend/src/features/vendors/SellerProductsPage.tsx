@@ -9,7 +9,9 @@ import {
   Clock, Filter, ChevronRight, Tag, Layers,
   TrendingDown, X,
 } from 'lucide-react';
-import { vendorsApi, type VendorProduct, type VendorProductEnriched } from '@/services/api/vendors';
+import {
+  vendorsApi, type ProductImportJob, type VendorProduct, type VendorProductEnriched,
+} from '@/services/api/vendors';
 import { productsApi, type Category } from '@/services/api/products';
 import { useToast } from '@/context/ToastContext';
 
@@ -33,6 +35,8 @@ type ProductListItem = Omit<VendorProduct, 'category'> &
     category: VendorProduct['category'] | VendorProductEnriched['category'];
   };
 
+const IMPORT_POLL_MS = 3000;  // suivi d'un import CSV en arrière-plan
+
 // ─── HELPERS ─────────────────────────────────────────────────────────────────
 
 function categoryId(category: ProductListItem['category']) {
@@ -267,10 +271,28 @@ export default function SellerProductsPage() {
     } catch { showToast('Erreur export CSV','error'); }
   };
 
+  // Import en arrière-plan : polling jusqu'à DONE / FAILED (arrêté si la page est quittée)
+  const importAlive = useRef(true);
+  useEffect(() => () => { importAlive.current = false; }, []);
+
+  const followImportJob = async (job: ProductImportJob) => {
+    showToast('Import en cours… vous serez notifié à la fin.', 'success');
+    let current = job;
+    while (importAlive.current && (current.status === 'PENDING' || current.status === 'RUNNING')) {
+      await new Promise(resolve => setTimeout(resolve, IMPORT_POLL_MS));
+      if (!importAlive.current) return;
+      current = await vendorsApi.getProductImportJob(job.id);
+    }
+    if (!importAlive.current) return;
+    if (current.status === 'FAILED') { showToast(current.message || "Erreur lors de l'import", 'error'); return; }
+    showToast(current.message, current.created_count > 0 ? 'success' : 'error'); await load();
+  };
+
   const handleImportCSV = async (file: File) => {
     try {
       setImporting(true);
       const result = await vendorsApi.importProductsCSV(file);
+      if ('status' in result) { await followImportJob(result); return; }
       showToast(result.message, result.created > 0 ? 'success' : 'error'); await load();
     } catch { showToast("Erreur lors de l'import",'error'); } finally { setImporting(false); }
   };
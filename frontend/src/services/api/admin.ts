@@ -429,6 +429,24 @@ export interface OrderFilters {
   min_amount?: number;
   max_amount?: number;
   search?: string;
+  /** Commandes d'un client (user ID) */
+  user?: number;
+  /** id | created_at | total_xaf, préfixe "-" = décroissant */
+  ordering?: string;
+  page?: number;
+  page_size?: number;
+}
+
+export interface AdminOrderPage {
+  count: number;
+  next: string | null;
+  previous: string | null;
+  results: AdminOrder[];
+  /** KPIs de l'ensemble filtré (toutes pages) */
+  totals: {
+    total: number; pending: number; paid: number; failed: number; refunded: number;
+    revenue: number; delivered: number; cancelled: number;
+  };
 }
 
 // ─────────────────────────────────────────────────────────────────────────────
@@ -532,9 +550,24 @@ export interface UserFilters {
   role?: string;
   is_banned?: boolean;
   is_active?: boolean;
+  status?: "active" | "inactive" | "banned";
+  plan?: string;
   date_from?: string;
   date_to?: string;
   search?: string;
+  /** username | date_joined | last_login | total_orders | total_spent | loyalty_points, préfixe "-" = décroissant */
+  ordering?: string;
+  page?: number;
+  page_size?: number;
+}
+
+export interface AdminUserPage {
+  count: number;
+  next: string | null;
+  previous: string | null;
+  results: AdminUser[];
+  /** Compteurs globaux, indépendants des filtres */
+  totals: { total: number; vendors: number; couriers: number; banned: number };
 }
 
 // ─────────────────────────────────────────────────────────────────────────────
@@ -1452,8 +1485,8 @@ export const adminApi = {
 
   // ── ORDERS ────────────────────────────────────────────────────────────────
 
-  /** Liste toutes les commandes */
-  listOrders: async (filters?: OrderFilters): Promise<AdminOrder[]> => {
+  /** Page de commandes : filtres, tri et pagination côté serveur */
+  listOrdersPage: async (filters?: OrderFilters): Promise<AdminOrderPage> => {
     const params = new URLSearchParams();
     if (filters?.payment_status)
       params.append("payment_status", filters.payment_status);
@@ -1467,8 +1500,12 @@ export const adminApi = {
     if (filters?.max_amount)
       params.append("max_amount", filters.max_amount.toString());
     if (filters?.search) params.append("search", filters.search);
+    if (filters?.user) params.append("user", filters.user.toString());
+    if (filters?.ordering) params.append("ordering", filters.ordering);
+    if (filters?.page) params.append("page", filters.page.toString());
+    if (filters?.page_size) params.append("page_size", filters.page_size.toString());
     const qs = params.toString();
-    return http<AdminOrder[]>(
+    return http<AdminOrderPage>(
       `/api/vendors/admin/orders/${qs ? "?" + qs : ""}`,
       { headers: authHeader() },
     );
@@ -1513,19 +1550,24 @@ export const adminApi = {
 
   // ── USERS ─────────────────────────────────────────────────────────────────
 
-  /** Liste tous les utilisateurs */
-  listUsers: async (filters?: UserFilters): Promise<AdminUser[]> => {
+  /** Page d'utilisateurs : filtres, tri et pagination côté serveur */
+  listUsersPage: async (filters?: UserFilters): Promise<AdminUserPage> => {
     const params = new URLSearchParams();
     if (filters?.role) params.append("role", filters.role);
     if (filters?.is_banned !== undefined)
       params.append("is_banned", filters.is_banned.toString());
     if (filters?.is_active !== undefined)
       params.append("is_active", filters.is_active.toString());
+    if (filters?.status) params.append("status", filters.status);
+    if (filters?.plan) params.append("plan", filters.plan);
     if (filters?.date_from) params.append("date_from", filters.date_from);
     if (filters?.date_to) params.append("date_to", filters.date_to);
     if (filters?.search) params.append("search", filters.search);
+    if (filters?.ordering) params.append("ordering", filters.ordering);
+    if (filters?.page) params.append("page", filters.page.toString());
+    if (filters?.page_size) params.append("page_size", filters.page_size.toString());
     const qs = params.toString();
-    return http<AdminUser[]>(`/api/vendors/admin/users/${qs ? "?" + qs : ""}`, {
+    return http<AdminUserPage>(`/api/vendors/admin/users/${qs ? "?" + qs : ""}`, {
       headers: authHeader(),
     });
   },
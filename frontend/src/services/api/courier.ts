@@ -92,6 +92,17 @@ export type CourierNetwork = {
   relay_points: CourierNetworkRelayPoint[];
 };
 
+export type CourierAvailablePage = {
+  next: string | null;
+  previous: string | null;
+  results: CourierShipment[];
+};
+
+export type CourierAvailableCount = {
+  city_key: string;
+  count: number;
+};
+
 export type CourierNotification = {
   id: number;
   title: string;
@@ -130,6 +141,7 @@ export type CourierShipmentMessage = {
 export type CourierDashboard = {
   active_shipments: number;
   delivered_shipments: number;
+  stats_window_days: number;
   today_earnings_xaf: number;
   month_earnings_xaf: number;
   monthly_target_xaf: number;
@@ -209,6 +221,10 @@ export const courierApi = {
     return http<CourierNotification[]>("/api/auth/notifications/?audience=courier");
   },
 
+  getUnreadNotificationsCount: async (): Promise<{ audience: string; unread: number }> => {
+    return http<{ audience: string; unread: number }>("/api/auth/notifications/unread-count/?audience=courier");
+  },
+
   getDisputes: async (): Promise<CourierDispute[]> => {
     return http<CourierDispute[]>("/api/shipping/disputes/");
   },
@@ -283,13 +299,29 @@ export const courierApi = {
     });
   },
 
-  listAvailableShipments: async (): Promise<CourierShipment[]> => {
-    return http<CourierShipment[]>("/api/shipping/available/");
+  // `next` est l'URL complète renvoyée par la page précédente (pagination par curseur)
+  listAvailablePage: async (next?: string | null): Promise<CourierAvailablePage> => {
+    return http<CourierAvailablePage>(next || "/api/shipping/available/");
+  },
+
+  countAvailableShipments: async (): Promise<CourierAvailableCount> => {
+    return http<CourierAvailableCount>("/api/shipping/available/count/");
+  },
+
+  // `idempotencyKey` : à conserver entre les tentatives d'un même geste
+  claimNextShipment: async (idempotencyKey?: string): Promise<CourierShipment | null> => {
+    // 204 : aucune livraison disponible
+    const shipment = await http<CourierShipment | undefined>("/api/shipping/available/claim-next/", {
+      method: "POST",
+      headers: idempotencyKey ? { "Idempotency-Key": idempotencyKey } : undefined,
+    });
+    return shipment ?? null;
   },
 
-  claimShipment: async (id: number): Promise<CourierShipment> => {
+  claimShipment: async (id: number, idempotencyKey?: string): Promise<CourierShipment> => {
     return http<CourierShipment>(`/api/shipping/available/${id}/claim/`, {
       method: "POST",
+      headers: idempotencyKey ? { "Idempotency-Key": idempotencyKey } : undefined,
     });
   },
 };
@@ -85,6 +85,9 @@ export const customerApi = {
   getNotifications: async (): Promise<CustomerNotification[]> =>
     api.get<CustomerNotification[]>('/auth/notifications/?audience=customer'),
 
+  getUnreadNotificationsCount: async (): Promise<{ audience: string; unread: number }> =>
+    api.get<{ audience: string; unread: number }>('/auth/notifications/unread-count/?audience=customer'),
+
   markNotificationRead: async (id: number): Promise<CustomerNotification> =>
     api.post<CustomerNotification>(`/auth/notifications/${id}/read/`),
 
@@ -101,6 +101,13 @@ async function refreshAccessToken(): Promise<string | null> {
   }
 }
 
+/**
+ * URL absolue d'un chemin d'API (EventSource, liens directs)
+ */
+export function apiUrl(endpoint: string): string {
+  return endpoint.startsWith('http') ? endpoint : `${API_BASE_URL}${endpoint}`;
+}
+
 /**
  * Helper HTTP avec gestion automatique des tokens
  */
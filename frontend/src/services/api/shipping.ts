@@ -1,4 +1,4 @@
-import { http } from "@/services/api/http";
+import { apiUrl, http } from "@/services/api/http";
 
 export type ShipmentEvent = {
   id: number;
@@ -23,3 +23,98 @@ export type Shipment = {
 export function trackShipment(orderId: number): Promise<Shipment> {
   return http<Shipment>(`/api/shipping/track/?order_id=${orderId}`, { method: "GET" });
 }
+
+// ─── Flux SSE de suivi ───────────────────────────────────────────────────────
+// EventSource n'envoie pas d'en-tête Authorization : on demande d'abord un jeton
+// court (lié à l'URL du flux) puis on l'ouvre avec ?token=. Le jeton expirant,
+// chaque reconnexion redemande un jeton et reprend au dernier id reçu.
+
+export type ShipmentStreamMessage = {
+  id: number;
+  shipment: number;
+  channel: string;
+  sender_role: "CLIENT" | "COURIER" | "SYSTEM";
+  sender_name: string;
+  message: string;
+  created_at: string;
+};
+
+export type ShipmentStreamPosition = {
+  latitude: number;
+  longitude: number;
+  recorded_at: string | null;
+};
+
+export type ShipmentStreamHandlers = {
+  onSnapshot?: (data: { shipment: Shipment; messages: ShipmentStreamMessage[] }) => void;
+  onEvent?: (event: ShipmentEvent) => void;
+  onMessage?: (message: ShipmentStreamMessage) => void;
+  onPosition?: (position: ShipmentStreamPosition) => void;
+  onLiveChange?: (live: boolean) => void;
+};
+
+type ShipmentStreamToken = { token: string; stream_url: string; expires_in: number };
+
+const STREAM_RETRY_MIN_MS = 3000;
+const STREAM_RETRY_MAX_MS = 60000;
+
+export function openOrderStream(orderId: number, handlers: ShipmentStreamHandlers): () => void {
+  let source: EventSource | null = null;
+  let lastEventId = "";
+  let closed = false;
+  let retryMs = STREAM_RETRY_MIN_MS;
+  let timer: number | undefined;
+
+  const schedule = () => {
+    handlers.onLiveChange?.(false);
+    if (closed) return;
+    timer = window.setTimeout(connect, retryMs);
+    retryMs = Math.min(retryMs * 2, STREAM_RETRY_MAX_MS);
+  };
+
+  const listen = (stream: EventSource, kind: string, handler?: (data: never) => void) => {
+    stream.addEventListener(kind, (event) => {
+      const message = event as MessageEvent<string>;
+      if (message.lastEventId) lastEventId = message.lastEventId;
+      handler?.((JSON.parse(message.data) as { data: never }).data);
+    });
+  };
+
+  async function connect() {
+    let grant: ShipmentStreamToken;
+    try {
+      grant = await http<ShipmentStreamToken>(`/api/shipping/orders/${orderId}/stream/token/`, { method: "POST" });
+    } catch {
+      schedule(); // pas encore de livraison, ou réseau coupé
+      return;
+    }
+    if (closed) return;
+
+    const params = new URLSearchParams({ token: grant.token });
+    if (lastEventId) params.set("last_event_id", lastEventId);
+    const stream = new EventSource(apiUrl(`${grant.stream_url}?${params}`));
+    source = stream;
+    stream.onopen = () => {
+      retryMs = STREAM_RETRY_MIN_MS;
+      handlers.onLiveChange?.(true);
+    };
+    listen(stream, "snapshot", handlers.onSnapshot);
+    listen(stream, "event", handlers.onEvent);
+    listen(stream, "message", handlers.onMessage);
+    listen(stream, "position", handlers.onPosition);
+    stream.onerror = () => {
+      // Fin de flux (STREAM_MAX_SECONDS) ou coupure : l'ancien jeton a expiré,
+      // on ne laisse pas EventSource rejouer la même URL
+      stream.close();
+      if (source === stream) source = null;
+      schedule();
+    };
+  }
+
+  void connect();
+  return () => {
+    closed = true;
+    window.clearTimeout(timer);
+    source?.close();
+  };
+}
@@ -558,6 +558,44 @@ export interface MasterImage {
   is_primary: boolean;
 }
 
+// ─────────────────────────────────────────────────────────────────────────────
+// IMPORT CSV
+// ─────────────────────────────────────────────────────────────────────────────
+
+export interface ProductImportError {
+  ligne: number | null;
+  erreur: string;
+}
+
+/** Import traité dans la requête (201 / 200 en simulation). */
+export interface ProductImportResult {
+  created: number;
+  valid: number;
+  rows: number;
+  dry_run: boolean;
+  error_count: number;
+  errors: ProductImportError[];
+  message: string;
+}
+
+export type ProductImportJobStatus = "PENDING" | "RUNNING" | "DONE" | "FAILED";
+
+/** Gros fichier : import confié au worker (202), suivi par polling. */
+export interface ProductImportJob {
+  id: number;
+  status: ProductImportJobStatus;
+  dry_run: boolean;
+  total_rows: number | null;
+  rows_processed: number;
+  created_count: number;
+  error_count: number;
+  errors: ProductImportError[];
+  message: string;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+}
+
 // ─────────────────────────────────────────────────────────────────────────────
 // API SERVICE
 // ─────────────────────────────────────────────────────────────────────────────
@@ -911,14 +949,14 @@ export const vendorsApi = {
     return res.blob();
   },
 
-  /** Importe des produits depuis un fichier CSV. */
+  /**
+   * Importe des produits depuis un fichier CSV.
+   * Petit fichier → résultat immédiat ; gros fichier → ProductImportJob (202)
+   * à suivre avec getProductImportJob.
+   */
   importProductsCSV: async (
     file: File,
-  ): Promise<{
-    created: number;
-    errors: { ligne: number; erreur: string }[];
-    message: string;
-  }> => {
+  ): Promise<ProductImportResult | ProductImportJob> => {
     const token = localStorage.getItem("access_token");
     const form = new FormData();
     form.append("file", file);
@@ -929,6 +967,14 @@ export const vendorsApi = {
     });
   },
 
+  /** Progression / résultat d'un import CSV en arrière-plan. */
+  getProductImportJob: async (jobId: number): Promise<ProductImportJob> => {
+    const token = localStorage.getItem("access_token");
+    return http<ProductImportJob>(`/api/vendors/products/import/jobs/${jobId}/`, {
+      headers: { Authorization: `Bearer ${token}` },
+    });
+  },
+
   /**
    * Crée une demande de Promotion/Flash Deal liée au produit.
    * Le backend la garde en PENDING jusqu'à validation admin.
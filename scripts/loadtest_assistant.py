@@ -0,0 +1,147 @@
+"""
+Test de charge : appels IA lents vs. catalogue.
+
+Deux sous-commandes :
+
+  stub  — faux OpenRouter qui répond après --delay secondes
+          (OPENROUTER_API_URL=http://127.0.0.1:9900/ côté backend)
+  run   — --slow clients enchaînent des appels à l'assistant pendant
+          --duration secondes ; en parallèle, --probes clients mesurent la
+          latence du catalogue. Affiche p50 / p95 / max et les erreurs.
+
+Exemple (voir docs/asgi.md pour la comparaison WSGI / ASGI) :
+
+  python scripts/loadtest_assistant.py stub --delay 5 &
+  python scripts/loadtest_assistant.py run --base http://127.0.0.1:8000 --slow 8
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+ASSISTANT_PATH = "/api/ai/catalog-assistant/"
+CATALOG_PATH = "/api/catalog/products/"
+PAYLOAD = {
+    "message": "un sac pas cher",
+    "products": [{"id": 1, "title": "Sac", "price_xaf": 1000}],
+}
+
+
+# ─── Faux OpenRouter ─────────────────────────────────────────────────────────
+
+def _completion():
+    content = json.dumps({"answer": "stub", "suggestions": [], "followUp": []})
+    return json.dumps({"choices": [{"message": {"content": content}}]}).encode()
+
+
+async def serve_stub(port, delay):
+    body = _completion()
+
+    async def handle(reader, writer):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.decode("latin-1").split("\r\n"):
+                name, _, value = line.partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            await asyncio.sleep(delay)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nConnection: close\r\n"
+                + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", port, backlog=1024)
+    print(f"faux OpenRouter sur http://127.0.0.1:{port}/ (délai {delay}s)")
+    async with server:
+        await server.serve_forever()
+
+
+# ─── Charge ──────────────────────────────────────────────────────────────────
+
+async def _loop(client, method, path, deadline, latencies, errors, ip, **kwargs):
+    # Une IP par client virtuel : le throttle anonyme (par IP) s'applique comme
+    # pour des visiteurs distincts et ne fausse pas la mesure
+    headers = {"X-Forwarded-For": ip}
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, headers=headers, **kwargs)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+            else:
+                latencies.append(time.perf_counter() - started)
+        except httpx.HTTPError as exc:
+            errors.append(exc.__class__.__name__)
+
+
+def _summary(label, latencies, errors, duration):
+    detail = ", ".join(f"{error}×{count}" for error, count in Counter(errors).most_common())
+    if not latencies:
+        return f"{label:<10} aucune réponse, erreurs {detail}"
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"{label:<10} {len(latencies):>5} req  {len(latencies) / duration:>7.1f} req/s  "
+        f"p50 {statistics.median(ordered) * 1000:>7.0f} ms  p95 {p95 * 1000:>7.0f} ms  "
+        f"max {ordered[-1] * 1000:>7.0f} ms  erreurs {len(errors)} {detail}"
+    )
+
+
+async def run(base, slow, probes, duration, timeout):
+    limits = httpx.Limits(max_connections=slow + probes, max_keepalive_connections=slow + probes)
+    async with httpx.AsyncClient(base_url=base, timeout=timeout, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+        slow_latencies, slow_errors, fast_latencies, fast_errors = [], [], [], []
+        tasks = [
+            _loop(client, "POST", ASSISTANT_PATH, deadline, slow_latencies, slow_errors, f"198.51.100.{index + 1}",
+                  json=PAYLOAD)
+            for index in range(slow)
+        ]
+        # Les sondes démarrent une fois les appels lents en vol
+        await asyncio.sleep(0.5)
+        tasks += [
+            _loop(client, "GET", CATALOG_PATH, deadline, fast_latencies, fast_errors, f"203.0.113.{index + 1}")
+            for index in range(probes)
+        ]
+        await asyncio.gather(*tasks)
+
+    print(_summary("assistant", slow_latencies, slow_errors, duration))
+    print(_summary("catalogue", fast_latencies, fast_errors, duration))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stub = commands.add_parser("stub", help="faux OpenRouter lent")
+    stub.add_argument("--port", type=int, default=9900)
+    stub.add_argument("--delay", type=float, default=5.0)
+
+    load = commands.add_parser("run", help="appels lents + sondes catalogue")
+    load.add_argument("--base", default="http://127.0.0.1:8000")
+    load.add_argument("--slow", type=int, default=8, help="appels assistant simultanés")
+    load.add_argument("--probes", type=int, default=4, help="clients catalogue simultanés")
+    load.add_argument("--duration", type=float, default=20.0)
+    load.add_argument("--timeout", type=float, default=60.0)
+
+    args = parser.parse_args()
+    if args.command == "stub":
+        asyncio.run(serve_stub(args.port, args.delay))
+    else:
+        asyncio.run(run(args.base, args.slow, args.probes, args.duration, args.timeout))
+
+
+if __name__ == "__main__":
+    main()